@@ -1,8 +1,11 @@
 """ This script gets whois information about a given AS and returns it parsed
 """
 # System imports
+import os
 import re
-from subprocess import (CalledProcessError, PIPE, run)
+import threading
+import time
+from subprocess import (CalledProcessError, PIPE, TimeoutExpired, run)
 
 # Third-party imports
 import json
@@ -10,14 +13,138 @@ import json
 # Local source tree imports
 
 
+class WhoIsCache(object):
+    """
+    Class to keep whois answers by ASN for a while, shared by all requests of
+    the process. Unknown ASNs are kept for a shorter time, and answers close
+    to expire are refreshed in background while the cached one is returned.
+    """
+    refresh_ahead = 0.2
+
+    def __init__(self, ttl, negative_ttl, timeout):
+        """
+
+        Args:
+            ttl: Seconds a whois answer is kept
+            negative_ttl: Seconds an ASN without whois answer is kept
+            timeout: Seconds whois may run
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.entries = {}
+        self.refreshing = set()
+        self.lock = threading.Lock()
+
+    def fetch(self, asn, refresh=False):
+        """ Runs whois for an ASN and stores its output and parsed dict
+
+        Args:
+            asn: The ASN
+            refresh: True when the stored answer is refreshed. If whois
+                fails (timeout, error or empty output) the stored answer is
+                kept, as an ASN without answer is only stored when nothing
+                is stored
+
+        Returns: The stored entry, a dict with 'output', 'parsed',
+        'expires_at' and 'refresh_at'
+
+        """
+        try:
+            data = run(['whois', 'AS' + str(asn)], stdout=PIPE,
+                       timeout=self.timeout)
+            data.check_returncode()
+            output = data.stdout.split(b'\n')
+        except (CalledProcessError, TimeoutExpired):
+            output = []
+        parsed = parse_who_is(output)
+
+        if refresh and not parsed:
+            with self.lock:
+                entry = self.entries.get(asn)
+            if entry is not None and entry['parsed']:
+                return entry
+
+        now = time.time()
+        ttl = self.ttl if parsed else self.negative_ttl
+        entry = {
+            'output': output,
+            'parsed': parsed,
+            'expires_at': now + ttl,
+            'refresh_at': now + ttl * (1 - self.refresh_ahead),
+        }
+        with self.lock:
+            self.entries[asn] = entry
+        return entry
+
+    def refresh_in_background(self, asn):
+        with self.lock:
+            if asn in self.refreshing:
+                return
+            self.refreshing.add(asn)
+
+        def refresh():
+            try:
+                self.fetch(asn, refresh=True)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(asn)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def get(self, asn):
+        """ Returns the entry of an ASN, running whois only when it is not
+        cached or expired """
+        asn = str(asn)
+        entry = self.entries.get(asn)
+        now = time.time()
+        if entry is None or now >= entry['expires_at']:
+            return self.fetch(asn)
+        if now >= entry['refresh_at']:
+            self.refresh_in_background(asn)
+        return entry
+
+
+who_is_cache = WhoIsCache(
+    ttl=int(os.environ.get('WHOIS_CACHE_TTL', 60 * 60 * 24)),
+    negative_ttl=int(os.environ.get('WHOIS_NEGATIVE_CACHE_TTL', 60 * 10)),
+    timeout=int(os.environ.get('WHOIS_TIMEOUT', 30)))
+
+
+def parse_who_is(who_is_output):
+    """ Process whois output and creates a dict with data
+
+    Args:
+        who_is_output: List with the lines of whois output
+
+    Returns: A dict with all data collected from whois tool
+
+    """
+    who_is_dict = {}
+    for line in who_is_output:
+        try:
+            decoded_line = line.decode("utf-8")
+        except:
+            decoded_line = line.decode("latin1")
+
+        div = decoded_line.split(":")
+        if len(div) == 2:
+            div[1] = re.sub("(^\s+)", '', div[1].rstrip())
+            who_is_dict[div[0]] = div[1]
+        else:
+            continue
+
+    return who_is_dict
+
+
 class WhoIsHandler(object):
 
     def __init__(self, asn):
-        arg = str(asn)
-        data = run(['whois', 'AS' + arg], stdout=PIPE)
+        entry = who_is_cache.get(asn)
 
         self.asn = asn
-        self.who_is_output = data.stdout.split(b'\n')
+        self.who_is_output = entry['output']
+        self.who_is_dict = entry['parsed']
 
     def who_is_to_dict(self):
         """ Process whois output and creates a dict with data
@@ -25,22 +152,7 @@ class WhoIsHandler(object):
         Returns: A dict with all data collected from whois tool
 
         """
-
-        who_is_dict = {}
-        for line in self.who_is_output:
-            try:
-                decoded_line = line.decode("utf-8")
-            except:
-                decoded_line = line.decode("latin1")
-
-            div = decoded_line.split(":")
-            if len(div) == 2:
-                div[1] = re.sub("(^\s+)", '', div[1].rstrip())
-                who_is_dict[div[0]] = div[1]
-            else:
-                continue
-
-        return who_is_dict
+        return dict(self.who_is_dict)
 
     def is_foreign(self):
         """ Check if a given AS is from BR or not
@@ -48,7 +160,7 @@ class WhoIsHandler(object):
         Returns: True if AS is from outside BR or False otherwise
 
         """
-        who_is_dict = self.who_is_to_dict()
+        who_is_dict = self.who_is_dict
 
         if "Country" in who_is_dict.keys():
             if who_is_dict['Country'] == 'BR':
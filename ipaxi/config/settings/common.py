@@ -278,7 +278,9 @@ ADMIN_URL = r'^admin/'
 # Your common stuff: Below this line define 3rd party library settings
 # ------------------------------------------------------------------------------
 REST_FRAMEWORK = {
-    # 'DEFAULT_PAGINATION_CLASS': 100,
+    'DEFAULT_PAGINATION_CLASS':
+        'ixbr_api.api.pagination.ModifiedCursorPagination',
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=100),
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -288,6 +290,9 @@ REST_FRAMEWORK = {
     )
 }
 
+# Largest page a client may ask for with ?page_size=
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=1000)
+
 SWAGGER_SETTINGS = {
     'LOGIN_URL': 'rest_framework:login',
     'LOGOUT_URL': 'rest_framework:logout',
@@ -296,6 +301,12 @@ SWAGGER_SETTINGS = {
     'APIS_SORTER': 'alpha'
 }
 
+# Seconds a whois answer is cached, and an unknown ASN is remembered
+WHOIS_CACHE_TTL = env.int('WHOIS_CACHE_TTL', default=60 * 60 * 24)
+WHOIS_NEGATIVE_CACHE_TTL = env.int('WHOIS_NEGATIVE_CACHE_TTL', default=60 * 10)
+# Seconds whois may run
+WHOIS_TIMEOUT = env.int('WHOIS_TIMEOUT', default=30)
+
 #############
 ## Logging ##
 #############
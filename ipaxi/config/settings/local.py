@@ -83,6 +83,7 @@ DEBUG_TOOLBAR_CONFIG = {
 # TESTING
 # ------------------------------------------------------------------------------
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
+MOMMY_CUSTOM_CLASS = 'ixbr_api.core.tests.mommy_generators.IXMommy'
 
 # Your local stuff: Below this line define 3rd party library settings
 # ------------------------------------------------------------------------------
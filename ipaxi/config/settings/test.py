@@ -62,6 +62,7 @@ CACHES = {
 # TESTING
 # ------------------------------------------------------------------------------
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
+MOMMY_CUSTOM_CLASS = 'ixbr_api.core.tests.mommy_generators.IXMommy'
 
 
 # PASSWORD HASHING
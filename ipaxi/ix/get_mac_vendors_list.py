@@ -1,58 +1,140 @@
-""" This script downloads OUI file and populate a sqlitedb
+""" This script populates a sqlitedb with the vendors of the OUI file.
+
+The OUI file is read from disk, so it runs offline; use --download to fetch
+a new one from IEEE first. The database is built in a temporary file and
+moved over the old one, or, with --diff, updated in place with only the
+entries that changed, so readers never see a half written database.
 """
 
+import argparse
 import os
-import sys
-import urllib.request
 import re
 import sqlite3
+import tempfile
+import time
+import urllib.request
+
+OUI_URL = "http://standards.ieee.org/develop/regauth/oui/oui.txt"
+
+VENDOR_LINE = re.compile(r"^\s*([0-9A-Fa-f]{6})\s+\(base 16\)\s*(.*?)\s*$")
 
 
 def get_mac_table_file(filename="oui/oui.txt"):
-    url = "http://standards.ieee.org/develop/regauth/oui/oui.txt"
-    request = urllib.request.urlopen(url)
+    request = urllib.request.urlopen(OUI_URL)
     with open(filename, "wb") as f:
         for line in request:
             f.write(line)
 
 
 def parse_mac_table_file(filename="oui/oui.txt"):
-    ven_arr = []
-    with open(filename, "r") as f:
+    """ Yields a (mac, vendor) tuple for each '(base 16)' line of the OUI
+    file, reading it line by line """
+    match = VENDOR_LINE.match
+    with open(filename, "r", encoding="utf-8", errors="replace") as f:
         for line in f:
             if "(base 16)" not in line:
                 continue
-            ven = tuple(re.sub("\s*([0-9a-zA-Z]+)[\s\t]*\(base 16\)[\s\t]*(.*)\n", r"\1;;\2", line).split(";;"))
-            ven_arr.append(ven)
-    return ven_arr
+            vendor = match(line)
+            if vendor:
+                yield vendor.group(1).upper(), vendor.group(2)
+
+
+def create_schema(cur):
+    cur.execute("CREATE TABLE IF NOT EXISTS macvendors("
+                "id INTEGER PRIMARY KEY, mac TEXT, vendor TEXT)")
+    cur.execute("CREATE INDEX IF NOT EXISTS macvendors_mac "
+                "ON macvendors(mac)")
 
 
 def list_to_database(ven_arr, filename="oui/macvendors1.db"):
+    """ Builds a new database with the vendors of ven_arr and moves it over
+    filename """
+    fd, tmp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)), suffix=".db")
+    os.close(fd)
     try:
-        os.unlink(filename)
-    except OSError:
-        pass
-    db = sqlite3.connect(filename)
-    cur = db.cursor()
-    create_q = "CREATE TABLE macvendors(id INTEGER PRIMARY KEY, mac TEXT, vendor TEXT);"
-    cur.execute(create_q)
-    query_pr = "INSERT INTO macvendors (`mac`,`vendor`) VALUES "
-    query = ""
-    for ind, ven in enumerate(ven_arr):
-        query = query_pr + '("%s", "%s")\n'% (ven[0], ven[1].replace("\"", "\"\""))
+        db = sqlite3.connect(tmp_filename)
         try:
-            cur.execute(query)
-        except Exception as e:
-            print ("Error: {}".format(e))
+            with db:
+                cur = db.cursor()
+                cur.execute("CREATE TABLE macvendors("
+                            "id INTEGER PRIMARY KEY, mac TEXT, vendor TEXT)")
+                cur.executemany(
+                    "INSERT INTO macvendors (mac, vendor) VALUES (?, ?)",
+                    ven_arr)
+                cur.execute("CREATE INDEX macvendors_mac ON macvendors(mac)")
+                count = cur.execute(
+                    "SELECT COUNT(*) FROM macvendors").fetchone()[0]
+        finally:
             db.close()
-            sys.exit()
-    db.commit()
-    db.close()
+        os.chmod(tmp_filename, 0o644)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        os.unlink(tmp_filename)
+        raise
+    return count
+
+
+def diff_to_database(ven_arr, filename="oui/macvendors1.db"):
+    """ Applies to an existing database only the vendors of ven_arr that
+    were added, changed or removed, in a single transaction.
+
+    Returns a tuple with the amount of inserted, updated and deleted macs
+    """
+    vendors = dict()
+    for mac, vendor in ven_arr:
+        vendors.setdefault(mac, vendor)
+
+    db = sqlite3.connect(filename)
+    try:
+        with db:
+            cur = db.cursor()
+            create_schema(cur)
+            current = dict()
+            for mac, vendor in cur.execute(
+                    "SELECT mac, vendor FROM macvendors ORDER BY id"):
+                current.setdefault(mac, vendor)
+
+            inserted = [(mac, vendor) for mac, vendor in vendors.items()
+                        if mac not in current]
+            updated = [(vendor, mac) for mac, vendor in vendors.items()
+                       if mac in current and current[mac] != vendor]
+            deleted = [(mac,) for mac in current if mac not in vendors]
+
+            cur.executemany(
+                "INSERT INTO macvendors (mac, vendor) VALUES (?, ?)",
+                inserted)
+            cur.executemany(
+                "UPDATE macvendors SET vendor = ? WHERE mac = ?", updated)
+            cur.executemany("DELETE FROM macvendors WHERE mac = ?", deleted)
+    finally:
+        db.close()
+    return len(inserted), len(updated), len(deleted)
 
 
 if __name__ == "__main__":
-    print("Downloading MAC VENDOR list to file oui.txt")
-    get_mac_table_file()
-    print("Parsing data and inserting in macvendors.db")
-    list_to_database(parse_mac_table_file())
-    print("Finished")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--download", action="store_true",
+                        help="download oui.txt from IEEE before parsing")
+    parser.add_argument("--diff", action="store_true",
+                        help="update the existing database in place")
+    parser.add_argument("--oui", default="oui/oui.txt")
+    parser.add_argument("--database", default="oui/macvendors1.db")
+    args = parser.parse_args()
+
+    if args.download:
+        print("Downloading MAC VENDOR list to file {}".format(args.oui))
+        get_mac_table_file(args.oui)
+
+    start = time.perf_counter()
+    print("Parsing data and inserting in {}".format(args.database))
+    if args.diff and os.path.exists(args.database):
+        inserted, updated, deleted = diff_to_database(
+            parse_mac_table_file(args.oui), args.database)
+        print("Inserted {}, updated {}, deleted {}".format(
+            inserted, updated, deleted))
+    else:
+        count = list_to_database(parse_mac_table_file(args.oui),
+                                 args.database)
+        print("Inserted {}".format(count))
+    print("Finished in {:.3f}s".format(time.perf_counter() - start))
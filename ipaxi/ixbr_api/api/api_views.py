@@ -1,5 +1,12 @@
+import hashlib
+
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from ..core.models import (ASN, DIO, IX, PIX, Bilateral, BilateralPeer,
                            ChannelPort, Contact, ContactsMap, CoreChannel,
@@ -8,6 +15,8 @@ from ..core.models import (ASN, DIO, IX, PIX, Bilateral, BilateralPeer,
                            Monitorv4, Organization, Phone, PhysicalInterface,
                            Port, Route, Switch, SwitchModel, SwitchPortRange,
                            Tag, TranslationChannel, UplinkChannel,)
+from ..core.use_cases.export_use_cases import export_ix_ndjson
+from ..core.use_cases.search_use_cases import search_services_q
 from .serializers import (ASNSerializer, BilateralPeerSerializer,
                           BilateralSerializer, ChannelPortSerializer,
                           ContactSerializer, ContactsMapSerializer,
@@ -23,10 +32,84 @@ from .serializers import (ASNSerializer, BilateralPeerSerializer,
                           RouteSerializer, SwitchModelSerializer,
                           SwitchPortRangeSerializer, SwitchSerializer,
                           TagSerializer, TranslationChannelSerializer,
-                          UplinkChannelSerializer,)
-
-
-class IXViewSet(mixins.ListModelMixin,
+                          UplinkChannelSerializer, get_requested_fields)
+
+
+class EagerLoadingViewSetMixin(object):
+    """ Mixin of GenericViewSet loading with the queryset the relations its
+    serializer declares through setup_eager_loading(), only the ones of
+    the fields asked with ?fields= and ?expand= when given """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(
+                queryset, *get_requested_fields(self.request))
+        return queryset
+
+
+class ConditionalGetViewSetMixin(object):
+    """ Mixin of GenericViewSet answering conditional GETs of list and
+    retrieve with 304, before serializing anything.
+
+    The ETag of a list comes from the primary keys and the modified of the
+    objects of the page, read by the page query itself, and from the query
+    string, so each page has its own and a deleted object changes it. Lists
+    have no Last-Modified, as it cannot tell deletions. The ETag of a detail
+    comes from the modified of the object. Changes in nested objects that do
+    not touch the listed objects are not seen.
+    """
+
+    def conditional_response(self, request, version, last_modified):
+        """ Returns: tuple with the 304 response, or None when the client
+        copy is stale, and the headers to add to the response """
+        etag = quote_etag(hashlib.md5('{}|{}'.format(
+            request.get_full_path(), version).encode()).hexdigest())
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+            headers['Last-Modified'] = http_date(last_modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        return response, headers
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+        version = '|'.join('{}:{}'.format(obj.pk, obj.modified)
+                           for obj in objects)
+
+        response, headers = self.conditional_response(request, version, None)
+        if response is None:
+            serializer = self.get_serializer(objects, many=True)
+            if page is None:
+                response = Response(serializer.data)
+            else:
+                response = self.get_paginated_response(serializer.data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        version = '{}|{}'.format(instance.pk, instance.modified)
+
+        response, headers = self.conditional_response(
+            request, version, instance.modified)
+        if response is None:
+            serializer = self.get_serializer(instance)
+            response = Response(serializer.data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+class IXViewSet(EagerLoadingViewSetMixin,
+                ConditionalGetViewSetMixin,
+                mixins.ListModelMixin,
                 mixins.RetrieveModelMixin,
                 viewsets.GenericViewSet):
     queryset = IX.objects.all()
@@ -34,8 +117,20 @@ class IXViewSet(mixins.ListModelMixin,
     lookup_field = 'code'
     lookup_value_regex = '[a-z]{2,4}'
 
+    @action(detail=True)
+    def export(self, request, *args, **kwargs):
+        """ Streams every object of the IX as newline delimited JSON """
+        ix = self.get_object()
+        response = StreamingHttpResponse(export_ix_ndjson(ix=ix.code),
+                                         content_type='application/x-ndjson')
+        response['Content-Disposition'] = \
+            'attachment; filename="{}.ndjson"'.format(ix.code)
+        return response
+
 
-class ContactViewSet(mixins.ListModelMixin,
+class ContactViewSet(EagerLoadingViewSetMixin,
+                     ConditionalGetViewSetMixin,
+                     mixins.ListModelMixin,
                      mixins.RetrieveModelMixin,
                      viewsets.GenericViewSet):
     queryset = Contact.objects.all()
@@ -45,7 +140,9 @@ class ContactViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class BilateralViewSet(mixins.ListModelMixin,
+class BilateralViewSet(EagerLoadingViewSetMixin,
+                       ConditionalGetViewSetMixin,
+                       mixins.ListModelMixin,
                        mixins.RetrieveModelMixin,
                        viewsets.GenericViewSet):
 
@@ -72,20 +169,14 @@ class BilateralViewSet(mixins.ListModelMixin,
 
         if search:
             qs = qs.filter(
-                Q(peer_a__asn__number__icontains=search) |
-                Q(peer_b__asn__number__icontains=search) |
-                Q(peer_a__pk__in=MACAddress.objects.filter(
-                        address__icontains=search)
-                    .values_list('bilateralpeer', flat=True)) |
-                Q(peer_b__pk__in=MACAddress.objects.filter(
-                        address__icontains=search)
-                    .values_list('bilateralpeer', flat=True)) |
-                Q(peer_a__tag__tag__icontains=search) |
-                Q(peer_b__tag__tag__icontains=search))
+                search_services_q(search, BilateralPeer, 'peer_a__') |
+                search_services_q(search, BilateralPeer, 'peer_b__'))
         return qs
 
 
-class BilateralPeerViewSet(mixins.ListModelMixin,
+class BilateralPeerViewSet(EagerLoadingViewSetMixin,
+                           ConditionalGetViewSetMixin,
+                           mixins.ListModelMixin,
                            mixins.RetrieveModelMixin,
                            viewsets.GenericViewSet):
     queryset = BilateralPeer.objects.all()
@@ -95,7 +186,9 @@ class BilateralPeerViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class ASNViewSet(mixins.ListModelMixin,
+class ASNViewSet(EagerLoadingViewSetMixin,
+                 ConditionalGetViewSetMixin,
+                 mixins.ListModelMixin,
                  mixins.RetrieveModelMixin,
                  viewsets.GenericViewSet):
     queryset = ASN.objects.all()
@@ -104,7 +197,9 @@ class ASNViewSet(mixins.ListModelMixin,
     lookup_value_regex = '[1-9][0-9]*'
 
 
-class ChannelPortViewSet(mixins.ListModelMixin,
+class ChannelPortViewSet(EagerLoadingViewSetMixin,
+                         ConditionalGetViewSetMixin,
+                         mixins.ListModelMixin,
                          mixins.RetrieveModelMixin,
                          viewsets.GenericViewSet):
     queryset = ChannelPort.objects.all()
@@ -114,7 +209,9 @@ class ChannelPortViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class ContactsMapViewSet(mixins.ListModelMixin,
+class ContactsMapViewSet(EagerLoadingViewSetMixin,
+                         ConditionalGetViewSetMixin,
+                         mixins.ListModelMixin,
                          mixins.RetrieveModelMixin,
                          viewsets.GenericViewSet):
     queryset = ContactsMap.objects.all()
@@ -124,7 +221,9 @@ class ContactsMapViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class DIOViewSet(mixins.ListModelMixin,
+class DIOViewSet(EagerLoadingViewSetMixin,
+                 ConditionalGetViewSetMixin,
+                 mixins.ListModelMixin,
                  mixins.RetrieveModelMixin,
                  viewsets.GenericViewSet):
     queryset = DIO.objects.all()
@@ -134,7 +233,9 @@ class DIOViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class DIOPortViewSet(mixins.ListModelMixin,
+class DIOPortViewSet(EagerLoadingViewSetMixin,
+                     ConditionalGetViewSetMixin,
+                     mixins.ListModelMixin,
                      mixins.RetrieveModelMixin,
                      viewsets.GenericViewSet):
     queryset = DIOPort.objects.all()
@@ -144,7 +245,9 @@ class DIOPortViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class IPv4AddressViewSet(mixins.ListModelMixin,
+class IPv4AddressViewSet(EagerLoadingViewSetMixin,
+                         ConditionalGetViewSetMixin,
+                         mixins.ListModelMixin,
                          mixins.RetrieveModelMixin,
                          viewsets.GenericViewSet):
     queryset = IPv4Address.objects.all()
@@ -154,7 +257,9 @@ class IPv4AddressViewSet(mixins.ListModelMixin,
                           '(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)')
 
 
-class IPv6AddressViewSet(mixins.ListModelMixin,
+class IPv6AddressViewSet(EagerLoadingViewSetMixin,
+                         ConditionalGetViewSetMixin,
+                         mixins.ListModelMixin,
                          mixins.RetrieveModelMixin,
                          viewsets.GenericViewSet):
     queryset = IPv6Address.objects.all()
@@ -172,7 +277,9 @@ class IPv6AddressViewSet(mixins.ListModelMixin,
          '(:(:[0-9A-Fa-f]{1,4}){1,7}))')
 
 
-class MACAddressViewSet(mixins.ListModelMixin,
+class MACAddressViewSet(EagerLoadingViewSetMixin,
+                        ConditionalGetViewSetMixin,
+                        mixins.ListModelMixin,
                         mixins.RetrieveModelMixin,
                         viewsets.GenericViewSet):
     queryset = MACAddress.objects.all()
@@ -181,7 +288,9 @@ class MACAddressViewSet(mixins.ListModelMixin,
     lookup_value_regex = '([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})'
 
 
-class OrganizationViewSet(mixins.ListModelMixin,
+class OrganizationViewSet(EagerLoadingViewSetMixin,
+                          ConditionalGetViewSetMixin,
+                          mixins.ListModelMixin,
                           mixins.RetrieveModelMixin,
                           viewsets.GenericViewSet):
     queryset = Organization.objects.all()
@@ -191,7 +300,9 @@ class OrganizationViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class PIXViewSet(mixins.ListModelMixin,
+class PIXViewSet(EagerLoadingViewSetMixin,
+                 ConditionalGetViewSetMixin,
+                 mixins.ListModelMixin,
                  mixins.RetrieveModelMixin,
                  viewsets.GenericViewSet):
     queryset = PIX.objects.all()
@@ -201,7 +312,9 @@ class PIXViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class PhoneViewSet(mixins.ListModelMixin,
+class PhoneViewSet(EagerLoadingViewSetMixin,
+                   ConditionalGetViewSetMixin,
+                   mixins.ListModelMixin,
                    mixins.RetrieveModelMixin,
                    viewsets.GenericViewSet):
     queryset = Phone.objects.all()
@@ -211,7 +324,9 @@ class PhoneViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class PhysicalInterfaceViewSet(mixins.ListModelMixin,
+class PhysicalInterfaceViewSet(EagerLoadingViewSetMixin,
+                               ConditionalGetViewSetMixin,
+                               mixins.ListModelMixin,
                                mixins.RetrieveModelMixin,
                                viewsets.GenericViewSet):
     queryset = PhysicalInterface.objects.all()
@@ -221,7 +336,9 @@ class PhysicalInterfaceViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class PortViewSet(mixins.ListModelMixin,
+class PortViewSet(EagerLoadingViewSetMixin,
+                  ConditionalGetViewSetMixin,
+                  mixins.ListModelMixin,
                   mixins.RetrieveModelMixin,
                   viewsets.GenericViewSet):
     queryset = Port.objects.all()
@@ -231,7 +348,9 @@ class PortViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class RouteViewSet(mixins.ListModelMixin,
+class RouteViewSet(EagerLoadingViewSetMixin,
+                   ConditionalGetViewSetMixin,
+                   mixins.ListModelMixin,
                    mixins.RetrieveModelMixin,
                    viewsets.GenericViewSet):
     queryset = Route.objects.all()
@@ -241,7 +360,9 @@ class RouteViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class SwitchViewSet(mixins.ListModelMixin,
+class SwitchViewSet(EagerLoadingViewSetMixin,
+                    ConditionalGetViewSetMixin,
+                    mixins.ListModelMixin,
                     mixins.RetrieveModelMixin,
                     viewsets.GenericViewSet):
     queryset = Switch.objects.all()
@@ -251,7 +372,9 @@ class SwitchViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class SwitchModelViewSet(mixins.ListModelMixin,
+class SwitchModelViewSet(EagerLoadingViewSetMixin,
+                         ConditionalGetViewSetMixin,
+                         mixins.ListModelMixin,
                          mixins.RetrieveModelMixin,
                          viewsets.GenericViewSet):
     queryset = SwitchModel.objects.all()
@@ -261,7 +384,9 @@ class SwitchModelViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class SwitchPortRangeViewSet(mixins.ListModelMixin,
+class SwitchPortRangeViewSet(EagerLoadingViewSetMixin,
+                             ConditionalGetViewSetMixin,
+                             mixins.ListModelMixin,
                              mixins.RetrieveModelMixin,
                              viewsets.GenericViewSet):
     queryset = SwitchPortRange.objects.all()
@@ -271,7 +396,9 @@ class SwitchPortRangeViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class TagViewSet(mixins.ListModelMixin,
+class TagViewSet(EagerLoadingViewSetMixin,
+                 ConditionalGetViewSetMixin,
+                 mixins.ListModelMixin,
                  mixins.RetrieveModelMixin,
                  viewsets.GenericViewSet):
     queryset = Tag.objects.all()
@@ -281,7 +408,9 @@ class TagViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class CoreChannelViewSet(mixins.ListModelMixin,
+class CoreChannelViewSet(EagerLoadingViewSetMixin,
+                         ConditionalGetViewSetMixin,
+                         mixins.ListModelMixin,
                          mixins.RetrieveModelMixin,
                          viewsets.GenericViewSet):
     queryset = CoreChannel.objects.all()
@@ -291,7 +420,9 @@ class CoreChannelViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class CustomerChannelViewSet(mixins.ListModelMixin,
+class CustomerChannelViewSet(EagerLoadingViewSetMixin,
+                             ConditionalGetViewSetMixin,
+                             mixins.ListModelMixin,
                              mixins.RetrieveModelMixin,
                              viewsets.GenericViewSet):
     queryset = CustomerChannel.objects.all()
@@ -301,7 +432,9 @@ class CustomerChannelViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class DownlinkChannelViewSet(mixins.ListModelMixin,
+class DownlinkChannelViewSet(EagerLoadingViewSetMixin,
+                             ConditionalGetViewSetMixin,
+                             mixins.ListModelMixin,
                              mixins.RetrieveModelMixin,
                              viewsets.GenericViewSet):
     queryset = DownlinkChannel.objects.all()
@@ -311,7 +444,9 @@ class DownlinkChannelViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class TranslationChannelViewSet(mixins.ListModelMixin,
+class TranslationChannelViewSet(EagerLoadingViewSetMixin,
+                                ConditionalGetViewSetMixin,
+                                mixins.ListModelMixin,
                                 mixins.RetrieveModelMixin,
                                 viewsets.GenericViewSet):
     queryset = TranslationChannel.objects.all()
@@ -321,7 +456,9 @@ class TranslationChannelViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class UplinkChannelViewSet(mixins.ListModelMixin,
+class UplinkChannelViewSet(EagerLoadingViewSetMixin,
+                           ConditionalGetViewSetMixin,
+                           mixins.ListModelMixin,
                            mixins.RetrieveModelMixin,
                            viewsets.GenericViewSet):
     queryset = UplinkChannel.objects.all()
@@ -331,7 +468,9 @@ class UplinkChannelViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class MLPAv4ViewSet(mixins.ListModelMixin,
+class MLPAv4ViewSet(EagerLoadingViewSetMixin,
+                    ConditionalGetViewSetMixin,
+                    mixins.ListModelMixin,
                     mixins.RetrieveModelMixin,
                     viewsets.GenericViewSet):
     queryset = MLPAv4.objects.all()
@@ -341,7 +480,9 @@ class MLPAv4ViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class MLPAv6ViewSet(mixins.ListModelMixin,
+class MLPAv6ViewSet(EagerLoadingViewSetMixin,
+                    ConditionalGetViewSetMixin,
+                    mixins.ListModelMixin,
                     mixins.RetrieveModelMixin,
                     viewsets.GenericViewSet):
     queryset = MLPAv6.objects.all()
@@ -351,7 +492,9 @@ class MLPAv6ViewSet(mixins.ListModelMixin,
                           '[89ab][0-9a-f]{3}-[0-9a-f]{12}')
 
 
-class Monitorv4ViewSet(mixins.ListModelMixin,
+class Monitorv4ViewSet(EagerLoadingViewSetMixin,
+                       ConditionalGetViewSetMixin,
+                       mixins.ListModelMixin,
                        mixins.RetrieveModelMixin,
                        viewsets.GenericViewSet):
     queryset = Monitorv4.objects.all()
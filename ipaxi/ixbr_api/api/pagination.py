@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ModifiedCursorPagination(CursorPagination):
+    """ Pages the list endpoints by modification time, so no COUNT(*) is run
+    and each page starts at the modified of the previous one.
+
+    The cursor only keeps the position in the first ordering field,
+    modified, and an offset over the rows that share it. The primary key
+    only makes the order of those rows stable. DRF caps that offset at
+    offset_cutoff (1000), so past 1000 rows with the same modified, e.g.
+    written by one bulk update, the cursor stops advancing.
+
+    The page size is REST_FRAMEWORK['PAGE_SIZE'], and clients may ask for up
+    to API_MAX_PAGE_SIZE rows with ?page_size=.
+    """
+    ordering = ('modified', 'pk')
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 1000)
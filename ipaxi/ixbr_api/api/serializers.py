@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from rest_framework import serializers
 
 from ..core.models import (ASN, DIO, IX, PIX, Bilateral, BilateralPeer,
@@ -9,7 +11,148 @@ from ..core.models import (ASN, DIO, IX, PIX, Bilateral, BilateralPeer,
                            Tag, TranslationChannel, UplinkChannel,)
 
 
-class IXSerializer(serializers.ModelSerializer):
+def get_requested_fields(request):
+    """ Reads the sparse fieldset asked by a request
+
+    Args:
+        request: the DRF Request
+
+    Returns: tuple with the field names of ?fields=, None when it is not
+    given, and the set of field names of ?expand=
+    """
+    def split(param):
+        return [name.strip() for name in
+                request.query_params.get(param, '').split(',')
+                if name.strip()]
+
+    return split('fields') or None, set(split('expand'))
+
+
+class EagerLoadingMixin(object):
+    """ Mixin of ModelSerializer declaring the relations it reads, so the
+    views load them with the queryset instead of one query per object.
+
+    select_related_fields and prefetch_related_fields list the relations
+    read by the serializer's own fields. The plans of nested serializers
+    using this mixin are added under the name of their field.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def get_field_source(cls, name):
+        """ Returns: the model attribute read by a field, first part of its
+        source """
+        field = cls._declared_fields.get(name)
+        source = field.source if field is not None and field.source else name
+        return source.split('.')[0]
+
+    @classmethod
+    def get_eager_loading(cls, fields=None, expand=()):
+        """ Returns: tuple with the select_related and the prefetch_related
+        lookups needed to serialize the model
+
+        Args:
+            fields: names of the fields serialized, None for all
+            expand: names of the nested fields serialized as objects when
+                fields is given, the others are serialized as primary keys
+        """
+        if fields is None:
+            sources = None
+        else:
+            sources = {cls.get_field_source(name) for name in fields}
+
+        select_related = [
+            lookup for lookup in cls.select_related_fields
+            if sources is None or lookup.split('__')[0] in sources]
+        prefetch_related = [
+            lookup for lookup in cls.prefetch_related_fields
+            if sources is None or lookup.split('__')[0] in sources]
+
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, EagerLoadingMixin):
+                continue
+            if fields is not None and (name not in fields or
+                                       name not in expand):
+                continue
+
+            source = field.source or name
+            nested_select, nested_prefetch = nested.get_eager_loading()
+            nested_select = [source + '__' + f for f in nested_select]
+            nested_prefetch = [source + '__' + f for f in nested_prefetch]
+            if many:
+                prefetch_related.append(source)
+                prefetch_related.extend(nested_select + nested_prefetch)
+            else:
+                select_related.append(source)
+                select_related.extend(nested_select)
+                prefetch_related.extend(nested_prefetch)
+
+        return (list(OrderedDict.fromkeys(select_related)),
+                list(OrderedDict.fromkeys(prefetch_related)))
+
+    @classmethod
+    def get_only_fields(cls, fields):
+        """ Returns: the model fields to load to serialize fields, with the
+        primary key and the modified used by the pagination """
+        opts = cls.Meta.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        only = {opts.pk.name} | ({'modified'} & concrete)
+        only.update(source for source in
+                    (cls.get_field_source(name) for name in fields)
+                    if source in concrete)
+        return sorted(only)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=()):
+        """ Applies to queryset the loading of the relations needed, and
+        when fields is given, defers the model fields not needed """
+        select_related, prefetch_related = cls.get_eager_loading(
+            fields, expand)
+        if fields is not None:
+            queryset = queryset.only(*cls.get_only_fields(fields))
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class DynamicFieldsMixin(object):
+    """ Mixin of ModelSerializer keeping only the fields asked with
+    ?fields=, when given. Nested serializers among them are serialized as
+    the primary key of their object, unless asked with ?expand=.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if getattr(request, 'query_params', None) is None:
+            return
+
+        fields, expand = get_requested_fields(request)
+        if fields is None:
+            return
+
+        for name in list(self.fields):
+            field = self.fields[name]
+            if name not in fields:
+                self.fields.pop(name)
+            elif name not in expand and \
+                    isinstance(field, serializers.BaseSerializer):
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    many=isinstance(field, serializers.ListSerializer),
+                    read_only=True)
+
+
+class IXAPISerializer(DynamicFieldsMixin, EagerLoadingMixin,
+                      serializers.ModelSerializer):
+    """ Base serializer of the API models """
+
+
+class IXSerializer(IXAPISerializer):
     class Meta:
         model = IX
         fields = ('created', 'modified', 'code', 'shortname',
@@ -17,15 +160,16 @@ class IXSerializer(serializers.ModelSerializer):
                   'management_prefix', 'description', 'tags_policy')
 
 
-class ContactSerializer(serializers.ModelSerializer):
+class ContactSerializer(IXAPISerializer):
     class Meta:
         model = Contact
         fields = ('created', 'modified', 'last_ticket',
                   'email', 'name', 'description')
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(IXAPISerializer):
     ix_fullname = serializers.CharField(source='ix.fullname')
+    select_related_fields = ('ix',)
 
     class Meta:
         model = Tag
@@ -33,8 +177,9 @@ class TagSerializer(serializers.ModelSerializer):
                   'tag', 'ix', 'ix_fullname', 'tag_domain', 'description')
 
 
-class BilateralPeerSerializer(serializers.ModelSerializer):
+class BilateralPeerSerializer(IXAPISerializer):
     tag = TagSerializer()
+    prefetch_related_fields = ('mac_addresses',)
 
     class Meta:
         model = BilateralPeer
@@ -43,7 +188,7 @@ class BilateralPeerSerializer(serializers.ModelSerializer):
                   'shortname', 'asn', 'mac_addresses', 'description')
 
 
-class BilateralSerializer(serializers.ModelSerializer):
+class BilateralSerializer(IXAPISerializer):
     peer_a = BilateralPeerSerializer()
     peer_b = BilateralPeerSerializer()
 
@@ -53,14 +198,14 @@ class BilateralSerializer(serializers.ModelSerializer):
                   'label', 'bilateral_type', 'peer_a', 'peer_b', 'description')
 
 
-class ChannelPortSerializer(serializers.ModelSerializer):
+class ChannelPortSerializer(IXAPISerializer):
     class Meta:
         model = ChannelPort
         fields = ('created', 'modified', 'last_ticket',
                   'description', 'tags_type')
 
 
-class CustomerChannelSerializer(serializers.ModelSerializer):
+class CustomerChannelSerializer(IXAPISerializer):
     class Meta:
         model = CustomerChannel
         fields = ('created', 'modified', 'last_ticket',
@@ -68,7 +213,7 @@ class CustomerChannelSerializer(serializers.ModelSerializer):
                   'asn', 'description')
 
 
-class CoreChannelSerializer(serializers.ModelSerializer):
+class CoreChannelSerializer(IXAPISerializer):
     class Meta:
         model = CoreChannel
         fields = ('created', 'modified', 'last_ticket',
@@ -76,14 +221,14 @@ class CoreChannelSerializer(serializers.ModelSerializer):
                   'other_core_channel', 'description')
 
 
-class DownlinkChannelSerializer(serializers.ModelSerializer):
+class DownlinkChannelSerializer(IXAPISerializer):
     class Meta:
         model = DownlinkChannel
         fields = ('created', 'modified', 'last_ticket', 'description',
                   'name', 'is_lag', 'is_mclag', 'channel_port')
 
 
-class UplinkChannelSerializer(serializers.ModelSerializer):
+class UplinkChannelSerializer(IXAPISerializer):
     class Meta:
         model = UplinkChannel
         fields = ('created', 'modified', 'last_ticket',
@@ -91,21 +236,21 @@ class UplinkChannelSerializer(serializers.ModelSerializer):
                   'downlink_channel', 'description')
 
 
-class TranslationChannelSerializer(serializers.ModelSerializer):
+class TranslationChannelSerializer(IXAPISerializer):
     class Meta:
         model = TranslationChannel
         fields = ('created', 'modified', 'last_ticket', 'description',
                   'name', 'is_lag', 'is_mclag', 'customer_channel')
 
 
-class ASNSerializer(serializers.ModelSerializer):
+class ASNSerializer(IXAPISerializer):
     class Meta:
         model = ASN
         fields = ('created', 'modified', 'last_ticket',
                   'number', 'description')
 
 
-class ContactsMapSerializer(serializers.ModelSerializer):
+class ContactsMapSerializer(IXAPISerializer):
     class Meta:
         model = ContactsMap
         fields = ('created', 'modified', 'last_ticket', 'description',
@@ -113,14 +258,14 @@ class ContactsMapSerializer(serializers.ModelSerializer):
                   'adm_contact', 'peer_contact', 'com_contact', 'peering_url')
 
 
-class DIOSerializer(serializers.ModelSerializer):
+class DIOSerializer(IXAPISerializer):
     class Meta:
         model = DIO
         fields = ('created', 'modified', 'last_ticket',
                   'uuid', 'pix', 'name', 'description')
 
 
-class DIOPortSerializer(serializers.ModelSerializer):
+class DIOPortSerializer(IXAPISerializer):
     class Meta:
         model = DIOPort
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'dio',
@@ -128,56 +273,56 @@ class DIOPortSerializer(serializers.ModelSerializer):
                   'description')
 
 
-class IPv4AddressSerializer(serializers.ModelSerializer):
+class IPv4AddressSerializer(IXAPISerializer):
     class Meta:
         model = IPv4Address
         fields = ('created', 'modified', 'last_ticket', 'description',
                   'ix', 'address', 'reverse_dns', 'in_lg')
 
 
-class IPv6AddressSerializer(serializers.ModelSerializer):
+class IPv6AddressSerializer(IXAPISerializer):
     class Meta:
         model = IPv6Address
         fields = ('created', 'modified', 'last_ticket', 'description',
                   'ix', 'address', 'reverse_dns', 'in_lg')
 
 
-class OrganizationSerializer(serializers.ModelSerializer):
+class OrganizationSerializer(IXAPISerializer):
     class Meta:
         model = Organization
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'description',
                   'name', 'shortname', 'cnpj', 'url', 'address')
 
 
-class MACAddressSerializer(serializers.ModelSerializer):
+class MACAddressSerializer(IXAPISerializer):
     class Meta:
         model = MACAddress
         fields = ('created', 'modified', 'last_ticket', 'address',
                   'description')
 
 
-class PIXSerializer(serializers.ModelSerializer):
+class PIXSerializer(IXAPISerializer):
     class Meta:
         model = PIX
         fields = ('created', 'modified', 'last_ticket',
                   'code', 'ix', 'description')
 
 
-class PhoneSerializer(serializers.ModelSerializer):
+class PhoneSerializer(IXAPISerializer):
     class Meta:
         model = Phone
         fields = ('created', 'modified', 'last_ticket', 'uuid',
                   'number', 'category', 'contact', 'description')
 
 
-class PhysicalInterfaceSerializer(serializers.ModelSerializer):
+class PhysicalInterfaceSerializer(IXAPISerializer):
     class Meta:
         model = PhysicalInterface
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'description',
                   'serial_number', 'connector_type', 'port_type')
 
 
-class PortSerializer(serializers.ModelSerializer):
+class PortSerializer(IXAPISerializer):
     class Meta:
         model = Port
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'name',
@@ -185,27 +330,27 @@ class PortSerializer(serializers.ModelSerializer):
                   'physical_interface', 'switch', 'route', 'channel_port')
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(IXAPISerializer):
     class Meta:
         model = Route
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'description')
 
 
-class SwitchSerializer(serializers.ModelSerializer):
+class SwitchSerializer(IXAPISerializer):
     class Meta:
         model = Switch
         fields = ('created', 'modified', 'last_ticket', 'description',
                   'is_pe', 'uuid', 'pix', 'management_ip', 'model')
 
 
-class SwitchModelSerializer(serializers.ModelSerializer):
+class SwitchModelSerializer(IXAPISerializer):
     class Meta:
         model = SwitchModel
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'model',
                   'translation', 'description')
 
 
-class SwitchPortRangeSerializer(serializers.ModelSerializer):
+class SwitchPortRangeSerializer(IXAPISerializer):
     class Meta:
         model = SwitchPortRange
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'capacity',
@@ -213,7 +358,9 @@ class SwitchPortRangeSerializer(serializers.ModelSerializer):
                   'switch_model', 'description')
 
 
-class MLPAv4Serializer(serializers.ModelSerializer):
+class MLPAv4Serializer(IXAPISerializer):
+    prefetch_related_fields = ('mac_addresses',)
+
     class Meta:
         model = MLPAv4
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'tag', 'inner',
@@ -221,7 +368,9 @@ class MLPAv4Serializer(serializers.ModelSerializer):
                   'prefix_limit', 'description')
 
 
-class MLPAv6Serializer(serializers.ModelSerializer):
+class MLPAv6Serializer(IXAPISerializer):
+    prefetch_related_fields = ('mac_addresses',)
+
     class Meta:
         model = MLPAv6
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'tag', 'inner',
@@ -229,7 +378,9 @@ class MLPAv6Serializer(serializers.ModelSerializer):
                   'prefix_limit', 'description')
 
 
-class Monitorv4Serializer(serializers.ModelSerializer):
+class Monitorv4Serializer(IXAPISerializer):
+    prefetch_related_fields = ('mac_addresses',)
+
     class Meta:
         model = Monitorv4
         fields = ('created', 'modified', 'last_ticket', 'uuid', 'tag', 'inner',
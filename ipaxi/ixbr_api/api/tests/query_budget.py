@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin(object):
+    """ Mixin of TestCase to check that a list endpoint runs the same
+    queries whatever the size of the page, and no more than a budget.
+
+    Examples:
+        class Test_IX_API(QueryBudgetMixin, TestCase):
+            def test_budget(self):
+                self.assertQueryBudget(url, 5)
+    """
+    page_sizes = (1, 10, 100)
+
+    def assertQueryBudget(self, url, budget, page_sizes=None, data=None):
+        counts = dict()
+        for page_size in page_sizes or self.page_sizes:
+            params = dict(data or {}, page_size=page_size)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            counts[page_size] = len(context.captured_queries)
+
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            'Queries per page size: {}'.format(counts))
+        self.assertLessEqual(
+            max(counts.values()), budget,
+            'Queries per page size: {}'.format(counts))
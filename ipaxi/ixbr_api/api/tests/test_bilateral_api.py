@@ -5,11 +5,14 @@ from model_mommy import mommy
 from rest_framework.reverse import reverse as api_reverse
 from rest_framework import status
 
-from ixbr_api.core.models import (ASN, Bilateral, IX)
+from ixbr_api.core.models import (ASN, Bilateral, IX, MACAddress)
 from ixbr_api.core.tests.login import DefaultLogin
 
+from ..serializers import BilateralSerializer
+from .query_budget import QueryBudgetMixin
 
-class Test_Bilateral_API(TestCase):
+
+class Test_Bilateral_API(QueryBudgetMixin, TestCase):
     """Tests Bilateral Endpoint."""
 
     def setUp(self):
@@ -52,8 +55,8 @@ class Test_Bilateral_API(TestCase):
 
         response = self.client.get(url, [], format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data[0]['label'], "a")
-        self.assertEqual(response.data[1]['label'], "b")
+        self.assertEqual(response.data['results'][0]['label'], "a")
+        self.assertEqual(response.data['results'][1]['label'], "b")
 
     def test_search(self):
         ix = mommy.make(IX, code='jpa')
@@ -72,5 +75,30 @@ class Test_Bilateral_API(TestCase):
         response = self.client.get(
             "{url}?search=2".format(url=url), [], format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['label'], "b")
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['label'], "b")
+
+    def test_eager_loading(self):
+        self.assertEqual(
+            BilateralSerializer.get_eager_loading(),
+            (['peer_a', 'peer_a__tag', 'peer_a__tag__ix',
+              'peer_b', 'peer_b__tag', 'peer_b__tag__ix'],
+             ['peer_a__mac_addresses', 'peer_b__mac_addresses']))
+
+    def test_query_budget(self):
+        ix = mommy.make(IX, code='jpa')
+        asn = mommy.make(ASN, number=1)
+        url = api_reverse("api:bilateral-list", kwargs={
+                          "code": ix.code, "asn": asn.number})
+
+        for i in range(12):
+            bilateral = mommy.make(Bilateral, peer_a__asn=asn,
+                                   peer_a__tag__ix=ix)
+            bilateral.peer_a.mac_addresses.set(
+                mommy.make(MACAddress, _quantity=2))
+            bilateral.peer_b.mac_addresses.set(
+                mommy.make(MACAddress, _quantity=2))
+
+        # session, user, the page and the mac addresses of each peer, plus
+        # the savepoint and release of the request where ATOMIC_REQUESTS is on
+        self.assertQueryBudget(url, 7)
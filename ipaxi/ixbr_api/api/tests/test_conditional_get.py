@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse as api_reverse
+
+from ixbr_api.core.models import IX
+from ixbr_api.core.tests.login import DefaultLogin
+
+from ..serializers import IXSerializer
+
+
+class Test_Conditional_Get(TestCase):
+    """Tests the conditional GETs of the endpoints."""
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        p.start()
+        self.addCleanup(p.stop)
+
+        mommy.make(IX, code='aaa')
+        mommy.make(IX, code='bbb')
+        self.list_url = api_reverse("api:ix-list")
+        self.detail_url = api_reverse("api:ix-detail", kwargs={'code': 'aaa'})
+
+    def test_list_not_modified(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with patch.object(IXSerializer, 'to_representation') as serialize:
+            with CaptureQueriesContext(connection) as context:
+                not_modified = self.client.get(
+                    self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        # session, user and the page, plus the savepoint and release of the
+        # request where ATOMIC_REQUESTS is on
+        self.assertLessEqual(len(context.captured_queries), 5)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        serialize.assert_not_called()
+        self.assertNotIn('Last-Modified', response)
+
+    def test_list_changes(self):
+        response = self.client.get(self.list_url)
+
+        mommy.make(IX, code='ccc')
+        changed = self.client.get(
+            self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(changed.data['results']), 3)
+
+    def test_list_deletion(self):
+        response = self.client.get(self.list_url)
+
+        IX.objects.filter(code='bbb').delete()
+        changed = self.client.get(
+            self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(changed.data['results']), 1)
+
+    def test_pages_have_own_etag(self):
+        first = self.client.get(self.list_url, {'page_size': 1})
+        second = self.client.get(first.data['next'])
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with patch.object(IXSerializer, 'to_representation') as serialize:
+            not_modified = self.client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        serialize.assert_not_called()
+
+        IX.objects.get(code='aaa').save()
+        changed = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
@@ -0,0 +1,41 @@
+import json
+from unittest.mock import patch
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse as api_reverse
+
+from ixbr_api.core.management.commands.benchmark_nikiti import Command
+from ixbr_api.core.tests.login import DefaultLogin
+
+
+class Test_IX_Export_API(TestCase):
+    """Tests IX export Endpoint."""
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.ix = Command().create_ix(2, 2, self.superuser)
+
+    def test_get(self):
+        response = self.client.get(
+            api_reverse("api:ix-export", kwargs={"code": self.ix.code}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])['pk'], self.ix.code)
+
+    def test_get_not_found(self):
+        response = self.client.get(
+            api_reverse("api:ix-export", kwargs={"code": 'xyz'}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
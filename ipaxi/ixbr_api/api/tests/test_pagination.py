@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse as api_reverse
+
+from ixbr_api.core.models import IX
+from ixbr_api.core.tests.login import DefaultLogin
+
+from .query_budget import QueryBudgetMixin
+
+
+class Test_Cursor_Pagination(QueryBudgetMixin, TestCase):
+    """Tests the cursor pagination of the list endpoints."""
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.codes = ['aaa', 'bbb', 'ccc', 'ddd', 'eee']
+        for code in self.codes:
+            mommy.make(IX, code=code)
+        self.url = api_reverse("api:ix-list")
+
+    def test_walk_pages(self):
+        codes = []
+        url = self.url + '?page_size=2'
+        while url:
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            codes.extend(ix['code'] for ix in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(codes, self.codes)
+
+    def test_page_is_stable_on_changes(self):
+        response = self.client.get(self.url, {'page_size': 2})
+
+        IX.objects.get(code='aaa').save()
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([ix['code'] for ix in response.data['results']],
+                         ['ccc', 'ddd'])
+
+    def test_max_page_size(self):
+        with patch('ixbr_api.api.pagination.ModifiedCursorPagination.'
+                   'max_page_size', 3):
+            response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_query_budget(self):
+        # session, user and the page, plus the savepoint and release of the
+        # request where ATOMIC_REQUESTS is on
+        self.assertQueryBudget(self.url, 5)
@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse as api_reverse
+
+from ixbr_api.core.models import ASN, IX, Bilateral, MACAddress
+from ixbr_api.core.tests.login import DefaultLogin
+
+from ..serializers import BilateralSerializer, TagSerializer
+from .query_budget import QueryBudgetMixin
+
+
+class Test_Sparse_Fields(QueryBudgetMixin, TestCase):
+    """Tests the ?fields= and ?expand= parameters of the list endpoints."""
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = patch('ixbr_api.core.models.create_tag_by_channel_port')
+        p.start()
+        self.addCleanup(p.stop)
+
+        ix = mommy.make(IX, code='jpa')
+        asn = mommy.make(ASN, number=1)
+        self.url = api_reverse("api:bilateral-list", kwargs={
+                               "code": ix.code, "asn": asn.number})
+
+        for label in ('a', 'b', 'c'):
+            bilateral = mommy.make(Bilateral, label=label, peer_a__asn=asn,
+                                   peer_a__tag__ix=ix)
+            bilateral.peer_a.mac_addresses.set(
+                mommy.make(MACAddress, _quantity=2))
+        self.bilateral = Bilateral.objects.get(label='a')
+
+    def test_eager_loading(self):
+        self.assertEqual(
+            BilateralSerializer.get_eager_loading(['uuid', 'label']),
+            ([], []))
+        self.assertEqual(
+            BilateralSerializer.get_eager_loading(['uuid', 'peer_a']),
+            ([], []))
+        self.assertEqual(
+            BilateralSerializer.get_eager_loading(['uuid', 'peer_a'],
+                                                  {'peer_a'}),
+            (['peer_a', 'peer_a__tag', 'peer_a__tag__ix'],
+             ['peer_a__mac_addresses']))
+        self.assertEqual(TagSerializer.get_eager_loading(['tag']), ([], []))
+        self.assertEqual(
+            TagSerializer.get_eager_loading(['tag', 'ix_fullname']),
+            (['ix'], []))
+
+    def test_only_fields(self):
+        self.assertEqual(
+            BilateralSerializer.get_only_fields(['label', 'peer_a', 'foo']),
+            ['label', 'modified', 'peer_a', 'uuid'])
+
+    def test_fields(self):
+        response = self.client.get(self.url, {'fields': 'uuid,label'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0],
+                         {'uuid': str(self.bilateral.uuid), 'label': 'a'})
+
+    def test_not_expanded_as_primary_key(self):
+        response = self.client.get(self.url, {'fields': 'label,peer_a'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0],
+                         {'label': 'a', 'peer_a': self.bilateral.peer_a.pk})
+
+    def test_expand(self):
+        response = self.client.get(
+            self.url, {'fields': 'label,peer_a', 'expand': 'peer_a'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(set(result), {'label', 'peer_a'})
+        self.assertEqual(result['peer_a']['tag']['tag'],
+                         self.bilateral.peer_a.tag.tag)
+        self.assertEqual(len(result['peer_a']['mac_addresses']), 2)
+
+    def test_query_budget(self):
+        # session, user and the page, plus the savepoint and release of the
+        # request where ATOMIC_REQUESTS is on
+        self.assertQueryBudget(self.url, 5, data={'fields': 'uuid,label'})
+        self.assertQueryBudget(self.url, 5, data={'fields': 'label,peer_b'})
+        # and the mac addresses of peer_a
+        self.assertQueryBudget(self.url, 6, data={'fields': 'label,peer_a',
+                                                  'expand': 'peer_a'})
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from django import forms
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.utils.translation import gettext as _
@@ -6,7 +8,6 @@ from .models import (ASN, IX, PIX, Bilateral, Contact, CustomerChannel,
                      IPv4Address, IPv6Address, Organization,
                      PhysicalInterface, Port, Switch, SwitchModel,
                      SwitchPortRange, Tag,)
-from .utils import port_utils
 from .utils.constants import (MAX_TAG_NUMBER, MIN_TAG_NUMBER,
                               SWITCH_MODEL_CHANNEL_PREFIX, PORT_TYPES,
                               VENDORS, CAPACITIES_MAX, CONNECTOR_TYPES)
@@ -88,7 +89,6 @@ class AddCustomerChannelForm(forms.Form):
     def __init__(self, *args, **kwargs):
         switch_list = kwargs.pop('switchs', None)
         super(AddCustomerChannelForm, self).__init__(*args, **kwargs)
-        port_list = {}
         if switch_list:
             self.fields['switch'] = forms.ChoiceField(
                 choices=switch_list,
@@ -102,11 +102,10 @@ class AddCustomerChannelForm(forms.Form):
                 or self.initial.get('switch')[0] \
                 or _raw_value(self, 'switch')[0]
             if switch_id:
-                port_set = Port.objects.filter(switch=switch_id,
-                                               status='AVAILABLE')
-                for port in port_set:
-                    port_list[str(port.name)] = str(port.uuid)
-                ordered_ports = port_utils.port_sorting(port_list)
+                port_set = Port.objects.filter(
+                    switch=switch_id, status='AVAILABLE').order_by_port_name()
+                ordered_ports = OrderedDict(
+                    (str(port.name), str(port.uuid)) for port in port_set)
                 port_choices = ()
                 for key in ordered_ports:
                     port_choices += (
@@ -929,6 +928,11 @@ class AllocateTagStatusForm(forms.Form):
         queryset=Tag.objects.all(),
         required=False,
         widget=forms.SelectMultiple(attrs={'class': 'form-control'}))
+    # Tags without instance, their choices are set by the view
+    tag_number_to_allocate = forms.TypedMultipleChoiceField(
+        coerce=int,
+        required=False,
+        widget=forms.SelectMultiple(attrs={'class': 'form-control'}))
 
 
 class DeallocateTagStatusForm(forms.Form):
@@ -945,6 +949,11 @@ class ReserveTagResourceForm(forms.Form):
         queryset=Tag.objects.all(),
         required=False,
         widget=forms.SelectMultiple(attrs={'class': 'form-control'}))
+    # Tags without instance, their choices are set by the view
+    tag_number_to_reserve = forms.TypedMultipleChoiceField(
+        coerce=int,
+        required=False,
+        widget=forms.SelectMultiple(attrs={'class': 'form-control'}))
 
 
 class ReleaseTagResourceForm(forms.Form):
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ixbr_api.core.models import IX, create_all_ips, plan_all_ips
+from ixbr_api.core.utils.globals import set_current_user
+from ixbr_api.users.models import User
+
+# RFC 2544 benchmarking and RFC 3849 documentation networks, so the
+# benchmark IX does not overlap a real one
+BENCHMARK_IPV4_NETWORK = '198.18.0.0/{}'
+BENCHMARK_IPV6_NETWORK = '2001:db8::/64'
+
+
+def create_ips_per_object(ix):
+    """ Previous provisioning path: one save() per address, each one with
+    full_clean(), log and history insert """
+    ipv4_addresses, ipv6_addresses = plan_all_ips(ix)
+    for ipv4, ipv6 in zip(ipv4_addresses, ipv6_addresses):
+        ipv4.save()
+        ipv6.save()
+
+
+class Command(BaseCommand):
+    help = ('Compare the bulk IP provisioning of an IX against the per '
+            'object path. Everything runs inside a transaction that is '
+            'rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefixes', nargs='+', type=int,
+                            default=[24, 22, 20],
+                            help='IPv4 prefix lengths to benchmark')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_superuser=True).first()
+        if not user:
+            raise CommandError('A superuser is needed to run the benchmark')
+        set_current_user(user)
+
+        self.stdout.write('{:>7} {:>12} {:>10} {:>10}'.format(
+            'prefix', 'path', 'queries', 'seconds'))
+        for prefix_length in options['prefixes']:
+            for name, provision in (('per object', create_ips_per_object),
+                                    ('bulk', create_all_ips)):
+                queries, seconds = self.run_provision(
+                    provision, prefix_length, user)
+                self.stdout.write('{:>7} {:>12} {:>10} {:>10.3f}'.format(
+                    '/{}'.format(prefix_length), name, queries, seconds))
+
+    def run_provision(self, provision, prefix_length, user):
+        with transaction.atomic():
+            ix = IX(code='bmrk',
+                    shortname='benchmark.bm',
+                    fullname='Benchmark - BM',
+                    ipv4_prefix=BENCHMARK_IPV4_NETWORK.format(prefix_length),
+                    ipv6_prefix=BENCHMARK_IPV6_NETWORK,
+                    management_prefix='10.0.0.0/24',
+                    create_ips=False,
+                    create_tags=False,
+                    tags_policy='distributed',
+                    last_ticket=0,
+                    modified_by=user)
+            ix.save()
+
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                provision(ix)
+                seconds = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        return len(context.captured_queries), seconds
@@ -0,0 +1,50 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from ixbr_api.core.utils.constants import MAX_TAG_NUMBER
+from ixbr_api.core.utils.tag_bitmap import TagBitmap
+
+
+def first_free_inner_by_scan(used_inners):
+    """ Previous lookup: scan every inner against the list of used ones """
+    for i in range(1, 4097):
+        if i not in used_inners:
+            return i
+
+
+def first_free_inner_by_bitmap(used_inners):
+    return TagBitmap(used_inners).next_free(1)
+
+
+class Command(BaseCommand):
+    help = ('Compare the first free inner tag lookup of a QinQ outer tag '
+            'using a list scan against the inner tag bitmap')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10,
+                            help='lookups timed for each case')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+
+        self.stdout.write('{:>12} {:>10} {:>14} {:>14}'.format(
+            'used inners', 'path', 'ms/lookup', 'ms/index hit'))
+        # Fully loaded outer tags keep only the last inner free
+        for used_amount in (100, 1000, MAX_TAG_NUMBER - 1):
+            used_inners = list(range(1, used_amount + 1))
+            bitmap = TagBitmap(used_inners)
+
+            scan = timeit.timeit(
+                lambda: first_free_inner_by_scan(used_inners),
+                number=repeat) / repeat
+            build = timeit.timeit(
+                lambda: first_free_inner_by_bitmap(used_inners),
+                number=repeat) / repeat
+            hit = timeit.timeit(
+                lambda: bitmap.next_free(1), number=repeat) / repeat
+
+            self.stdout.write('{:>12} {:>10} {:>14.4f} {:>14}'.format(
+                used_amount, 'scan', scan * 1000, '-'))
+            self.stdout.write('{:>12} {:>10} {:>14.4f} {:>14.4f}'.format(
+                used_amount, 'bitmap', build * 1000, hit * 1000))
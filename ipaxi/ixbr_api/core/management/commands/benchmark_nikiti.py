@@ -0,0 +1,165 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ixbr_api.core.models import (ASN, IX, PIX, ChannelPort, Contact,
+                                  ContactsMap, CustomerChannel,
+                                  DownlinkChannel, IPv4Address, MLPAv4,
+                                  Organization, Port, Switch, SwitchModel, Tag,
+                                  UplinkChannel)
+from ixbr_api.core.utils.globals import set_current_user
+from ixbr_api.core.utils.port_utils import natural_sort_key
+from ixbr_api.core.views.nikiti_views import MonitoramentoInterfaces
+from ixbr_api.users.models import User
+
+# RFC 2544 benchmarking network, so the benchmark IX does not overlap a
+# real one
+BENCHMARK_IPV4_NETWORK = '198.18.0.0/16'
+BENCHMARK_IPV6_NETWORK = '2001:db8::/64'
+BENCHMARK_ASN = 64512
+
+
+class Command(BaseCommand):
+    help = ('Time the Nikiti "Monitoramento de Interfaces" page of a '
+            'synthetic IX. Everything runs inside a transaction that is '
+            'rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--switches', nargs='+', type=int, default=[50],
+                            help='amounts of switches of the synthetic IX')
+        parser.add_argument('--customer-ports', type=int, default=24,
+                            help='customer ports of each switch')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_superuser=True).first()
+        if not user:
+            raise CommandError('A superuser is needed to run the benchmark')
+        set_current_user(user)
+
+        self.stdout.write('{:>9} {:>7} {:>10} {:>10}'.format(
+            'switches', 'ports', 'queries', 'seconds'))
+        for switches in options['switches']:
+            ports, queries, seconds = self.run_build(
+                switches, options['customer_ports'], user)
+            self.stdout.write('{:>9} {:>7} {:>10} {:>10.3f}'.format(
+                switches, ports, queries, seconds))
+
+    def run_build(self, switches, customer_ports, user):
+        with transaction.atomic():
+            ix = self.create_ix(switches, customer_ports, user)
+            ports = Port.objects.filter(switch__pix__ix=ix).count()
+
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                MonitoramentoInterfaces().build_dict(ix=ix.code)
+                seconds = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        return ports, len(context.captured_queries), seconds
+
+    def create_ix(self, switches, customer_ports, user):
+        """ Creates an IX with a PE switch and switches - 1 switches below
+        it, each one with customer_ports customer ports holding a MLPAv4
+        service. The objects are bulk created, skipping the model rules """
+        common = {'last_ticket': 0, 'modified_by': user}
+
+        ix = IX(code='bmrk',
+                shortname='benchmark.bm',
+                fullname='Benchmark - BM',
+                ipv4_prefix=BENCHMARK_IPV4_NETWORK,
+                ipv6_prefix=BENCHMARK_IPV6_NETWORK,
+                management_prefix='10.0.0.0/16',
+                create_ips=False,
+                create_tags=False,
+                tags_policy='distributed',
+                **common)
+        ix.save()
+
+        pix = PIX.objects.create(code='BMRK', ix=ix, **common)
+        switch_model, created = SwitchModel.objects.get_or_create(
+            model='BENCHMARK', defaults=dict(vendor='CISCO', **common))
+        organization = Organization.objects.create(
+            name='Benchmark', shortname='benchmark',
+            url='http://benchmark.bm', address='Benchmark', **common)
+        contact = Contact.objects.create(name='Benchmark', **common)
+
+        switch_list = Switch.objects.bulk_create(
+            Switch(pix=pix, model=switch_model, create_ports=False,
+                   management_ip='10.0.{}.{}'.format(*divmod(i + 1, 256)),
+                   is_pe=(i == 0), **common)
+            for i in range(switches))
+        pe, switch_list = switch_list[0], switch_list[1:]
+
+        channel_ports = ChannelPort.objects.bulk_create(
+            ChannelPort(**common)
+            for i in range(2 * len(switch_list) +
+                           customer_ports * len(switch_list)))
+        channel_ports = iter(channel_ports)
+
+        port_list = []
+        downlinks = []
+        uplinks = []
+        for i, switch in enumerate(switch_list):
+            downlink_port = next(channel_ports)
+            uplink_port = next(channel_ports)
+            port_list.append(Port(
+                switch=pe, name=str(i + 1), sort_key=natural_sort_key(
+                    str(i + 1)), status='INFRASTRUCTURE',
+                channel_port=downlink_port, **common))
+            port_list.append(Port(
+                switch=switch, name='1', sort_key=natural_sort_key('1'),
+                status='INFRASTRUCTURE', channel_port=uplink_port, **common))
+            downlinks.append(DownlinkChannel(
+                name='dl-BE{}'.format(i + 1), is_lag=False, is_mclag=False,
+                channel_port=downlink_port, **common))
+            uplinks.append(UplinkChannel(
+                name='ul-BE1', is_lag=False, is_mclag=False,
+                channel_port=uplink_port, downlink_channel=downlinks[-1],
+                **common))
+
+        asns = ASN.objects.bulk_create(
+            ASN(number=BENCHMARK_ASN + i, **common)
+            for i in range(customer_ports * len(switch_list)))
+        ContactsMap.objects.bulk_create(
+            ContactsMap(ix=ix, organization=organization, asn=asn,
+                        noc_contact=contact, adm_contact=contact,
+                        peer_contact=contact, com_contact=contact,
+                        org_contact=contact, peering_url='http://bm.bm',
+                        **common)
+            for asn in asns)
+        asns = iter(asns)
+
+        customer_channels = []
+        for switch in switch_list:
+            for i in range(customer_ports):
+                channel_port = next(channel_ports)
+                port_list.append(Port(
+                    switch=switch, name=str(i + 2), sort_key=natural_sort_key(
+                        str(i + 2)), status='CUSTOMER',
+                    channel_port=channel_port, **common))
+                customer_channels.append(CustomerChannel(
+                    name='ct-{}'.format(i + 2), is_lag=False,
+                    is_mclag=False, cix_type=0, asn=next(asns),
+                    channel_port=channel_port, **common))
+
+        Port.objects.bulk_create(port_list)
+        DownlinkChannel.objects.bulk_create(downlinks)
+        UplinkChannel.objects.bulk_create(uplinks)
+        CustomerChannel.objects.bulk_create(customer_channels)
+
+        tag = Tag.objects.create(tag=10, ix=ix, status='PRODUCTION',
+                                 **common)
+        addresses = IPv4Address.objects.bulk_create(
+            IPv4Address(ix=ix, in_lg=True, address='198.18.{}.{}'.format(
+                *divmod(i + 1, 256)), **common)
+            for i in range(len(customer_channels)))
+        MLPAv4.objects.bulk_create(
+            MLPAv4(customer_channel=channel, asn=channel.asn, tag=tag,
+                   shortname='bm', status='PRODUCTION',
+                   mlpav4_address=address, **common)
+            for channel, address in zip(customer_channels, addresses))
+
+        return ix
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ixbr_api.core.models import IX
+from ixbr_api.core.utils.nikiti.snapshots import (get_cached_snapshot,
+                                                  refresh_snapshot)
+from ixbr_api.core.views.nikiti_views import (AlocacaoDeIP,
+                                              MonitoramentoInterfaces, Vlans)
+
+
+class Command(BaseCommand):
+    help = 'Build again the snapshots of the Nikiti pages of the IXs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('codes', nargs='*',
+                            help='codes of the IXs, all IXs when omitted')
+
+    def handle(self, *args, **options):
+        codes = options['codes'] or IX.objects.values_list('code', flat=True)
+
+        for code in codes:
+            if not IX.objects.filter(code=code).exists():
+                raise CommandError('IX {} does not exist'.format(code))
+            for view in (MonitoramentoInterfaces, AlocacaoDeIP, Vlans):
+                snapshot = refresh_snapshot(
+                    view.page, code, view().build,
+                    previous=get_cached_snapshot(view.page, code))
+                self.stdout.write('{} {}: {}'.format(
+                    code, view.page, snapshot['etag']))
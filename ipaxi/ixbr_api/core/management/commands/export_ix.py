@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ixbr_api.core.models import IX
+from ixbr_api.core.use_cases.export_use_cases import export_ix_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Export every object of an IX as newline delimited JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('code', help='code of the IX')
+        parser.add_argument('--output', '-o',
+                            help='file to write, stdout when omitted')
+
+    def handle(self, *args, **options):
+        code = options['code']
+        if not IX.objects.filter(code=code).exists():
+            raise CommandError('IX {} does not exist'.format(code))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.writelines(export_ix_ndjson(ix=code))
+        else:
+            for line in export_ix_ndjson(ix=code):
+                self.stdout.write(line, ending='')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ixbr_api.core.models import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Build again the identifier index used by the UUID search'
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index()
+        self.stdout.write('{} objects indexed'.format(total))
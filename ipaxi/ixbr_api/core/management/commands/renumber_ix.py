@@ -0,0 +1,55 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from ixbr_api.core.models import IX
+from ixbr_api.core.utils.globals import set_current_user
+from ixbr_api.users.models import User
+
+
+class Command(BaseCommand):
+    help = ('Change the IPv4 and/or IPv6 prefix of an IX, moving its '
+            'addresses and services to the new prefixes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('code', help='code of the IX')
+        parser.add_argument('--ipv4-prefix', help='new IPv4 prefix')
+        parser.add_argument('--ipv6-prefix', help='new IPv6 prefix')
+        parser.add_argument('--email', required=True,
+                            help='email of the user doing the change')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='only show what would be changed')
+
+    def handle(self, *args, **options):
+        try:
+            ix = IX.objects.get(code=options['code'])
+            user = User.objects.get(email=options['email'])
+        except (IX.DoesNotExist, User.DoesNotExist) as e:
+            raise CommandError(e)
+        set_current_user(user)
+
+        ix.ipv4_prefix = options['ipv4_prefix'] or ix.ipv4_prefix
+        ix.ipv6_prefix = options['ipv6_prefix'] or ix.ipv6_prefix
+
+        try:
+            plan = ix.plan_renumbering()
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+
+        for model, family_plan in plan.items():
+            if not family_plan:
+                continue
+            self.stdout.write('{}: {} to create, {} to delete'.format(
+                model.__name__, len(family_plan['create']),
+                len(family_plan['delete'])))
+            for address, target in sorted(family_plan['moves'].items()):
+                self.stdout.write('    {} -> {}'.format(address, target))
+
+        if options['dry_run']:
+            return
+
+        ix.prefix_update = True
+        try:
+            ix.save()
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+        self.stdout.write('{} renumbered'.format(ix))
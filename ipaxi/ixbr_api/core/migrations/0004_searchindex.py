@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from ..utils.search_labels import (channel_port_label, port_label,
+                                   service_label, switch_label, tag_label)
+
+SEARCH_INDEX_GROUP_OFFSETS = (0, 8, 12, 16, 20)
+SEARCH_INDEX_TAG_STATUSES = ('ALLOCATED', 'PRODUCTION')
+BATCH_SIZE = 1000
+
+
+def fill_search_index(apps, schema_editor):
+    SearchIndex = apps.get_model('core', 'SearchIndex')
+    querysets = (
+        ('MLPAv4', apps.get_model('core', 'MLPAv4').objects.select_related(
+            'tag'), service_label),
+        ('MLPAv6', apps.get_model('core', 'MLPAv6').objects.select_related(
+            'tag'), service_label),
+        ('Tag', apps.get_model('core', 'Tag').objects.filter(
+            status__in=SEARCH_INDEX_TAG_STATUSES), tag_label),
+        ('ChannelPort', apps.get_model('core', 'ChannelPort').objects.all(),
+         channel_port_label),
+        ('Port', apps.get_model('core', 'Port').objects.select_related(
+            'switch', 'switch_module'), port_label),
+        ('Switch', apps.get_model('core', 'Switch').objects.select_related(
+            'pix'), switch_label),
+    )
+    for model, queryset, label in querysets:
+        rows = []
+        for instance in queryset.iterator():
+            rows.extend(SearchIndex(identifier=instance.uuid.hex[offset:],
+                                    model=model,
+                                    object_pk=str(instance.pk),
+                                    label=label(instance)[:255])
+                        for offset in SEARCH_INDEX_GROUP_OFFSETS)
+            if len(rows) >= BATCH_SIZE:
+                SearchIndex.objects.bulk_create(rows)
+                rows = []
+        SearchIndex.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auto_20181011_1551'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.CharField(db_index=True, max_length=32)),
+                ('model', models.CharField(max_length=32)),
+                ('object_pk', models.CharField(max_length=64)),
+                ('label', models.CharField(max_length=255)),
+            ],
+            options={
+                'ordering': ('model', 'label'),
+                'verbose_name': 'SearchIndex',
+                'verbose_name_plural': 'SearchIndexes',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='searchindex',
+            index_together=set([('model', 'object_pk')]),
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
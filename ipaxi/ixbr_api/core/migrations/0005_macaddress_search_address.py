@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.db import migrations, models
+
+TRIGRAM_INDEXES = (
+    ('core_macaddress_search_address_trgm', 'core_macaddress',
+     'search_address'),
+    ('core_asn_number_trgm', 'core_asn', '(number::text)'),
+    ('core_tag_tag_trgm', 'core_tag', '(tag::text)'),
+)
+
+
+def fill_search_address(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE core_macaddress SET search_address = "
+            "regexp_replace(lower(address), '[^0-9a-f]', '', 'g')")
+        return
+    MACAddress = apps.get_model('core', 'MACAddress')
+    for address in MACAddress.objects.values_list('address', flat=True):
+        MACAddress.objects.filter(address=address).update(
+            search_address=re.sub(r'[^0-9a-f]', '', address.lower()))
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX {} ON {} USING gin ({} gin_trgm_ops)'.format(
+                name, table, column))
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_searchindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalmacaddress',
+            name='search_address',
+            field=models.CharField(default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='macaddress',
+            name='search_address',
+            field=models.CharField(default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(fill_search_address, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
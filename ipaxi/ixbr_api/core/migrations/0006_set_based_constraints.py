@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import ipaddress
+
+from django.db import migrations, models
+
+import ixbr_api.core.validators
+
+# Invariants checked by the model validators, enforced by PostgreSQL too.
+# The GiST indexes behind them answer the validators' overlap queries.
+EXCLUSION_CONSTRAINTS = (
+    ('core_ix_ipv4_prefix_overlap', 'core_ix',
+     'USING gist ((ipv4_prefix::cidr) inet_ops WITH &&)'),
+    ('core_ix_ipv6_prefix_overlap', 'core_ix',
+     'USING gist ((ipv6_prefix::cidr) inet_ops WITH &&)'),
+    ('core_switchportrange_overlap', 'core_switchportrange',
+     'USING gist ((switch_model_id::text) WITH =, name_format WITH =, '
+     'int4range("begin", "end", \'[]\') WITH &&)'),
+)
+
+
+def normalize_ix_prefixes(apps, schema_editor):
+    # The prefixes are validated without host bits from now on, and the
+    # exclusion constraints cast them to cidr, which refuses host bits
+    IX = apps.get_model('core', 'IX')
+    for code, ipv4_prefix, ipv6_prefix in IX.objects.values_list(
+            'code', 'ipv4_prefix', 'ipv6_prefix'):
+        networks = {
+            'ipv4_prefix': str(ipaddress.ip_network(ipv4_prefix, False)),
+            'ipv6_prefix': str(ipaddress.ip_network(ipv6_prefix, False)),
+        }
+        if (networks['ipv4_prefix'], networks['ipv6_prefix']) != \
+                (ipv4_prefix, ipv6_prefix):
+            IX.objects.filter(code=code).update(**networks)
+
+
+def create_exclusion_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # btree_gist provides the = operator of text columns in GiST indexes
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    for name, table, constraint in EXCLUSION_CONSTRAINTS:
+        schema_editor.execute(
+            'ALTER TABLE {} ADD CONSTRAINT {} EXCLUDE {}'.format(
+                table, name, constraint))
+
+
+def drop_exclusion_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, constraint in EXCLUSION_CONSTRAINTS:
+        schema_editor.execute(
+            'ALTER TABLE {} DROP CONSTRAINT IF EXISTS {}'.format(table, name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_macaddress_search_address'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='switch',
+            index=models.Index(fields=['management_ip'],
+                               name='core_switch_management_ip'),
+        ),
+        migrations.AlterField(
+            model_name='historicalix',
+            name='ipv4_prefix',
+            field=models.CharField(db_index=True, max_length=18, validators=[ixbr_api.core.validators.validate_ipv4_prefix]),
+        ),
+        migrations.AlterField(
+            model_name='historicalix',
+            name='ipv6_prefix',
+            field=models.CharField(db_index=True, max_length=43, validators=[ixbr_api.core.validators.validate_ipv6_prefix]),
+        ),
+        migrations.AlterField(
+            model_name='ix',
+            name='ipv4_prefix',
+            field=models.CharField(max_length=18, unique=True, validators=[ixbr_api.core.validators.validate_ipv4_prefix]),
+        ),
+        migrations.AlterField(
+            model_name='ix',
+            name='ipv6_prefix',
+            field=models.CharField(max_length=43, unique=True, validators=[ixbr_api.core.validators.validate_ipv6_prefix]),
+        ),
+        migrations.RunPython(normalize_ix_prefixes,
+                             migrations.RunPython.noop),
+        migrations.RunPython(create_exclusion_constraints,
+                             drop_exclusion_constraints),
+    ]
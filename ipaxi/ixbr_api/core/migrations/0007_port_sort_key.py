@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def natural_sort_key(port_name):
+    return ''.join(number.zfill(6)
+                   for number in re.findall(r'\d+', port_name))[:255]
+
+
+def fill_sort_key(apps, schema_editor):
+    for model_name, field in (('Port', 'name'),
+                              ('DIOPort', 'datacenter_position')):
+        model = apps.get_model('core', model_name)
+        pks_by_key = defaultdict(list)
+        for pk, value in model.objects.values_list('pk', field).iterator():
+            pks_by_key[natural_sort_key(value)].append(pk)
+        for sort_key, pks in pks_by_key.items():
+            model.objects.filter(pk__in=pks).update(sort_key=sort_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_set_based_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dioport',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='historicaldioport',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='historicalport',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='port',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_sort_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='dioport',
+            index=models.Index(fields=['dio', 'sort_key'],
+                               name='core_dioport_sort_key'),
+        ),
+        migrations.AddIndex(
+            model_name='port',
+            index=models.Index(fields=['switch', 'sort_key'],
+                               name='core_port_sort_key'),
+        ),
+    ]
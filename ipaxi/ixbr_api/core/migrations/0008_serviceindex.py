@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+SERVICE_TABLES = (
+    ('MLPAv4', 'core_mlpav4', 'mlpav4_address_id'),
+    ('MLPAv6', 'core_mlpav6', 'mlpav6_address_id'),
+    ('Monitorv4', 'core_monitorv4', 'monitor_address_id'),
+    ('BilateralPeer', 'core_bilateralpeer', 'CAST(NULL AS inet)'),
+)
+
+CREATE_SERVICE_INDEX = 'CREATE VIEW core_serviceindex AS\n' + \
+    '\nUNION ALL\n'.join(
+        "SELECT '{}' AS service_type, uuid, asn_id, tag_id, "
+        '"inner", customer_channel_id, status, {} AS address '
+        'FROM {}'.format(service_type, address, table)
+        for service_type, table, address in SERVICE_TABLES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_port_sort_key'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SERVICE_INDEX,
+                          'DROP VIEW core_serviceindex'),
+        migrations.CreateModel(
+            name='ServiceIndex',
+            fields=[
+                ('service_type', models.CharField(max_length=16)),
+                ('service_uuid', models.UUIDField(db_column='uuid', primary_key=True, serialize=False)),
+                ('inner', models.PositiveIntegerField(null=True)),
+                ('status', models.CharField(max_length=32)),
+                ('address', models.GenericIPAddressField(null=True)),
+                ('asn', models.ForeignKey(on_delete=models.deletion.DO_NOTHING, related_name='+', to='core.ASN')),
+                ('customer_channel', models.ForeignKey(on_delete=models.deletion.DO_NOTHING, related_name='+', to='core.CustomerChannel')),
+                ('tag', models.ForeignKey(null=True, on_delete=models.deletion.DO_NOTHING, related_name='+', to='core.Tag')),
+            ],
+            options={
+                'verbose_name': 'ServiceIndex',
+                'verbose_name_plural': 'ServiceIndexes',
+                'db_table': 'core_serviceindex',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,17 +1,23 @@
+import re
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from difflib import SequenceMatcher
 from logging import WARN
+from threading import local
 
 import ipaddress
 from django.core.exceptions import ValidationError
 from django.core.validators import (MaxLengthValidator, MaxValueValidator,
                                     MinLengthValidator, MinValueValidator,
                                     validate_email)
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
 from django.db.models import Q
+from django.db.models.functions import Cast
 from django.db.models.query import QuerySet
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from ixbr_api.users.models import User
 from model_utils.models import TimeStampedModel
@@ -19,9 +25,16 @@ from simple_history.models import HistoricalRecords
 
 from .use_cases.mac_address_converter_to_system_pattern import \
     MACAddressConverterToSystemPattern
+from .utils.address_hold import get_address_holder, release_address
 from .utils.calculate_percent_use_of_switch_ports import (
     calculate_percent_use_of_switch_ports)
-from .utils.constants import (MAX_TAG_NUMBER, MIN_TAG_NUMBER,
+from .utils.constants import (BULK_CREATE_BATCH_SIZE,
+                              IX_PREFIX_OVERLAP_CONSTRAINTS,
+                              SEARCH_INDEX_GROUP_OFFSETS,
+                              SEARCH_INDEX_TAG_STATUSES,
+                              SERVICE_INDEX_FIELDS,
+                              MAX_TAG_NUMBER, MIN_TAG_NUMBER,
+                              TAGS_BORN_ALLOCATED,
                               PHYSICAL_INTERFACE_PORT_CONNECTOR_TYPE,
                               PORT_CAPACITY_CONNECTOR_TYPE,
                               PORT_TYPE_CONNECTOR_TYPE, VENDORS,
@@ -29,14 +42,24 @@ from .utils.constants import (MAX_TAG_NUMBER, MIN_TAG_NUMBER,
                               CONNECTOR_TYPES, PORT_TYPES)
 from .utils.globals import get_current_user
 from .utils.logging_handlers import log_object
-from .utils.port_utils import port_sorting
+from .utils.nikiti.snapshots import (invalidate_all_nikiti_snapshots,
+                                     invalidate_nikiti_snapshots)
+from .utils.port_utils import natural_sort_key
+from .utils.search_labels import (channel_port_label, pix_label, port_label,
+                                  service_label, switch_label,
+                                  switch_module_label, tag_label)
+from .utils.switch_topology import (PORT_TOPOLOGY_FIELDS,
+                                    invalidate_switch_topology)
+from .utils.tag_bitmap import (TagBitmap, invalidate_inner_tag_bitmap,
+                               invalidate_tag_bitmaps)
 from .validators import (validate_as_number, validate_channel_name,
                          validate_cnpj, validate_ipv4_network,
-                         validate_ipv6_network, validate_ix_code,
+                         validate_ipv4_prefix, validate_ipv6_network,
+                         validate_ipv6_prefix, validate_ix_code,
                          validate_ix_fullname, validate_ix_shortname,
                          validate_mac_address, validate_name_format,
                          validate_pix_code, validate_switch_model,
-                         validate_url_format, RESERVED_IP)
+                         validate_url_format, ADDRESS_HELD, RESERVED_IP)
 
 
 class IXAPIQuerySet(QuerySet):
@@ -54,31 +77,198 @@ class IXAPIQuerySet(QuerySet):
 
 class PortQuerySet(IXAPIQuerySet):
     def order_by_port_name(self, **kwargs):
-        return self.extra(
-            select={
-                'port_int':
-                '''
-                CAST
-                    (REGEXP_REPLACE
-                        (REGEXP_REPLACE(name, '([a-zA-Z]|(?:\s)|(?:-))','','g'),
-                    '\/', '00','g')
-                AS INTEGER)'''
-            }).order_by('switch__management_ip', 'port_int')
+        return self.order_by('switch__management_ip', 'sort_key', 'name')
 
 
 class DIOPortQuerySet(IXAPIQuerySet):
     def order_by_datacenter_position(self, **kwargs):
-        return self.extra(
-            select={
-                'datacenter_position_int':
-                '''
-                CAST
-                    (REGEXP_REPLACE
-                        (REGEXP_REPLACE(datacenter_position,
-                        '([a-zA-Z]|(?:\s)|(?:-))','','g'),
-                    '\/', '00','g')
-                AS INTEGER)'''
-            }).order_by('datacenter_position_int')
+        return self.order_by('sort_key', 'datacenter_position')
+
+
+class ServiceIndexQuerySet(IXAPIQuerySet):
+    def get_services(self, service_models=None):
+        """ Returns the services of the rows as instances of their own model
+
+        Only the models with rows in the queryset are queried, each one by a
+        subquery of the rows.
+
+        Args:
+            service_models: the models of the services returned, in the order
+                they are listed. Defaults to service_index_models()
+        """
+        if service_models is None:
+            service_models = service_index_models()
+        service_types = set(self.order_by().values_list(
+            'service_type', flat=True).distinct())
+        services = []
+        for model in service_models:
+            if model.__name__ in service_types:
+                services.extend(model.objects.filter(pk__in=self.filter(
+                    service_type=model.__name__).values('service_uuid')))
+        return services
+
+    def get_mac_addresses(self):
+        """ Returns the MACAddresses of the services of the rows """
+        mac_addresses = Q()
+        for model in service_index_models():
+            mac_addresses |= Q(pk__in=model.mac_addresses.through.objects
+                               .filter(**{
+                                   model._meta.model_name + '__in':
+                                   self.filter(service_type=model.__name__)
+                                   .values('service_uuid')})
+                               .values('macaddress'))
+        return MACAddress.objects.filter(mac_addresses)
+
+    def count_by_type(self):
+        """ Returns a dict with the amount of rows of each service type,
+        zero for the types without rows """
+        amounts = OrderedDict.fromkeys(
+            [model.__name__ for model in service_index_models()], 0)
+        amounts.update(self.order_by().values_list('service_type').annotate(
+            amount=models.Count('service_uuid')))
+        return amounts
+
+
+_write_batches = local()
+
+
+class WriteBatch(object):
+    """
+    Unit of work of batch_writes(). Updates of HistoricalTimeStampedModel
+    objects are kept until flush(), and then written together: one UPDATE
+    for each model and set of changed values, one INSERT of history rows
+    for each model and a single log record for the whole batch.
+    """
+    def __init__(self, user):
+        self.user = user
+        self.pending = OrderedDict()
+        self.saved = []
+
+    def add(self, obj):
+        """ Keeps obj to be written by flush(), once however many times it
+        is saved """
+        self.pending[id(obj)] = obj
+
+    def flush(self):
+        """ Validates every pending object, as save() does, and only then
+        writes their updates. Must run inside the transaction of
+        batch_writes(), which a ValidationError rolls back.
+        """
+        pending = list(self.pending.values())
+        self.pending = OrderedDict()
+        if not pending:
+            return
+
+        # Nothing is written before all objects are valid, so the
+        # constraints of the database are not hit by invalid values
+        for obj in pending:
+            obj.full_clean()
+
+        # An object whose pk was changed after it was kept is saved alone
+        for obj in [obj for obj in pending
+                    if obj.get_update_fields() is None]:
+            pending.remove(obj)
+            super(HistoricalTimeStampedModel, obj).save()
+            obj.take_snapshot()
+
+        now = timezone.now()
+        updates = OrderedDict()
+        for obj in pending:
+            obj.modified = now
+            update_fields = frozenset(obj.get_update_fields())
+            pre_save.send(sender=obj.__class__, instance=obj, raw=False,
+                          using=obj._state.db, update_fields=update_fields)
+            values = tuple(sorted((attname, getattr(obj, attname))
+                                  for attname in update_fields))
+            key = (obj.__class__, values)
+            try:
+                hash(key)
+            except TypeError:
+                key = (obj.__class__, id(obj))
+            updates.setdefault(key, (values, update_fields, []))[2].append(
+                obj)
+
+        for (model, key), (values, update_fields, objs) in updates.items():
+            model._base_manager.filter(
+                pk__in=[obj.pk for obj in objs]).update(**dict(values))
+
+        history = OrderedDict()
+        for obj in pending:
+            history.setdefault(obj.__class__, []).append(obj)
+        for model, objs in history.items():
+            model.bulk_create_history(objs, '~')
+
+        # The history rows are already written, simple_history skips them
+        for (model, key), (values, update_fields, objs) in updates.items():
+            for obj in objs:
+                obj.take_snapshot(update_fields)
+                obj.skip_history_when_saving = True
+                try:
+                    post_save.send(sender=model, instance=obj, created=False,
+                                   raw=False, using=obj._state.db,
+                                   update_fields=update_fields)
+                finally:
+                    del obj.skip_history_when_saving
+
+
+def get_write_batch():
+    """ Returns: the WriteBatch of the batch_writes() block running in this
+    thread, or None """
+    return getattr(_write_batches, 'batch', None)
+
+
+@contextmanager
+def batch_writes():
+    """ Runs a block in a transaction where the updates of
+    HistoricalTimeStampedModel objects are written together when it exits.
+
+    Inside the block save() of an existing object only keeps it in the
+    batch, so the database shows the change only after the block or an
+    explicit flush(). Objects created are still written by save(), with the
+    user of the batch and without a log record each.
+
+    Examples:
+        with batch_writes() as batch:
+            for port in ports:
+                port.status = 'INFRASTRUCTURE'
+                port.save()
+
+    Returns:
+        The WriteBatch, the one of the enclosing block when nested
+    """
+    batch = get_write_batch()
+    if batch is not None:
+        yield batch
+        return
+
+    batch = WriteBatch(get_current_user())
+    with transaction.atomic():
+        _write_batches.batch = batch
+        try:
+            yield batch
+            batch.flush()
+        finally:
+            _write_batches.batch = None
+    log_object("Objects updated in batch", batch.saved,
+               count=len(batch.saved))
+
+
+def bulk_batch_size(model, objs, batch_size=BULK_CREATE_BATCH_SIZE):
+    """ Caps batch_size to the rows the database takes in one INSERT, as
+    bulk_create() doesn't cap an explicit batch_size (SQLite takes 500
+    rows at most)
+
+    Args:
+        model: the model of objs
+        objs: list of instances to be inserted
+        batch_size: Integer -> rows per INSERT statement wanted
+
+    Returns:
+        Integer: the rows per INSERT statement
+    """
+    ops = connections[model.objects.db].ops
+    return max(min(batch_size, ops.bulk_batch_size(
+        model._meta.concrete_fields, objs)), 1)
 
 
 class HistoricalTimeStampedModel(TimeStampedModel):
@@ -107,6 +297,10 @@ class HistoricalTimeStampedModel(TimeStampedModel):
     def _history_user(self, value):
         self.modified_by = value
 
+    # Values of the concrete fields, by attname, as they were when the object
+    # was loaded or last saved. Replaced, never changed in place.
+    _snapshot = {}
+
     # When use clean() method, remember that order matters,
     # for error messages and dealing with database.
     # Use block_update_pk() then block_update_fields() and
@@ -120,10 +314,13 @@ class HistoricalTimeStampedModel(TimeStampedModel):
             return False
 
     def save(self, *args, **kwargs):
-
-        log_object("Object updated", self, **kwargs)
-
-        modified_by = get_current_user()
+        batch = get_write_batch()
+        if batch is None:
+            log_object("Object updated", self, **kwargs)
+            modified_by = get_current_user()
+        else:
+            batch.saved.append(self)
+            modified_by = batch.user
 
         if self.resource_is_reservable:
             if self.is_reserved:
@@ -135,9 +332,18 @@ class HistoricalTimeStampedModel(TimeStampedModel):
                        severity=WARN)
         else:
             self.modified_by = modified_by
+        # Updates in a batch are validated and written when it is flushed
+        if batch is not None and not args and not kwargs and \
+                self.get_update_fields() is not None:
+            batch.add(self)
+            return
         # Call clean validations before save.
         self.full_clean()
+        if not args and kwargs.get('update_fields') is None and \
+                not kwargs.get('force_insert'):
+            kwargs['update_fields'] = self.get_update_fields()
         super().save(*args, **kwargs)
+        self.take_snapshot(kwargs.get('update_fields'))
 
     def delete(self, *args, **kwargs):
         if self.resource_is_reservable:
@@ -146,23 +352,137 @@ class HistoricalTimeStampedModel(TimeStampedModel):
         else:
             super().delete(*args, **kwargs)
 
+    @classmethod
+    def bulk_create_with_history(cls, objs, batch_size=BULK_CREATE_BATCH_SIZE):
+        """ Insert objs and their creation history rows in batches
+
+        save() is bypassed, so neither full_clean() nor the per object log is
+        run: callers must validate the whole set before calling this method.
+
+        Args:
+            objs: list of unsaved instances of cls
+            batch_size: Integer -> rows per INSERT statement
+
+        Returns:
+            list: the created instances
+        """
+        objs = cls.objects.bulk_create(
+            objs, batch_size=bulk_batch_size(cls, objs, batch_size))
+        cls.bulk_create_history(objs, '+', batch_size=batch_size)
+        return objs
+
+    @classmethod
+    def bulk_create_history(cls, objs, history_type,
+                            batch_size=BULK_CREATE_BATCH_SIZE):
+        """ Insert, in batches, the history rows of objs changed without
+        save() (bulk_create(), update() or delete())
+
+        Args:
+            objs: list of instances of cls, as they are after the change
+            history_type: '+' (created), '~' (changed) or '-' (deleted)
+            batch_size: Integer -> rows per INSERT statement
+        """
+        history_model = cls.history.model
+        history_date = timezone.now()
+        history_objs = [
+            history_model(history_date=history_date,
+                          history_type=history_type,
+                          history_user_id=obj.modified_by_id,
+                          **{field.attname: getattr(obj, field.attname)
+                             for field in cls._meta.fields})
+            for obj in objs]
+        history_model.objects.bulk_create(
+            history_objs,
+            batch_size=bulk_batch_size(history_model, history_objs,
+                                       batch_size))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.take_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self.take_snapshot(fields)
+
+    def take_snapshot(self, fields=None):
+        """ Keeps the values of the concrete fields loaded, to tell later
+        which ones changed without querying the database
+
+        Args:
+            fields: names or attnames of the fields to keep, None for all
+        """
+        snapshot = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__ and
+            (fields is None or field.name in fields or
+             field.attname in fields)}
+        if fields is not None:
+            snapshot = dict(self._snapshot, **snapshot)
+        self._snapshot = snapshot
+
+    def get_original_value(self, attname):
+        """ Returns: the value of a field when the object was loaded or last
+        saved. It is read from the database only if it was not loaded. """
+        if attname in self._snapshot:
+            return self._snapshot[attname]
+        if self._state.adding:
+            return getattr(self, attname)
+        return self.__class__.objects.filter(pk=self.pk).values_list(
+            attname, flat=True).first()
+
+    def get_dirty_fields(self):
+        """ Returns: set with the attnames of the loaded fields changed since
+        the object was loaded or last saved """
+        return {field.attname for field in self._meta.concrete_fields
+                if field.attname in self.__dict__ and
+                (field.attname not in self._snapshot or
+                 self.__dict__[field.attname] !=
+                 self._snapshot[field.attname])}
+
+    def get_update_fields(self):
+        """ Returns: the update_fields of save(), the changed fields plus the
+        ones set on every save, or None to save every field when the object
+        is new, was not loaded from the database or had its pk changed """
+        pk_attname = self._meta.pk.attname
+        if self._state.adding or pk_attname not in self._snapshot:
+            return None
+        dirty = self.get_dirty_fields()
+        if pk_attname in dirty:
+            return None
+        return dirty | {'modified', 'modified_by_id'}
+
     # Block pk field update
     def block_update_pk(self):
-        if(not self._state.adding and
-           not self.__class__.objects.filter(pk=self.pk)):
+        if self._state.adding:
+            return
+        pk_attname = self._meta.pk.attname
+        if pk_attname in self._snapshot:
+            changed = self.pk != self._snapshot[pk_attname]
+        else:
+            changed = not self.__class__.objects.filter(pk=self.pk)
+        if changed:
             raise ValidationError(_(
                 'Trying to update non updatable field: {}.{}'.format(
                     self.__class__.__name__, self._meta.pk.name)))
 
     # Block field update passed as arg
     def block_update_fields(self, block_field):
-        if self.__class__.objects.filter(pk=self.pk):
+        if block_field in self._snapshot:
+            changed = self.__dict__[block_field] != \
+                self._snapshot[block_field]
+        elif self.__class__.objects.filter(pk=self.pk):
             old = self.__class__.objects.get(pk=self.pk)
-            if self.__dict__[block_field] != old.__dict__[block_field]:
-                raise ValidationError(
-                    ('Trying to update non updatable field: {0}.{1}'.format(
-                        self.__class__.__name__,
-                        self.__class__._meta.get_field(block_field).name)))
+            changed = self.__dict__[block_field] != old.__dict__[block_field]
+        else:
+            changed = False
+        if changed:
+            raise ValidationError(
+                ('Trying to update non updatable field: {0}.{1}'.format(
+                    self.__class__.__name__,
+                    self.__class__._meta.get_field(block_field).name)))
 
 
 class ReservableModel(models.Model):
@@ -236,12 +556,11 @@ class ASN(HistoricalTimeStampedModel):
         self.block_update_pk()
 
     def get_stats_amount(self, ix):
-        return {"mlpav4_amount": MLPAv4.objects.filter(asn=self.number,
-                                                       tag__ix=ix).count(),
-                "mlpav6_amount": MLPAv6.objects.filter(
-                    asn=self.number, tag__ix=ix).count(),
-                "bilateral_amount": BilateralPeer.objects.filter(
-                    asn=self.number, tag__ix=ix).count()}
+        amounts = ServiceIndex.objects.filter(
+            asn=self.number, tag__ix=ix).count_by_type()
+        return {"mlpav4_amount": amounts['MLPAv4'],
+                "mlpav6_amount": amounts['MLPAv6'],
+                "bilateral_amount": amounts['BilateralPeer']}
 
 
 class Bilateral(HistoricalTimeStampedModel):
@@ -416,7 +735,7 @@ class ChannelPort(HistoricalTimeStampedModel):
         verbose_name_plural = _('ChannelPorts')
 
     def __str__(self):
-        return "[%s]" % (self.uuid, )
+        return channel_port_label(self)
 
 
 class Contact(HistoricalTimeStampedModel):
@@ -521,6 +840,8 @@ class DIOPort(HistoricalTimeStampedModel):
                                     models.SET_NULL,
                                     blank=True,
                                     null=True)  # revisar
+    # natural_sort_key() of datacenter_position, set on save
+    sort_key = models.CharField(max_length=255, editable=False, default='')
 
     class Meta:
         unique_together = ('dio', 'ix_position', 'datacenter_position',
@@ -528,10 +849,16 @@ class DIOPort(HistoricalTimeStampedModel):
         ordering = ('dio',)
         verbose_name = _('DIOPort')
         verbose_name_plural = _('DIOPorts')
+        indexes = [models.Index(fields=['dio', 'sort_key'],
+                                name='core_dioport_sort_key')]
 
     def __str__(self):
         return "[DIO %s: POS %s]" % (self.dio.name, self.datacenter_position,)
 
+    def save(self, *args, **kwargs):
+        self.sort_key = natural_sort_key(str(self.datacenter_position))
+        super().save(*args, **kwargs)
+
     def clean(self):
         self.block_update_fields('dio_id')
 
@@ -616,9 +943,9 @@ class IX(HistoricalTimeStampedModel):
     fullname = models.CharField(
         max_length=48, validators=[validate_ix_fullname])
     ipv4_prefix = models.CharField(
-        max_length=18, unique=True, validators=[validate_ipv4_network])
+        max_length=18, unique=True, validators=[validate_ipv4_prefix])
     ipv6_prefix = models.CharField(
-        max_length=43, unique=True, validators=[validate_ipv6_network])
+        max_length=43, unique=True, validators=[validate_ipv6_prefix])
     management_prefix = models.CharField(
         max_length=18, validators=[validate_ipv4_network])
     create_ips = models.BooleanField(default=True)
@@ -632,12 +959,6 @@ class IX(HistoricalTimeStampedModel):
         verbose_name = _('IX')
         verbose_name_plural = _('IXs')
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self._original_ipv4_prefix = self.ipv4_prefix
-        self._original_ipv6_prefix = self.ipv6_prefix
-
     def __str__(self):
         return "[%s]" % (self.code,)
 
@@ -657,9 +978,29 @@ class IX(HistoricalTimeStampedModel):
             raise ValidationError(_("{} is not a IPv4 network".
                                     format(self.management_prefix)))
 
+    def get_overlapping_ix(self, field):
+        """ Returns: an IX other than this one whose prefix of field overlaps
+        the prefix of this IX, or None
+
+        On PostgreSQL it is a single query using the GiST index of the
+        exclusion constraint on the prefix.
+        """
+        return IX.objects.exclude(pk=self.pk).extra(
+            where=['{}::cidr && %s::cidr'.format(field)],
+            params=[getattr(self, field)]).first()
+
     def validate_ip_network_intersect(self):
         current_v4 = ipaddress.ip_network(self.ipv4_prefix)
         current_v6 = ipaddress.ip_network(self.ipv6_prefix)
+        if connections[IX.objects.db].vendor == 'postgresql':
+            for field, current in (('ipv4_prefix', current_v4),
+                                   ('ipv6_prefix', current_v6)):
+                ix = self.get_overlapping_ix(field)
+                if ix is not None:
+                    raise ValidationError(_("{} overlaps with {} from IX: {}".
+                                            format(current, getattr(ix, field),
+                                                   ix)))
+            return
         for ix in IX.objects.all():
             if ix.code == self.code:
                 continue
@@ -677,119 +1018,42 @@ class IX(HistoricalTimeStampedModel):
         self.validate_mgmt_network()
         self.validate_ip_network_intersect()
 
-    def create_ipv4(self, old_addresses=[]):
-        """
-        Create all IPv4Addresses that belong to this IX IPv4 prefix.
-        Raises ValueError if one of those IPs already exist and is assigned
-        to another IX.
-
-        """
-        prefix = self.get_ipv4_network()
-        old_prefix = ipaddress.ip_network(self._original_ipv4_prefix)
-
-        expansion = prefix.overlaps(old_prefix) and prefix < old_prefix
-
-        if expansion:
-            new_addresses = (ip for ip in prefix.hosts()
-                             if ip not in old_prefix.hosts())
-
-            for address in new_addresses:
-                ip = IPv4Address(address=address, ix=self, in_lg=False,
-                                 last_ticket=self.last_ticket,
-                                 modified_by=self.modified_by)
-                ip.save()
-        else:
-            difference = int(prefix.network_address) - \
-                         int(old_prefix.network_address)
-            for address in old_addresses:
-                ip_address = ipaddress.ip_address(address.address)
-
-                address = IPv4Address(
-                    address=ip_address + difference,
-                    ix=self,
-                    reverse_dns=address.reverse_dns,
-                    in_lg=address.in_lg,
-                    last_ticket=address.last_ticket,
-                    modified_by=self.modified_by)
-                address.save()
-
-            # If the new prefix is bigger, create the remaining addresses
-            remaining = list(prefix.hosts())[len(old_addresses):]
-            for address in remaining:
-                ip = IPv4Address(address=address, ix=self, in_lg=False,
-                                 last_ticket=self.last_ticket,
-                                 modified_by=self.modified_by)
-                ip.save()
-
-    def map_new_address_ipv4(self, *services):
+    def save(self, *args, **kwargs):
+        # On PostgreSQL the overlapping prefixes refused by
+        # validate_ip_network_intersect() are refused by exclusion
+        # constraints too, which are reported by it the same way
+        try:
+            with transaction.atomic():
+                super(IX, self).save(*args, **kwargs)
+        except IntegrityError as error:
+            if not any(constraint in str(error)
+                       for constraint in IX_PREFIX_OVERLAP_CONSTRAINTS):
+                raise
+            self.validate_ip_network_intersect()
+            raise ValidationError(_("The prefixes of {} overlap with the "
+                                    "prefixes of another IX".format(self)))
+
+    def plan_renumbering(self):
         """
-        Change address of services to match new prefix. If the new prefix
-        contains the old one, no alteration is made. Else, the new address of a
-        given service is calculated by keeping the same offset from the old
-        prefix.
+        Dry run of update_ips(): the changes that renumbering the IX from its
+        original prefixes to the current ones would make. See
+        plan_renumbering().
 
         """
-        prefix = self.get_ipv4_network()
-        old_prefix = ipaddress.ip_network(self._original_ipv4_prefix)
-
-        expansion = prefix.overlaps(old_prefix) and prefix < old_prefix
-
-        if expansion:
-            return
-        else:
-            for service in services:
-                service_address = ipaddress.ip_address(
-                    service.get_address().address)
-                offset = int(service_address) - int(old_prefix.network_address)
-                new_address = prefix.network_address + offset
-
-                service.set_address(
-                    IPv4Address.objects.get(address=str(new_address)))
-                service.save()
+        return plan_renumbering(self)
 
     def update_ips(self):
         """
         Called after an IX has one of its prefixes changed.
         Create new IP objects and change the address of its services
         for the new prefix. They are not changed if the new prefix contains the
-        old one (expansion)
+        old one (expansion). The whole change is planned in memory and
+        written with set based statements, see apply_renumbering().
 
         """
-        prefix = self.get_ipv4_network()
-        old_prefix = ipaddress.ip_network(self._original_ipv4_prefix)
-
-        if prefix != old_prefix:
-            #  If it's an expansion, just create new addresses without changing
-            # services address
-            expansion = prefix.overlaps(old_prefix) and prefix < old_prefix
-
-            if expansion:
-                self.create_ipv4()
-            else:
-                mlpa_v4_services = MLPAv4.objects.filter(
-                    mlpav4_address__ix=self)
-                monitor_services = Monitorv4.objects.filter(
-                    monitor_address__ix=self)
-
-                old_addresses = list(IPv4Address.objects.filter(ix=self))
-
-                self.create_ipv4(old_addresses)
-                self.map_new_address_ipv4(*mlpa_v4_services, *monitor_services)
-
-                for old_address in old_addresses:
-                    old_address.delete()
-
-        prefix = self.get_ipv6_network()
-        old_prefix = ipaddress.ip_network(self._original_ipv6_prefix)
-
-        if prefix != old_prefix:
-            mlpa_v6_services = MLPAv6.objects.filter(
-                    mlpav6_address__ix=self)
-
-            old_addresses = list(IPv6Address.objects.filter(ix=self))
-
-            self.map_new_address_ipv4(*mlpa_v6_services)
+        apply_renumbering(self, plan_renumbering(self))
 
+        self.take_snapshot(('ipv4_prefix', 'ipv6_prefix'))
         self.prefix_update = False
 
     def get_all_customer_channels(self):
@@ -841,6 +1105,9 @@ class MACAddress(HistoricalTimeStampedModel):
     uuid = None
     address = models.CharField(primary_key=True, max_length=17, validators=[
                                validate_mac_address])
+    # address without separators, with a trigram index for partial searches
+    search_address = models.CharField(max_length=12, editable=False,
+                                      default='')
 
     class Meta:
         ordering = ('address',)
@@ -910,7 +1177,7 @@ class PIX(HistoricalTimeStampedModel):
         verbose_name_plural = _('PIXs')
 
     def __str__(self):
-        return "[IX %s: PIX %s]" % (self.ix.code, self.code,)
+        return pix_label(self)
 
     def clean(self):
         self.block_update_fields('ix_id')
@@ -923,25 +1190,13 @@ class PIX(HistoricalTimeStampedModel):
         return channels
 
     def get_asns(self):
-
         channels = self.get_customer_channels()
+        services = ServiceIndex.objects.filter(
+            customer_channel__in=channels.values('pk'))
 
-        asn_list = []
-        asn_list.extend(channels.values_list('asn', flat=True))
-        mlpav4 = MLPAv4.objects.filter(customer_channel__in=channels)
-        asn_list.extend(list(mlpav4.values_list('asn', flat=True)))
-
-        mlpav6 = MLPAv6.objects.filter(customer_channel__in=channels)
-        asn_list.extend(list(mlpav6.values_list('asn', flat=True)))
-
-        bilateralpeer = BilateralPeer.objects.filter(
-            customer_channel__in=channels)
-        asn_list.extend(list(bilateralpeer.values_list('asn', flat=True)))
-
-        monitorv4 = Monitorv4.objects.filter(customer_channel__in=channels)
-        asn_list.extend(list(monitorv4.values_list('asn', flat=True)))
-
-        return list(set(asn_list))
+        return list(ASN.objects.filter(
+            Q(pk__in=channels.values('asn')) |
+            Q(pk__in=services.values('asn'))).values_list('number', flat=True))
 
     def get_stats_amount(self):
         channels = self.get_customer_channels()
@@ -950,20 +1205,14 @@ class PIX(HistoricalTimeStampedModel):
         for contact_map in self.ix.contactsmap_set.all():
             asn_amount.append(contact_map.asn.number)
 
-        mlpav4 = MLPAv4.objects.filter(customer_channel__in=channels)
-
-        mlpav6 = MLPAv6.objects.filter(customer_channel__in=channels)
-
-        bilateralpeer = BilateralPeer.objects.filter(
-            customer_channel__in=channels)
-
-        monitorv4 = Monitorv4.objects.filter(customer_channel__in=channels)
+        amounts = ServiceIndex.objects.filter(
+            customer_channel__in=channels.values('pk')).count_by_type()
 
         stats_infos = {'asn_amount': len(set(asn_amount)),
-                       'mlpav4_amount': len(mlpav4),
-                       'mlpav6_amount': len(mlpav6),
-                       'monitorv4': len(monitorv4),
-                       'bilateral_amount': len(bilateralpeer),
+                       'mlpav4_amount': amounts['MLPAv4'],
+                       'mlpav6_amount': amounts['MLPAv6'],
+                       'monitorv4': amounts['Monitorv4'],
+                       'bilateral_amount': amounts['BilateralPeer'],
                        'cix_amount': len(channels.exclude(cix_type=0))}
 
         return stats_infos
@@ -1069,12 +1318,21 @@ class Port(HistoricalTimeStampedModel, ReservableModel):
     channel_port = models.ForeignKey(
         'ChannelPort', models.SET_NULL, blank=True, null=True)
     description = models.CharField(max_length=80, blank=True)
+    # natural_sort_key() of name, set on save
+    sort_key = models.CharField(max_length=255, editable=False, default='')
 
     class Meta:
         ordering = ('switch', 'name',)
         unique_together = (('switch', 'name',),)
         verbose_name = _('Port')
         verbose_name_plural = _('Ports')
+        indexes = [models.Index(fields=['switch', 'sort_key'],
+                                name='core_port_sort_key')]
+
+    def save(self, *args, **kwargs):
+        self.sort_key = natural_sort_key(str(self.name))
+        super().save(*args, **kwargs)
+
     #Criar validator Switch e Module NUll
     def validate_connector_type_capacity(self):
         if(self.capacity not in
@@ -1143,10 +1401,7 @@ class Port(HistoricalTimeStampedModel, ReservableModel):
             Route.clean(self.route, self)
 
     def __str__(self):
-        if self.switch:
-            return "[%s: %s]" % (self.switch.management_ip, self.name)
-        else:
-            return "[%s: %s]" % (self.switch_module, self.name)
+        return port_label(self)
 
     @property
     def capacity_translated(self):
@@ -1186,6 +1441,60 @@ class Route(HistoricalTimeStampedModel):
                                             "Route."))
 
 
+class SearchIndex(models.Model):
+    """Identifier index to search objects by part of their UUID.
+
+    Each object has one row per UUID group, holding the UUID hex digits
+    from that group on, so a search for any group beginning is a prefix
+    search on an indexed column. The rows are kept by signals and can be
+    rebuilt by the rebuild_search_index command.
+    """
+    identifier = models.CharField(max_length=32, db_index=True)
+    model = models.CharField(max_length=32)
+    object_pk = models.CharField(max_length=64)
+    label = models.CharField(max_length=255)
+
+    class Meta:
+        ordering = ('model', 'label',)
+        index_together = (('model', 'object_pk'),)
+        verbose_name = _('SearchIndex')
+        verbose_name_plural = _('SearchIndexes')
+
+    def __str__(self):
+        return "[%s: %s]" % (self.model, self.label,)
+
+
+class ServiceIndex(models.Model):
+    """Read only index of the services of every type.
+
+    It is a database view with one row per MLPAv4, MLPAv6, Monitorv4 and
+    BilateralPeer, so questions about the services of a tag, channel or ASN
+    are answered by one query using the indexes of each service table. The
+    services themselves are got by ServiceIndexQuerySet.get_services().
+    """
+    service_type = models.CharField(max_length=16)
+    service_uuid = models.UUIDField(primary_key=True, db_column='uuid')
+    asn = models.ForeignKey('ASN', models.DO_NOTHING, related_name='+')
+    tag = models.ForeignKey('Tag', models.DO_NOTHING, null=True,
+                            related_name='+')
+    inner = models.PositiveIntegerField(null=True)
+    customer_channel = models.ForeignKey(
+        'CustomerChannel', models.DO_NOTHING, related_name='+')
+    status = models.CharField(max_length=32)
+    address = models.GenericIPAddressField(null=True)
+
+    objects = ServiceIndexQuerySet.as_manager()
+
+    class Meta:
+        managed = False
+        db_table = 'core_serviceindex'
+        verbose_name = _('ServiceIndex')
+        verbose_name_plural = _('ServiceIndexes')
+
+    def __str__(self):
+        return "[%s: %s]" % (self.service_type, self.service_uuid,)
+
+
 class Service(HistoricalTimeStampedModel):
     """Service representation."""
     tag = models.ForeignKey('Tag', models.PROTECT, null=True)
@@ -1204,6 +1513,8 @@ class Service(HistoricalTimeStampedModel):
                 ('QUARANTINE', 'Customer in test/quarantine'), )
     status = models.CharField(
         max_length=32, choices=STATUSES, default='ALLOCATED')
+    # Name of the address field of the services that have one
+    address_field = None
 
     class Meta:
         abstract = True
@@ -1214,30 +1525,27 @@ class Service(HistoricalTimeStampedModel):
         # unique_together = (('asn', 'tag', 'inner'),)
 
     def __str__(self):
-        return "%s [%s AS%s %s:%s]" % (self.uuid,
-                                       self.shortname,
-                                       self.asn.number,
-                                       self.tag,
-                                       self.inner)
+        return service_label(self)
 
     @staticmethod
     def get_objects_all():
-        objects_list = []
-        objects_list.extend(list(MLPAv4.objects.all()))
-        objects_list.extend(list(MLPAv6.objects.all()))
-        objects_list.extend(list(Monitorv4.objects.all()))
-        objects_list.extend(list(BilateralPeer.objects.all()))
-        return objects_list
+        return ServiceIndex.objects.get_services()
 
     def get_service_type(self):
         return self.__class__.__name__
 
     def get_objects_filter(kwarg, arg):
+        """ Returns the services of every type filtered by kwarg=arg, through
+        ServiceIndex when kwarg starts by one of its fields """
+        field, separator, lookup = kwarg.partition('__')
+        field = SERVICE_INDEX_FIELDS.get(field)
+        if field:
+            return ServiceIndex.objects.filter(
+                **{field + separator + lookup: arg}).get_services()
+
         objects = list()
-        objects.extend(list(MLPAv4.objects.filter(**{kwarg: arg})))
-        objects.extend(list(MLPAv6.objects.filter(**{kwarg: arg})))
-        objects.extend(list(Monitorv4.objects.filter(**{kwarg: arg})))
-        objects.extend(list(BilateralPeer.objects.filter(**{kwarg: arg})))
+        for model in service_index_models():
+            objects.extend(list(model.objects.filter(**{kwarg: arg})))
         return objects
 
     def validate_asn_ix(self):
@@ -1253,22 +1561,10 @@ class Service(HistoricalTimeStampedModel):
                                     "a least one port."))
 
     def validate_mac(self):
-        macs = set()
-        macs_mlpav4 = set([mac for mac in MLPAv4.objects.filter(
-            asn=self.asn, customer_channel=self.customer_channel).values_list(
-                'mac_addresses', flat=True) if mac])
-        macs_mlpav6 = set([mac for mac in MLPAv6.objects.filter(
-            asn=self.asn, customer_channel=self.customer_channel).values_list(
-                'mac_addresses', flat=True) if mac])
-        macs_bilateralpeer = set([mac for mac in BilateralPeer.objects.filter(
-            asn=self.asn, customer_channel=self.customer_channel).values_list(
-                'mac_addresses', flat=True) if mac])
-        macs_monitorv4 = set([mac for mac in Monitorv4.objects.filter(
-            asn=self.asn, customer_channel=self.customer_channel).values_list(
-                'mac_addresses', flat=True) if mac])
-        macs = macs.union(
-            macs_mlpav4, macs_mlpav6, macs_bilateralpeer, macs_monitorv4)
-        if len(macs) > 4:
+        macs = ServiceIndex.objects.filter(
+            asn=self.asn_id,
+            customer_channel=self.customer_channel_id).get_mac_addresses()
+        if macs.count() > 4:
             raise ValidationError(_('Only 4 MACs by AS by Channel is allowed'))
         if len(self.mac_addresses.all()) >= 3:
             raise ValidationError(_('Only 2 MAC/Service are allowed'))
@@ -1291,11 +1587,35 @@ class Service(HistoricalTimeStampedModel):
         return set(
             [port.switch.pix for port in self.customer_channel.get_ports()])
 
+    def validate_address_hold(self):
+        """ The address of a new service, or the new address of a service,
+        can not be one held to another user by a suggestion of free
+        addresses. Returns the (ix, address) to release after the save, or
+        None """
+        if self.address_field is None:
+            return None
+        attname = self._meta.get_field(self.address_field).attname
+        if not self._state.adding and \
+                attname not in self.get_dirty_fields():
+            return None
+        address = self.get_address()
+        holder = get_address_holder(address.ix_id, address.pk)
+        user = get_current_user()
+        if holder is not None and holder != getattr(user, 'pk', None):
+            raise ValidationError(ADDRESS_HELD.format(address))
+        return address.ix_id, address.pk
+
     def clean(self):
         self.validate_asn_ix()
         self.validate_mac()
         self.validate_cix_type()
 
+    def save(self, *args, **kwargs):
+        hold = self.validate_address_hold()
+        super().save(*args, **kwargs)
+        if hold is not None:
+            transaction.on_commit(lambda: release_address(*hold))
+
 
 class Switch(HistoricalTimeStampedModel):
     """Network switch representation."""
@@ -1311,9 +1631,11 @@ class Switch(HistoricalTimeStampedModel):
         ordering = ('pix', 'management_ip',)
         verbose_name = _('Switch')
         verbose_name_plural = _('Switches')
+        indexes = [models.Index(fields=['management_ip'],
+                                name='core_switch_management_ip')]
 
     def __str__(self):
-        return "[%s: %s]" % (self.pix, self.management_ip, )
+        return switch_label(self)
 
     def get_channel(channel_port):
         try:
@@ -1344,13 +1666,12 @@ class Switch(HistoricalTimeStampedModel):
             raise ValidationError(
                 _("{} doesn't belong to network management IX: {}"
                   .format(self.management_ip, self.pix.ix.management_prefix)))
-        for pix in PIX.objects.filter(ix=self.pix.ix):
-            for switch in Switch.objects.filter(pix=pix):
-                if switch.uuid == self.uuid:
-                    continue
-                if switch.management_ip == self.management_ip:
-                    raise ValidationError(_("This IP {} already exist"
-                                            .format(self.management_ip)))
+        if Switch.objects.filter(
+                pix__ix=self.pix.ix_id,
+                management_ip=self.management_ip).exclude(
+                pk=self.pk).exists():
+            raise ValidationError(_("This IP {} already exist"
+                                    .format(self.management_ip)))
 
     def validate_model(self):
         port_ranges = SwitchPortRange.objects.filter(switch_model=self.model)
@@ -1364,10 +1685,15 @@ class Switch(HistoricalTimeStampedModel):
         self.validate_model()
 
     def ordered_ports(self, descendent=False):
-        port_dict = dict()
-        for port in self.port_set.all():
-            port_dict[port.name] = port
-        return port_sorting(port_dict, descendent)
+        order = ('-sort_key', '-name') if descendent else ('sort_key', 'name')
+        return OrderedDict((port.name, port)
+                           for port in self.port_set.order_by(*order))
+
+    def get_last_port_name(self):
+        """ Returns: the name of the last port of the switch in the order of
+        ordered_ports() """
+        return self.port_set.order_by('-sort_key', '-name').values_list(
+            'name', flat=True).first()
 
     def create_additional_ports(self, quantity, last_ticket):
         """Creates aditional port(s) to switch, from the end of SwitchPortRange
@@ -1378,16 +1704,17 @@ class Switch(HistoricalTimeStampedModel):
             quantity (int): quantity of ports to create
             last_ticket (int): ticket number about this requisition
         """
+        last_port_name = self.get_last_port_name()
         match = SequenceMatcher(
             None,
             self.model.switchportrange_set.first().name_format,
-            self.ordered_ports().popitem()[0]
+            last_port_name
             ).find_longest_match(
                 0,
                 len(self.model.switchportrange_set.first().name_format),
                 0,
-                len(self.ordered_ports().popitem()[0]))
-        last_created_port = int(self.ordered_ports().popitem()[0][match.size:])
+                len(last_port_name))
+        last_created_port = int(last_port_name[match.size:])
 
         if self.model.switchportrange_set.last().end > self.port_set.count():
             last_port_number = self.model.switchportrange_set.last().end + 1
@@ -1476,20 +1803,14 @@ class SwitchPortRange(HistoricalTimeStampedModel):
                                     'end field'))
 
     def validate_range_ports(self):
-        if SwitchPortRange.objects.all():
-            query_similars = SwitchPortRange.objects.filter(
-                switch_model=self.switch_model,
-                name_format=self.name_format).exclude(pk=self.pk)
-            if query_similars:
-                port_intervals = [range(instance.begin, instance.end + 1)
-                                  for instance in query_similars]
-                current_range = range(self.begin, self.end + 1)
-                for port_interval in port_intervals:
-                    for port_number in current_range:
-                        if port_number in port_interval:
-                            raise ValidationError(
-                                _("This interval of range conflits with "
-                                  "another existent"))
+        if SwitchPortRange.objects.filter(
+                switch_model=self.switch_model_id,
+                name_format=self.name_format,
+                begin__lte=self.end,
+                end__gte=self.begin).exclude(pk=self.pk).exists():
+            raise ValidationError(
+                _("This interval of range conflits with "
+                  "another existent"))
 
     def clean(self):
         self.block_update_fields('capacity')
@@ -1523,8 +1844,7 @@ class SwitchModule(HistoricalTimeStampedModel):
         verbose_name_plural = _('SwitchModules')
 
     def __str__(self):
-        return "[module-%s-%s ports]" % (self.model,
-                                         self.port_quantity)
+        return switch_module_label(self)
 
     def clean(self):
         self.block_update_fields('model')
@@ -1554,7 +1874,7 @@ class Tag(HistoricalTimeStampedModel, ReservableModel):
         verbose_name_plural = ('Tags')
 
     def __str__(self):
-        return "[%s-%s:%s]" % (self.ix, self.tag, self.tag_domain, )
+        return tag_label(self)
 
     def update_status(self, new_status):
         if self.status != new_status:
@@ -1573,14 +1893,9 @@ class Tag(HistoricalTimeStampedModel, ReservableModel):
                                                 'the same'))
 
     def validate_tag_status(self):
-        mlpav4 = MLPAv4.objects.filter(tag=self)
-        mlpav6 = MLPAv6.objects.filter(tag=self)
-        monitorv4 = Monitorv4.objects.filter(tag=self)
-        bilateralpeer = BilateralPeer.objects.filter(tag=self)
-
-        if mlpav4 or mlpav6 or monitorv4 or bilateralpeer:
-            if self.status == 'AVAILABLE':
-                raise ValidationError(_('An used Tag can not be AVAILABLE'))
+        if self.status == 'AVAILABLE' and \
+                ServiceIndex.objects.filter(tag=self.pk).exists():
+            raise ValidationError(_('An used Tag can not be AVAILABLE'))
 
     def get_services_info(self):
         if hasattr(self.mlpav4_set.first(), 'tag'):
@@ -1597,17 +1912,13 @@ class Tag(HistoricalTimeStampedModel, ReservableModel):
         return None
 
     def get_services(self):
-        services = []
-        mlpav4 = [("MLPAv4", mlpav4) for mlpav4 in MLPAv4.objects.filter(
-            tag=self)]
-        mlpav6 = [("MLPAv6", mlpav6) for mlpav6 in MLPAv6.objects.filter(
-            tag=self)]
-        bilateralpeer = [("Bilateralpeer", bilateral) for bilateral in
-                         BilateralPeer.objects.filter(tag=self)]
-        monitorv4 = [("Monitorv4",  monitor) for monitor in
-                     Monitorv4.objects.filter(tag=self)]
-        services = services + mlpav4 + mlpav6 + bilateralpeer + monitorv4
-        return services
+        labels = OrderedDict(((MLPAv4, "MLPAv4"),
+                              (MLPAv6, "MLPAv6"),
+                              (BilateralPeer, "Bilateralpeer"),
+                              (Monitorv4, "Monitorv4"),))
+        return [(labels[service.__class__], service) for service in
+                ServiceIndex.objects.filter(tag=self.pk).get_services(
+                    labels.keys())]
 
     def clean(self):
         self.block_update_fields('tag')
@@ -1653,28 +1964,20 @@ class CustomerChannel(Channel):
         return self.cix_type == 3
 
     def get_stats_amount(self):
-        asn_amount = [self.asn.number]
-
-        mlpav4 = MLPAv4.objects.filter(customer_channel=self)
-        asn_amount.extend(list(mlpav4.values_list('asn', flat=True)))
+        asn_amount = [self.asn_id]
+        amounts = OrderedDict.fromkeys(
+            [model.__name__ for model in service_index_models()], 0)
 
-        mlpav6 = MLPAv6.objects.filter(customer_channel=self)
-        asn_amount.extend(list(mlpav6.values_list('asn', flat=True)))
-
-        bilateralpeer = BilateralPeer.objects.filter(
-            customer_channel=self)
-
-        asn_amount.extend(
-            list(bilateralpeer.values_list('asn', flat=True)))
-
-        monitorv4 = Monitorv4.objects.filter(customer_channel=self)
-        asn_amount.extend(list(monitorv4.values_list('asn', flat=True)))
+        for service_type, asn in ServiceIndex.objects.filter(
+                customer_channel=self).values_list('service_type', 'asn'):
+            asn_amount.append(asn)
+            amounts[service_type] += 1
 
         stats_infos = {'asn_amount': list(set(asn_amount)),
-                       'mlpav4_amount': len(mlpav4),
-                       'mlpav6_amount': len(mlpav6),
-                       'monitorv4': len(monitorv4),
-                       'bilateral_amount': len(bilateralpeer)}
+                       'mlpav4_amount': amounts['MLPAv4'],
+                       'mlpav6_amount': amounts['MLPAv6'],
+                       'monitorv4': amounts['Monitorv4'],
+                       'bilateral_amount': amounts['BilateralPeer']}
 
         return stats_infos
 
@@ -1781,6 +2084,7 @@ class MLPAv4(Service):
     """IPv4 Multilateral Peering Agreement service."""
     mlpav4_address = models.OneToOneField('IPv4Address', models.PROTECT)
     prefix_limit = models.PositiveIntegerField(default=100)
+    address_field = 'mlpav4_address'
     objects = IXAPIQuerySet.as_manager()
 
     class Meta:
@@ -1835,6 +2139,7 @@ class MLPAv6(Service):
     """IPv6 Multilateral Peering Agreement service."""
     mlpav6_address = models.OneToOneField('IPv6Address', models.PROTECT)
     prefix_limit = models.PositiveIntegerField(default=100)
+    address_field = 'mlpav6_address'
     objects = IXAPIQuerySet.as_manager()
 
     class Meta:
@@ -1888,6 +2193,7 @@ class MLPAv6(Service):
 class Monitorv4(Service):
     """Channel availability monitor service."""
     monitor_address = models.OneToOneField('IPv4Address', models.PROTECT)
+    address_field = 'monitor_address'
     objects = IXAPIQuerySet.as_manager()
 
     class Meta:
@@ -1955,34 +2261,349 @@ class Phone(HistoricalTimeStampedModel):
 ###############################################################################
 
 
-def create_all_ips(instance):
-    # Get the first subnetwork /24 in the ipv4_prefix field
-    first_sub_network_v4 = list(ipaddress.ip_network(instance.ipv4_prefix).
-                                subnets(new_prefix=24))[0]
-    ip_v6 = None
-
-    for ip in ipaddress.ip_network(instance.ipv4_prefix).hosts():
-        # For each IPv4 in ipv4_prefix create the respective IP.
-        IPv4Address.objects.create(
+def pair_ipv6_address(ipv4_network, ipv6_first_address, ip):
+    """ Returns the IPv6 planned for an IPv4 host by plan_all_ips()
+
+    Args:
+        ipv4_network: ipaddress.IPv4Network of the IX IPv4 prefix
+        ipv6_first_address: ipaddress.IPv6Address, first of the IX IPv6
+            prefix
+        ip: ipaddress.IPv4Address
+
+    Returns:
+        ipaddress.IPv6Address
+    """
+    octets = str(ip).split('.')
+    ip_v6 = ipv6_first_address + int(octets[-1], 16)
+    # Out of the first /24 of the IPv4 prefix
+    if int(ip) >> 8 != int(ipv4_network.network_address) >> 8:
+        ip_v6 += 65536*int(octets[-2], 16)
+    return ip_v6
+
+
+def pair_ipv4_address(ipv4_network, ipv6_first_address, ip_v6):
+    """ Inverse of pair_ipv6_address()
+
+    Returns:
+        ipaddress.IPv4Address or None if ip_v6 is not planned for any IPv4
+        host of ipv4_network
+    """
+    offset = int(ip_v6) - int(ipv6_first_address)
+    third, last = '{:x}'.format(offset >> 16), '{:x}'.format(offset & 0xffff)
+    if offset < 0 or not third.isdigit() or not last.isdigit():
+        return None
+
+    octets = str(ipv4_network.network_address).split('.')
+    if int(third):
+        octets[-2] = third
+    octets[-1] = last
+    try:
+        ip = ipaddress.IPv4Address('.'.join(octets))
+    except ipaddress.AddressValueError:
+        return None
+    if(ip not in ipv4_network or
+       pair_ipv6_address(ipv4_network, ipv6_first_address, ip) != ip_v6):
+        return None
+    return ip
+
+
+def plan_all_ips(instance):
+    """ Compute, without touching the database, every IPv4Address and
+    IPv6Address that belongs to an IX
+
+    For each IPv4 host a respective IPv6 is planned with the same final
+    visual number (IPv4 v.w.y.x -> IPv6 ::x). Out of the first /24 of the
+    IPv4 prefix the IPv6 also carries the third octet (IPv6 ::y:x).
+
+    Args:
+        instance: IX instance
+
+    Returns:
+        tuple (list<IPv4Address>, list<IPv6Address>): unsaved instances
+    """
+    ipv4_network = ipaddress.ip_network(instance.ipv4_prefix)
+    ipv6_first_address = ipaddress.ip_network(instance.ipv6_prefix)[0]
+
+    ipv4_addresses = []
+    ipv6_addresses = []
+    for ip in ipv4_network.hosts():
+        ip_v6 = pair_ipv6_address(ipv4_network, ipv6_first_address, ip)
+
+        ipv4_addresses.append(IPv4Address(
+            ix=instance, last_ticket=instance.last_ticket,
+            modified_by=instance.modified_by, address=str(ip), in_lg=False))
+        ipv6_addresses.append(IPv6Address(
             ix=instance, last_ticket=instance.last_ticket,
-            modified_by=instance.modified_by, address=str(ip), in_lg=False)
+            modified_by=instance.modified_by, address=str(ip_v6),
+            in_lg=False))
+
+    return ipv4_addresses, ipv6_addresses
+
 
-        # For each IPv4 create a respective IPv6 with the same final visual
-        # number. (IPv4 v.w.y.x IPv6 final ::0.x)
-        ip_v6 = ipaddress.ip_network(instance.ipv6_prefix)[0] + \
-            int(str(ip).split('.')[-1], 16)
+def validate_ip_plan(instance, ipv4_addresses, ipv6_addresses):
+    """ Validate a whole IP plan of an IX with set based checks, instead of
+    calling full_clean() on each address
 
-        # If IPv4 is in the first block /24 create IPv6
-        # with final ::y.x IPv4 v.w.y.x
-        if ip not in first_sub_network_v4:
-            ip_v6 += 65536*int(str(ip).split('.')[-2], 16)
+    Args:
+        instance: IX instance
+        ipv4_addresses: list<IPv4Address> planned for instance
+        ipv6_addresses: list<IPv6Address> planned for instance
+
+    Raises:
+        ValidationError: if a planned IPv6 is out of the IX IPv6 prefix or
+        if a planned address already exists
+    """
+    ipv6_network = ipaddress.ip_network(instance.ipv6_prefix)
+    if(ipv6_addresses and
+       ipaddress.ip_address(ipv6_addresses[-1].address) not in ipv6_network):
+        raise ValidationError(_("{} is too small to hold an IPv6 for each "
+                                "IPv4 of {}".format(instance.ipv6_prefix,
+                                                    instance.ipv4_prefix)))
+
+    for model, planned in ((IPv4Address, ipv4_addresses),
+                           (IPv6Address, ipv6_addresses)):
+        for i in range(0, len(planned), BULK_CREATE_BATCH_SIZE):
+            batch = [ip.address
+                     for ip in planned[i:i + BULK_CREATE_BATCH_SIZE]]
+            existing = model.objects.filter(address__in=batch).first()
+            if existing:
+                raise ValidationError(_("{} already exists in IX: {}".format(
+                    existing.address, existing.ix_id)))
+
+
+def create_all_ips(instance):
+    """ Create all IPv4Address and IPv6Address of an IX
+
+    The address plan is computed in memory, validated once and written,
+    together with its history, in batches of BULK_CREATE_BATCH_SIZE rows or
+    less, see bulk_batch_size().
+
+    Args:
+        instance: IX instance
+    """
+    ipv4_addresses, ipv6_addresses = plan_all_ips(instance)
+    validate_ip_plan(instance, ipv4_addresses, ipv6_addresses)
+
+    with transaction.atomic():
+        IPv4Address.bulk_create_with_history(ipv4_addresses)
+        IPv6Address.bulk_create_with_history(ipv6_addresses)
+
+    log_object("IP addresses created", instance,
+               ipv4_amount=len(ipv4_addresses),
+               ipv6_amount=len(ipv6_addresses))
+
+
+def _renumbering_services():
+    """ Services holding the addresses of each family, with the name of the
+    address field """
+    return {
+        IPv4Address: ((MLPAv4, 'mlpav4_address'),
+                      (Monitorv4, 'monitor_address')),
+        IPv6Address: ((MLPAv6, 'mlpav6_address'),),
+    }
+
+
+def plan_family_renumbering(instance, model, old_prefix, new_prefix,
+                            planned):
+    """ Plan the renumbering of the addresses of one family of an IX
+
+    If the new prefix contains the old one (expansion) the addresses are
+    kept. Otherwise each address is moved to the same offset in the new
+    prefix. The planned addresses of the new prefix that do not exist are
+    created and the old addresses left out of it are deleted.
+
+    Args:
+        instance: IX instance
+        model: IPv4Address or IPv6Address
+        old_prefix: String -> prefix the addresses are in
+        new_prefix: String -> prefix the addresses are moved to
+        planned: list<IPv4Address|IPv6Address> of plan_all_ips() for
+            new_prefix
+
+    Returns:
+        dict: 'moves' maps each moved address to its new address, 'create'
+        is the list of unsaved addresses to create and 'delete' the list of
+        addresses to delete
+
+    Raises:
+        ValidationError: if an address used by a service or reserved has no
+        place in the new prefix, or if an address to create already exists
+        in another IX
+    """
+    old_network = ipaddress.ip_network(old_prefix)
+    new_network = ipaddress.ip_network(new_prefix)
+    expansion = (old_network.network_address in new_network and
+                 old_network.broadcast_address in new_network)
+    if isinstance(new_network, ipaddress.IPv4Network):
+        valid_targets = (new_network.network_address + 1,
+                         new_network.broadcast_address - 1)
+    else:
+        valid_targets = (new_network.network_address,
+                         new_network.broadcast_address)
+
+    if(planned and
+       ipaddress.ip_address(planned[-1].address) not in new_network):
+        raise ValidationError(_("{} is too small to hold the addresses of "
+                                "{}".format(new_prefix, instance)))
+
+    existing = {str(ipaddress.ip_address(row[0])): row for row in
+                model.objects.filter(ix=instance).values_list(
+                    'address', 'reverse_dns', 'in_lg', 'reserved',
+                    'last_ticket')}
+
+    moves = {}
+    targets = set()
+    homeless = []
+    for address, row in existing.items():
+        if expansion:
+            target = ipaddress.ip_address(address)
+        else:
+            target = new_network.network_address + (
+                int(ipaddress.ip_address(address)) -
+                int(old_network.network_address))
+        if not valid_targets[0] <= target <= valid_targets[1]:
+            if row[3]:
+                homeless.append(address)
+            continue
+        targets.add(str(target))
+        if str(target) != address:
+            moves[address] = str(target)
+
+    used = set()
+    for service_model, field in _renumbering_services()[model]:
+        used.update(str(ipaddress.ip_address(address)) for address in
+                    service_model.objects.filter(**{
+                        field + '__ix': instance}).values_list(
+                            field, flat=True))
+    homeless.extend(address for address in used
+                    if address not in moves and address not in targets)
+    if homeless:
+        raise ValidationError(_("{} have no place in {}".format(
+            ', '.join(sorted(homeless)), new_prefix)))
+
+    sources = {target: address for address, target in moves.items()}
+    final = targets | set(ip.address for ip in planned)
+    create = []
+    for address in sorted(final - set(existing),
+                          key=lambda a: int(ipaddress.ip_address(a))):
+        source = existing.get(sources.get(address))
+        create.append(model(
+            address=address, ix=instance,
+            reverse_dns=source[1] if source else '',
+            in_lg=source[2] if source else False,
+            reserved=source[3] if source else False,
+            last_ticket=source[4] if source else instance.last_ticket,
+            modified_by=instance.modified_by))
+
+    for i in range(0, len(create), BULK_CREATE_BATCH_SIZE):
+        batch = [ip.address for ip in create[i:i + BULK_CREATE_BATCH_SIZE]]
+        duplicated = model.objects.filter(address__in=batch).first()
+        if duplicated:
+            raise ValidationError(_("{} already exists in IX: {}".format(
+                duplicated.address, duplicated.ix_id)))
+
+    return {
+        'moves': {address: target for address, target in moves.items()
+                  if address in used},
+        'create': create,
+        'delete': sorted(set(existing) - final),
+    }
+
+
+def plan_renumbering(instance):
+    """ Plan, without changing the database, the renumbering of an IX from
+    its original prefixes to its current ones
+
+    Args:
+        instance: IX instance with ipv4_prefix and/or ipv6_prefix changed
 
-        IPv6Address.objects.create(
-            ix=instance,
-            last_ticket=instance.last_ticket,
-            modified_by=instance.modified_by,
-            address=str(ip_v6),
-            in_lg=False)
+    Returns:
+        dict: {IPv4Address: plan, IPv6Address: plan}, each plan as returned
+        by plan_family_renumbering(), or None when nothing changes in the
+        family
+
+    This funciton is dependent of the following functions:
+        plan_all_ips
+        plan_family_renumbering
+    """
+    original_ipv4_prefix = instance.get_original_value('ipv4_prefix')
+    original_ipv6_prefix = instance.get_original_value('ipv6_prefix')
+    ipv4_changed = instance.ipv4_prefix != original_ipv4_prefix
+    ipv6_changed = instance.ipv6_prefix != original_ipv6_prefix
+    planned_ipv4, planned_ipv6 = plan_all_ips(instance)
+
+    # The IPv6 plan follows the IPv4 prefix too, so any change replans it
+    return {
+        IPv4Address: plan_family_renumbering(
+            instance, IPv4Address, original_ipv4_prefix,
+            instance.ipv4_prefix, planned_ipv4) if ipv4_changed else None,
+        IPv6Address: plan_family_renumbering(
+            instance, IPv6Address, original_ipv6_prefix,
+            instance.ipv6_prefix, planned_ipv6)
+        if ipv4_changed or ipv6_changed else None,
+    }
+
+
+def apply_renumbering(instance, plan):
+    """ Apply a plan of plan_renumbering() in one transaction
+
+    Addresses are created in batches, the services of each family are moved
+    with one UPDATE per batch and the old addresses are deleted, the history
+    of the created and moved ones written in bulk.
+
+    Args:
+        instance: IX instance
+        plan: dict returned by plan_renumbering(instance)
+    """
+    changed = {'modified': timezone.now()}
+    modified_by = get_current_user()
+    if isinstance(modified_by, User):
+        changed['modified_by'] = modified_by
+
+    with transaction.atomic():
+        for model, family_plan in plan.items():
+            if not family_plan:
+                continue
+            model.bulk_create_with_history(family_plan['create'])
+
+            moves = family_plan['moves']
+            sources = list(moves)
+            for service_model, field in _renumbering_services()[model]:
+                # Every service is selected before any is moved, as the old
+                # and the new addresses may overlap
+                affected = []
+                for i in range(0, len(sources), BULK_CREATE_BATCH_SIZE):
+                    affected.extend(service_model.objects.filter(**{
+                        field + '__in':
+                        sources[i:i + BULK_CREATE_BATCH_SIZE]}).values_list(
+                            'pk', field))
+
+                for i in range(0, len(affected), BULK_CREATE_BATCH_SIZE):
+                    batch = affected[i:i + BULK_CREATE_BATCH_SIZE]
+                    services = service_model.objects.filter(
+                        pk__in=[pk for pk, _ in batch])
+                    services.update(**dict(changed, **{field: models.Case(
+                        *[models.When(pk=pk, then=Cast(
+                            models.Value(
+                                moves[str(ipaddress.ip_address(address))]),
+                            models.GenericIPAddressField()))
+                          for pk, address in batch])}))
+                    service_model.bulk_create_history(services, '~')
+
+            # The old addresses are no longer referenced by services
+            delete = family_plan['delete']
+            for i in range(0, len(delete), BULK_CREATE_BATCH_SIZE):
+                model.objects.filter(
+                    ix=instance,
+                    address__in=delete[i:i + BULK_CREATE_BATCH_SIZE]).delete()
+
+        # The services were moved by UPDATEs, which send no signals
+        invalidate_nikiti_snapshots(instance.pk)
+
+    log_object("IX renumbered", instance,
+               **{'{}_{}'.format(model.__name__, key): len(value)
+                  for model, family_plan in plan.items() if family_plan
+                  for key, value in family_plan.items()})
 
 
 def create_tag_by_channel_port(channel_port, initial, limit):
@@ -1993,7 +2614,8 @@ def create_tag_by_channel_port(channel_port, initial, limit):
     Args:
         channel_port: ChannelPort instance
         initial: Bool -> True = Initial approach, create from tag 0
-        False = Starts from the last tag in the database
+        False = Creates the lowest tags without an instance in the
+        channel_port, as tags are not instantiated in sequence
         limit: Integer -> Quantity of instances to create
 
     """
@@ -2004,17 +2626,15 @@ def create_tag_by_channel_port(channel_port, initial, limit):
                                 'in a least one port.'))
 
     if initial:
-        tag_numbers_to_create_start = MIN_TAG_NUMBER
-        tag_numbers_to_create_limit = MIN_TAG_NUMBER + limit
+        tag_numbers_to_create = range(MIN_TAG_NUMBER, MIN_TAG_NUMBER + limit)
 
     else:
-        last_tag = Tag.objects.filter(tag_domain=channel_port).last()
-        tag_numbers_to_create_start = last_tag.tag + 1
-        tag_numbers_to_create_limit = tag_numbers_to_create_start + limit
+        tag_numbers_to_create = TagBitmap(Tag.objects.filter(
+            tag_domain=channel_port).values_list(
+                'tag', flat=True)).free_in_range(limit=limit)
 
-    for n_tag in range(tag_numbers_to_create_start,
-                       tag_numbers_to_create_limit):
-        if n_tag == 0 or n_tag == 1:
+    for n_tag in tag_numbers_to_create:
+        if n_tag in TAGS_BORN_ALLOCATED:
             status = 'ALLOCATED'
         else:
             status = Tag._meta.get_field('status').get_default()
@@ -2026,7 +2646,7 @@ def create_tag_by_channel_port(channel_port, initial, limit):
 
 def create_all_tags_by_ix(instance, limit):
     for n_tag in range(0, limit):
-        if n_tag == 0 or n_tag == 1:
+        if n_tag in TAGS_BORN_ALLOCATED:
             status = 'ALLOCATED'
         else:
             status = Tag._meta.get_field('status').get_default()
@@ -2069,28 +2689,120 @@ def delete_orphan_asn(instance):
 def delete_orphan_contactsmap(instance):
 
     ix = instance.asn.contactsmap_set.first().ix.pk
-    services = []
-    services = services + list(MLPAv4.objects.filter(asn=instance.asn))
-    services = services + list(MLPAv6.objects.filter(asn=instance.asn))
-    services = services + list(BilateralPeer.objects.filter(asn=instance.asn))
-    services = services + list(Monitorv4.objects.filter(asn=instance.asn))
-    channels = list(CustomerChannel.objects.filter(asn=instance.asn))
-
-    ports = []
-    for service in services:
-        ports.append(Port.objects.filter(
-            channel_port=service.customer_channel.channel_port,
-            switch__pix__ix__pk=ix))
-
-    for channel in channels:
-        ports.append(Port.objects.filter(
-            channel_port=channel.channel_port,
-            switch__pix__ix__pk=ix))
-
-    if len(ports) < 1:
+    services = ServiceIndex.objects.filter(asn=instance.asn_id)
+    channels = CustomerChannel.objects.filter(asn=instance.asn_id)
+
+    if not services.exists() and not channels.exists():
         for contact in ContactsMap.objects.filter(asn=instance.asn, ix__pk=ix):
             contact.delete()
 
+
+def service_index_models():
+    """ Returns the service models of ServiceIndex, whose names are its
+    service types """
+    return (MLPAv4, MLPAv6, Monitorv4, BilateralPeer)
+
+
+def search_index_models():
+    """ Returns the models indexed by SearchIndex with the queryset used to
+    build their labels without further queries """
+    return (
+        (MLPAv4, MLPAv4.objects.select_related(
+            'asn', 'tag__ix', 'tag__tag_domain')),
+        (MLPAv6, MLPAv6.objects.select_related(
+            'asn', 'tag__ix', 'tag__tag_domain')),
+        (Tag, Tag.objects.filter(
+            status__in=SEARCH_INDEX_TAG_STATUSES).select_related(
+                'ix', 'tag_domain')),
+        (ChannelPort, ChannelPort.objects.all()),
+        (Port, Port.objects.select_related('switch', 'switch_module')),
+        (Switch, Switch.objects.select_related('pix__ix')),
+    )
+
+
+def normalize_identifier(identifier):
+    """ Returns the identifier as stored in SearchIndex: lowercase hex
+    digits, without dashes """
+    return identifier.strip().replace('-', '').lower()
+
+
+def search_index_rows(instance):
+    """ Returns the unsaved SearchIndex rows of an object """
+    # uuid is a str until the object is loaded again when it was assigned
+    identifier = uuid.UUID(str(instance.uuid)).hex
+    label = str(instance)[:255]
+    return [SearchIndex(identifier=identifier[offset:],
+                        model=instance.__class__.__name__,
+                        object_pk=str(instance.pk),
+                        label=label)
+            for offset in SEARCH_INDEX_GROUP_OFFSETS]
+
+
+def index_objects(model, objects):
+    """ Replaces the SearchIndex rows of objects of model
+
+    Args:
+        model: one of the models of search_index_models()
+        objects: iterable of model instances, with the relations used by
+            their labels already loaded
+    """
+    objects = list(objects)
+    unindex_objects(model, [instance.pk for instance in objects])
+    rows = [row for instance in objects
+            for row in search_index_rows(instance)]
+    SearchIndex.objects.bulk_create(
+        rows, batch_size=bulk_batch_size(SearchIndex, rows))
+
+
+def unindex_objects(model, pks):
+    SearchIndex.objects.filter(
+        model=model.__name__,
+        object_pk__in=[str(pk) for pk in pks]).delete()
+
+
+def rebuild_search_index():
+    """ Builds again the whole SearchIndex
+
+    Returns: the amount of indexed objects
+    """
+    total = 0
+    with transaction.atomic():
+        SearchIndex.objects.all().delete()
+        for model, queryset in search_index_models():
+            objects = list(queryset.iterator())
+            rows = [row for instance in objects
+                    for row in search_index_rows(instance)]
+            SearchIndex.objects.bulk_create(
+                rows, batch_size=bulk_batch_size(SearchIndex, rows))
+            total += len(objects)
+    return total
+
+
+def search_by_identifier(identifier):
+    """ Searches objects by the beginning of a UUID group
+
+    Args:
+        identifier: the searched part of a UUID, with or without dashes
+
+    Returns:
+        list of dicts {'type': model name, 'desc': label} of the objects
+        found, one per object
+    """
+    identifier = normalize_identifier(identifier)
+    if not identifier:
+        return []
+    return [{'type': model, 'desc': label} for model, object_pk, label in
+            SearchIndex.objects.filter(identifier__startswith=identifier)
+            .order_by('model', 'label', 'object_pk')
+            .values_list('model', 'object_pk', 'label').distinct()]
+
+
+def normalize_mac_search(address):
+    """ Returns a full or partial mac address as stored in
+    MACAddress.search_address: lowercase hex digits, without separators """
+    return re.sub(r'[^0-9a-f]', '', address.lower())
+
+
 # After a object is save, for some models it's necessary
 # create others objects, this could be done by using a
 # post_save decorator that listen some model.
@@ -2115,23 +2827,23 @@ def update_ips(sender, instance, update_fields, **kwargs):
 
 
 # This post_save for the ChannelPort, call a method for
-# create all tags possible (0 - 4095).
+# create the tags born allocated (0 and 1). The other tags are only
+# created when they are allocated.
 @receiver(post_save, sender=ChannelPort)
 def create_tags_channel_port(sender, instance, **kwargs):
     if instance.create_tags and instance.tags_type == 'Direct-Bundle-Ether' and not kwargs['raw']:
-        create_tag_by_channel_port(instance,
-                                   True,
-                                   MAX_TAG_NUMBER-MIN_TAG_NUMBER+1)
+        create_tag_by_channel_port(instance, True,
+                                   len(TAGS_BORN_ALLOCATED))
 
 
 # This post_save for the IX model, call a method for
-# create all tags possible (0 - 4095).
+# create the tags born allocated (0 and 1). The other tags are only
+# created when they are allocated.
 @receiver(post_save, sender=IX)
 def create_tags_ix(sender, instance, **kwargs):
     if kwargs['created'] and not kwargs['raw']:
         if instance.create_tags and instance.tags_policy == 'ix_managed':
-            create_all_tags_by_ix(instance,
-                                  MAX_TAG_NUMBER-MIN_TAG_NUMBER+1)
+            create_all_tags_by_ix(instance, len(TAGS_BORN_ALLOCATED))
 
 
 # This post_save for the Switch model, call a method for
@@ -2178,6 +2890,197 @@ def delete_bilatealpeer_related_models(sender, instance, **kwargs):
     delete_orphan_contactsmap(instance)
 
 
+# The tag occupancy bitmaps of an IX are cached, so they must be dropped
+# whenever a Tag, the IX itself or a BilateralPeer changes.
+@receiver(post_save, sender=IX)
+@receiver(post_delete, sender=IX)
+def invalidate_ix_tag_bitmaps(sender, instance, **kwargs):
+    invalidate_tag_bitmaps(instance.pk)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_tag_bitmaps(sender, instance, **kwargs):
+    invalidate_tag_bitmaps(instance.ix_id)
+
+
+@receiver(post_save, sender=BilateralPeer)
+@receiver(post_delete, sender=BilateralPeer)
+def invalidate_bilateralpeer_tag_bitmaps(sender, instance, **kwargs):
+    if instance.tag_id:
+        invalidate_tag_bitmaps(instance.tag.ix_id)
+
+
+# The inner tags used in an outer Tag are cached too. A service moved to
+# another Tag also changes the inner tags of its previous Tag.
+@receiver(pre_save, sender=MLPAv4)
+@receiver(pre_save, sender=MLPAv6)
+@receiver(pre_save, sender=Monitorv4)
+@receiver(pre_save, sender=BilateralPeer)
+def invalidate_previous_inner_tag_bitmap(sender, instance, **kwargs):
+    if not instance._state.adding:
+        previous_tag = instance.get_original_value('tag_id')
+        if previous_tag and previous_tag != instance.tag_id:
+            invalidate_inner_tag_bitmap(previous_tag)
+
+
+@receiver(post_save, sender=MLPAv4)
+@receiver(post_save, sender=MLPAv6)
+@receiver(post_save, sender=Monitorv4)
+@receiver(post_save, sender=BilateralPeer)
+@receiver(post_delete, sender=MLPAv4)
+@receiver(post_delete, sender=MLPAv6)
+@receiver(post_delete, sender=Monitorv4)
+@receiver(post_delete, sender=BilateralPeer)
+def invalidate_service_inner_tag_bitmap(sender, instance, **kwargs):
+    if instance.tag_id:
+        invalidate_inner_tag_bitmap(instance.tag_id)
+
+
+@receiver(post_save, sender=Switch)
+@receiver(post_save, sender=ChannelPort)
+@receiver(post_save, sender=UplinkChannel)
+@receiver(post_save, sender=DownlinkChannel)
+@receiver(post_delete, sender=Switch)
+@receiver(post_delete, sender=ChannelPort)
+@receiver(post_delete, sender=UplinkChannel)
+@receiver(post_delete, sender=DownlinkChannel)
+def invalidate_switch_topology_cache(sender, instance, **kwargs):
+    invalidate_switch_topology()
+
+
+# Ports are saved often, but only their switch and channel are edges of the
+# switch topology
+@receiver(post_save, sender=Port)
+@receiver(post_delete, sender=Port)
+def invalidate_port_switch_topology(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('created', True):
+        # A new or deleted port only matters inside a channel
+        changed = instance.channel_port_id is not None
+    else:
+        changed = update_fields is None or \
+            not PORT_TOPOLOGY_FIELDS.isdisjoint(update_fields)
+    if changed:
+        invalidate_switch_topology()
+
+
+# The Nikiti pages of an IX are served from snapshots. They are dropped for
+# the IX of the changed object when it is known without a query, and made
+# stale for every IX otherwise.
+@receiver(post_save, sender=IX)
+@receiver(post_delete, sender=IX)
+def invalidate_ix_nikiti_snapshots(sender, instance, **kwargs):
+    invalidate_nikiti_snapshots(instance.pk)
+
+
+@receiver(post_save, sender=PIX)
+@receiver(post_save, sender=ContactsMap)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=IPv4Address)
+@receiver(post_save, sender=IPv6Address)
+@receiver(post_delete, sender=PIX)
+@receiver(post_delete, sender=ContactsMap)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=IPv4Address)
+@receiver(post_delete, sender=IPv6Address)
+def invalidate_related_ix_nikiti_snapshots(sender, instance, **kwargs):
+    invalidate_nikiti_snapshots(instance.ix_id)
+
+
+@receiver(post_save, sender=MLPAv4)
+@receiver(post_save, sender=MLPAv6)
+@receiver(post_save, sender=Monitorv4)
+@receiver(post_save, sender=BilateralPeer)
+@receiver(post_delete, sender=MLPAv4)
+@receiver(post_delete, sender=MLPAv6)
+@receiver(post_delete, sender=Monitorv4)
+@receiver(post_delete, sender=BilateralPeer)
+def invalidate_service_nikiti_snapshots(sender, instance, **kwargs):
+    if instance.tag_id:
+        invalidate_nikiti_snapshots(instance.tag.ix_id)
+    else:
+        invalidate_all_nikiti_snapshots()
+
+
+@receiver(post_save, sender=ASN)
+@receiver(post_save, sender=Organization)
+@receiver(post_save, sender=SwitchModel)
+@receiver(post_save, sender=Switch)
+@receiver(post_save, sender=Port)
+@receiver(post_save, sender=ChannelPort)
+@receiver(post_save, sender=CustomerChannel)
+@receiver(post_save, sender=UplinkChannel)
+@receiver(post_save, sender=DownlinkChannel)
+@receiver(post_save, sender=CoreChannel)
+@receiver(post_save, sender=MACAddress)
+@receiver(post_delete, sender=ASN)
+@receiver(post_delete, sender=Organization)
+@receiver(post_delete, sender=SwitchModel)
+@receiver(post_delete, sender=Switch)
+@receiver(post_delete, sender=Port)
+@receiver(post_delete, sender=ChannelPort)
+@receiver(post_delete, sender=CustomerChannel)
+@receiver(post_delete, sender=UplinkChannel)
+@receiver(post_delete, sender=DownlinkChannel)
+@receiver(post_delete, sender=CoreChannel)
+@receiver(post_delete, sender=MACAddress)
+def invalidate_all_nikiti_snapshots_cache(sender, instance, **kwargs):
+    invalidate_all_nikiti_snapshots()
+
+
+# The SearchIndex rows of an object are written again whenever it is saved,
+# along with the objects whose labels show it.
+@receiver(post_save, sender=MLPAv4)
+@receiver(post_save, sender=MLPAv6)
+@receiver(post_save, sender=ChannelPort)
+@receiver(post_save, sender=Port)
+def index_search_object(sender, instance, **kwargs):
+    if not kwargs['raw']:
+        index_objects(sender, [instance])
+
+
+@receiver(post_save, sender=Tag)
+def index_search_tag(sender, instance, **kwargs):
+    if kwargs['raw']:
+        return
+    if instance.status in SEARCH_INDEX_TAG_STATUSES:
+        index_objects(Tag, [instance])
+    elif not kwargs['created']:
+        unindex_objects(Tag, [instance.pk])
+
+
+@receiver(post_save, sender=Switch)
+def index_search_switch(sender, instance, **kwargs):
+    if not kwargs['raw']:
+        index_objects(Switch, [instance])
+        if not kwargs['created']:
+            index_objects(Port, Port.objects.filter(
+                switch=instance).select_related('switch', 'switch_module'))
+
+
+@receiver(post_save, sender=PIX)
+def index_search_pix(sender, instance, **kwargs):
+    if not kwargs['raw'] and not kwargs['created']:
+        index_objects(Switch, Switch.objects.filter(
+            pix=instance).select_related('pix__ix'))
+
+
+@receiver(post_delete, sender=MLPAv4)
+@receiver(post_delete, sender=MLPAv6)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=ChannelPort)
+@receiver(post_delete, sender=Port)
+@receiver(post_delete, sender=Switch)
+def unindex_search_object(sender, instance, **kwargs):
+    unindex_objects(sender, [instance.pk])
+
+
+@receiver(pre_save, sender=MACAddress)
+def set_mac_search_address(sender, instance, **kwargs):
+    instance.search_address = normalize_mac_search(instance.address)
+
+
 ###############################################################################
 ###############################################################################
 ############################# UTILITY FUNCTIONS ###############################
@@ -1,11 +1,25 @@
+import sqlite3
+
 from django import template
 
+from ..utils.consulta import get_oui_index
+
 register = template.Library()
 
 
 @register.filter(name='lookup')
 def lookup(value, arg):
     return value[arg]
+
+
+@register.filter(name='mac_vendor')
+def mac_vendor(value):
+    """ Vendor of a mac address, or an empty string when it is unknown or
+    the OUI file can not be read """
+    try:
+        return get_oui_index().get_vendor(str(value)) or ''
+    except (OSError, sqlite3.Error):
+        return ''
 #
 #
 # @register.filter(name='lookupIPv6')
@@ -124,3 +124,25 @@ class AllocateTagStatusFormTestCase(TestCase):
 
         tag_modified = Tag.objects.get(uuid=tag_set[0].uuid)
         self.assertEqual(tag_modified.status, 'ALLOCATED')
+
+    def test_post_allocate_tag_without_instance(self):
+        ix = mommy.make(IX, code='rj', tags_policy='ix_managed',
+                        create_tags=False)
+        mommy.make(Tag, tag=20, ix=ix, status='PRODUCTION')
+
+        response = self.client.get(
+            reverse('core:allocate_tag_status', args=[ix.code]))
+        choices = [tag_number for tag_number, _ in response.context[
+            'form'].fields['tag_number_to_allocate'].choices]
+        self.assertEqual(choices[:2], [2, 3])
+        self.assertNotIn(20, choices)
+
+        response = self.client.post(
+            reverse('core:allocate_tag_status', args=[ix.code]),
+            {'tag_number_to_allocate': [21, 22]})
+
+        self.assertEqual(response.status_code, 302)
+        tags = Tag.objects.filter(ix=ix, tag__in=[21, 22])
+        self.assertEqual(['ALLOCATED', 'ALLOCATED'],
+                         [tag.status for tag in tags])
+        self.assertIsNone(tags[0].tag_domain)
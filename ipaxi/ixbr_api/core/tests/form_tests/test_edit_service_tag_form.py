@@ -91,6 +91,18 @@ class EditServiceTagFormViewTestCase(TestCase):
         service = MLPAv4.objects.get(uuid=self.mlpav4.uuid)
         self.assertEqual(self.tags[1], service.tag)
 
+    def test_when_tag_is_not_instantiated(self):
+        response = self.client.post(reverse(
+            "core:edit_service_tag_form",
+            args=[self.mlpav4.uuid, self.ix.code]),
+            {"tag": 20})
+        self.assertEqual(response.status_code, 302)
+        service = MLPAv4.objects.get(uuid=self.mlpav4.uuid)
+        self.assertEqual(20, service.tag.tag)
+        self.assertEqual('PRODUCTION', service.tag.status)
+        self.tags[0].refresh_from_db()
+        self.assertEqual('AVAILABLE', self.tags[0].status)
+
     def test_when_tag_production(self):
         response = self.client.post(reverse(
             "core:edit_service_tag_form",
@@ -124,3 +124,16 @@ class ReserveTagStatusFormTestCase(TestCase):
 
         tag_modified = Tag.objects.get(uuid=tag_set[0].uuid)
         self.assertEqual(tag_modified.reserved, True)
+
+    def test_reserve_tag_recourse_form_without_instance(self):
+        ix = mommy.make(IX, code='rj', tags_policy='ix_managed',
+                        create_tags=False)
+
+        response = self.client.post(
+            reverse('core:reserve_tag_resource', args=[ix.code]),
+            {'tag_number_to_reserve': 30})
+
+        self.assertEqual(response.status_code, 302)
+        tag_reserved = Tag.objects.get(ix=ix, tag=30)
+        self.assertEqual(tag_reserved.reserved, True)
+        self.assertEqual(tag_reserved.status, 'AVAILABLE')
@@ -3,7 +3,8 @@ from unittest.mock import patch
 from django.test import TestCase
 from model_mommy import mommy
 
-from ...models import IX, ChannelPort, Port, Tag, User
+from ...models import (IX, ChannelPort, Port, Tag, User,
+                       create_tag_by_channel_port)
 from ..login import DefaultLogin
 
 
@@ -86,7 +87,26 @@ class Test_Channel_Port(TestCase):
         mommy.make(Port, channel_port=channel_port, switch__pix__ix=ix)
         channel_port.create_tags = True
         channel_port.save()
-        tags = Tag.objects.all()
-        self.assertEqual(4096, tags.count())
+        tags = Tag.objects.order_by('tag')
+        self.assertEqual([0, 1], [tag.tag for tag in tags])
         self.assertEqual(ix, tags[0].ix)
         self.assertEqual(channel_port, tags[0].tag_domain)
+        self.assertEqual('ALLOCATED', tags[1].status)
+
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_create_tags_after_sparse_tags(self, mock_full_clean):
+        channel_port = mommy.make(ChannelPort,
+                                  create_tags=False,
+                                  tags_type='Direct-Bundle-Ether')
+        ix = mommy.make(IX, ipv4_prefix='10.0.0.0/22',
+                        ipv6_prefix='2001:12f5::0/64', create_tags=False)
+        mommy.make(Port, channel_port=channel_port, switch__pix__ix=ix)
+        for tag in (0, 1, 3, 100):
+            mommy.make(Tag, tag=tag, ix=ix, tag_domain=channel_port)
+
+        create_tag_by_channel_port(channel_port, False, 3)
+
+        self.assertEqual(
+            [0, 1, 2, 3, 4, 5, 100],
+            list(Tag.objects.order_by('tag').values_list('tag', flat=True)))
+        self.assertEqual('AVAILABLE', Tag.objects.get(tag=2).status)
@@ -1,14 +1,19 @@
 import ipaddress
+import math
 import re
+from unittest import skipUnless
 from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from model_mommy import mommy
 
 import ixbr_api.core.validators as validators
 
-from ...models import IX, IPv4Address, IPv6Address, User
+from ...models import (IX, IPv4Address, IPv6Address, MLPAv4, MLPAv6, User,
+                       bulk_batch_size, create_all_ips)
 
 
 class Test_IX(TestCase):
@@ -127,7 +132,7 @@ class Test_IX(TestCase):
     def test_ix_with_correct_fields(self, mock_clean, mock_create_all_ips):
         mommy.make(IX, code='sp', shortname='aaa.aaa',
                    fullname='São Paulo - SP',
-                   ipv4_prefix='187.16.216.255/21',
+                   ipv4_prefix='187.16.216.0/21',
                    ipv6_prefix='2001:12e2::/64',
                    management_prefix='192.168.0.15',
                    tags_policy='distributed')
@@ -180,16 +185,18 @@ class Test_IX(TestCase):
     def test_ipv4_network_intersect_error(self,
                                           mock_full_clean,
                                           mock_create_all_ips):
-        ix0 = mommy.make(
-            IX,
-            ipv4_prefix='11.0.0.0/24',
-            ipv6_prefix='2001:12e2::/64')
-
+        # Overlapping IXs are refused by the database, so the one being
+        # validated is not saved
         ix1 = mommy.make(
             IX,
             ipv4_prefix='11.0.0.0/22',
             ipv6_prefix='2002:12e2::/64')
 
+        ix0 = mommy.prepare(
+            IX,
+            ipv4_prefix='11.0.0.0/24',
+            ipv6_prefix='2001:12e2::/64')
+
         with self.assertRaisesMessage(
             ValidationError,
             '{ipv4} overlaps with {other_ipv4} from IX: {ix}'.
@@ -203,16 +210,16 @@ class Test_IX(TestCase):
     def test_ipv6_network_intersect_error(self,
                                           mock_full_clean,
                                           mock_create_all_ips):
-        ix0 = mommy.make(
-            IX,
-            ipv4_prefix='12.0.0.0/24',
-            ipv6_prefix='2001:12e2::/64')
-
         ix1 = mommy.make(
             IX,
             ipv4_prefix='11.0.0.0/22',
             ipv6_prefix='2001:12e2::/60')
 
+        ix0 = mommy.prepare(
+            IX,
+            ipv4_prefix='12.0.0.0/24',
+            ipv6_prefix='2001:12e2::/64')
+
         with self.assertRaisesMessage(
             ValidationError,
             '{ipv6} overlaps with {other_ipv6} from IX: {ix}'.
@@ -221,6 +228,28 @@ class Test_IX(TestCase):
                        ix=ix1)):
             ix0.validate_ip_network_intersect()
 
+    @skipUnless(connection.vendor == 'postgresql',
+                'exclusion constraints are created on PostgreSQL only')
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_overlapping_ix_save_error(self,
+                                       mock_full_clean,
+                                       mock_create_all_ips):
+        ix1 = mommy.make(
+            IX,
+            ipv4_prefix='11.0.0.0/22',
+            ipv6_prefix='2002:12e2::/64')
+
+        with self.assertRaisesMessage(
+                ValidationError,
+                '11.0.0.0/24 overlaps with 11.0.0.0/22 from IX: {}'.format(
+                    ix1)):
+            mommy.make(
+                IX,
+                ipv4_prefix='11.0.0.0/24',
+                ipv6_prefix='2001:12e2::/64')
+        self.assertEqual(IX.objects.count(), 1)
+
     @patch('ixbr_api.core.models.create_all_ips')
     @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
     def test_validate_mgmt_network(self,
@@ -274,3 +303,169 @@ class Test_IX(TestCase):
                 raise Exception("Error creating IPv4 network")
             if pattern_ipv6.fullmatch(ipv6) is None:
                 raise Exception("Error creating IPv6 network")
+
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_create_all_ips_creates_history(self, mock_full_clean):
+        ix = mommy.make(
+            IX,
+            ipv4_prefix='11.0.0.0/24',
+            ipv6_prefix='2001:12e2::/64',
+            management_prefix='192.168.4.0/24')
+
+        self.assertEqual(IPv4Address.history.filter(ix=ix).count(), 254)
+        self.assertEqual(IPv6Address.history.filter(ix=ix).count(), 254)
+        self.assertEqual(
+            IPv4Address.history.filter(history_type='+').first().history_user,
+            ix.modified_by)
+
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_create_all_ips_in_batches(self, mock_full_clean):
+        ix = mommy.make(
+            IX,
+            ipv4_prefix='11.0.0.0/22',
+            ipv6_prefix='2001:12e2::/64',
+            management_prefix='192.168.4.0/24',
+            create_ips=False)
+
+        with CaptureQueriesContext(connection) as context:
+            create_all_ips(ix)
+
+        addresses = list(IPv4Address.objects.filter(ix=ix))
+        self.assertEqual(len(addresses), 1022)
+        inserts = [query for query in context.captured_queries
+                   if query['sql'].startswith('INSERT INTO "core_ipv4address"')]
+        self.assertEqual(len(inserts), math.ceil(
+            len(addresses) / bulk_batch_size(IPv4Address, addresses)))
+
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_create_all_ips_with_existing_address(self, mock_full_clean):
+        other_ix = mommy.make(
+            IX,
+            ipv4_prefix='12.0.0.8/30',
+            ipv6_prefix='2001:12e3::/64',
+            create_ips=False)
+        # An address of the new prefix already taken by other IX
+        mommy.make(IPv4Address, address='11.0.0.10', ix=other_ix)
+        ix = mommy.make(
+            IX,
+            ipv4_prefix='11.0.0.0/24',
+            ipv6_prefix='2001:12e2::/64',
+            management_prefix='192.168.4.0/24',
+            create_ips=False)
+
+        with self.assertRaisesMessage(ValidationError,
+                                      '11.0.0.10 already exists'):
+            create_all_ips(ix)
+        self.assertFalse(IPv6Address.objects.filter(ix=ix))
+
+    def make_renumbering_ix(self, ipv4_prefix):
+        ix = mommy.make(
+            IX,
+            code='sp',
+            ipv4_prefix=ipv4_prefix,
+            ipv6_prefix='2001:12e2::/64',
+            management_prefix='192.168.4.0/24',
+            create_ips=False)
+        create_all_ips(ix)
+        return IX.objects.get(pk='sp')
+
+    @patch('ixbr_api.core.models.create_tag_by_channel_port')
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_update_ips_moves_services_to_new_prefixes(self, *mocks):
+        ix = self.make_renumbering_ix('11.0.0.0/24')
+        mlpav4 = mommy.make(
+            MLPAv4,
+            mlpav4_address=IPv4Address.objects.get(address='11.0.0.10'))
+        mlpav6 = mommy.make(
+            MLPAv6,
+            mlpav6_address=IPv6Address.objects.get(address='2001:12e2::10'))
+
+        ix.ipv4_prefix = '11.0.4.0/24'
+        ix.ipv6_prefix = '2001:12e3::/64'
+        ix.prefix_update = True
+        with CaptureQueriesContext(connection) as context:
+            ix.save()
+
+        mlpav4.refresh_from_db()
+        mlpav6.refresh_from_db()
+        self.assertEqual(mlpav4.mlpav4_address_id, '11.0.4.10')
+        self.assertEqual(mlpav6.mlpav6_address_id, '2001:12e3::10')
+        self.assertEqual(mlpav4.history.first().history_type, '~')
+        self.assertEqual(IPv4Address.objects.filter(ix=ix).count(), 254)
+        self.assertEqual(IPv6Address.objects.filter(ix=ix).count(), 254)
+        self.assertFalse(IPv4Address.objects.filter(
+            ix=ix, address__startswith='11.0.0.'))
+        self.assertEqual(
+            IPv4Address.history.filter(history_type='-').count(), 254)
+        self.assertGreater(mlpav4.modified, mlpav4.created)
+        self.assertEqual(
+            len([query for query in context.captured_queries
+                 if query['sql'].startswith('UPDATE "core_mlpav4"')]), 1)
+
+    @patch('ixbr_api.core.models.create_tag_by_channel_port')
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_update_ips_with_overlapping_prefixes(self, *mocks):
+        # The new prefix is the second half of the old one, so services
+        # move to addresses that already exist
+        ix = self.make_renumbering_ix('11.0.0.0/22')
+        services = [
+            mommy.make(MLPAv4, mlpav4_address=IPv4Address.objects.get(
+                address='11.0.{}.{}'.format(block, i)))
+            for block in (0, 1) for i in range(10, 13)]
+
+        ix.ipv4_prefix = '11.0.2.0/23'
+        ix.prefix_update = True
+        ix.save()
+
+        self.assertEqual(
+            [MLPAv4.objects.get(pk=mlpav4.pk).mlpav4_address_id
+             for mlpav4 in services],
+            ['11.0.2.10', '11.0.2.11', '11.0.2.12',
+             '11.0.3.10', '11.0.3.11', '11.0.3.12'])
+        self.assertFalse(IPv4Address.objects.filter(
+            ix=ix, address__startswith='11.0.0.'))
+
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_plan_renumbering_does_not_change_addresses(self, *mocks):
+        ix = self.make_renumbering_ix('11.0.0.0/24')
+
+        ix.ipv4_prefix = '11.0.4.0/24'
+        plan = ix.plan_renumbering()
+
+        self.assertEqual(len(plan[IPv4Address]['create']), 254)
+        self.assertEqual(len(plan[IPv4Address]['delete']), 254)
+        self.assertEqual(plan[IPv6Address]['create'], [])
+        self.assertEqual(plan[IPv6Address]['delete'], [])
+        self.assertEqual(IPv4Address.objects.filter(
+            ix=ix, address__startswith='11.0.0.').count(), 254)
+
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_update_ips_on_expansion_keeps_addresses(self, *mocks):
+        ix = self.make_renumbering_ix('11.0.0.0/24')
+
+        ix.ipv4_prefix = '11.0.0.0/23'
+        ix.prefix_update = True
+        ix.save()
+
+        self.assertEqual(IPv4Address.objects.filter(ix=ix).count(), 510)
+        self.assertEqual(IPv6Address.objects.filter(ix=ix).count(), 510)
+        self.assertFalse(IPv4Address.history.filter(history_type='-'))
+
+    @patch('ixbr_api.core.models.create_tag_by_channel_port')
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_update_ips_with_service_out_of_new_prefix(self, *mocks):
+        ix = self.make_renumbering_ix('11.0.0.0/23')
+        mommy.make(
+            MLPAv4,
+            mlpav4_address=IPv4Address.objects.get(address='11.0.1.10'))
+
+        ix.ipv4_prefix = '11.0.0.0/24'
+        ix.prefix_update = True
+        with self.assertRaisesMessage(ValidationError,
+                                      '11.0.1.10 have no place'):
+            ix.save()
@@ -4,6 +4,7 @@ from model_mommy import mommy
 from unittest.mock import patch
 
 from ...models import (Port, PIX, Switch)
+from ...utils.port_utils import natural_sort_key
 from ..login import DefaultLogin
 
 
@@ -120,3 +121,33 @@ class Test_Port_Ordering(TestCase):
                           'Ten0/0/8', 'Ten0/0/9', 'Ten0/0/10', 'Ten0/0/11',
                           '1', '2', '3', '4', '5', '6', '7', '8', '9', '10',
                           '11'])
+
+    @patch('ixbr_api.core.models.create_tag_by_channel_port')
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_ordering_by_each_number(
+            self, mock_full_clean, mock_create_all_ips, mock_create_tags):
+        switch = mommy.make(Switch, management_ip='192.0.0.1')
+        ports_names = ['Ten0/10/1', 'Ten0/1/10', 'Ten0/2/1', 'Ten0/1/2']
+        mommy.make(Port, _quantity=len(ports_names),
+                   switch=switch, name=cycle(ports_names))
+
+        port = Port.objects.get(name='Ten0/1/10')
+        self.assertEqual(port.sort_key, '000000000001000010')
+
+        ordered_ports = Port.objects.order_by_port_name()
+        self.assertEqual(list(ordered_ports.values_list('name', flat=True)),
+                         ['Ten0/1/2', 'Ten0/1/10', 'Ten0/2/1', 'Ten0/10/1'])
+        self.assertEqual(list(switch.ordered_ports(descendent=True)),
+                         ['Ten0/10/1', 'Ten0/2/1', 'Ten0/1/10', 'Ten0/1/2'])
+        self.assertEqual(switch.get_last_port_name(), 'Ten0/10/1')
+
+    @patch('ixbr_api.core.models.create_tag_by_channel_port')
+    @patch('ixbr_api.core.models.create_all_ips')
+    @patch('ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+    def test_sort_key_with_integer_name(
+            self, mock_full_clean, mock_create_all_ips, mock_create_tags):
+        switch = mommy.make(Switch, management_ip='192.0.0.1')
+        port = mommy.make(Port, switch=switch, name=1)
+
+        self.assertEqual(port.sort_key, natural_sort_key('1'))
@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from model_mommy import mommy
+
+from ...models import (BilateralPeer, ContactsMap, CustomerChannel,
+                       MACAddress, MLPAv4, MLPAv6, Monitorv4, Service,
+                       ServiceIndex, Tag)
+from ..login import DefaultLogin
+
+
+class Test_ServiceIndex(TestCase):
+    """Tests ServiceIndex view."""
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        patches = [
+            patch('ixbr_api.core.models.create_all_ips'),
+            patch('ixbr_api.core.models.HistoricalTimeStampedModel'
+                  '.full_clean'),
+            patch('ixbr_api.core.models.create_tag_by_channel_port'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.asn = mommy.make(ContactsMap).asn
+        self.channel = mommy.make(CustomerChannel)
+        self.tag = mommy.make(Tag, status='PRODUCTION')
+        common = {'asn': self.asn, 'customer_channel': self.channel,
+                  'tag': self.tag}
+        self.mlpav4 = mommy.make(MLPAv4, **common)
+        self.mlpav6 = mommy.make(MLPAv6, **common)
+        self.monitorv4 = mommy.make(Monitorv4, **common)
+        self.bilateral_peer = mommy.make(BilateralPeer, **common)
+
+    def test_rows(self):
+        self.assertEqual(
+            set(ServiceIndex.objects.filter(asn=self.asn).values_list(
+                'service_type', 'service_uuid', 'address')),
+            {('MLPAv4', self.mlpav4.pk, self.mlpav4.mlpav4_address_id),
+             ('MLPAv6', self.mlpav6.pk, self.mlpav6.mlpav6_address_id),
+             ('Monitorv4', self.monitorv4.pk,
+              self.monitorv4.monitor_address_id),
+             ('BilateralPeer', self.bilateral_peer.pk, None)})
+
+        self.mlpav4.delete()
+        self.assertFalse(ServiceIndex.objects.filter(
+            service_uuid=self.mlpav4.pk).exists())
+
+    def test_get_services(self):
+        services = [self.mlpav4, self.mlpav6, self.monitorv4,
+                    self.bilateral_peer]
+        mommy.make(MLPAv4)
+
+        with self.assertNumQueries(5):
+            self.assertEqual(
+                ServiceIndex.objects.filter(tag=self.tag).get_services(),
+                services)
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                ServiceIndex.objects.filter(
+                    service_uuid=self.mlpav6.pk).get_services(),
+                [self.mlpav6])
+        self.assertEqual(Service.get_objects_filter('asn', self.asn),
+                         services)
+        self.assertEqual(
+            Service.get_objects_filter('uuid', self.bilateral_peer.uuid),
+            [self.bilateral_peer])
+        self.assertEqual(
+            Service.get_objects_filter('shortname', self.mlpav4.shortname),
+            [self.mlpav4])
+
+    def test_tag_services(self):
+        self.assertEqual(self.tag.get_services(),
+                         [('MLPAv4', self.mlpav4),
+                          ('MLPAv6', self.mlpav6),
+                          ('Bilateralpeer', self.bilateral_peer),
+                          ('Monitorv4', self.monitorv4)])
+
+        self.tag.status = 'AVAILABLE'
+        with self.assertNumQueries(1):
+            self.assertRaises(ValidationError,
+                              self.tag.validate_tag_status)
+
+    def test_count_by_type(self):
+        mommy.make(MLPAv4, asn=self.asn)
+
+        self.assertEqual(
+            dict(ServiceIndex.objects.filter(asn=self.asn).count_by_type()),
+            {'MLPAv4': 2, 'MLPAv6': 1, 'Monitorv4': 1, 'BilateralPeer': 1})
+        self.assertEqual(
+            dict(ServiceIndex.objects.filter(
+                customer_channel=self.channel,
+                service_type='MLPAv6').count_by_type()),
+            {'MLPAv4': 0, 'MLPAv6': 1, 'Monitorv4': 0, 'BilateralPeer': 0})
+
+    def test_get_mac_addresses(self):
+        macs = mommy.make(MACAddress, _quantity=3)
+        self.mlpav4.mac_addresses.add(macs[0])
+        self.mlpav6.mac_addresses.add(macs[0], macs[1])
+        self.bilateral_peer.mac_addresses.add(macs[2])
+        mommy.make(Monitorv4).mac_addresses.add(
+            mommy.make(MACAddress))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                set(ServiceIndex.objects.filter(
+                    asn=self.asn,
+                    customer_channel=self.channel).get_mac_addresses()),
+                set(macs))
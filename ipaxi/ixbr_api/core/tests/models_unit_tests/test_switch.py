@@ -93,6 +93,22 @@ class Test_Switch(TestCase):
                 create_ports=False)
             self.cisco_switch_test.save()
 
+    def test_managment_ip_already_exists(self):
+        management_ip = self.cisco_sp_araguaia.management_ip
+        with self.assertRaisesMessage(
+                ValidationError,
+                "This IP {} already exist".format(management_ip)):
+            Switch.objects.create(
+                pix=self.araguaia,
+                model=self.cisco_sp_araguaia.model,
+                management_ip=management_ip,
+                last_ticket='453',
+                translation=False,
+                create_ports=False)
+
+        # The switch itself keeps its management IP
+        self.cisco_sp_araguaia.validate_managment_ip()
+
     '''TODO: Fix this test
     def test_create_ports(self):
         self.cisco_switch_model_test = SwitchModel.objects.create(
@@ -0,0 +1,33 @@
+from itertools import count
+
+from model_mommy.mommy import Mommy
+
+_ipv4_prefixes = count()
+_ipv6_prefixes = count()
+
+
+def gen_ipv4_prefix():
+    n = next(_ipv4_prefixes)
+    return '100.{}.{}.0/24'.format(64 + n // 256 % 64, n % 256)
+
+
+def gen_ipv6_prefix():
+    return 'fd00:{:x}::/64'.format(next(_ipv6_prefixes) % 0x10000)
+
+
+class IXMommy(Mommy):
+    """
+    Mommy that fills the prefixes of IXs with networks that do not overlap,
+    as the exclusion constraints of PostgreSQL refuse random strings and
+    overlapping prefixes.
+    """
+    ix_generators = {
+        'ipv4_prefix': gen_ipv4_prefix,
+        'ipv6_prefix': gen_ipv6_prefix,
+    }
+
+    def generate_value(self, field, commit=True):
+        if self.model._meta.label == 'core.IX' and \
+                field.name in self.ix_generators:
+            return self.ix_generators[field.name]()
+        return super(IXMommy, self).generate_value(field, commit)
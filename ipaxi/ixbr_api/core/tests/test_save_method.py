@@ -1,9 +1,11 @@
 from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from ixbr_api.core.models import ASN
+from ixbr_api.core.models import ASN, batch_writes
 from ixbr_api.core.validators import INVALID_ASN
 from ixbr_api.users.models import User
 
@@ -113,3 +115,111 @@ class TestSaveMethod(TestCase):
         self.asn_to_update.number = 54321
         with self.assertRaisesMessage(ValidationError, err_msg):
             self.asn_to_update.save()
+
+    def test_update_writes_only_changed_fields(self):
+        """ Validate that an update sends only the changed fields, without
+        reading the row again before saving it
+
+        Returns:
+
+        """
+        ASN.objects.create(number=self.valid_asn_number, last_ticket=0,
+                           description='old description')
+
+        asn = ASN.objects.get(number=self.valid_asn_number)
+        self.assertEqual(asn.get_dirty_fields(), set())
+        asn.last_ticket = 1
+        self.assertEqual(asn.get_dirty_fields(), {'last_ticket'})
+
+        with CaptureQueriesContext(connection) as context:
+            asn.save()
+
+        queries = [query['sql'] for query in context.captured_queries]
+        self.assertFalse([sql for sql in queries
+                          if sql.startswith('SELECT') and
+                          'FROM "core_asn"' in sql])
+        updates = [sql for sql in queries if sql.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"last_ticket"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+        self.assertEqual(asn.get_dirty_fields(), set())
+        asn = ASN.objects.get(number=self.valid_asn_number)
+        self.assertEqual(asn.last_ticket, 1)
+        self.assertEqual(asn.description, 'old description')
+        self.assertEqual(asn.history.first().last_ticket, 1)
+
+    def test_snapshot_after_refresh_from_db(self):
+        """ Validate that the original values follow refresh_from_db()
+
+        Returns:
+
+        """
+        ASN.objects.create(number=self.valid_asn_number, last_ticket=0)
+        asn = ASN.objects.get(number=self.valid_asn_number)
+
+        ASN.objects.filter(number=self.valid_asn_number).update(
+            last_ticket=2)
+        asn.refresh_from_db()
+
+        self.assertEqual(asn.get_original_value('last_ticket'), 2)
+        self.assertEqual(asn.get_dirty_fields(), set())
+
+    def test_batch_writes_updates_together(self):
+        """ Validate that the updates of a batch are written together when
+        it exits, with one UPDATE for the same changes and one INSERT of
+        history rows
+
+        Returns:
+
+        """
+        for number in range(1, 4):
+            ASN.objects.create(number=number, last_ticket=0)
+        asns = list(ASN.objects.filter(number__in=range(1, 4)))
+
+        with CaptureQueriesContext(connection) as context:
+            with batch_writes():
+                for asn in asns:
+                    asn.last_ticket = 5
+                    asn.save()
+                    asn.save()
+                self.assertFalse(ASN.objects.filter(last_ticket=5))
+
+        queries = [query['sql'] for query in context.captured_queries]
+        self.assertEqual(
+            len([sql for sql in queries if sql.startswith('UPDATE')]), 1)
+        self.assertEqual(
+            len([sql for sql in queries if sql.startswith('INSERT')]), 1)
+        self.assertEqual(ASN.objects.filter(last_ticket=5).count(), 3)
+        for asn in asns:
+            self.assertEqual(asn.history.count(), 2)
+            self.assertEqual(asn.history.first().last_ticket, 5)
+            self.assertEqual(asn.get_dirty_fields(), set())
+
+    def test_batch_writes_rolls_back_invalid_update(self):
+        """ Validate that an object invalid when the batch is written rolls
+        back the whole batch
+
+        Returns:
+
+        """
+        ASN.objects.create(number=1, last_ticket=0)
+        ASN.objects.create(number=2, last_ticket=0)
+        asn1, asn2 = ASN.objects.filter(number__in=(1, 2))
+
+        # A refused value, whatever validators the database backend adds
+        invalid = patch.object(asn2, 'full_clean',
+                               side_effect=ValidationError(INVALID_ASN))
+
+        with self.assertRaises(ValidationError), invalid, \
+                CaptureQueriesContext(connection) as context:
+            with batch_writes():
+                asn1.last_ticket = 5
+                asn1.save()
+                asn2.last_ticket = 6
+                asn2.save()
+
+        # The invalid object is refused before any UPDATE is sent
+        self.assertFalse([query for query in context.captured_queries
+                          if query['sql'].startswith('UPDATE')])
+        self.assertFalse(ASN.objects.exclude(last_ticket=0))
@@ -0,0 +1,69 @@
+import json
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ...management.commands.benchmark_nikiti import Command
+from ...models import (ASN, ContactsMap, CustomerChannel, IPv4Address,
+                       MACAddress, MLPAv4, Port, Switch)
+from ...use_cases.export_use_cases import export_ix, export_ix_ndjson
+from ..login import DefaultLogin
+
+
+class TestExportUseCases(TestCase):
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        self.addCleanup(p.stop)
+        p.start()
+
+        p = patch(
+            'ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        self.addCleanup(p.stop)
+        p.start()
+
+        self.ix = Command().create_ix(3, 2, self.superuser)
+        mac = MACAddress.objects.create(address='aa:bb:cc:dd:ee:ff',
+                                        last_ticket=1)
+        MLPAv4.objects.first().mac_addresses.add(mac)
+
+    def test_export_ix(self):
+        objects = list(export_ix(ix=self.ix.code))
+        models = [obj['model'] for obj in objects]
+
+        self.assertEqual(objects[0]['model'], 'core.ix')
+        self.assertEqual(objects[0]['pk'], self.ix.code)
+        self.assertEqual(models.count('core.switch'),
+                         Switch.objects.filter(pix__ix=self.ix).count())
+        self.assertEqual(models.count('core.port'),
+                         Port.objects.filter(switch__pix__ix=self.ix).count())
+        self.assertEqual(models.count('core.customerchannel'),
+                         CustomerChannel.objects.count())
+        self.assertEqual(models.count('core.ipv4address'),
+                         IPv4Address.objects.filter(ix=self.ix).count())
+        self.assertEqual(models.count('core.contactsmap'),
+                         ContactsMap.objects.filter(ix=self.ix).count())
+        self.assertEqual(models.count('core.asn'), ASN.objects.count())
+        self.assertEqual(models.count('core.macaddress'), 1)
+        self.assertEqual(models.count('core.mlpav4_mac_addresses'), 1)
+
+        # referenced objects come first
+        self.assertLess(models.index('core.pix'), models.index('core.switch'))
+        self.assertLess(models.index('core.port'),
+                        models.index('core.customerchannel'))
+        self.assertLess(models.index('core.macaddress'),
+                        models.index('core.mlpav4_mac_addresses'))
+
+        mlpav4 = next(obj for obj in objects if obj['model'] == 'core.mlpav4')
+        self.assertEqual(mlpav4['fields']['tag'],
+                         MLPAv4.objects.get(pk=mlpav4['pk']).tag_id)
+
+    def test_export_ix_ndjson(self):
+        lines = list(export_ix_ndjson(ix=self.ix.code))
+
+        self.assertEqual(len(lines), len(list(export_ix(ix=self.ix.code))))
+        for line in lines:
+            self.assertTrue(line.endswith('\n'))
+            self.assertIn('model', json.loads(line))
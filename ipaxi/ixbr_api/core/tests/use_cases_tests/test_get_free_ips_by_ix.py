@@ -1,10 +1,15 @@
 from itertools import cycle
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 from ixbr_api.core.models import IX, IPv4Address, IPv6Address, MLPAv4, MLPAv6
 from ixbr_api.core.tests.login import DefaultLogin
-from ixbr_api.core.use_cases.get_free_ips_by_ix import get_free_ips_by_ix
+from ixbr_api.core.use_cases.get_free_ips_by_ix import (get_free_ips_by_ix,
+                                                        pair_free_ips)
+from ixbr_api.core.utils.address_hold import (get_address_holder,
+                                              hold_address)
 from model_mommy import mommy
 
 
@@ -158,3 +163,67 @@ class TestGetFreeIPSByIX(TestCase):
         free_ips = get_free_ips_by_ix('v4_and_v6', self.ix)
         self.assertEqual(free_ips['ipv4'].address, self.ipv4_list[3].address)
         self.assertEqual(free_ips['ipv6'].address, self.ipv6_list[3].address)
+
+    def test_pair_free_ips_by_last_group(self):
+        self.assertEqual(
+            pair_free_ips(['187.16.205.4', '187.16.205.6'],
+                          ['2001:12f8:0:28::a', '2001:12f8:0:28::6']),
+            ('187.16.205.6', '2001:12f8:0:28::6'))
+        self.assertEqual(
+            pair_free_ips(['187.16.205.4'], ['2001:12f8:0:28::5']),
+            (None, None))
+
+    def test_suggestion_queries_do_not_grow_with_free_ips(self):
+        mommy.make(
+            IPv4Address,
+            _quantity=100,
+            address=cycle('187.16.206.{}'.format(i) for i in range(100)),
+            ix=self.ix)
+
+        with self.assertNumQueries(4):
+            free_ips = get_free_ips_by_ix('v4_and_v6', self.ix)
+        self.assertEqual(free_ips['ipv4'].address, self.ipv4_list[0].address)
+        self.assertEqual(free_ips['ipv6'].address, self.ipv6_list[0].address)
+
+    def test_held_ips_are_not_suggested_to_other_holders(self):
+        self.addCleanup(cache.clear)
+
+        first = get_free_ips_by_ix('v4_and_v6', self.ix, holder=1)
+        again = get_free_ips_by_ix('v4_and_v6', self.ix, holder=1)
+        second = get_free_ips_by_ix('v4_and_v6', self.ix, holder=2)
+
+        self.assertEqual(first, again)
+        self.assertEqual(first['ipv4'].address, self.ipv4_list[0].address)
+        self.assertEqual(first['ipv6'].address, self.ipv6_list[0].address)
+        self.assertEqual(second['ipv4'].address, self.ipv4_list[1].address)
+        self.assertEqual(second['ipv6'].address, self.ipv6_list[1].address)
+
+    def test_ips_are_suggested_when_cache_fails(self):
+        with patch('ixbr_api.core.utils.address_hold.cache') as failing:
+            failing.add.return_value = False
+            failing.get.return_value = None
+            free_ips = get_free_ips_by_ix('v4_and_v6', self.ix, holder=1)
+
+        self.assertEqual(free_ips['ipv4'].address, self.ipv4_list[0].address)
+        self.assertEqual(free_ips['ipv6'].address, self.ipv6_list[0].address)
+
+    def test_pair_keeps_previous_hold(self):
+        self.addCleanup(cache.clear)
+        hold_address(self.ix.pk, '187.16.205.4', 1)
+
+        self.assertEqual(
+            pair_free_ips(['187.16.205.4'], ['2001:12f8:0:28::5'],
+                          self.ix.pk, holder=1),
+            (None, None))
+        self.assertEqual(get_address_holder(self.ix.pk, '187.16.205.4'), 1)
+
+    def test_service_with_address_held_to_other_user(self):
+        self.addCleanup(cache.clear)
+        hold_address(self.ix.pk, self.ipv4_list[0].address,
+                     self.superuser.pk + 1)
+        hold_address(self.ix.pk, self.ipv4_list[1].address,
+                     self.superuser.pk)
+
+        with self.assertRaisesMessage(ValidationError, 'is held to another'):
+            mommy.make(MLPAv4, mlpav4_address=self.ipv4_list[0])
+        mommy.make(MLPAv4, mlpav4_address=self.ipv4_list[1])
@@ -1,4 +1,5 @@
 from unittest.mock import patch
+from uuid import UUID
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
@@ -6,8 +7,9 @@ from django.test.client import Client
 from model_mommy import mommy
 
 from ...use_cases.network_use_cases import (
-    next_switch, bfs_switch, get_pe_channel_by_channel)
+    next_switch, bfs_switch, build_switch_topology, get_pe_channel_by_channel)
 from ...models import (DownlinkChannel, UplinkChannel, Switch, Port, User)
+from ...utils.switch_topology import get_cached_switch_topology
 
 
 class SwitchUseCasesTest(TestCase):
@@ -114,3 +116,59 @@ class SwitchUseCasesTest(TestCase):
             channel=self.uplink_origin, ix=self.port_origin.switch.pix.ix)
 
         self.assertEqual(self.downlink_end, tested_function)
+
+    def test_get_pe_channel_by_channel_without_graph_queries(self):
+        ix = self.port_origin.switch.pix.ix
+        get_pe_channel_by_channel(channel=self.uplink_origin, ix=ix)
+
+        # Only the switches of the channel and the DownlinkChannel are
+        # queried, the route to the PE comes from the cached topology
+        with self.assertNumQueries(2):
+            pe_channel = get_pe_channel_by_channel(
+                channel=self.uplink_origin, ix=ix)
+            self.assertEqual(pe_channel.channel_port,
+                             self.downlink_end.channel_port)
+
+    def test_get_pe_channel_by_channel_after_topology_change(self):
+        ix = self.port_origin.switch.pix.ix
+        self.assertEqual(
+            self.downlink_end,
+            get_pe_channel_by_channel(channel=self.uplink_origin, ix=ix))
+
+        self.neighboor_middle.is_pe = True
+        self.neighboor_middle.save()
+
+        self.assertEqual(
+            self.downlink_middle,
+            get_pe_channel_by_channel(channel=self.uplink_origin, ix=ix))
+
+    def test_topology_mc_lag_downlink_leads_to_first_switch(self):
+        pe_b, pe_a = [
+            mommy.make(Switch, is_pe=True, pix=self.neighboor_end.pix,
+                       management_ip=management_ip)
+            for management_ip in ('192.168.0.2', '192.168.0.1')]
+        downlink = mommy.make(DownlinkChannel)
+        uplink = mommy.make(UplinkChannel, downlink_channel=downlink)
+        origin = mommy.make(Switch)
+        mommy.make(Port, switch=origin, channel_port=uplink.channel_port)
+        # The port of pe_b has the lower pk, but pe_a comes first in
+        # Port.Meta.ordering
+        for i, switch in enumerate((pe_b, pe_a)):
+            mommy.make(Port, switch=switch, uuid=UUID(int=i + 1),
+                       channel_port=downlink.channel_port)
+
+        self.assertEqual(build_switch_topology()['routes'][origin.pk],
+                         (pe_a.pk, downlink.pk))
+        self.assertEqual(bfs_switch(origin_vertex=origin), (pe_a, downlink))
+
+    def test_topology_follows_port_channel_changes(self):
+        get_pe_channel_by_channel(channel=self.uplink_origin,
+                                  ix=self.port_origin.switch.pix.ix)
+
+        self.port_origin.description = 'Not an edge'
+        self.port_origin.save()
+        self.assertIsNotNone(get_cached_switch_topology())
+
+        self.port_origin.channel_port = None
+        self.port_origin.save()
+        self.assertIsNone(get_cached_switch_topology())
@@ -1,10 +1,15 @@
+from importlib import import_module
 from unittest.mock import patch
 
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
 from model_mommy import mommy
 
 from ...models import (CustomerChannel, MLPAv4, MLPAv6, BilateralPeer, Monitorv4, MACAddress)
-from ...use_cases.search_use_cases import (search_customer_channel_by_mac_address)
+from ...use_cases.search_use_cases import (search_customer_channel_by_mac_address,
+                                           search_mac_addresses,
+                                           search_services_q)
 from ...use_cases.mac_address_converter_to_system_pattern import (
     MACAddressConverterToSystemPattern,)
 from ..login import DefaultLogin
@@ -90,4 +95,49 @@ class TestSearchUseCases(TestCase):
         search_result = search_customer_channel_by_mac_address(
             address=address_string)
 
-        self.assertIn(channel, search_result)
\ No newline at end of file
+        self.assertIn(channel, search_result)
+
+    def test_search_mac_addresses(self):
+        mac = mommy.make(MACAddress, address='1b:d8:ee:ac:40:5f')
+        mommy.make(MACAddress, address='aa:bb:cc:dd:ee:ff')
+
+        self.assertEqual(mac.search_address, '1bd8eeac405f')
+        for search in ('d8:ee', 'D8-EE-A', 'd8ee.ac', '405F'):
+            self.assertEqual(list(search_mac_addresses(search)), [mac])
+
+    def test_migration_fills_search_address(self):
+        mac = mommy.make(MACAddress, address='1b:d8:ee:ac:40:5f')
+        MACAddress.objects.update(search_address='')
+
+        with connection.schema_editor() as schema_editor:
+            import_module(
+                'ixbr_api.core.migrations.0005_macaddress_search_address') \
+                .fill_search_address(apps, schema_editor)
+        mac.refresh_from_db()
+        self.assertEqual(mac.search_address, '1bd8eeac405f')
+
+    def test_search_services_q(self):
+        mac = mommy.make(MACAddress, address='1b:d8:ee:ac:40:5f')
+        by_mac = mommy.make(BilateralPeer, asn__number=64999,
+                            tag__tag=100, mac_addresses=[mac])
+        by_asn = mommy.make(BilateralPeer, asn__number=62345, tag__tag=101)
+        by_tag = mommy.make(BilateralPeer, asn__number=64998, tag__tag=2345)
+
+        def search(text):
+            return set(BilateralPeer.objects.filter(
+                search_services_q(text, BilateralPeer)))
+
+        self.assertEqual(search('ac:40'), {by_mac})
+        self.assertEqual(search('2345'), {by_asn, by_tag})
+        self.assertEqual(search('nothing'), set())
+
+    def test_search_services_q_looks_numbers_up_in_subqueries(self):
+        sql = str(BilateralPeer.objects.filter(
+            search_services_q('2345', BilateralPeer)).order_by().query)
+
+        # The numbers are matched on core_asn and core_tag, where the
+        # trigram indexes are, and not through a join of the services
+        self.assertIn('FROM "core_asn"', sql)
+        self.assertIn('FROM "core_tag"', sql)
+        self.assertNotIn('JOIN "core_asn"', sql)
+        self.assertNotIn('JOIN "core_tag"', sql)
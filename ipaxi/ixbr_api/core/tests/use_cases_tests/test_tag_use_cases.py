@@ -1,18 +1,26 @@
 from unittest.mock import patch
 
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 from model_mommy import mommy
 
-from ...models import (IX, BilateralPeer, CustomerChannel, DownlinkChannel,
-                       MLPAv4, Port, Switch, Tag, UplinkChannel, User)
+from ...models import (IX, BilateralPeer, ContactsMap, CustomerChannel,
+                       DownlinkChannel, MLPAv4, Port, Switch, Tag,
+                       UplinkChannel, User)
 from ...use_cases.tags_use_cases import (check_inner_tag_availability,
                                          get_available_inner_tag,
+                                         get_common_available_inner_tag,
+                                         get_free_tag_numbers,
                                          get_free_tags,
+                                         get_next_free_tag,
                                          get_or_create_specific_tag_without_all_service,
                                          get_or_create_specific_tag_without_bilateral,
+                                         get_tag_amounts,
+                                         get_tag_bitmaps,
                                          get_tag_without_all_service,
                                          get_tag_without_bilateral,
-                                         instantiate_tag)
+                                         instantiate_tag,
+                                         is_tag_free)
 
 
 class TagUseCasesTest(TestCase):
@@ -48,6 +56,7 @@ class TagUseCasesTest(TestCase):
             IX,
             tags_policy='distributed',
             create_tags=False)
+        self.contacts_map = mommy.make(ContactsMap, ix=self.ix)
 
         self.origin_switch = mommy.make(
             Switch,
@@ -117,7 +126,7 @@ class TagUseCasesTest(TestCase):
         self.assertIn(available_tag, free_tags)
         self.assertNotIn(reserved_tag, free_tags)
         self.assertNotIn(production_tag, free_tags)
-        self.assertTrue(len(free_tags) >= 2)
+        self.assertEqual(list(free_tags), [available_tag])
 
     def test_ix_managed(self):
         self.ix.tags_policy = 'ix_managed'
@@ -152,6 +161,76 @@ class TagUseCasesTest(TestCase):
             tag_number=55)
 
         self.assertIn(tag_tested, Tag.objects.filter(ix=self.ix))
+        self.assertEqual(tag_tested.tag_domain, self.downlink_end.channel_port)
+        self.assertIsNone(instantiate_tag(
+            channel=self.downlink_end,
+            ix=self.ix,
+            tag_number=55))
+
+    def test_instantiate_tag_ix_managed(self):
+        self.ix.tags_policy = 'ix_managed'
+        mommy.make(
+            Tag,
+            ix=self.ix,
+            tag=56,
+            tag_domain=self.downlink_block.channel_port,
+            status='PRODUCTION')
+
+        tag_tested = instantiate_tag(
+            channel=self.uplink_origin,
+            ix=self.ix,
+            tag_number=55)
+
+        self.assertEqual(tag_tested.status, 'AVAILABLE')
+        self.assertIsNone(tag_tested.tag_domain)
+        self.assertIsNone(instantiate_tag(
+            channel=self.uplink_origin,
+            ix=self.ix,
+            tag_number=56))
+
+    def test_get_tag_amounts(self):
+        tag_domains = (self.downlink_end.channel_port,
+                       self.downlink_block.channel_port)
+        for tag, status, tag_domain in (
+                (0, 'ALLOCATED', tag_domains[0]),
+                (5, 'PRODUCTION', tag_domains[0]),
+                (6, 'AVAILABLE', tag_domains[0]),
+                (7, 'PRODUCTION', tag_domains[1])):
+            mommy.make(Tag, ix=self.ix, tag=tag, status=status,
+                       tag_domain=tag_domain)
+
+        amounts = get_tag_amounts(ix=self.ix, tag_domain=tag_domains[0])
+        bitmaps = get_tag_bitmaps(ix=self.ix, tag_domain=tag_domains[0])
+        self.assertEqual(
+            amounts['AVAILABLE'],
+            len((bitmaps['not_available'] & bitmaps['existing'])
+                .free_in_range()))
+        self.assertEqual(
+            amounts, {'AVAILABLE': 4093, 'ALLOCATED': 2, 'PRODUCTION': 1})
+        self.assertEqual(
+            get_tag_amounts(ix=self.ix),
+            {'AVAILABLE': 8186, 'ALLOCATED': 4, 'PRODUCTION': 2})
+
+    def test_get_tag_without_bilateral_instantiates_free_tag(self):
+        used_bilateral_tag = mommy.make(
+            Tag,
+            ix=self.ix,
+            tag=2,
+            tag_domain=self.downlink_block.channel_port,
+            status='PRODUCTION')
+        mommy.make(
+            BilateralPeer,
+            tag=used_bilateral_tag)
+
+        free_tags = get_tag_without_bilateral(
+            ix=self.ix,
+            channel=self.uplink_origin)
+
+        self.assertEqual([tag.tag for tag in free_tags], [3])
+        self.assertEqual(free_tags[0].tag_domain,
+                         self.downlink_end.channel_port)
+        self.assertEqual(Tag.objects.filter(
+            tag_domain=self.downlink_end.channel_port).count(), 1)
 
     def test_get_tag_without_bilateral(self):
         used_production_tag = mommy.make(
@@ -439,6 +518,12 @@ class TagUseCasesTest(TestCase):
 
         self.assertFalse(unavailability)
         self.assertTrue(availability)
+        self.assertFalse(check_inner_tag_availability(
+            tag=used_production_mlpa_tag, inner='1010'))
+        self.assertTrue(check_inner_tag_availability(
+            tag=used_production_mlpa_tag, inner='1020'))
+        self.assertRaises(ValidationError, check_inner_tag_availability,
+                          tag=used_production_mlpa_tag, inner='10a')
 
     def test_get_available_inner_tag(self):
         cix_channel = mommy.make(
@@ -462,3 +547,123 @@ class TagUseCasesTest(TestCase):
             tag=used_production_mlpa_tag)
 
         self.assertEqual(available_tag, 2)
+
+    def test_get_next_free_tag(self):
+        for tag_number, status in ((2, 'PRODUCTION'), (3, 'AVAILABLE'),
+                                   (4, 'AVAILABLE')):
+            mommy.make(
+                Tag,
+                ix=self.ix,
+                tag=tag_number,
+                tag_domain=self.downlink_end.channel_port,
+                status=status)
+        bilateral_tag = mommy.make(
+            Tag,
+            ix=self.ix,
+            tag=3,
+            tag_domain=self.downlink_block.channel_port,
+            status='PRODUCTION')
+        mommy.make(BilateralPeer, tag=bilateral_tag)
+
+        self.assertEqual(
+            get_next_free_tag(ix=self.ix, channel=self.uplink_origin), 3)
+        self.assertEqual(
+            get_next_free_tag(ix=self.ix, channel=self.uplink_origin,
+                              without='bilateral'), 4)
+        self.assertEqual(
+            get_next_free_tag(ix=self.ix, channel=self.uplink_origin,
+                              without='bilateral', start=5, create=True), 5)
+
+    def test_is_tag_free(self):
+        mommy.make(
+            Tag,
+            ix=self.ix,
+            tag=20,
+            tag_domain=self.downlink_end.channel_port,
+            status='PRODUCTION')
+
+        self.assertFalse(is_tag_free(ix=self.ix, channel=self.uplink_origin,
+                                     tag_number=20, create=True))
+        self.assertTrue(is_tag_free(ix=self.ix, channel=self.uplink_origin,
+                                    tag_number=21, create=True))
+        self.assertFalse(is_tag_free(ix=self.ix, channel=self.uplink_origin,
+                                     tag_number=21))
+
+    def test_get_free_tag_numbers_does_not_create_tags(self):
+        tags_before = Tag.objects.count()
+
+        free_tags = get_free_tag_numbers(
+            ix=self.ix, channel=self.uplink_origin, create=True, limit=3)
+
+        self.assertEqual(free_tags, [2, 3, 4])
+        self.assertEqual(Tag.objects.count(), tags_before)
+
+    def test_tag_bitmaps_follow_tag_changes(self):
+        tag = mommy.make(
+            Tag,
+            ix=self.ix,
+            tag=30,
+            tag_domain=self.downlink_end.channel_port,
+            status='AVAILABLE')
+        self.assertTrue(is_tag_free(ix=self.ix, channel=self.uplink_origin,
+                                    tag_number=30))
+
+        tag.status = 'PRODUCTION'
+        tag.save()
+
+        self.assertFalse(is_tag_free(ix=self.ix, channel=self.uplink_origin,
+                                     tag_number=30))
+
+    def test_get_common_available_inner_tag(self):
+        cix_channel = mommy.make(
+            CustomerChannel,
+            cix_type=3)
+        tag_a, tag_b = mommy.make(
+            Tag,
+            ix=self.ix,
+            tag_domain=self.downlink_block.channel_port,
+            status='PRODUCTION',
+            _quantity=2)
+
+        for tag, inner in ((tag_a, 1), (tag_a, 2), (tag_b, 3)):
+            mommy.make(
+                MLPAv4,
+                tag=tag,
+                customer_channel=cix_channel,
+                inner=inner)
+
+        self.assertEqual(
+            get_common_available_inner_tag(tag_a=tag_a, tag_b=tag_b), 4)
+
+    def test_inner_tag_index_follows_service_changes(self):
+        cix_channel = mommy.make(
+            CustomerChannel,
+            cix_type=3)
+        outer_tag, other_tag = mommy.make(
+            Tag,
+            ix=self.ix,
+            tag_domain=self.downlink_block.channel_port,
+            status='PRODUCTION',
+            _quantity=2)
+        mlpav4 = mommy.make(
+            MLPAv4,
+            asn=self.contacts_map.asn,
+            tag=outer_tag,
+            customer_channel=cix_channel,
+            inner=1)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(get_available_inner_tag(tag=outer_tag), 2)
+        with self.assertNumQueries(0):
+            self.assertFalse(
+                check_inner_tag_availability(tag=outer_tag, inner=1))
+
+        mlpav4.tag = other_tag
+        mlpav4.save()
+
+        self.assertTrue(check_inner_tag_availability(tag=outer_tag, inner=1))
+        self.assertFalse(check_inner_tag_availability(tag=other_tag, inner=1))
+
+        mlpav4.delete()
+
+        self.assertTrue(check_inner_tag_availability(tag=other_tag, inner=1))
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import tempfile
+
+from django.test import SimpleTestCase
+
+from ...utils.consulta import OUI_RELOAD_CHECK_INTERVAL, OUIIndex, oui_prefix
+
+
+class TestOUIIndex(SimpleTestCase):
+
+    def setUp(self):
+        fd, self.sqlite_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.addCleanup(os.unlink, self.sqlite_path)
+        self.write_vendors([('E043DB', 'Shenzhen ViewAt'),
+                            ('3CD92B', 'Hewlett Packard')])
+        self.index = OUIIndex(self.sqlite_path)
+
+    def write_vendors(self, vendors):
+        db = sqlite3.connect(self.sqlite_path)
+        db.execute('DROP TABLE IF EXISTS macvendors')
+        db.execute('CREATE TABLE macvendors(id INTEGER PRIMARY KEY, '
+                   'mac TEXT, vendor TEXT)')
+        db.executemany('INSERT INTO macvendors (mac, vendor) VALUES (?, ?)',
+                       vendors)
+        db.commit()
+        db.close()
+
+    def test_oui_prefix(self):
+        self.assertEqual(oui_prefix('e0:43:db:00:11:22'), 0xE043DB)
+        self.assertEqual(oui_prefix('E0-43-DB-00-11-22'), 0xE043DB)
+        self.assertEqual(oui_prefix('e043.db00.1122'), 0xE043DB)
+        self.assertEqual(oui_prefix('e043db001122'), 0xE043DB)
+        self.assertIsNone(oui_prefix('zz:zz:zz:00:11:22'))
+        self.assertIsNone(oui_prefix('e0'))
+
+    def test_get_vendor(self):
+        self.assertIsNone(self.index.vendors)
+
+        self.assertEqual(self.index.get_vendor('e0:43:db:00:11:22'),
+                         'Shenzhen ViewAt')
+        self.assertIsNone(self.index.get_vendor('00:00:00:00:11:22'))
+        self.assertIsNone(self.index.get_vendor('not a mac'))
+
+    def test_get_vendors(self):
+        self.assertEqual(
+            self.index.get_vendors(['3c:d9:2b:00:00:01', '00:00:00:00:00:01']),
+            {'3c:d9:2b:00:00:01': 'Hewlett Packard',
+             '00:00:00:00:00:01': None})
+
+    def test_reload_when_file_changes(self):
+        self.assertIsNone(self.index.get_vendor('00:00:00:00:11:22'))
+
+        self.write_vendors([('000000', 'Xerox')])
+        stat = os.stat(self.sqlite_path)
+        os.utime(self.sqlite_path, (stat.st_atime, stat.st_mtime + 10))
+
+        # Changes are seen only after the check interval
+        self.assertIsNone(self.index.get_vendor('00:00:00:00:11:22'))
+        self.index.checked -= OUI_RELOAD_CHECK_INTERVAL
+        self.assertEqual(self.index.get_vendor('00:00:00:00:11:22'),
+                         'Xerox')
+        self.assertIsNone(self.index.get_vendor('e0:43:db:00:11:22'))
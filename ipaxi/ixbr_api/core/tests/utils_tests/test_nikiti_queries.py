@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ...management.commands.benchmark_nikiti import Command
+from ...views.nikiti_views import AlocacaoDeIP, MonitoramentoInterfaces
+from ..login import DefaultLogin
+
+
+class MonitoramentoInterfacesTestCase(TestCase):
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        self.addCleanup(p.stop)
+        p.start()
+
+        p = patch(
+            'ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        self.addCleanup(p.stop)
+        p.start()
+
+    view_class = MonitoramentoInterfaces
+
+    def build_dict(self, switches, customer_ports):
+        with transaction.atomic():
+            ix = Command().create_ix(switches, customer_ports, self.superuser)
+            with CaptureQueriesContext(connection) as context:
+                nikiti_dict = self.view_class().build_dict(ix=ix.code)
+            transaction.set_rollback(True)
+
+        return nikiti_dict, len(context.captured_queries)
+
+    def test_build_dict(self):
+        nikiti_dict, queries = self.build_dict(3, 2)
+
+        self.assertEqual(sorted(nikiti_dict),
+                         ['10.0.0.1', '10.0.0.2', '10.0.0.3'])
+
+        pe_ports = nikiti_dict['10.0.0.1']['ports']
+        self.assertEqual(sorted(pe_ports), ['1', '2'])
+        self.assertEqual(pe_ports['1']['type'], 'D')
+        self.assertEqual(pe_ports['1']['participante'],
+                         'Uplink-BENCHMARK    (.2)')
+        self.assertEqual(pe_ports['1']['status'], 'Ativo Principal')
+
+        ports = nikiti_dict['10.0.0.3']['ports']
+        self.assertEqual(sorted(ports), ['1', '2', '3'])
+        self.assertEqual(ports['1']['participante'],
+                         'Uplink-BENCHMARK    (.1)')
+        self.assertEqual(ports['3']['type'], 'P')
+        self.assertEqual(ports['3']['asn'], 64515)
+        self.assertEqual(ports['3']['participante'], 'Benchmark')
+        self.assertEqual(ports['3']['ticket'], 0)
+        self.assertEqual(ports['3']['status'],
+                         ['- cisco-tr  as64515-tr     (10)'])
+
+    def test_build_dict_queries_do_not_grow_with_ix(self):
+        small_dict, small_queries = self.build_dict(2, 1)
+        large_dict, large_queries = self.build_dict(6, 4)
+
+        self.assertEqual(len(large_dict), 6)
+        self.assertEqual(small_queries, large_queries)
+
+
+class AlocacaoDeIPTestCase(MonitoramentoInterfacesTestCase):
+    view_class = AlocacaoDeIP
+
+    def test_build_dict(self):
+        nikiti_dict, queries = self.build_dict(3, 2)
+
+        self.assertEqual(nikiti_dict['ips_range'],
+                         {'ipv4_range': '198.18.0.0/16',
+                          'ipv6_range': '2001:db8::/64'})
+        self.assertEqual(len(nikiti_dict['lines']), 4)
+        self.assertIn('64512' + 9 * ' ' + 'Benchmark' + 7 * ' ' +
+                      '198.18.0.1' + 20 * ' ' + 'BMRK' + 5 * ' ' +
+                      'Em ativação [0]', nikiti_dict['lines'])
+
+    def test_build_dict_queries_do_not_grow_with_ix(self):
+        small_dict, small_queries = self.build_dict(2, 1)
+        large_dict, large_queries = self.build_dict(6, 4)
+
+        self.assertEqual(len(large_dict['lines']), 20)
+        self.assertEqual(small_queries, large_queries)
@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase
+
+from ...utils.constants import MAX_TAG_NUMBER, MIN_TAG_NUMBER
+from ...utils.tag_bitmap import TagBitmap
+
+
+class TestTagBitmap(SimpleTestCase):
+
+    def test_next_free(self):
+        bitmap = TagBitmap([0, 1, 2, 4])
+
+        self.assertEqual(bitmap.next_free(), 3)
+        self.assertEqual(bitmap.next_free(4), 5)
+        self.assertEqual(TagBitmap().next_free(), MIN_TAG_NUMBER)
+
+    def test_next_free_when_full(self):
+        bitmap = ~TagBitmap()
+
+        self.assertIsNone(bitmap.next_free())
+        bitmap.release(MAX_TAG_NUMBER)
+        self.assertEqual(bitmap.next_free(), MAX_TAG_NUMBER)
+
+    def test_is_free(self):
+        bitmap = TagBitmap([10])
+
+        self.assertFalse(bitmap.is_free(10))
+        self.assertTrue(bitmap.is_free(11))
+        self.assertFalse(bitmap.is_free(MAX_TAG_NUMBER + 1))
+        self.assertFalse(bitmap.is_free(MIN_TAG_NUMBER - 1))
+
+    def test_occupy_and_release(self):
+        bitmap = TagBitmap()
+        bitmap.occupy(20)
+        self.assertFalse(bitmap.is_free(20))
+        bitmap.release(20)
+        self.assertTrue(bitmap.is_free(20))
+
+    def test_free_in_range(self):
+        bitmap = TagBitmap([100, 102])
+
+        self.assertEqual(bitmap.free_in_range(100, 104), [101, 103, 104])
+        self.assertEqual(bitmap.free_in_range(100, 104, limit=2), [101, 103])
+
+    def test_used_tags(self):
+        self.assertEqual(TagBitmap([7, 3, 4095]).used_tags(), [3, 7, 4095])
+
+    def test_operators(self):
+        a = TagBitmap([1, 2])
+        b = TagBitmap([2, 3])
+
+        self.assertEqual((a | b).used_tags(), [1, 2, 3])
+        self.assertEqual((a & b).used_tags(), [2])
+        self.assertEqual(len((~a).used_tags()),
+                         MAX_TAG_NUMBER - MIN_TAG_NUMBER - 1)
@@ -2,7 +2,8 @@ from django.core.exceptions import ValidationError
 from django.test import TestCase
 
 from ...validators import (USUAL_MAC_ADDRESS, validate_as_number,
-                           validate_ipv4_network, validate_ipv6_network,
+                           validate_ipv4_network, validate_ipv4_prefix,
+                           validate_ipv6_network, validate_ipv6_prefix,
                            validate_ipv46_network, validate_ix_code,
                            validate_ix_fullname, validate_ix_shortname,
                            validate_mac_address, validate_only_lowercase,
@@ -532,6 +533,19 @@ class Test_validate_ipv4_network(TestCase):
             validate_ipv4_network('2a02::223:6cff:fe8a:2e8a/-1')
 
 
+class Test_validate_ip_prefix(TestCase):
+
+    def test_prefix_without_host_bits(self):
+        self.assertIsNone(validate_ipv4_prefix('187.16.216.0/21'))
+        self.assertIsNone(validate_ipv6_prefix('2001:12e2::/64'))
+        with self.assertRaisesMessage(ValidationError,
+                                      "'Enter a valid IPv4 network.'"):
+            validate_ipv4_prefix('187.16.216.255/21')
+        with self.assertRaisesMessage(ValidationError,
+                                      "'Enter a valid IPv6 network.'"):
+            validate_ipv6_prefix('2001:12e2::1/64')
+
+
 class Test_validate_ipv6_network(TestCase):
     """Based on stable/1.10.x/tests/
     forms_tests/field_tests/test_genericipaddressfield.py"""
@@ -1,9 +1,14 @@
-from unittest.mock import patch
+import time
+from unittest.mock import Mock, patch
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-from ...utils.whoisutils import INEXISTENT_ASN, get_whois, parse_whois
+from ...utils.whoisutils import (INEXISTENT_ASN, WHOIS_CACHE_KEY,
+                                 get_parsed_whois, get_whois, parse_whois)
+
+WHOIS_CONTENT = b'aut-num:        AS62000\nas-name:        TEST\n'
 
 
 class Test_whoisutils(TestCase):
@@ -29,3 +34,67 @@ class Test_whoisutils(TestCase):
     def test_parse_whois_failure_with_blank_whois_content(self):
         with self.assertRaisesMessage(ValidationError, INEXISTENT_ASN):
             parse_whois(b'')
+
+
+@patch('ixbr_api.core.utils.whoisutils.get_whois')
+class Test_whois_cache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_get_parsed_whois_is_cached(self, mock_get_whois):
+        mock_get_whois.return_value = WHOIS_CONTENT
+
+        parsed = get_parsed_whois(62000)
+        self.assertEqual(parsed, [('aut-num', 'AS62000'),
+                                  ('as-name', 'TEST')])
+        self.assertEqual(get_parsed_whois(62000), parsed)
+        mock_get_whois.assert_called_once_with(62000)
+
+    def test_unknown_asn_is_cached(self, mock_get_whois):
+        mock_get_whois.side_effect = ValidationError(INEXISTENT_ASN)
+
+        for i in range(2):
+            with self.assertRaisesMessage(ValidationError, INEXISTENT_ASN):
+                get_parsed_whois(62000)
+        mock_get_whois.assert_called_once_with(62000)
+
+    def test_invalid_asn_is_not_cached(self, mock_get_whois):
+        with self.assertRaisesMessage(ValidationError, INEXISTENT_ASN):
+            get_parsed_whois("62000")
+        mock_get_whois.assert_not_called()
+
+    @patch('ixbr_api.core.utils.whoisutils.threading.Thread')
+    def test_refresh_in_background(self, mock_thread, mock_get_whois):
+        mock_get_whois.return_value = WHOIS_CONTENT
+        parsed = get_parsed_whois(62000)
+
+        entry = cache.get(WHOIS_CACHE_KEY.format(62000))
+        entry['refresh_at'] = time.time() - 1
+        cache.set(WHOIS_CACHE_KEY.format(62000), entry)
+
+        # The expiring entry is answered while one refresh is started
+        self.assertEqual(get_parsed_whois(62000), parsed)
+        self.assertEqual(get_parsed_whois(62000), parsed)
+        mock_get_whois.assert_called_once_with(62000)
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once_with()
+
+    @patch('ixbr_api.core.utils.whoisutils.threading.Thread')
+    def test_failed_refresh_keeps_entry(self, mock_thread, mock_get_whois):
+        mock_thread.side_effect = lambda target, **kwargs: Mock(start=target)
+        mock_get_whois.return_value = WHOIS_CONTENT
+        parsed = get_parsed_whois(62000)
+
+        entry = cache.get(WHOIS_CACHE_KEY.format(62000))
+        entry['refresh_at'] = time.time() - 1
+        cache.set(WHOIS_CACHE_KEY.format(62000), entry)
+
+        # whois times out, fails or answers nothing on the refresh
+        mock_get_whois.side_effect = ValidationError(INEXISTENT_ASN)
+        self.assertEqual(get_parsed_whois(62000), parsed)
+        self.assertEqual(mock_get_whois.call_count, 2)
+        self.assertEqual(
+            cache.get(WHOIS_CACHE_KEY.format(62000))['parsed'], parsed)
+        self.assertEqual(get_parsed_whois(62000), parsed)
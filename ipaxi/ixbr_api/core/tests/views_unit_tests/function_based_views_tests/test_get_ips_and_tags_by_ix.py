@@ -59,7 +59,7 @@ class GetIPsAndTagsByIXTestCase(TestCase):
             ix=self.ix,
             address=seq("2001:12f8:0:16::"),
             _quantity=3)
-        self.tags = mommy.make(Tag, _quantity=5, ix=self.ix, tag=seq(2))
+        self.tags = mommy.make(Tag, _quantity=5, ix=self.ix, tag=seq(1))
 
         self.mlpav4 = mommy.make(
             MLPAv4,
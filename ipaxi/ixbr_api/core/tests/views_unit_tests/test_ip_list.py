@@ -2,9 +2,12 @@
 from __future__ import unicode_literals
 
 import ast
+from unittest import skipUnless
 
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from ..makefaketestdata import MakeFakeTestData
 
@@ -60,6 +63,69 @@ class IPsViewTestCase(TestCase):
         self.assertEqual(ips_name[7]['v4'], self.ipv4_sp_terena)
         self.assertEqual(ips_name[7]['v6'], self.ipv6_sp_terena)
 
+    @skipUnless(connection.vendor == 'postgresql',
+                'addresses are ordered numerically on PostgreSQL only')
+    def test_ip_allocation_pages(self):
+        url = reverse('core:ip_allocation', args=[self.sp.code])
+
+        response = self.client.get(url, {'limit': 3})
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(
+            [(row['v4']['address'], row['v6']['address'])
+             for row in page['results']],
+            [(self.ipv4_sp_kinikinau.address, self.ipv6_sp_kinikinau.address),
+             (self.ipv4_sp_monitor_v4_1.address,
+              self.ipv6_sp_monitor_v4_1.address),
+             (self.ipv4_sp_monitor_v4_2.address,
+              self.ipv6_sp_monitor_v4_2.address)])
+        self.assertEqual(page['results'][0]['v4']['status'], 'ALLOCATED')
+        self.assertEqual(page['results'][0]['v6']['status'], 'FREE')
+        self.assertEqual(page['next'], self.ipv4_sp_monitor_v4_2.address)
+
+        page = self.client.get(
+            url, {'limit': 3, 'after': page['next']}).json()
+        self.assertEqual(
+            [row['v4']['address'] for row in page['results']],
+            [self.ipv4_sp_monitor_v4_3.address,
+             self.ipv4_sp_chamacoco.address,
+             self.ipv4_sp_none.address])
+
+        page = self.client.get(
+            url, {'limit': 3, 'after': page['next']}).json()
+        self.assertEqual(
+            [row['v4']['address'] for row in page['results']],
+            [self.ipv4_sp_terena.address])
+        self.assertIsNone(page['next'])
+
+    def test_ip_allocation_status_filter(self):
+        url = reverse('core:ip_allocation', args=[self.sp.code])
+
+        page = self.client.get(
+            url, {'family': 'ipv4', 'status': 'FREE'}).json()
+        self.assertEqual(
+            [row['v4']['address'] for row in page['results']],
+            [self.ipv4_sp_none.address])
+
+        page = self.client.get(
+            url, {'family': 'ipv6', 'status': 'ALLOCATED'}).json()
+        self.assertEqual(len(page['results']), 1)
+        self.assertEqual(page['results'][0]['v6']['address'],
+                         self.ipv6_sp_chamacoco.address)
+        self.assertEqual(page['results'][0]['v4']['address'],
+                         self.ipv4_sp_chamacoco.address)
+        self.assertEqual(page['results'][0]['v4']['status'], 'ALLOCATED')
+
+    def test_ip_allocation_queries_do_not_grow_with_page(self):
+        url = reverse('core:ip_allocation', args=[self.sp.code])
+
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get(url, {'limit': 1})
+        with CaptureQueriesContext(connection) as large_page:
+            self.client.get(url, {'limit': 7})
+        self.assertEqual(len(small_page.captured_queries),
+                         len(large_page.captured_queries))
+
     def test_get_ip_informations_by_click__ip_views(self):
         # To a valid request
         resp = self.c.generic(
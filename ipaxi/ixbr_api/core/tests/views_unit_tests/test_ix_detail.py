@@ -6,7 +6,9 @@ from itertools import cycle
 from unittest.mock import patch
 
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from model_mommy import mommy
 from model_mommy.recipe import seq
 
@@ -30,7 +32,7 @@ class IXDetailViewTestCase(TestCase):
         self.addCleanup(p.stop)
         p.start()
 
-        p = patch('ixbr_api.core.use_cases.tags_use_cases.create_tag_by_channel_port')
+        p = patch('ixbr_api.core.models.create_tag_by_channel_port')
         p.start()
         self.addCleanup(p.stop)
 
@@ -85,6 +87,7 @@ class IXDetailViewTestCase(TestCase):
         self.tags = mommy.make(
             Tag,
             ix=self.ix,
+            tag=seq(1),
             tag_domain=self.channels_port[1],
             status=cycle(status),
             _quantity=4)
@@ -139,8 +142,11 @@ class IXDetailViewTestCase(TestCase):
         self.assertEqual(ix.ipv6_prefix, self.ix.ipv6_prefix)
         amount_production_tags = self.response.context['total_production_tags']
         self.assertEqual(amount_production_tags, 3)
+        # The 4096 tags of the tag domain but the 3 in PRODUCTION and the
+        # tags 0 and 1, which are ALLOCATED without an instance
         amount_available_tags = self.response.context['total_available_tags']
-        self.assertEqual(amount_available_tags, 1)
+        self.assertEqual(amount_available_tags, 4091)
+        self.assertEqual(self.response.context['total_reserved_tags'], 2)
         self.assertEqual(len(self.response.context['pixs']), 1)
         self.assertIs(type(self.response.context['cixs']), dict)
         self.assertEqual(len(self.response.context['cixs']), 1)
@@ -150,6 +156,35 @@ class IXDetailViewTestCase(TestCase):
         self.assertEqual(self.response.context['mlpav6_total'], 1)
         self.assertEqual(self.response.context['bilateral_total'], 1)
 
+    def test_ix_detail_queries_do_not_grow_with_ix(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('core:ix_detail', args=[self.ix.code]))
+
+        switch = mommy.make(Switch, pix__ix=self.ix)
+        channel_port = mommy.make(ChannelPort, create_tags=False)
+        mommy.make(Port, switch=switch, channel_port=channel_port,
+                   status='AVAILABLE')
+        customer_channel = mommy.make(
+            CustomerChannel,
+            asn=self.asns[2],
+            cix_type=2,
+            channel_port=channel_port)
+        mommy.make(
+            BilateralPeer,
+            tag=self.tags[-1],
+            asn=self.asns[3],
+            customer_channel=customer_channel)
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self.client.get(
+                reverse('core:ix_detail', args=[self.ix.code]))
+        self.assertEqual(len(response.context['pixs']), 2)
+        self.assertEqual(len(response.context['cixs']), 2)
+        self.assertEqual(response.context['bilateral_total'], 2)
+        self.assertEqual(
+            response.context['pix_stats'][switch.pix.pk]['asns'],
+            sorted([self.asns[2].number, self.asns[3].number]))
+
     def test_ix_detail_pix__ix_detail(self):
         c = Client()
         resp = c.generic(
@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from ...management.commands.benchmark_nikiti import Command
+from ...models import IPv4Address, Port
+from ...utils.nikiti.snapshots import get_cached_snapshot
+from ...views.nikiti_views import NikitiSnapshotView
+from ..login import DefaultLogin
+
+
+class NikitiSnapshotViewTestCase(TestCase):
+
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch('ixbr_api.core.models.create_all_ips')
+        self.addCleanup(p.stop)
+        p.start()
+
+        p = patch(
+            'ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        self.addCleanup(p.stop)
+        p.start()
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.ix = Command().create_ix(3, 2, self.superuser)
+        self.url = reverse('core:nikiti_monitoramento_de_interfaces',
+                           args=[self.ix.code])
+
+    def test_snapshot_is_served_without_queries(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('as64515-tr', response.content.decode())
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(cached['Last-Modified'], response['Last-Modified'])
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+
+        not_modified = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        not_modified = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_snapshot_follows_changes(self):
+        response = self.client.get(self.url)
+
+        port = Port.objects.get(switch__management_ip='10.0.0.3', name='3')
+        port.status = 'AVAILABLE'
+        port.save()
+
+        changed = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+        self.assertNotIn('as64515-tr', changed.content.decode())
+
+    def test_snapshot_follows_address_changes(self):
+        self.client.get(self.url)
+
+        address = IPv4Address.objects.get(address='198.18.0.1')
+        address.in_lg = False
+        address.save()
+
+        self.assertIsNone(get_cached_snapshot('monitoramento_de_interfaces',
+                                              self.ix.code))
+
+    def test_base_view_is_abstract(self):
+        self.assertRaises(TypeError, NikitiSnapshotView)
@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 import uuid
+from importlib import import_module
+from io import StringIO
 from unittest.mock import patch
 
+from django.apps import apps
 from django.contrib.messages import get_messages
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from model_mommy import mommy
 
-from ...models import PIX, Switch
+from ...models import (PIX, MLPAv4, Port, SearchIndex, Switch, Tag,
+                       search_by_identifier)
 from ..login import DefaultLogin
 
 
@@ -34,7 +39,7 @@ class SearchUUIDTestCase(TestCase):
 
         pix = mommy.make(PIX)
         self.sw_uuid = uuid.UUID("7b2c3193-b7c0-4ee9-94e8-bf18270ce5ff")
-        mommy.make(Switch, pix=pix, uuid=self.sw_uuid)
+        self.switch = mommy.make(Switch, pix=pix, uuid=self.sw_uuid)
         self.search_uuid = "4ee9"
         self.search_uuid_fail = "abc123"
 
@@ -59,3 +64,67 @@ class SearchUUIDTestCase(TestCase):
         messages = [
             m.message for m in get_messages(self.response.wsgi_request)]
         self.assertIn('abc123 not found', messages)
+
+    def test_search_uuid_found_items(self):
+        self.response = self.client.get(
+            reverse('core:uuid_search'),
+            {"uuid": "4EE9-94E8", "prev_path": "/core/"})
+        self.assertEqual(
+            self.response.context['search_res'],
+            [{'type': 'Switch', 'desc': str(self.switch)}])
+
+    def test_search_uuid_is_one_query(self):
+        with self.assertNumQueries(1):
+            search_data = search_by_identifier(self.search_uuid)
+        self.assertEqual(len(search_data), 1)
+
+    def test_search_index_follows_changes(self):
+        self.switch.management_ip = '192.168.0.99'
+        self.switch.save()
+        self.assertEqual(search_by_identifier('7b2c')[0]['desc'],
+                         str(Switch.objects.get(pk=self.sw_uuid)))
+
+        tag = mommy.make(Tag, status='AVAILABLE')
+        self.assertEqual(search_by_identifier(tag.uuid.hex), [])
+        tag.status = 'PRODUCTION'
+        tag.save()
+        self.assertEqual(search_by_identifier(tag.uuid.hex)[0]['type'],
+                         'Tag')
+        tag.status = 'AVAILABLE'
+        tag.save()
+        self.assertEqual(search_by_identifier(tag.uuid.hex), [])
+
+        self.switch.delete()
+        self.assertEqual(search_by_identifier(self.search_uuid), [])
+
+    def test_rebuild_search_index(self):
+        SearchIndex.objects.all().delete()
+        self.assertEqual(search_by_identifier(self.search_uuid), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search_by_identifier(self.search_uuid),
+                         [{'type': 'Switch', 'desc': str(self.switch)}])
+
+    def test_search_index_with_str_uuid(self):
+        switch = mommy.make(Switch, pix=self.switch.pix,
+                            uuid='2cf97cbf-3bf6-4ba7-8a3d-d3e9de5a5b0c')
+        self.assertEqual(search_by_identifier('2cf97cbf'),
+                         [{'type': 'Switch', 'desc': str(switch)}])
+
+    def test_migration_fills_search_index(self):
+        tag = mommy.make(Tag, status='PRODUCTION')
+        mlpav4 = mommy.make(MLPAv4, tag=tag)
+        port = mommy.make(Port, switch=self.switch)
+        # Labels are cut to the length of the column, as mommy makes long
+        # random names
+        max_length = SearchIndex._meta.get_field('label').max_length
+        expected = {(model, str(instance)[:max_length])
+                    for model, instance in (
+                        ('Switch', self.switch), ('Tag', tag),
+                        ('MLPAv4', mlpav4), ('Port', port))}
+        SearchIndex.objects.all().delete()
+
+        import_module('ixbr_api.core.migrations.0004_searchindex') \
+            .fill_search_index(apps, None)
+        self.assertTrue(expected.issubset(
+            set(SearchIndex.objects.values_list('model', 'label'))))
@@ -61,7 +61,9 @@ class TestTagListViewWithoutBundle(TagListViewTestBasics):
         self.assertEqual(switch, '')
         available_amount = self.response_without_bundle.context[
             'available_amount']
-        self.assertEqual(available_amount, 1)
+        # The 4096 tags of the tag domain but the 7 in PRODUCTION and the
+        # tags 0 and 1, which are ALLOCATED without an instance
+        self.assertEqual(available_amount, 4087)
         production_amount = self.response_without_bundle.context[
             'production_amount']
         self.assertEqual(production_amount, 7)
@@ -149,7 +151,9 @@ class TestTagListViewWithBundle(TagListViewTestBasics):
         self.assertEqual(switch.model, self.cisco_sp_kadiweu.model.model)
         available_amount = self.response_with_bundle.context[
             'available_amount']
-        self.assertEqual(available_amount, 2)
+        # The 4096 tags of the bundle but 1 (ALLOCATED), 13 (PRODUCTION)
+        # and 0, which is ALLOCATED without an instance
+        self.assertEqual(available_amount, 4093)
         production_amount = self.response_with_bundle.context[
             'production_amount']
         self.assertEqual(production_amount, 1)
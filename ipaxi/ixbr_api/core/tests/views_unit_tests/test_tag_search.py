@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from model_mommy import mommy
+
+from ixbr_api.core.models import IX, ChannelPort, Tag
+
+from ..login import DefaultLogin
+
+
+class TagSearchViewTestCase(TestCase):
+    def setUp(self):
+        DefaultLogin.__init__(self)
+
+        p = patch(
+            'ixbr_api.core.models.create_all_ips')
+        self.addCleanup(p.stop)
+        p.start()
+
+        p = patch(
+            'ixbr_api.core.models.HistoricalTimeStampedModel.full_clean')
+        self.addCleanup(p.stop)
+        p.start()
+
+        self.ix = mommy.make(IX, code='rj', create_tags=False)
+        self.channel_ports = mommy.make(
+            ChannelPort, create_tags=False, _quantity=2)
+        self.tag = mommy.make(
+            Tag, tag=10, ix=self.ix, tag_domain=self.channel_ports[0],
+            status='PRODUCTION')
+        mommy.make(
+            Tag, tag=11, ix=self.ix, tag_domain=self.channel_ports[1])
+
+    def test_tag_search_shows_tag_domains_without_instance(self):
+        response = self.client.get(
+            reverse('core:tag_search', args=[self.ix.code]), {'tag': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'core/tag_search_result.html')
+        self.assertEqual(list(response.context['tag_queryset']), [self.tag])
+        self.assertEqual(response.context['free_tag_domains'],
+                         [self.channel_ports[1]])
+
+    def test_tag_search_of_tag_without_instance(self):
+        response = self.client.get(
+            reverse('core:tag_search', args=[self.ix.code]), {'tag': 20})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['tag_queryset'])
+        self.assertEqual(set(response.context['free_tag_domains']),
+                         set(self.channel_ports))
+
+    def test_tag_search_of_ix_managed_ix(self):
+        ix = mommy.make(IX, code='ce', create_tags=False,
+                        tags_policy='ix_managed')
+
+        response = self.client.get(
+            reverse('core:tag_search', args=[ix.code]), {'tag': 20})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['free_tag_domains'], [None])
+
+    def test_tag_search_of_tag_born_allocated(self):
+        response = self.client.get(
+            reverse('core:tag_search', args=[self.ix.code]), {'tag': 1},
+            HTTP_REFERER='/')
+
+        self.assertEqual(response.status_code, 302)
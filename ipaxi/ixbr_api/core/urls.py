@@ -435,6 +435,11 @@ ip_urls = [
         view=ip_views.IPListView.as_view(),
         name='ip_list'
     ),
+    url(
+        regex=r'^ix/(?P<code>' + regex.ix_code + ')/ips/allocation/$',
+        view=ip_views.IPAllocationView.as_view(),
+        name='ip_allocation'
+    ),
 ]
 
 ix_urls = [
@@ -1,7 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
-from ..models import Bilateral, BilateralPeer
+from ..models import Bilateral, BilateralPeer, batch_writes
 from .tags_use_cases import (check_inner_tag_availability,
                              get_or_create_specific_tag_without_all_service,
                              get_or_create_specific_tag_without_bilateral)
@@ -38,6 +38,7 @@ def define_bilateral_case(**kwargs):
     return case
 
 
+@batch_writes()
 def create_bilateral_not_qinq(**kwargs):
     peer_a = kwargs.pop('peer_a')
     peer_b = kwargs.pop('peer_b')
@@ -91,6 +92,7 @@ def create_bilateral_not_qinq(**kwargs):
         return bilateral
 
 
+@batch_writes()
 def create_bilateral_peer_a_qinq(**kwargs):
 
     peer_a = kwargs.pop('peer_a')
@@ -155,6 +157,7 @@ def create_bilateral_peer_a_qinq(**kwargs):
     return bilateral
 
 
+@batch_writes()
 def create_bilateral_peer_b_qinq(**kwargs):
 
     peer_a = kwargs.pop('peer_a')
@@ -220,6 +223,7 @@ def create_bilateral_peer_b_qinq(**kwargs):
     return bilateral
 
 
+@batch_writes()
 def create_bilateral_a_b_qinq(**kwargs):
 
     peer_a = kwargs.pop('peer_a')
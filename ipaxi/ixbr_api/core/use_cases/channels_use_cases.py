@@ -1,11 +1,13 @@
 from django.utils.translation import gettext as _
 
-from ..models import ChannelPort, CoreChannel, DownlinkChannel, UplinkChannel
+from ..models import (ChannelPort, CoreChannel, DownlinkChannel, UplinkChannel,
+                      batch_writes)
 
 NOT_PE_ERROR = _("PE switch must be connected with other pe")
 UPLINK_NOT_PE = _("UplinkChannel does not apply on pe Switch")
 
 
+@batch_writes()
 def create_uplink_channel_use_case(**kwargs):
     """ Function to instantiate and link Uplink and Downlink
 
@@ -104,6 +106,7 @@ def create_uplink_channel_use_case(**kwargs):
     return uplink.pk, downlink.pk
 
 
+@batch_writes()
 def create_core_channel_use_case(**kwargs):
     """ Function to instantiate and link two CoreChannels
 
@@ -0,0 +1,147 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from ..models import (ASN, DIO, IX, PIX, Bilateral, BilateralPeer,
+                      ChannelPort, Contact, ContactsMap, CoreChannel,
+                      CustomerChannel, DIOPort, DownlinkChannel, IPv4Address,
+                      IPv6Address, MACAddress, MLPAv4, MLPAv6, Monitorv4,
+                      Organization, Phone, PhysicalInterface, Port, Route,
+                      Switch, SwitchModel, SwitchModule, SwitchPortRange, Tag,
+                      TranslationChannel, UplinkChannel)
+
+EXPORT_CHANNEL_MODELS = (CustomerChannel, CoreChannel, DownlinkChannel,
+                         UplinkChannel, TranslationChannel)
+EXPORT_SERVICE_MODELS = (MLPAv4, MLPAv6, Monitorv4, BilateralPeer)
+EXPORT_CONTACT_FIELDS = ('noc_contact', 'adm_contact', 'peer_contact',
+                         'com_contact', 'org_contact')
+
+
+def get_ix_export_querysets(ix):
+    """ gets the querysets of every object of an IX, in an order where
+    each object comes after the objects it references
+
+    Objects shared by IXs, like ASNs and switch models, are the ones
+    referenced by the IX objects. Many to many links are exported as the
+    rows of their through model.
+
+    Args:
+        ix: the IX
+
+    Returns:
+        list of QuerySets, each one filtered by primary key subqueries to
+        not need DISTINCT
+    """
+    ports = Port.objects.filter(switch__pix__ix=ix)
+    channel_ports = ChannelPort.objects.filter(
+        pk__in=ports.values('channel_port'))
+    contacts_maps = ContactsMap.objects.filter(ix=ix)
+    contacts = Q()
+    for field in EXPORT_CONTACT_FIELDS:
+        contacts |= Q(pk__in=contacts_maps.values(field))
+    customer_channels = CustomerChannel.objects.filter(
+        channel_port__in=channel_ports.values('pk'))
+
+    querysets = [
+        IX.objects.filter(pk=ix.pk),
+        PIX.objects.filter(ix=ix),
+        SwitchModel.objects.filter(
+            pk__in=Switch.objects.filter(pix__ix=ix).values('model')),
+        SwitchPortRange.objects.filter(
+            switch_model__in=Switch.objects.filter(
+                pix__ix=ix).values('model')),
+        Switch.objects.filter(pix__ix=ix),
+        SwitchModule.objects.filter(pk__in=ports.values('switch_module')),
+        PhysicalInterface.objects.filter(
+            pk__in=ports.values('physical_interface')),
+        Route.objects.filter(pk__in=ports.values('route')),
+        channel_ports,
+        ports,
+        DIO.objects.filter(pix__ix=ix),
+        DIOPort.objects.filter(dio__pix__ix=ix),
+        Tag.objects.filter(ix=ix),
+        IPv4Address.objects.filter(ix=ix),
+        IPv6Address.objects.filter(ix=ix),
+        Organization.objects.filter(
+            pk__in=contacts_maps.values('organization')),
+        ASN.objects.filter(Q(pk__in=contacts_maps.values('asn')) |
+                           Q(pk__in=customer_channels.values('asn'))),
+        Contact.objects.filter(contacts),
+        Phone.objects.filter(contact__in=Contact.objects.filter(
+            contacts).values('pk')),
+        contacts_maps,
+    ]
+
+    querysets.extend(model.objects.filter(
+        channel_port__in=channel_ports.values('pk'))
+        for model in EXPORT_CHANNEL_MODELS)
+
+    services = [model.objects.filter(tag__ix=ix)
+                for model in EXPORT_SERVICE_MODELS]
+    mac_addresses = Q()
+    for service in services:
+        mac_addresses |= Q(pk__in=service.model.mac_addresses.through
+                           .objects.filter(**{
+                               service.model._meta.model_name + '__in':
+                               service.values('pk')})
+                           .values('macaddress'))
+    querysets.append(MACAddress.objects.filter(mac_addresses))
+    querysets.extend(services)
+    querysets.extend(
+        service.model.mac_addresses.through.objects.filter(**{
+            service.model._meta.model_name + '__in': service.values('pk')})
+        for service in services)
+    bilateral_peers = BilateralPeer.objects.filter(tag__ix=ix)
+    querysets.append(Bilateral.objects.filter(
+        Q(peer_a__in=bilateral_peers.values('pk')) |
+        Q(peer_b__in=bilateral_peers.values('pk'))))
+
+    return querysets
+
+
+def export_ix(**kwargs):
+    """ exports every object of an IX, streaming it from the database
+
+    Args:
+        ix: kwarg -> the IX code
+
+    Returns:
+        generator of dicts {'model': app_label.model_name, 'pk': primary
+        key, 'fields': {field name: value}}, one per object, with the
+        foreign keys as the primary key of the object referenced
+
+    This funciton is dependent of the following functions:
+        get_ix_export_querysets()
+    """
+    ix = IX.objects.get(code=kwargs.pop('ix'))
+
+    for queryset in get_ix_export_querysets(ix):
+        meta = queryset.model._meta
+        fields = [(field.name, field.attname)
+                  for field in meta.concrete_fields if field is not meta.pk]
+        # values() and iterator() stream the rows from a server side cursor
+        # without building model instances or caching them
+        rows = queryset.order_by('pk').values(
+            'pk', *[attname for name, attname in fields]).iterator()
+        for row in rows:
+            yield {
+                'model': meta.label_lower,
+                'pk': row['pk'],
+                'fields': {name: row[attname] for name, attname in fields},
+            }
+
+
+def export_ix_ndjson(**kwargs):
+    """ exports every object of an IX as newline delimited JSON
+
+    Args:
+        ix: kwarg -> the IX code
+
+    Returns:
+        generator of lines, one JSON object described in export_ix() each
+
+    This funciton is dependent of the following functions:
+        export_ix()
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for obj in export_ix(**kwargs):
+        yield encoder.encode(obj) + '\n'
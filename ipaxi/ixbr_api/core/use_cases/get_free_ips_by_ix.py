@@ -1,32 +1,106 @@
+from ..models import (IPv4Address, IPv6Address, get_free_ipv4_by_ix,
+                      get_free_ipv6_by_ix)
+from ..utils.address_hold import (get_address_holder, hold_address,
+                                  release_address)
 
-from ..models import (get_free_ipv4_by_ix, get_free_ipv6_by_ix)
-import itertools
 
+def last_group(address):
+    """ Returns the last group of an IPv4 or IPv6 address as an integer, the
+    same value returned by last_group() of IPv4Address and IPv6Address, or
+    None if the group is not decimal """
+    group = address.rsplit(':' if ':' in address else '.', 1)[-1]
+    return int(group) if group.isdigit() else None
 
-def get_free_ips_by_ix(option, ix):
-    ips = {}
-    ipv6 = None
+
+def pair_free_ips(free_ipv4, free_ipv6, ix=None, holder=None):
+    """ Finds the first free IPv4 whose last group has a free IPv6 with the
+    same last group. The IPv6 addresses are indexed by last group, so every
+    address is visited once.
+
+    Args:
+        free_ipv4: list of free IPv4 addresses (str) in suggestion order
+        free_ipv6: list of free IPv6 addresses (str) in suggestion order
+        ix: the owner IX, required with holder
+        holder: when given, both addresses of the pair are held to it and
+            pairs held by another holder are skipped
+
+    Returns:
+        tuple: (ipv4, ipv6) addresses or (None, None) if there is no pair
+    """
+    ipv6_by_group = {}
+    for ipv6 in free_ipv6:
+        ipv6_by_group.setdefault(last_group(ipv6), []).append(ipv6)
+    ipv6_by_group.pop(None, None)
+
+    for ipv4 in free_ipv4:
+        candidates = ipv6_by_group.get(last_group(ipv4))
+        if not candidates:
+            continue
+        if holder is None:
+            return ipv4, candidates[0]
+        # A hold the holder already had is kept when there is no pair
+        held_before = get_address_holder(ix, ipv4) == holder
+        if not hold_address(ix, ipv4, holder):
+            continue
+        for ipv6 in candidates:
+            if hold_address(ix, ipv6, holder):
+                return ipv4, ipv6
+        if not held_before:
+            release_address(ix, ipv4)
+
+    return None, None
+
+
+def first_free_ip(free_ips, ix=None, holder=None):
+    """ Returns the first address of free_ips not held by another holder,
+    holding it to holder when given """
+    for address in free_ips:
+        if holder is None or hold_address(ix, address, holder):
+            return address
+    return None
+
+
+def get_free_ips_by_ix(option, ix, holder=None):
+    """ Suggests free addresses of an IX for a new service
+
+    Args:
+        option: 'only_v4', 'only_v6' or 'v4_and_v6'
+        ix: the owner IX
+        holder: who is going to use the addresses, usually the pk of the
+            logged user. When given, the suggested addresses are held to it
+            and are not suggested to other holders for IP_HOLD_TIMEOUT
+            seconds
+
+    Returns:
+        dict: {'ipv4': IPv4Address, 'ipv6': IPv6Address}, with None on the
+        family not asked. With 'v4_and_v6', both addresses share the last
+        group when possible.
+    """
+    ix = getattr(ix, 'pk', ix)
     ipv4 = None
+    ipv6 = None
+
+    if option in ('only_v4', 'v4_and_v6'):
+        free_ipv4 = list(
+            get_free_ipv4_by_ix(ix=ix).values_list('address', flat=True))
+    if option in ('only_v6', 'v4_and_v6'):
+        free_ipv6 = list(
+            get_free_ipv6_by_ix(ix=ix).values_list('address', flat=True))
+
     if option == 'only_v4':
-        ipv4 = get_free_ipv4_by_ix(ix=ix)[0]
+        ipv4 = first_free_ip(free_ipv4, ix, holder)
 
-    if option == 'only_v6':
-        ipv6 = get_free_ipv6_by_ix(ix=ix)[0]
+    elif option == 'only_v6':
+        ipv6 = first_free_ip(free_ipv6, ix, holder)
 
     elif option == 'v4_and_v6':
-        free_ipv4 = get_free_ipv4_by_ix(ix=ix)
-        free_ipv6 = get_free_ipv6_by_ix(ix=ix)
-
-        ips_combination = itertools.product(free_ipv4, free_ipv6)
-        ipv4, ipv6 = next((
-            ips for ips in ips_combination
-            if ips[0].last_group() == ips[1].last_group()), (None, None))
+        ipv4, ipv6 = pair_free_ips(free_ipv4, free_ipv6, ix, holder)
 
         if ipv4 is None:
-            ipv4 = free_ipv4[0]
-            ipv6 = free_ipv6[0]
-
-    ips['ipv4'] = ipv4
-    ips['ipv6'] = ipv6
+            ipv4 = first_free_ip(free_ipv4, ix, holder)
+            ipv6 = first_free_ip(free_ipv6, ix, holder)
 
-    return ips
+    return {
+        'ipv4': IPv4Address.objects.get(pk=ipv4) if ipv4 else None,
+        'ipv6': IPv6Address.objects.get(pk=ipv6) if ipv6 else None,
+    }
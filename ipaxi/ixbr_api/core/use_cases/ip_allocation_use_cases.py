@@ -0,0 +1,157 @@
+import ipaddress
+
+from django.db.models import Exists, OuterRef, Q
+
+from ..models import (IX, IPv4Address, IPv6Address, MLPAv4, MLPAv6,
+                      Monitorv4, pair_ipv4_address, pair_ipv6_address)
+
+IP_ALLOCATION_PAGE_SIZE = 256
+IP_ALLOCATION_STATUSES = ('ALLOCATED', 'FREE')
+IP_ALLOCATION_FAMILIES = ('ipv4', 'ipv6')
+
+
+def annotate_ipv4_allocation(queryset):
+    """ Annotates if each IPv4Address is used by a MLPAv4 or a Monitorv4 """
+    return queryset.annotate(
+        used_by_mlpav4=Exists(
+            MLPAv4.objects.filter(mlpav4_address=OuterRef('pk'))),
+        used_by_monitorv4=Exists(
+            Monitorv4.objects.filter(monitor_address=OuterRef('pk'))))
+
+
+def annotate_ipv6_allocation(queryset):
+    """ Annotates if each IPv6Address is used by a MLPAv6 """
+    return queryset.annotate(
+        used_by_mlpav6=Exists(
+            MLPAv6.objects.filter(mlpav6_address=OuterRef('pk'))))
+
+
+def filter_ipv4_status(queryset, status):
+    allocated = Q(used_by_mlpav4=True) | Q(used_by_monitorv4=True)
+    if status == 'ALLOCATED':
+        return queryset.filter(allocated)
+    return queryset.exclude(allocated)
+
+
+def filter_ipv6_status(queryset, status):
+    return queryset.filter(used_by_mlpav6=(status == 'ALLOCATED'))
+
+
+def ipv4_status(ipv4):
+    if ipv4 is None:
+        return None
+    if ipv4.used_by_mlpav4 or ipv4.used_by_monitorv4:
+        return 'ALLOCATED'
+    return 'FREE'
+
+
+def ipv6_status(ipv6):
+    if ipv6 is None:
+        return None
+    return 'ALLOCATED' if ipv6.used_by_mlpav6 else 'FREE'
+
+
+def get_ip_allocation(**kwargs):
+    """ gets a page of the IPv4/IPv6 pairs of an IX with their allocation
+    status
+
+    The IPv6 of each pair is the one planned for the IPv4 by
+    plan_all_ips(). Pages are cut by address (keyset), so every page costs
+    the same queries, with the allocation status computed and filtered in
+    the database.
+
+    Addresses are ordered and compared by the database, numerically on
+    PostgreSQL, where they are inet. Backends that store them as text, as
+    SQLite, order them as strings (10.0.3.243 before 10.0.3.3).
+
+    Args:
+        ix: kwarg -> the owner IX
+        family: kwarg -> 'ipv4' (default) or 'ipv6', the family the pages
+            are ordered, cut and filtered by
+        status: kwarg -> 'ALLOCATED' or 'FREE' to keep only the pairs whose
+            address of family has that status, None for all
+        after: kwarg -> address of family where the previous page ended,
+            None for the first page
+        limit: kwarg -> amount of pairs of the page
+
+    Returns:
+        dict: {
+            'rows': [{
+                'v4': IPv4Address or None,
+                'v4_status': 'ALLOCATED', 'FREE' or None,
+                'v6': IPv6Address or None,
+                'v6_status': 'ALLOCATED', 'FREE' or None}],
+            'next': the after of the next page or None on the last page
+        }
+
+    This funciton is dependent of the following functions:
+        pair_ipv4_address()
+        pair_ipv6_address()
+    """
+    ix = kwargs.pop('ix')
+    family = kwargs.pop('family', None) or 'ipv4'
+    status = kwargs.pop('status', None)
+    after = kwargs.pop('after', None)
+    limit = kwargs.pop('limit', IP_ALLOCATION_PAGE_SIZE)
+
+    if not isinstance(ix, IX):
+        ix = IX.objects.get(code=ix)
+    ipv4_network = ipaddress.ip_network(ix.ipv4_prefix)
+    ipv6_first_address = ipaddress.ip_network(ix.ipv6_prefix)[0]
+
+    if family == 'ipv4':
+        model, pair_model = IPv4Address, IPv6Address
+        annotate, pair_annotate = (annotate_ipv4_allocation,
+                                   annotate_ipv6_allocation)
+        filter_status = filter_ipv4_status
+
+        def pair(address):
+            return pair_ipv6_address(
+                ipv4_network, ipv6_first_address,
+                ipaddress.IPv4Address(address))
+    else:
+        model, pair_model = IPv6Address, IPv4Address
+        annotate, pair_annotate = (annotate_ipv6_allocation,
+                                   annotate_ipv4_allocation)
+        filter_status = filter_ipv6_status
+
+        def pair(address):
+            return pair_ipv4_address(
+                ipv4_network, ipv6_first_address,
+                ipaddress.IPv6Address(address))
+
+    addresses = annotate(model.objects.filter(ix=ix))
+    if status:
+        addresses = filter_status(addresses, status)
+    if after:
+        addresses = addresses.filter(address__gt=after)
+    addresses = list(addresses.order_by('address')[:limit + 1])
+
+    next_after = None
+    if len(addresses) > limit:
+        addresses = addresses[:limit]
+        next_after = addresses[-1].address
+
+    pair_addresses = {address.address: pair(address.address)
+                      for address in addresses}
+    pairs = {
+        ipaddress.ip_address(address.address): address
+        for address in pair_annotate(pair_model.objects.filter(
+            ix=ix, address__in=[str(pair_address) for pair_address in
+                                pair_addresses.values() if pair_address]))}
+
+    rows = []
+    for address in addresses:
+        paired = pairs.get(pair_addresses[address.address])
+        if family == 'ipv4':
+            ipv4, ipv6 = address, paired
+        else:
+            ipv4, ipv6 = paired, address
+        rows.append({
+            'v4': ipv4,
+            'v4_status': ipv4_status(ipv4),
+            'v6': ipv6,
+            'v6_status': ipv6_status(ipv6),
+        })
+
+    return {'rows': rows, 'next': next_after}
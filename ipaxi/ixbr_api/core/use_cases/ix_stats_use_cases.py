@@ -0,0 +1,116 @@
+from django.db.models import Count
+
+from ..models import (PIX, BilateralPeer, ContactsMap, CustomerChannel,
+                      MLPAv4, MLPAv6, Monitorv4, Port)
+from .tags_use_cases import get_tag_amounts
+
+CHANNEL_PIX = 'channel_port__port__switch__pix'
+SERVICE_PIX = 'customer_channel__' + CHANNEL_PIX
+
+SERVICE_AMOUNTS = (
+    (MLPAv4, 'mlpav4_amount'),
+    (MLPAv6, 'mlpav6_amount'),
+    (BilateralPeer, 'bilateral_amount'),
+    (Monitorv4, 'monitorv4_amount'),
+)
+
+
+def get_ix_stats(**kwargs):
+    """ gets every figure of the IX dashboard
+
+    Each figure comes from aggregate queries grouped by status or by PIX,
+    so the amount of queries does not grow with the IX. The amounts per PIX
+    follow PIX.get_stats_amount() and the ASNs per PIX follow
+    PIX.get_asns().
+
+    Args:
+        ix: kwarg -> the IX
+
+    Returns:
+        dict: {
+            'pixs': Queryset<PIX> of the IX,
+            'tags': {status: amount of tags}, see get_tag_amounts(),
+            'asn_total': amount of ASNs with a ContactsMap in the IX,
+            'mlpav4_total', 'mlpav6_total', 'bilateral_total',
+            'total_available_ports': sums of the PIX figures below,
+            'pix_stats': {PIX pk: {
+                'asns': sorted list of ASN numbers,
+                'mlpav4_amount', 'mlpav6_amount', 'bilateral_amount',
+                'monitorv4_amount', 'cix_amount', 'available_ports'}},
+            'cixs': the same dict returned by IX.get_cix_info()
+        }
+    """
+    ix = kwargs.pop('ix')
+
+    pixs = PIX.objects.filter(ix=ix)
+    pixs_by_pk = {pix.pk: pix for pix in pixs}
+    pix_stats = {}
+    for pix in pixs:
+        pix_stats[pix.pk] = {'asns': set(), 'cix_amount': 0,
+                             'available_ports': 0}
+        pix_stats[pix.pk].update(
+            (amount, 0) for _, amount in SERVICE_AMOUNTS)
+
+    tags = get_tag_amounts(ix=ix)
+
+    asn_total = ContactsMap.objects.filter(ix=ix).order_by().values(
+        'asn').distinct().count()
+
+    # One row per port of each customer channel; the first port (in the
+    # Port ordering) tells the PIX shown for a CIX
+    cixs = {}
+    cix_uuids = set()
+    seen = set()
+    for pix, uuid, asn, cix_type, is_lag, is_mclag in (
+            CustomerChannel.objects.filter(**{CHANNEL_PIX + '__ix': ix})
+            .order_by('asn', 'uuid', 'channel_port__port__switch',
+                      'channel_port__port__name')
+            .values_list(CHANNEL_PIX, 'uuid', 'asn', 'cix_type', 'is_lag',
+                         'is_mclag')):
+        if (pix, uuid) in seen:
+            continue
+        seen.add((pix, uuid))
+        pix_stats[pix]['asns'].add(asn)
+        if cix_type == 0:
+            continue
+        pix_stats[pix]['cix_amount'] += 1
+        if uuid not in cix_uuids:
+            cix_uuids.add(uuid)
+            cixs[str(len(cixs))] = {
+                'uuid': uuid,
+                'number': asn,
+                'is_lag': is_lag,
+                'is_mclag': is_mclag,
+                'pix': pixs_by_pk[pix],
+            }
+
+    for model, amount in SERVICE_AMOUNTS:
+        for pix, asn, services in (
+                model.objects.filter(**{SERVICE_PIX + '__ix': ix})
+                .order_by().values_list(SERVICE_PIX, 'asn')
+                .annotate(services=Count('pk', distinct=True))):
+            pix_stats[pix]['asns'].add(asn)
+            pix_stats[pix][amount] += services
+
+    for pix, ports in (
+            Port.objects.filter(switch__pix__ix=ix, status='AVAILABLE')
+            .order_by().values_list('switch__pix')
+            .annotate(ports=Count('pk'))):
+        pix_stats[pix]['available_ports'] = ports
+
+    for stats in pix_stats.values():
+        stats['asns'] = sorted(stats['asns'])
+
+    return {
+        'pixs': pixs,
+        'tags': tags,
+        'asn_total': asn_total,
+        'mlpav4_total': sum(s['mlpav4_amount'] for s in pix_stats.values()),
+        'mlpav6_total': sum(s['mlpav6_amount'] for s in pix_stats.values()),
+        'bilateral_total': sum(
+            s['bilateral_amount'] for s in pix_stats.values()),
+        'total_available_ports': sum(
+            s['available_ports'] for s in pix_stats.values()),
+        'pix_stats': pix_stats,
+        'cixs': cixs,
+    }
@@ -1,7 +1,8 @@
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
-from ..models import Channel, SwitchPortRange, create_all_ports
+from ..models import (Channel, SwitchPortRange, batch_writes,
+                      create_all_ports)
 from ..utils.constants import SWITCH_MODEL_CHANNEL_PREFIX
 
 
@@ -30,6 +31,9 @@ def __migrate_switch_ports(old_switch, new_switch):
         unavailable_ports[i].switch = new_switch
         unavailable_ports[i].save()
 
+    # The moved ports are written before the ones left are deleted
+    with batch_writes() as batch:
+        batch.flush()
     old_switch.port_set.all().delete()
     if old_switch.create_ports:
         create_all_ports(old_switch)
@@ -49,6 +53,7 @@ def __update_names_of_connected_channels(old_switch, new_switch):
         channel.save()
 
 
+@batch_writes()
 def migrate_switch(old_switch, new_switch):
     """ Migrates this switch to a new switch.
     All ports from this switch are migrated to the new switch.
@@ -1,4 +1,10 @@
-from ..models import DownlinkChannel, Switch, UplinkChannel
+from collections import deque
+
+from django.db.models import Q
+
+from ..models import DownlinkChannel, Port, Switch, UplinkChannel
+from ..utils.switch_topology import (get_cached_switch_topology,
+                                     set_cached_switch_topology)
 
 
 def next_switch(**kwargs):
@@ -25,9 +31,108 @@ def next_switch(**kwargs):
 
     return switches
 
+
+def build_switch_topology():
+    """ Builds the uplink/downlink graph of every switch and the route of
+    each switch to its PE
+
+    The graph is small (only uplink and downlink channels are edges), so it
+    is read in four queries and every BFS is done in memory.
+
+    Returns:
+        dict: 'routes' maps the pk of each non PE switch that reaches a PE
+            to a tuple (pk of the PE switch, pk of the DownlinkChannel to
+            get it). Only primary keys are kept, so the cached topology does
+            not hold stale instances.
+    """
+    pe_switches = set(
+        Switch.objects.filter(is_pe=True).values_list('pk', flat=True))
+
+    # The switches of each channel port follow Port.Meta.ordering, so the
+    # downlink of a MC-LAG leads to its first switch, as in next_switch()
+    switches_by_channel_port = {}
+    for channel_port, switch in Port.objects.filter(
+            Q(channel_port__uplinkchannel__isnull=False) |
+            Q(channel_port__downlinkchannel__isnull=False),
+            switch__isnull=False).values_list('channel_port', 'switch'):
+        switches = switches_by_channel_port.setdefault(channel_port, [])
+        if switch not in switches:
+            switches.append(switch)
+
+    neighbours = {}
+    for uplink_port, downlink, downlink_port in (
+            UplinkChannel.objects.values_list(
+                'channel_port', 'downlink_channel',
+                'downlink_channel__channel_port')):
+        if not switches_by_channel_port.get(downlink_port):
+            continue
+        next_switch_pk = switches_by_channel_port[downlink_port][0]
+        for switch in switches_by_channel_port.get(uplink_port, []):
+            neighbours.setdefault(switch, []).append(
+                (next_switch_pk, downlink))
+
+    routes = {}
+    for origin in neighbours:
+        if origin in pe_switches:
+            continue
+        visited = {origin}
+        queue = deque(neighbours[origin])
+        while queue:
+            switch, downlink = queue.popleft()
+            if switch in visited:
+                continue
+            visited.add(switch)
+            if switch in pe_switches:
+                routes[origin] = (switch, downlink)
+                break
+            queue.extend(neighbours.get(switch, []))
+
+    return {'routes': routes}
+
+
+def get_switch_topology():
+    """ Returns the switch topology of build_switch_topology(), from the
+    cache when it is there. It is invalidated when a Switch, ChannelPort,
+    UplinkChannel or DownlinkChannel changes, and when a Port is moved to
+    another switch or channel.
+
+    This funciton is dependent of the following functions:
+        build_switch_topology
+    """
+    topology = get_cached_switch_topology()
+    if topology is None:
+        topology = build_switch_topology()
+        set_cached_switch_topology(topology)
+    return topology
+
+
+def get_pe_route(**kwargs):
+    """ gets the PE reached from a switch that is not a PE
+
+    Args:
+        switch: kwarg -> the pk of the origin Switch
+
+    Returns:
+        tuple (int, DownlinkChannel): the pk of the is_pe Switch and the
+            DownlinkChannel to get it, or None if no PE is reached
+
+    This funciton is dependent of the following functions:
+        get_switch_topology
+    """
+    switch = kwargs.pop('switch')
+    route = get_switch_topology()['routes'].get(switch)
+    if route is None:
+        return None
+    return route[0], DownlinkChannel.objects.select_related(
+        'channel_port').get(pk=route[1])
+
+
 def bfs_switch(**kwargs):
     """ Breadth-first search for switch to find the PE node
 
+    The search is done once for every switch when the switch topology is
+    built, so this is a lookup in it.
+
     Args:
         origin_vertex: kwarg -> A Switch Model object
 
@@ -36,18 +141,17 @@ def bfs_switch(**kwargs):
             and the DownlinkChannel to get it.
 
     This funciton is dependent of the following functions:
-        next_switch
+        get_pe_route
     """
     origin_vertex = kwargs.pop('origin_vertex')
-    checklist = set()
-    checklist.add((origin_vertex, None))
-    while len(checklist) > 0:
-        current_vertex = checklist.pop()
-        if current_vertex[0].is_pe:
-            return current_vertex
-        else:
-            [checklist.add(switch_and_downlink)
-                for switch_and_downlink in next_switch(switch=current_vertex[0])]
+    if origin_vertex.is_pe:
+        return origin_vertex, None
+
+    route = get_pe_route(switch=origin_vertex.pk)
+    if route is None:
+        return None
+    pe_switch, downlink = route
+    return Switch.objects.get(pk=pe_switch), downlink
 
 
 def get_pe_channel_by_channel(**kwargs):
@@ -61,23 +165,21 @@ def get_pe_channel_by_channel(**kwargs):
         DownlinkChannel: The is_pe Switch's DownlinkChannel
 
     This funciton is dependent of the following functions:
-        bfs_switch
-        next_switch
+        get_pe_route
     """
     channel = kwargs.pop('channel')
     ix = kwargs.pop('ix')
 
-    switch = Switch.objects.filter(
-        port__pk__in=channel.channel_port.port_set.values_list(
-            'pk', flat=True), pix__ix=ix)
+    switches = list(Switch.objects.filter(
+        port__channel_port=channel.channel_port_id,
+        pix__ix=ix).values_list('pk', 'is_pe'))
 
-    pe = switch.filter(is_pe=True)
-    if pe:
+    if any(is_pe for _, is_pe in switches):
         return channel
-    else:
-        switch = switch.first()
-        channel = bfs_switch(origin_vertex=switch)
+    elif not switches:
+        return []
 
-        if not channel:
-            return []
-        return channel[1]
+    route = get_pe_route(switch=switches[0][0])
+    if not route:
+        return []
+    return route[1]
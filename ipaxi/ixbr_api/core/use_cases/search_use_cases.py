@@ -1,17 +1,72 @@
+import re
+
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 from django.db.models import Q
 
-from ..models import CustomerChannel, MACAddress
+from ..models import (ASN, BilateralPeer, CustomerChannel, MACAddress,
+                      MLPAv4, MLPAv6, Monitorv4, Tag, normalize_mac_search)
+
+MAC_SEARCH_PATTERN = re.compile(r'^[0-9a-fA-F:.\-]+$')
+
 
 def search_customer_channel_by_mac_address(**kwargs):
 
-	address = kwargs.pop('address')
-	channels = CustomerChannel.objects.filter(
-		Q(mlpav4__mac_addresses__address=address)|
-		Q(mlpav6__mac_addresses__address=address)|
-		Q(monitorv4__mac_addresses__address=address)|
-		Q(bilateralpeer__mac_addresses__address=address))
+    address = kwargs.pop('address')
+    channels = CustomerChannel.objects.filter(
+        Q(pk__in=MLPAv4.objects.filter(
+            mac_addresses=address).values('customer_channel')) |
+        Q(pk__in=MLPAv6.objects.filter(
+            mac_addresses=address).values('customer_channel')) |
+        Q(pk__in=Monitorv4.objects.filter(
+            mac_addresses=address).values('customer_channel')) |
+        Q(pk__in=BilateralPeer.objects.filter(
+            mac_addresses=address).values('customer_channel')))
+
+    return set(channels)
+
+
+def search_mac_addresses(search):
+    """ Searches MAC addresses by any part of them, ignoring case and
+    separators. It uses the trigram index of MACAddress.search_address.
+
+    Args:
+        search: part of a mac address, like 'aabb', 'AA:BB' or 'aabb.cc'
+
+    Returns:
+        QuerySet of MACAddress
+    """
+    return MACAddress.objects.filter(
+        search_address__contains=normalize_mac_search(search))
+
+
+def search_services_q(search, model, prefix=''):
+    """ Builds the filter of the services whose ASN number, tag or one of
+    the MAC addresses contains search. Numbers are matched as text
+    through the trigram indexes of ASN.number and Tag.tag, so they are
+    looked up in subqueries over core_asn and core_tag: a lookup through
+    the foreign key would compare the asn_id and join core_tag instead.
+
+    Args:
+        search: the searched text
+        model: the Service subclass searched
+        prefix: lookup path from the filtered model to the service, like
+            'peer_a__' to filter Bilaterals by its peer_a
+
+    Returns:
+        Q, that matches nothing when search can not be part of an ASN,
+        tag or mac address
+    """
+    q = Q(**{prefix + 'pk__in': []})
+
+    if search.isdigit():
+        q |= Q(**{prefix + 'asn__in': ASN.objects.filter(
+            number__contains=search).values('pk')})
+        q |= Q(**{prefix + 'tag__in': Tag.objects.filter(
+            tag__contains=search).values('pk')})
 
-	return set(channels)
+    if MAC_SEARCH_PATTERN.match(search) and normalize_mac_search(search):
+        q |= Q(**{prefix + 'pk__in': search_mac_addresses(search).values(
+            model._meta.model_name)})
 
+    return q
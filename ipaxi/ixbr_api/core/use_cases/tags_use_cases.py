@@ -1,12 +1,213 @@
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db.models import Case, Count, Q, When
 from django.utils.translation import gettext as _
 
-from ..models import (IX, BilateralPeer, MLPAv4, MLPAv6, Monitorv4, Tag,
-                      create_tag_by_channel_port)
-from ..utils.constants import MAX_TAG_NUMBER, MIN_TAG_NUMBER
+from ..models import (IX, BilateralPeer, ChannelPort, MLPAv4, MLPAv6,
+                      Monitorv4, Tag)
+from ..utils.constants import (MAX_TAG_NUMBER, MIN_TAG_NUMBER,
+                               TAGS_BORN_ALLOCATED)
+from ..utils.tag_bitmap import (TagBitmap, get_cached_inner_tag_bitmap,
+                                get_cached_tag_bitmaps,
+                                set_cached_inner_tag_bitmap,
+                                set_cached_tag_bitmaps)
 from .network_use_cases import get_pe_channel_by_channel
 
 
+def get_tag_domain(**kwargs):
+    """ gets the tag_domain where the tags of a given channel live
+
+    Args:
+        ix: kwarg -> the owner IX
+        channel: kwargs -> Origin Channel
+
+    Returns:
+        ChannelPort: the PE ChannelPort or None if ix is ix_managed or
+        there is no PE
+
+    This funciton is dependent of the following functions:
+        get_pe_channel_by_channel
+    """
+    ix = kwargs.pop('ix')
+    channel = kwargs.pop('channel')
+
+    if ix.tags_policy == 'ix_managed':
+        return None
+    pe_channel = get_pe_channel_by_channel(channel=channel, ix=ix)
+    return pe_channel.channel_port if pe_channel else None
+
+
+def get_ix_tag_bitmaps(**kwargs):
+    """ gets the occupancy bitmaps shared by every tag domain of an IX,
+    building and caching them when they are not cached yet
+
+    Args:
+        ix: kwarg -> the owner IX
+
+    Returns:
+        dict of TagBitmap:
+            'bilateral': tags used by a BilateralPeer or reserved in the IX
+            'all_service': tags in PRODUCTION or reserved in the IX
+    """
+    ix = kwargs.pop('ix')
+
+    bitmaps = get_cached_tag_bitmaps(ix.pk)
+    if 'ix' not in bitmaps:
+        bitmaps['ix'] = {
+            'bilateral': TagBitmap(Tag.objects.filter(
+                Q(bilateralpeer__isnull=False) | Q(reserved=True),
+                ix=ix).values_list('tag', flat=True).distinct()).bits,
+            'all_service': TagBitmap(Tag.objects.filter(
+                Q(status='PRODUCTION') | Q(reserved=True),
+                ix=ix).values_list('tag', flat=True)).bits,
+        }
+        set_cached_tag_bitmaps(ix.pk, bitmaps)
+
+    return {kind: TagBitmap(bits=bits)
+            for kind, bits in bitmaps['ix'].items()}
+
+
+def get_tag_bitmaps(**kwargs):
+    """ gets the occupancy bitmaps of a tag domain, building and caching
+    them when they are not cached yet
+
+    Args:
+        ix: kwarg -> the owner IX
+        tag_domain: kwarg -> ChannelPort or None
+
+    Returns:
+        dict of TagBitmap: the get_ix_tag_bitmaps ones and
+            'not_available': tags without an AVAILABLE Tag in the domain
+            'existing': tags with a Tag in the domain (and 0 and 1)
+
+    This funciton is dependent of the following functions:
+        get_ix_tag_bitmaps
+    """
+    ix = kwargs.pop('ix')
+    tag_domain = kwargs.pop('tag_domain')
+    domain_key = 'ix_managed' if ix.tags_policy == 'ix_managed' else str(
+        getattr(tag_domain, 'pk', None))
+
+    ix_bitmaps = get_ix_tag_bitmaps(ix=ix)
+
+    bitmaps = get_cached_tag_bitmaps(ix.pk)
+    if domain_key not in bitmaps:
+        # ix_managed tags are looked up in the whole IX, as get_free_tags
+        domain_tags = Tag.objects.filter(ix=ix)
+        if domain_key != 'ix_managed':
+            domain_tags = domain_tags.filter(tag_domain=tag_domain)
+        existing = TagBitmap(TAGS_BORN_ALLOCATED)
+        available = TagBitmap()
+        for tag, status in domain_tags.values_list('tag', 'status'):
+            existing.occupy(tag)
+            if status == 'AVAILABLE':
+                available.occupy(tag)
+        bitmaps[domain_key] = {'not_available': (~available).bits,
+                               'existing': existing.bits}
+        set_cached_tag_bitmaps(ix.pk, bitmaps)
+
+    ix_bitmaps.update({kind: TagBitmap(bits=bits)
+                       for kind, bits in bitmaps[domain_key].items()})
+    return ix_bitmaps
+
+
+def get_tag_allocation_bitmap(**kwargs):
+    """ gets the bitmap of the tags that can't be allocated to a channel
+
+    Args:
+        ix: kwarg -> the owner IX
+        channel: kwargs -> Origin Channel
+        without: kwargs -> 'bilateral', 'all_service' or None: tags used
+            in the whole IX by this kind of service are not free
+        create: kwargs -> Bool, if True, tags without a Tag instance
+            are free, as they are instantiated when allocated
+
+    Returns:
+        TagBitmap: bitmap where a free bit is a free tag
+    """
+    ix = kwargs.pop('ix')
+    channel = kwargs.pop('channel')
+    without = kwargs.pop('without', None)
+    create = kwargs.pop('create', False)
+
+    if type(ix) is str:
+        ix = IX.objects.get(pk=ix)
+
+    bitmaps = get_tag_bitmaps(
+        ix=ix, tag_domain=get_tag_domain(ix=ix, channel=channel))
+    used = bitmaps['not_available']
+    if create:
+        used = used & bitmaps['existing']
+    if without:
+        used = used | bitmaps[without]
+    return used
+
+
+def get_next_free_tag(**kwargs):
+    """ gets the lowest free tag number of a channel, without creating
+    Tag instances
+
+    Args:
+        ix: kwarg -> the owner IX
+        channel: kwargs -> Origin Channel
+        without: kwargs -> 'bilateral', 'all_service' or None
+        create: kwargs -> Bool, consider tags without Tag instance as free
+        start: kwargs -> Integer, first tag to be considered
+
+    Returns:
+        Integer: the tag number or None if there's no free tag
+
+    This funciton is dependent of the following functions:
+        get_tag_allocation_bitmap
+    """
+    start = kwargs.pop('start', MIN_TAG_NUMBER)
+    return get_tag_allocation_bitmap(**kwargs).next_free(start)
+
+
+def is_tag_free(**kwargs):
+    """ Check if a tag number can be allocated to a channel
+
+    Args:
+        ix: kwarg -> the owner IX
+        channel: kwargs -> Origin Channel
+        tag_number: kwargs -> Integer
+        without: kwargs -> 'bilateral', 'all_service' or None
+        create: kwargs -> Bool, consider tags without Tag instance as free
+
+    Returns:
+        Bool: True if tag_number is free
+
+    This funciton is dependent of the following functions:
+        get_tag_allocation_bitmap
+    """
+    tag_number = kwargs.pop('tag_number')
+    return get_tag_allocation_bitmap(**kwargs).is_free(tag_number)
+
+
+def get_free_tag_numbers(**kwargs):
+    """ gets the free tag numbers of a channel in a range
+
+    Args:
+        ix: kwarg -> the owner IX
+        channel: kwargs -> Origin Channel
+        without: kwargs -> 'bilateral', 'all_service' or None
+        create: kwargs -> Bool, consider tags without Tag instance as free
+        begin: kwargs -> Integer, first tag of the range
+        end: kwargs -> Integer, last tag of the range
+        limit: kwargs -> Integer, max amount of tags returned
+
+    Returns:
+        list of Integer: the free tags in ascending order
+
+    This funciton is dependent of the following functions:
+        get_tag_allocation_bitmap
+    """
+    begin = kwargs.pop('begin', MIN_TAG_NUMBER)
+    end = kwargs.pop('end', MAX_TAG_NUMBER)
+    limit = kwargs.pop('limit', None)
+    return get_tag_allocation_bitmap(**kwargs).free_in_range(
+        begin, end, limit)
+
+
 def get_free_tags(**kwargs):
     """ gets the free TAGs to be used in a given channel
 
@@ -15,7 +216,9 @@ def get_free_tags(**kwargs):
         channel: kwargs -> Origin Channel
 
     Returns:
-        Queryset<Tag>: Queryset conataining free Tags
+        Queryset<Tag>: Queryset conataining the free Tags that already have
+        an instance. Tags that were never allocated have none, see
+        instantiate_free_tag
 
     This funciton is dependent of the following functions:
         get_pe_channel_by_channel
@@ -42,61 +245,189 @@ def get_free_tags(**kwargs):
             tag_domain=tag_domain,
             status='AVAILABLE').order_by('tag')
 
-        if channel.channel_port.tags_type == 'Direct-Bundle-Ether':
-            if len(free_tags) <= 1 and pe_channel:
-                if(Tag.objects.filter(tag_domain=tag_domain).count() <=
-                        MAX_TAG_NUMBER - MIN_TAG_NUMBER):
-                    create_tag_by_channel_port(tag_domain, False, 2)
-                    free_tags = get_free_tags(ix=ix, channel=channel)
-
     return free_tags
 
 
+def get_uninstantiated_tag_numbers(**kwargs):
+    """ gets the tag numbers of a tag domain that have no Tag instance.
+    They are AVAILABLE and not reserved, as tags are only instantiated when
+    they are allocated
+
+    Args:
+        ix: kwarg -> the owner IX
+        tag_domain: kwargs -> ChannelPort or None
+
+    Returns:
+        list of Integer: the tag numbers in ascending order. It is empty
+        when ix is not ix_managed and there's no tag_domain
+
+    This funciton is dependent of the following functions:
+        get_tag_bitmaps
+    """
+    ix = kwargs.pop('ix')
+    tag_domain = kwargs.pop('tag_domain')
+
+    if type(ix) is str:
+        ix = IX.objects.get(pk=ix)
+
+    if ix.tags_policy != 'ix_managed' and tag_domain is None:
+        return []
+    return get_tag_bitmaps(
+        ix=ix, tag_domain=tag_domain)['existing'].free_in_range()
+
+
+def get_uninstantiated_tag_domains(**kwargs):
+    """ gets the tag domains of an IX where a tag number has no Tag
+    instance, so the tag is AVAILABLE there
+
+    Args:
+        ix: kwarg -> the owner IX
+        tag_number: kwargs -> Integer
+
+    Returns:
+        list: the ChannelPorts with Tags in the IX, or [None] for the whole
+        IX when ix is ix_managed
+    """
+    ix = kwargs.pop('ix')
+    tag_number = kwargs.pop('tag_number')
+
+    if (tag_number < MIN_TAG_NUMBER or tag_number > MAX_TAG_NUMBER or
+            tag_number in TAGS_BORN_ALLOCATED):
+        return []
+
+    tags = Tag.objects.filter(ix=ix, tag=tag_number)
+    if ix.tags_policy == 'ix_managed':
+        return [] if tags.exists() else [None]
+    return list(ChannelPort.objects.filter(tag__ix=ix).exclude(
+        pk__in=tags.filter(tag_domain__isnull=False).values(
+            'tag_domain')).distinct())
+
+
+def get_tag_amounts(**kwargs):
+    """ counts the tags of an IX by status. As in get_tag_bitmaps, the tags
+    without a Tag instance are AVAILABLE, or ALLOCATED if they are born
+    allocated, so every tag domain has MAX_TAG_NUMBER - MIN_TAG_NUMBER + 1
+    tags. The amount of queries does not grow with the tag domains.
+
+    Args:
+        ix: kwarg -> the owner IX
+        tag_domain: kwargs -> ChannelPort to count only its tags, or None to
+            count every tag domain of the IX
+
+    Returns:
+        dict: {status: amount of tags}
+    """
+    ix = kwargs.pop('ix')
+    tag_domain = kwargs.pop('tag_domain', None)
+
+    tags = Tag.objects.filter(ix=ix).order_by()
+    if ix.tags_policy == 'ix_managed':
+        tag_domain = None
+    elif tag_domain is not None:
+        tags = tags.filter(tag_domain=tag_domain)
+    amounts = dict(tags.values_list('status').annotate(amount=Count('pk')))
+
+    # Tags born allocated with an instance, by tag domain
+    if ix.tags_policy == 'ix_managed':
+        born = {None: tags.filter(tag__in=TAGS_BORN_ALLOCATED).count()}
+    else:
+        born = dict(tags.values_list('tag_domain').annotate(born=Count(
+            Case(When(tag__in=TAGS_BORN_ALLOCATED, then=1)))))
+        if tag_domain is not None:
+            born.setdefault(tag_domain.pk, 0)
+
+    uninstantiated = (len(born) * (MAX_TAG_NUMBER - MIN_TAG_NUMBER + 1) -
+                      sum(amounts.values()))
+    born_uninstantiated = (len(born) * len(TAGS_BORN_ALLOCATED) -
+                           sum(born.values()))
+    amounts['ALLOCATED'] = amounts.get('ALLOCATED', 0) + born_uninstantiated
+    amounts['AVAILABLE'] = (amounts.get('AVAILABLE', 0) + uninstantiated -
+                            born_uninstantiated)
+    return amounts
+
+
 def instantiate_tag(**kwargs):
     """ create a tag instance
 
     Args:
         ix: kwarg -> the owner IX
         channel: kwargs -> Origin Channel
+        tag_domain: kwargs -> ChannelPort or None, the tag domain used when
+            there's no channel
         tag_number: kwargs:Integer -> the tag.tag to be created
+        last_ticket: kwargs -> Integer, by default the one of the channel
+        modified_by: kwargs -> User, by default the one of the channel
 
     Returns:
-        Tag: tag instance
+        Tag: tag instance or None if it already exists
 
     This funciton is dependent of the following functions:
-        get_pe_by_channel
+        get_tag_domain
     """
 
-    channel = kwargs.pop('channel')
+    channel = kwargs.pop('channel', None)
     tag_number = kwargs.pop('tag_number')
     ix = kwargs.pop('ix')
     if type(ix) == str:
         ix = IX.objects.get(pk=ix)
 
+    if channel:
+        tag_domain = get_tag_domain(ix=ix, channel=channel)
+    else:
+        tag_domain = kwargs.pop('tag_domain', None)
+    last_ticket = kwargs.pop('last_ticket', None) or channel.last_ticket
+    modified_by = kwargs.pop('modified_by', None) or channel.modified_by
+    # ix_managed tags are looked up in the whole IX, as get_free_tags
+    tags = Tag.objects.filter(ix=ix, tag=tag_number)
     if not ix.tags_policy == 'ix_managed':
-        pe_channel = get_pe_channel_by_channel(channel=channel, ix=ix)
-        tag_domain = pe_channel.channel_port if pe_channel else None
-        tag = Tag.objects.filter(
-            ix=ix,
-            tag_domain=tag_domain).order_by('tag').filter(tag=tag_number)
-        if not tag:
-            if tag_number == 0 or tag_number == 1:
-                status = 'ALLOCATED'
-            else:
-                status = 'AVAILABLE'
-            tag = Tag.objects.create(
-                tag=tag_number, last_ticket=channel.last_ticket,
-                modified_by=channel.modified_by, ix=ix,
-                tag_domain=tag_domain, status=status)
-            tag.save()
-            return tag
-        else:
-            return None
+        tags = tags.filter(tag_domain=tag_domain)
+    if tags.exists():
+        return None
+
+    if tag_number in TAGS_BORN_ALLOCATED:
+        status = 'ALLOCATED'
+    else:
+        status = 'AVAILABLE'
+    return Tag.objects.create(
+        tag=tag_number, last_ticket=last_ticket,
+        modified_by=modified_by, ix=ix,
+        tag_domain=tag_domain, status=status)
+
+
+def instantiate_free_tag(**kwargs):
+    """ create the instance of the lowest free tag that has none, as tags
+    are only instantiated when they are allocated
+
+    Args:
+        ix: kwarg -> the owner IX
+        channel: kwargs -> Origin Channel
+        without: kwargs -> 'bilateral', 'all_service' or None
+
+    Returns:
+        Queryset<Tag>: Queryset containing the new Tag or empty if there's
+        no free tag
+
+    This funciton is dependent of the following functions:
+        get_next_free_tag, instantiate_tag
+    """
+    ix = kwargs.pop('ix')
+    channel = kwargs.pop('channel')
+    without = kwargs.pop('without', None)
+
+    tag_number = get_next_free_tag(
+        ix=ix, channel=channel, without=without, create=True)
+    tag = None
+    if tag_number is not None:
+        tag = instantiate_tag(channel=channel, ix=ix, tag_number=tag_number)
+    if tag:
+        return Tag.objects.filter(pk=tag.pk)
+    return Tag.objects.none()
 
 
 def get_tag_without_bilateral(**kwargs):
     """ gets all the free TAGs in a given Channel, that their tag attribute
     don't be the same to other TAG used by a Bilateral in the given IX.
+    If there's no an instance of free TAG, then, this instantiate it
 
     Args:
         ix: kwarg -> the owner IX
@@ -106,20 +437,22 @@ def get_tag_without_bilateral(**kwargs):
         Queryset<Tag>: Queryset conataining free Tags
 
     This funciton is dependent of the following functions:
-        get_free_tags
+        get_free_tags, instantiate_free_tag
     """
     ix = kwargs.pop('ix')
     channel = kwargs.pop('channel')
 
+    if type(ix) is str:
+        ix = IX.objects.get(pk=ix)
+
     channel_available_tags = get_free_tags(ix=ix, channel=channel)
-    bilateral_used_tags = Tag.objects.filter(
-        Q(bilateralpeer__in=list(BilateralPeer.objects.all()))
-        | Q(reserved=True),
-        ix=ix,
-    )
+    bilateral_used_tags = get_ix_tag_bitmaps(ix=ix)['bilateral'].used_tags()
+
+    free_tags = channel_available_tags.exclude(tag__in=bilateral_used_tags)
 
-    free_tags = channel_available_tags.exclude(
-        tag__in=bilateral_used_tags.values_list('tag', flat=True))
+    if not free_tags:
+        free_tags = instantiate_free_tag(
+            ix=ix, channel=channel, without='bilateral')
 
     return free_tags
 
@@ -137,28 +470,23 @@ def get_tag_without_all_service(**kwargs):
         Queryset<Tag>: Queryset conataining free Tags
 
     This funciton is dependent of the following functions:
-        get_free_tags, instantiate_tag
+        get_free_tags, instantiate_free_tag
     """
     ix = kwargs.pop('ix')
     channel = kwargs.pop('channel')
-    all_tags = set(range(1, 4097))
+
+    if type(ix) is str:
+        ix = IX.objects.get(pk=ix)
 
     channel_available_tags = get_free_tags(ix=ix, channel=channel)
-    all_ix_used_tags = Tag.objects.filter(
-        Q(status='PRODUCTION') | Q(reserved=True),
-        ix=ix
-    )
-
-    free_tags = channel_available_tags.exclude(
-        tag__in=all_ix_used_tags.values_list('tag', flat=True))
-
-    if(not free_tags and len(all_ix_used_tags) <=
-            MAX_TAG_NUMBER - MIN_TAG_NUMBER):
-        tags_to_create = all_tags - \
-            set(all_ix_used_tags.values_list('tag', flat=True))
-        tag = list(tags_to_create)[0]
-        free_tags = instantiate_tag(channel=channel, ix=ix, tag_number=tag)
-        free_tags = Tag.objects.filter(pk=free_tags.pk)
+    all_ix_used_tags = get_ix_tag_bitmaps(
+        ix=ix)['all_service'].used_tags()
+
+    free_tags = channel_available_tags.exclude(tag__in=all_ix_used_tags)
+
+    if not free_tags:
+        free_tags = instantiate_free_tag(
+            ix=ix, channel=channel, without='all_service')
 
     return free_tags
 
@@ -173,10 +501,11 @@ def get_or_create_specific_tag_without_all_service(**kwargs):
         tag_number
 
     Returns:
-        Tag: Tag object
+        Tag: Tag object, 0 if the tag is used in the channel or None if
+        it can't be allocated
 
     This funciton is dependent of the following functions:
-        get_free_tags, instantiate_tag, get_tag_without_all_services
+        get_free_tags, instantiate_tag, is_tag_free
     """
     ix = kwargs.pop('ix')
     channel = kwargs.pop('channel')
@@ -196,11 +525,14 @@ def get_or_create_specific_tag_without_all_service(**kwargs):
 
     if used_tags.filter(tag=tag_number):
         return 0
+    elif not is_tag_free(ix=ix, channel=channel, tag_number=tag_number,
+                         without='all_service', create=True):
+        return None
     else:
-        free_tags = get_tag_without_all_service(
-            ix=ix, channel=channel)
-        if free_tags.filter(tag=tag_number):
-            return free_tags.get(tag=tag_number)
+        free_tags = get_free_tags(
+            ix=ix, channel=channel).filter(tag=tag_number)
+        if free_tags:
+            return free_tags.first()
         else:
             tag = instantiate_tag(
                 channel=channel, ix=ix, tag_number=tag_number)
@@ -217,10 +549,11 @@ def get_or_create_specific_tag_without_bilateral(**kwargs):
         tag_number
 
     Returns:
-        Tag: Tag object
+        Tag: Tag object, 0 if the tag is used in the channel or None if
+        it can't be allocated
 
     This funciton is dependent of the following functions:
-        get_free_tags, instantiate_tag, get_tag_without_all_services
+        get_free_tags, instantiate_tag, is_tag_free
     """
     ix = kwargs.pop('ix')
     channel = kwargs.pop('channel')
@@ -240,42 +573,72 @@ def get_or_create_specific_tag_without_bilateral(**kwargs):
 
     if used_tags.filter(tag=tag_number):
         return 0
+    elif not is_tag_free(ix=ix, channel=channel, tag_number=tag_number,
+                         without='bilateral', create=True):
+        return None
     else:
-        free_tags = get_tag_without_bilateral(
-            ix=ix, channel=channel)
-        if free_tags.filter(tag=tag_number):
-            return free_tags.get(tag=tag_number)
+        free_tags = get_free_tags(
+            ix=ix, channel=channel).filter(tag=tag_number)
+        if free_tags:
+            return free_tags.first()
         else:
             tag = instantiate_tag(
                 channel=channel, ix=ix, tag_number=tag_number)
             return tag
 
 
+def get_inner_tag_bitmap(**kwargs):
+    """ gets the bitmap of the inner tags used in a given outer tag,
+    building and caching it when it is not cached yet. Only the inner
+    numbers are read, no service instance is loaded.
+
+    Args:
+        tag: Tag object
+
+    Returns:
+        TagBitmap: bitmap where a used bit is an used inner tag
+    """
+    tag = kwargs.pop('tag')
+
+    bits = get_cached_inner_tag_bitmap(tag.pk)
+    if bits is None:
+        inners = TagBitmap()
+        for service_class in (MLPAv4, MLPAv6, BilateralPeer, Monitorv4):
+            for inner in service_class.objects.filter(
+                    tag=tag, inner__isnull=False).values_list(
+                        'inner', flat=True):
+                inners.occupy(inner)
+        bits = inners.bits
+        set_cached_inner_tag_bitmap(tag.pk, bits)
+
+    return TagBitmap(bits=bits)
+
+
 def check_inner_tag_availability(**kwargs):
     """ Check if a given inner tag is available in a
         given outer tag
 
     Args:
-        inner: int
+        inner: int or str with the inner tag number
         tag: Tag object
 
     Returns:
         Bool: True if inner available
               False if inner unavailable
+
+    Raises:
+        ValidationError: if inner is not a number
+
+    This funciton is dependent of the following functions:
+        get_inner_tag_bitmap
     """
 
-    inner = kwargs.pop('inner')
+    try:
+        inner = int(kwargs.pop('inner'))
+    except (TypeError, ValueError):
+        raise ValidationError(_("Invalid inner tag"))
     tag = kwargs.pop('tag')
-    used_inners = [item.inner for item in [
-        *MLPAv4.objects.filter(tag=tag),
-        *MLPAv6.objects.filter(tag=tag),
-        *BilateralPeer.objects.filter(tag=tag),
-        *Monitorv4.objects.filter(tag=tag)]]
-    check_inner = inner in used_inners
-    if check_inner:
-        return False
-    else:
-        return True
+    return get_inner_tag_bitmap(tag=tag).is_free(inner)
 
 
 def get_available_inner_tag(**kwargs):
@@ -284,17 +647,37 @@ def get_available_inner_tag(**kwargs):
 
     Args:
         tag: Tag object
+        start: kwargs -> Integer, first inner tag to be considered
 
     Returns:
-        Int: the inner tag number
+        Int: the inner tag number or None if every inner is used
+
+    This funciton is dependent of the following functions:
+        get_inner_tag_bitmap
     """
 
     tag = kwargs.pop('tag')
-    used_inners = [item.inner for item in [
-        *MLPAv4.objects.filter(tag=tag),
-        *MLPAv6.objects.filter(tag=tag),
-        *BilateralPeer.objects.filter(tag=tag),
-        *Monitorv4.objects.filter(tag=tag)]]
-    for i in range(1, 4097):
-        if i not in used_inners:
-            return i
+    start = kwargs.pop('start', 1)
+    return get_inner_tag_bitmap(tag=tag).next_free(start)
+
+
+def get_common_available_inner_tag(**kwargs):
+    """ Get the lowest inner tag available in both given outer tags
+
+    Args:
+        tag_a: Tag object
+        tag_b: Tag object
+        start: kwargs -> Integer, first inner tag to be considered
+
+    Returns:
+        Int: the inner tag number or None if there's no common inner
+
+    This funciton is dependent of the following functions:
+        get_inner_tag_bitmap
+    """
+
+    tag_a = kwargs.pop('tag_a')
+    tag_b = kwargs.pop('tag_b')
+    start = kwargs.pop('start', 1)
+    return (get_inner_tag_bitmap(tag=tag_a) |
+            get_inner_tag_bitmap(tag=tag_b)).next_free(start)
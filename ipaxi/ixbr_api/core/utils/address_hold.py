@@ -0,0 +1,30 @@
+from django.core.cache import cache
+
+IP_HOLD_CACHE_KEY = 'ip_hold:{}:{}'
+IP_HOLD_TIMEOUT = 5 * 60
+
+
+def get_address_holder(ix, address):
+    """ Returns who holds the address, or None if it is not held or the
+    cache is unavailable """
+    return cache.get(IP_HOLD_CACHE_KEY.format(ix, address))
+
+
+def hold_address(ix, address, holder):
+    """ Holds the address to holder for IP_HOLD_TIMEOUT seconds, so it is not
+    suggested to other operators while the service form is being filled.
+
+    Returns: True if the address was free or already held by holder, False
+    if another holder got it first. When the cache is unavailable nothing is
+    held and every address is free.
+    """
+    key = IP_HOLD_CACHE_KEY.format(ix, address)
+    if cache.add(key, holder, IP_HOLD_TIMEOUT):
+        return True
+    # add() also fails when the cache ignores its errors, and then get()
+    # finds no holder
+    return get_address_holder(ix, address) in (None, holder)
+
+
+def release_address(ix, address):
+    cache.delete(IP_HOLD_CACHE_KEY.format(ix, address))
@@ -69,8 +69,32 @@ SWITCH_MODEL_CHANNEL_PREFIX = {
 MAX_TAG_NUMBER = 4095
 MIN_TAG_NUMBER = 0
 
+# Tags created as ALLOCATED with their domain, every other Tag is only
+# created when it is allocated
+TAGS_BORN_ALLOCATED = (0, 1)
+
+# Rows per INSERT statement used by bulk provisioning (IPs, tags, history)
+BULK_CREATE_BATCH_SIZE = 1000
+
 VENDORS = (('EXTREME', 'EXTREME'),
            ('BROCADE', 'BROCADE'),
            ('CISCO', 'CISCO'),
            ('JUNIPER', 'JUNIPER'),
            ('HUAWEI', 'HUAWEI'),)
+
+# SearchIndex keeps the UUID hex digits from the beginning of each group
+SEARCH_INDEX_GROUP_OFFSETS = (0, 8, 12, 16, 20)
+SEARCH_INDEX_TAG_STATUSES = ('ALLOCATED', 'PRODUCTION')
+
+# Service fields looked up through the ServiceIndex field of the same value
+SERVICE_INDEX_FIELDS = {'pk': 'service_uuid',
+                        'uuid': 'service_uuid',
+                        'asn': 'asn',
+                        'tag': 'tag',
+                        'inner': 'inner',
+                        'customer_channel': 'customer_channel',
+                        'status': 'status'}
+
+# Exclusion constraints of PostgreSQL on overlapping IX prefixes
+IX_PREFIX_OVERLAP_CONSTRAINTS = ('core_ix_ipv4_prefix_overlap',
+                                 'core_ix_ipv6_prefix_overlap')
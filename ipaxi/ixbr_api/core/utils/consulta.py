@@ -1,60 +1,173 @@
+import os
 import sqlite3
+import threading
+import time
 from functools import reduce
 from re import search
 
+OUI_DIR = "/app/ix/oui/"
+# Seconds between checks of the OUI file modification time
+OUI_RELOAD_CHECK_INTERVAL = 60
 
-class MAC(object):
+
+class OUIIndex(object):
     """
-    This class implements a connection and a query to the sqlite that
-    contains data regarding mac address vendors
+    This class keeps in memory the vendors of the sqlite OUI file, keyed by
+    the 24 bits prefix of the mac address. The file is read on the first
+    lookup and read again when it changes.
     """
-    def __init__(self, sqlite_file_name):
-        sqlite_path = "/app/ix/oui/" + sqlite_file_name
-        db = sqlite3.connect(sqlite_path)
-        self.cursor = db.cursor()
+    def __init__(self, sqlite_path):
+        self.sqlite_path = sqlite_path
+        self.vendors = None
+        self.mtime = None
+        self.checked = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """ Reads the whole macvendors table of the sqlite file """
+        mtime = os.stat(self.sqlite_path).st_mtime
+        db = sqlite3.connect(self.sqlite_path)
+        try:
+            rows = db.execute('SELECT mac, vendor FROM macvendors').fetchall()
+        finally:
+            db.close()
+
+        vendors = dict()
+        for mac, vendor in rows:
+            prefix = oui_prefix(mac)
+            if prefix is not None:
+                vendors.setdefault(prefix, vendor)
+
+        self.vendors = vendors
+        self.mtime = mtime
+
+    def refresh(self):
+        """ Loads the file if it was not loaded yet or if it changed since
+        it was loaded, checking its modification time at most once every
+        OUI_RELOAD_CHECK_INTERVAL seconds """
+        now = time.monotonic()
+        if self.vendors is not None and \
+                now - self.checked < OUI_RELOAD_CHECK_INTERVAL:
+            return
+
+        with self.lock:
+            if self.vendors is not None and \
+                    now - self.checked < OUI_RELOAD_CHECK_INTERVAL:
+                return
+            try:
+                changed = os.stat(self.sqlite_path).st_mtime != self.mtime
+            except OSError:
+                # Keep the vendors already loaded while the file is replaced
+                changed = self.vendors is None
+            if changed:
+                self.load()
+            self.checked = now
 
     def get_vendor(self, mac_address):
-        """ This method execute a query in sqlite to find the vendor of a
-        ethernet card.
+        """ Finds the vendor of a ethernet card
 
         :param mac_address: MAC Address to find
-        :return: The vendor of a given ethernet card
+        :return: The vendor of a given ethernet card or None
         """
-        mac_norm = self.__mac_normalization(mac_address)
-        vendor_query = 'SELECT vendor FROM macvendors WHERE mac=\'' + mac_norm \
-                       + "\'"
-
-        res = self.cursor.execute(vendor_query).fetchall()
-        if len(res) > 0:
-            return res[0][0]
-        else:
+        self.refresh()
+        prefix = oui_prefix(mac_address)
+        if prefix is None:
             return None
+        return self.vendors.get(prefix)
 
-    @staticmethod
-    def __mac_normalization(mac_address):
-        """ This method receives a mac address which can have fields
-        separeted by ':', '-' or '.'
-        It will get first 3 fields (or first 6 characters) and return it in
-        upcase.
+    def get_vendors(self, mac_addresses):
+        """ Finds the vendors of several ethernet cards
 
-        :param mac_address: The mac address to be normalized
-        :return: A string with first characters of a mac address
+        :param mac_addresses: iterable of MAC Addresses to find
+        :return: dict mapping each MAC Address to its vendor or None
         """
+        self.refresh()
+        vendors = self.vendors
+        result = dict()
+        for mac_address in mac_addresses:
+            prefix = oui_prefix(mac_address)
+            result[mac_address] = None if prefix is None else \
+                vendors.get(prefix)
+        return result
+
+
+_oui_indexes = dict()
+_oui_indexes_lock = threading.Lock()
+
+
+def get_oui_index(sqlite_file_name="macvendors1.db"):
+    """ Returns the OUIIndex of a sqlite file of OUI_DIR, shared by the
+    whole process """
+    sqlite_path = OUI_DIR + sqlite_file_name
+    index = _oui_indexes.get(sqlite_path)
+    if index is None:
+        with _oui_indexes_lock:
+            index = _oui_indexes.setdefault(sqlite_path,
+                                            OUIIndex(sqlite_path))
+    return index
+
+
+def oui_prefix(mac_address):
+    """ Returns the first 24 bits of a mac address as an integer, or None if
+    they are not hexadecimal digits """
+    prefix = mac_normalization(mac_address)
+    if len(prefix) != 6:
+        return None
+    try:
+        return int(prefix, 16)
+    except ValueError:
+        return None
+
+
+def mac_normalization(mac_address):
+    """ This method receives a mac address which can have fields
+    separeted by ':', '-' or '.'
+    It will get first 3 fields (or first 6 characters) and return it in
+    upcase.
 
-        regex = r"(:){1,}|(-){1,}|(\.){1,}"
+    :param mac_address: The mac address to be normalized
+    :return: A string with first characters of a mac address
+    """
+
+    regex = r"(:){1,}|(-){1,}|(\.){1,}"
+
+    if mac_address.count(':') >= 2 or mac_address.count('-') >= 2 or \
+            mac_address.count('.') >= 2:
+
+        matches = search(regex, mac_address)
+
+        if matches.group() == ':':
+            mac_parts = mac_address.split(':')
+        elif matches.group() == '-':
+            mac_parts = mac_address.split('-')
+        elif matches.group() == '.':
+            mac_parts = mac_address.split('.')
+    else:
+        mac_parts = mac_address
 
-        if mac_address.count(':') >= 2 or mac_address.count('-') >= 2 or \
-                mac_address.count('.') >= 2:
+    return reduce(lambda x, y: x + y, mac_parts, "").upper()[0:6]
 
-            matches = search(regex, mac_address)
 
-            if matches.group() == ':':
-                mac_parts = mac_address.split(':')
-            elif matches.group() == '-':
-                mac_parts = mac_address.split('-')
-            elif matches.group() == '.':
-                mac_parts = mac_address.split('.')
-        else:
-            mac_parts = mac_address
+class MAC(object):
+    """
+    This class implements a query to the vendors of ethernet cards, answered
+    by the OUIIndex of the sqlite file shared by the whole process
+    """
+    def __init__(self, sqlite_file_name):
+        self.index = get_oui_index(sqlite_file_name)
 
-        return reduce(lambda x, y: x + y, mac_parts).upper()[0:6]
+    def get_vendor(self, mac_address):
+        """ Finds the vendor of a ethernet card.
+
+        :param mac_address: MAC Address to find
+        :return: The vendor of a given ethernet card
+        """
+        return self.index.get_vendor(mac_address)
+
+    def get_vendors(self, mac_addresses):
+        """ Finds the vendors of several ethernet cards.
+
+        :param mac_addresses: iterable of MAC Addresses to find
+        :return: dict mapping each MAC Address to its vendor or None
+        """
+        return self.index.get_vendors(mac_addresses)
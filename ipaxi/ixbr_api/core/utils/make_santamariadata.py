@@ -27,6 +27,12 @@ class MakeSantaMaria(object):
             create_ips=True,
             create_tags=True)
 
+    def get_tag(self, ix, tag):
+        # Tags are only created when they are allocated
+        return Tag.objects.get_or_create(
+            tag=tag, ix=ix,
+            defaults={'last_ticket': '0', 'modified_by': self.user})[0]
+
     def createRIAPix(self):
 
         self.avato = PIX.objects.create(
@@ -573,83 +579,83 @@ class MakeSantaMaria(object):
 
     def tagsRIA(self):
         # ############# Tag Setttings #############
-        self.tag_ria_rs_v4 = Tag.objects.get(tag=10, ix=self.ria)
+        self.tag_ria_rs_v4 = self.get_tag(self.ria, 10)
         self.tag_ria_rs_v4.status='PRODUCTION'
         self.tag_ria_rs_v4.save()
-        self.tag_ria_rs_v6 = Tag.objects.get(tag=20, ix=self.ria)
+        self.tag_ria_rs_v6 = self.get_tag(self.ria, 20)
         self.tag_ria_rs_v6.status='PRODUCTION'
         self.tag_ria_rs_v6.save()
-        self.tag_ria_reserved_99 = Tag.objects.get(tag=99, ix=self.ria)
+        self.tag_ria_reserved_99 = self.get_tag(self.ria, 99)
         self.tag_ria_reserved_99.status='ALLOCATED'
         self.tag_ria_reserved_99.save()
-        self.tag_ria_reserved_100 = Tag.objects.get(tag=100, ix=self.ria)
+        self.tag_ria_reserved_100 = self.get_tag(self.ria, 100)
         self.tag_ria_reserved_100.status='ALLOCATED'
         self.tag_ria_reserved_100.save()
-        self.tag_ria_reserved_201 = Tag.objects.get(tag=201, ix=self.ria)
+        self.tag_ria_reserved_201 = self.get_tag(self.ria, 201)
         self.tag_ria_reserved_201.status='ALLOCATED'
         self.tag_ria_reserved_201.save()
-        self.tag_ria_reserved_202 = Tag.objects.get(tag=202, ix=self.ria)
+        self.tag_ria_reserved_202 = self.get_tag(self.ria, 202)
         self.tag_ria_reserved_202.status='ALLOCATED'
         self.tag_ria_reserved_202.save()
-        self.tag_ria_reserved_203 = Tag.objects.get(tag=203, ix=self.ria)
+        self.tag_ria_reserved_203 = self.get_tag(self.ria, 203)
         self.tag_ria_reserved_203.status='ALLOCATED'
         self.tag_ria_reserved_203.save()
-        self.tag_ria_reserved_204 = Tag.objects.get(tag=204, ix=self.ria)
+        self.tag_ria_reserved_204 = self.get_tag(self.ria, 204)
         self.tag_ria_reserved_204.status='ALLOCATED'
         self.tag_ria_reserved_204.save()
-        self.tag_ria_reserved_205 = Tag.objects.get(tag=205, ix=self.ria)
+        self.tag_ria_reserved_205 = self.get_tag(self.ria, 205)
         self.tag_ria_reserved_205.status='ALLOCATED'
         self.tag_ria_reserved_205.save()
-        self.tag_ria_reserved_206 = Tag.objects.get(tag=206, ix=self.ria)
+        self.tag_ria_reserved_206 = self.get_tag(self.ria, 206)
         self.tag_ria_reserved_206.status='ALLOCATED'
         self.tag_ria_reserved_206.save()
-        self.tag_ria_reserved_207 = Tag.objects.get(tag=207, ix=self.ria)
+        self.tag_ria_reserved_207 = self.get_tag(self.ria, 207)
         self.tag_ria_reserved_207.status='ALLOCATED'
         self.tag_ria_reserved_207.save()
-        self.tag_ria_reserved_208 = Tag.objects.get(tag=208, ix=self.ria)
+        self.tag_ria_reserved_208 = self.get_tag(self.ria, 208)
         self.tag_ria_reserved_208.status='ALLOCATED'
         self.tag_ria_reserved_208.save()
-        self.tag_ria_reserved_209 = Tag.objects.get(tag=209, ix=self.ria)
+        self.tag_ria_reserved_209 = self.get_tag(self.ria, 209)
         self.tag_ria_reserved_209.status='ALLOCATED'
         self.tag_ria_reserved_209.save()
-        self.tag_ria_reserved_210 = Tag.objects.get(tag=210, ix=self.ria)
+        self.tag_ria_reserved_210 = self.get_tag(self.ria, 210)
         self.tag_ria_reserved_210.status='ALLOCATED'
         self.tag_ria_reserved_210.save()
-        self.tag_ria_reserved_301 = Tag.objects.get(tag=301, ix=self.ria)
+        self.tag_ria_reserved_301 = self.get_tag(self.ria, 301)
         self.tag_ria_reserved_301.status='ALLOCATED'
         self.tag_ria_reserved_301.save()
-        self.tag_ria_reserved_302 = Tag.objects.get(tag=302, ix=self.ria)
+        self.tag_ria_reserved_302 = self.get_tag(self.ria, 302)
         self.tag_ria_reserved_302.status='ALLOCATED'
         self.tag_ria_reserved_302.save()
-        self.tag_ria_reserved_303 = Tag.objects.get(tag=303, ix=self.ria)
+        self.tag_ria_reserved_303 = self.get_tag(self.ria, 303)
         self.tag_ria_reserved_303.status='ALLOCATED'
         self.tag_ria_reserved_303.save()
-        self.tag_ria_reserved_304 = Tag.objects.get(tag=304, ix=self.ria)
+        self.tag_ria_reserved_304 = self.get_tag(self.ria, 304)
         self.tag_ria_reserved_304.status='ALLOCATED'
         self.tag_ria_reserved_304.save()
-        self.tag_ria_reserved_305 = Tag.objects.get(tag=305, ix=self.ria)
+        self.tag_ria_reserved_305 = self.get_tag(self.ria, 305)
         self.tag_ria_reserved_305.status='ALLOCATED'
         self.tag_ria_reserved_305.save()
-        self.tag_ria_reserved_306 = Tag.objects.get(tag=306, ix=self.ria)
+        self.tag_ria_reserved_306 = self.get_tag(self.ria, 306)
         self.tag_ria_reserved_306.status='ALLOCATED'
         self.tag_ria_reserved_306.save()
-        self.tag_ria_reserved_307 = Tag.objects.get(tag=307, ix=self.ria)
+        self.tag_ria_reserved_307 = self.get_tag(self.ria, 307)
         self.tag_ria_reserved_307.status='ALLOCATED'
         self.tag_ria_reserved_307.save()
-        self.tag_ria_reserved_308 = Tag.objects.get(tag=308, ix=self.ria)
+        self.tag_ria_reserved_308 = self.get_tag(self.ria, 308)
         self.tag_ria_reserved_308.status='ALLOCATED'
         self.tag_ria_reserved_308.save()
-        self.tag_ria_reserved_309 = Tag.objects.get(tag=309, ix=self.ria)
+        self.tag_ria_reserved_309 = self.get_tag(self.ria, 309)
         self.tag_ria_reserved_309.status='ALLOCATED'
         self.tag_ria_reserved_309.save()
-        self.tag_ria_reserved_310 = Tag.objects.get(tag=310, ix=self.ria)
+        self.tag_ria_reserved_310 = self.get_tag(self.ria, 310)
         self.tag_ria_reserved_310.status='ALLOCATED'
         self.tag_ria_reserved_310.save()
 
-        self.tag_ria_simet_v4 = Tag.objects.get(tag=2008, ix=self.ria)
+        self.tag_ria_simet_v4 = self.get_tag(self.ria, 2008)
         self.tag_ria_simet_v4.status='PRODUCTION'
         self.tag_ria_simet_v4.save()
-        self.tag_ria_simet_v6 = Tag.objects.get(tag=2009, ix=self.ria)
+        self.tag_ria_simet_v6 = self.get_tag(self.ria, 2009)
         self.tag_ria_simet_v6.status='PRODUCTION'
         self.tag_ria_simet_v6.save()
 
@@ -1274,61 +1280,61 @@ class MakeSantaMaria(object):
 
     def tagsJPA(self):
         # ############# Tag Setttings #############
-        self.tag_jpa_rs_v4 = Tag.objects.get(tag=10, ix=self.jpa)
+        self.tag_jpa_rs_v4 = self.get_tag(self.jpa, 10)
         self.tag_jpa_rs_v4.status='PRODUCTION'
-        self.tag_jpa_rs_v6 = Tag.objects.get(tag=20, ix=self.jpa)
+        self.tag_jpa_rs_v6 = self.get_tag(self.jpa, 20)
         self.tag_jpa_rs_v6.status='PRODUCTION'
-        self.tag_jpa_public_1 = Tag.objects.get(tag=40, ix=self.jpa)
+        self.tag_jpa_public_1 = self.get_tag(self.jpa, 40)
         self.tag_jpa_public_1.status='ALLOCATED'
-        self.tag_jpa_public_2 = Tag.objects.get(tag=41, ix=self.jpa)
+        self.tag_jpa_public_2 = self.get_tag(self.jpa, 41)
         self.tag_jpa_public_2.status='ALLOCATED'
 
-        self.tag_jpa_drac = Tag.objects.get(tag=66, ix=self.jpa)
+        self.tag_jpa_drac = self.get_tag(self.jpa, 66)
         self.tag_jpa_drac.status='ALLOCATED'
-        self.tag_jpa_mgmt = Tag.objects.get(tag=99, ix=self.jpa)
+        self.tag_jpa_mgmt = self.get_tag(self.jpa, 99)
         self.tag_jpa_mgmt.status='ALLOCATED'
-        self.tag_jpa_servers = Tag.objects.get(tag=100, ix=self.jpa)
+        self.tag_jpa_servers = self.get_tag(self.jpa, 100)
         self.tag_jpa_servers.status='ALLOCATED'
 
-        self.tag_jpa_reserved_201 = Tag.objects.get(tag=201, ix=self.jpa)
+        self.tag_jpa_reserved_201 = self.get_tag(self.jpa, 201)
         self.tag_jpa_reserved_201.status='ALLOCATED'
-        self.tag_jpa_reserved_202 = Tag.objects.get(tag=202, ix=self.jpa)
+        self.tag_jpa_reserved_202 = self.get_tag(self.jpa, 202)
         self.tag_jpa_reserved_202.status='ALLOCATED'
-        self.tag_jpa_reserved_203 = Tag.objects.get(tag=203, ix=self.jpa)
+        self.tag_jpa_reserved_203 = self.get_tag(self.jpa, 203)
         self.tag_jpa_reserved_203.status='ALLOCATED'
-        self.tag_jpa_reserved_204 = Tag.objects.get(tag=204, ix=self.jpa)
+        self.tag_jpa_reserved_204 = self.get_tag(self.jpa, 204)
         self.tag_jpa_reserved_204.status='ALLOCATED'
-        self.tag_jpa_reserved_205 = Tag.objects.get(tag=205, ix=self.jpa)
+        self.tag_jpa_reserved_205 = self.get_tag(self.jpa, 205)
         self.tag_jpa_reserved_205.status='ALLOCATED'
-        self.tag_jpa_reserved_206 = Tag.objects.get(tag=206, ix=self.jpa)
+        self.tag_jpa_reserved_206 = self.get_tag(self.jpa, 206)
         self.tag_jpa_reserved_206.status='ALLOCATED'
-        self.tag_jpa_reserved_207 = Tag.objects.get(tag=207, ix=self.jpa)
+        self.tag_jpa_reserved_207 = self.get_tag(self.jpa, 207)
         self.tag_jpa_reserved_207.status='ALLOCATED'
-        self.tag_jpa_reserved_208 = Tag.objects.get(tag=208, ix=self.jpa)
+        self.tag_jpa_reserved_208 = self.get_tag(self.jpa, 208)
         self.tag_jpa_reserved_208.status='ALLOCATED'
-        self.tag_jpa_reserved_209 = Tag.objects.get(tag=209, ix=self.jpa)
+        self.tag_jpa_reserved_209 = self.get_tag(self.jpa, 209)
         self.tag_jpa_reserved_209.status='ALLOCATED'
-        self.tag_jpa_reserved_210 = Tag.objects.get(tag=210, ix=self.jpa)
+        self.tag_jpa_reserved_210 = self.get_tag(self.jpa, 210)
         self.tag_jpa_reserved_210.status='ALLOCATED'
-        self.tag_jpa_reserved_301 = Tag.objects.get(tag=301, ix=self.jpa)
+        self.tag_jpa_reserved_301 = self.get_tag(self.jpa, 301)
         self.tag_jpa_reserved_301.status='ALLOCATED'
-        self.tag_jpa_reserved_302 = Tag.objects.get(tag=302, ix=self.jpa)
+        self.tag_jpa_reserved_302 = self.get_tag(self.jpa, 302)
         self.tag_jpa_reserved_302.status='ALLOCATED'
-        self.tag_jpa_reserved_303 = Tag.objects.get(tag=303, ix=self.jpa)
+        self.tag_jpa_reserved_303 = self.get_tag(self.jpa, 303)
         self.tag_jpa_reserved_303.status='ALLOCATED'
-        self.tag_jpa_reserved_304 = Tag.objects.get(tag=304, ix=self.jpa)
+        self.tag_jpa_reserved_304 = self.get_tag(self.jpa, 304)
         self.tag_jpa_reserved_304.status='ALLOCATED'
-        self.tag_jpa_reserved_305 = Tag.objects.get(tag=305, ix=self.jpa)
+        self.tag_jpa_reserved_305 = self.get_tag(self.jpa, 305)
         self.tag_jpa_reserved_305.status='ALLOCATED'
-        self.tag_jpa_reserved_306 = Tag.objects.get(tag=306, ix=self.jpa)
+        self.tag_jpa_reserved_306 = self.get_tag(self.jpa, 306)
         self.tag_jpa_reserved_306.status='ALLOCATED'
-        self.tag_jpa_reserved_307 = Tag.objects.get(tag=307, ix=self.jpa)
+        self.tag_jpa_reserved_307 = self.get_tag(self.jpa, 307)
         self.tag_jpa_reserved_307.status='ALLOCATED'
-        self.tag_jpa_reserved_308 = Tag.objects.get(tag=308, ix=self.jpa)
+        self.tag_jpa_reserved_308 = self.get_tag(self.jpa, 308)
         self.tag_jpa_reserved_308.status='ALLOCATED'
-        self.tag_jpa_reserved_309 = Tag.objects.get(tag=309, ix=self.jpa)
+        self.tag_jpa_reserved_309 = self.get_tag(self.jpa, 309)
         self.tag_jpa_reserved_309.status='ALLOCATED'
-        self.tag_jpa_reserved_310 = Tag.objects.get(tag=310, ix=self.jpa)
+        self.tag_jpa_reserved_310 = self.get_tag(self.jpa, 310)
         self.tag_jpa_reserved_310.status='ALLOCATED'
 
     def servicesJPA(self):
@@ -328,10 +328,12 @@ class MakeFakeData(object):
         self.ipv4s_cpv = list(IPv4Address.objects.filter(ix='cpv'))
         self.ipv6s_cpv = list(IPv6Address.objects.filter(ix='cpv'))
 
-        self.tags_ext_pix1_sp = list(Tag.objects.filter(
-            tag_domain=self.channel_port_cisco_ext_pix1_sp))
-
-        self.tag_mplpav4_extreme_sp = self.tags_ext_pix1_sp.pop()
+        # Tags are only created when they are allocated
+        self.tag_mplpav4_extreme_sp = TagFactory(
+            tag=4095,
+            ix=IX.objects.get(pk='sp'),
+            tag_domain=self.channel_port_cisco_ext_pix1_sp,
+            status='AVAILABLE')
         self.mlpav4_ext_sp = MLPAv4Factory(
             status='PRODUCTION',
             mlpav4_address=self.ipv4s_sp.pop(),
@@ -343,7 +345,11 @@ class MakeFakeData(object):
 
         print('created MLPAv4 extreme pix1 SP')
 
-        self.tag_mlpav6_cisco_sp = self.tags_ext_pix1_sp.pop()
+        self.tag_mlpav6_cisco_sp = TagFactory(
+            tag=4094,
+            ix=IX.objects.get(pk='sp'),
+            tag_domain=self.channel_port_cisco_ext_pix1_sp,
+            status='AVAILABLE')
         self.mlpav6_ext_sp = MLPAv6Factory(
             status='PRODUCTION',
             mlpav6_address=self.ipv6s_sp.pop(),
@@ -383,10 +389,10 @@ class MakeFakeData(object):
 
         print('created MLPAv6 cisco pix1 SP')
 
-        self.tags_ext_pix1_cpv = list(
-            Tag.objects.filter(ix=IX.objects.get(pk='cpv')))
-
-        self.tag_mplpav4_extreme_cpv = self.tags_ext_pix1_cpv.pop()
+        self.tag_mplpav4_extreme_cpv = TagFactory(
+            tag=4095,
+            ix=self.cpv,
+            status='AVAILABLE')
 
         self.mlpav4_ext_cpv = MLPAv4Factory(
             status='PRODUCTION',
@@ -400,7 +406,10 @@ class MakeFakeData(object):
 
         print('created MLPAv4 extreme pix1 CPV')
 
-        self.tag_mplpav6_extreme_cpv = self.tags_ext_pix1_cpv.pop()
+        self.tag_mplpav6_extreme_cpv = TagFactory(
+            tag=4094,
+            ix=self.cpv,
+            status='AVAILABLE')
 
         self.mlpav6_ext_cpv = MLPAv6Factory(
             status='PRODUCTION',
@@ -0,0 +1,134 @@
+""" This script loads, in a fixed number of queries, every object used to
+build the Nikiti pages of an IX
+"""
+
+# Third-party Imports
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+
+# Local source tree Imports
+from ....core.models import (BilateralPeer, ContactsMap, CoreChannel,
+                             CustomerChannel, DownlinkChannel, MLPAv4,
+                             MLPAv6, Monitorv4, Port, Switch, UplinkChannel)
+
+SERVICES = (
+    ("mlpav4", MLPAv4),
+    ("mlpav6", MLPAv6),
+    ("bilateralpeer", BilateralPeer),
+    ("monitorv4", Monitorv4),
+)
+
+
+class Loader(object):
+    """
+    Loads switches, ports, channels, services, tags and contacts of an IX
+    with one query per model, and answers from memory the lookups that the
+    Query classes used to do per port.
+    """
+
+    def __init__(self, ix):
+        self.switches = list(
+            Switch.objects.filter(pix__ix=ix)
+            .select_related('pix', 'model')
+            .order_by('pix__code', 'management_ip'))
+
+        ports = list(
+            Port.objects.filter(switch__pix__ix=ix)
+            .select_related('switch__pix', 'switch__model', 'channel_port'))
+        self.ports = {port.uuid: port for port in ports}
+        self.ports_by_switch = dict()
+        self.ports_by_channel_port = dict()
+        for port in ports:
+            self.ports_by_switch.setdefault(port.switch_id, []).append(port)
+            self.ports_by_channel_port.setdefault(
+                port.channel_port_id, []).append(port)
+
+        channel_ports = Port.objects.filter(
+            switch__pix__ix=ix).values('channel_port')
+
+        self.customer_channels = {
+            channel.channel_port_id: channel for channel in
+            CustomerChannel.objects.filter(channel_port__in=channel_ports)
+            .select_related('asn')}
+        self.channels = dict()
+        for model in (DownlinkChannel, UplinkChannel, CoreChannel):
+            self.channels.update(
+                (channel.channel_port_id, channel) for channel in
+                model.objects.filter(channel_port__in=channel_ports))
+        self.uplinks_by_downlink = {
+            channel.downlink_channel_id: channel
+            for channel in self.channels.values()
+            if isinstance(channel, UplinkChannel)}
+        self.downlinks = {
+            channel.pk: channel for channel in self.channels.values()
+            if isinstance(channel, DownlinkChannel)}
+
+        self.services = dict()
+        customer_channels = [channel.pk for channel in
+                             self.customer_channels.values()]
+        for service_type, model in SERVICES:
+            self.services[service_type] = dict()
+            for service in model.objects.filter(
+                    customer_channel__in=customer_channels).select_related(
+                        'tag', 'asn'):
+                self.services[service_type].setdefault(
+                    service.customer_channel_id, []).append(service)
+
+        self.contacts_maps = dict()
+        for contacts_map in ContactsMap.objects.filter(
+                asn__in=set(channel.asn_id for channel in
+                            self.customer_channels.values())
+        ).select_related('organization'):
+            self.contacts_maps.setdefault(contacts_map.asn_id, contacts_map)
+
+    def get_customer_channel(self, port):
+        return self.customer_channels[port.channel_port_id]
+
+    def get_channel(self, port):
+        """ Returns the Downlink, Uplink or Core channel of a port """
+        return self.channels[port.channel_port_id]
+
+    def get_channel_ports(self, channel):
+        return self.ports_by_channel_port.get(channel.channel_port_id, [])
+
+    def get_first_port(self, channel_port):
+        """ Same as channel_port.port_set.first(), from the loaded ports """
+        ports = self.ports_by_channel_port.get(channel_port.pk)
+        if not ports:
+            return None
+        return min(ports, key=lambda port: (port.switch_id, port.name))
+
+    def get_connected_channel(self, channel):
+        """ Returns the channel at the other end of a Downlink or Uplink
+        channel, or the channel itself for a Core channel """
+        if isinstance(channel, DownlinkChannel):
+            return self.uplinks_by_downlink[channel.pk]
+        if isinstance(channel, UplinkChannel):
+            return self.downlinks[channel.downlink_channel_id]
+        return channel
+
+    def get_services(self, channel):
+        """ Returns the services of a CustomerChannel by type, as
+        Query.get_services_per_port() does """
+        return {service_type: self.services[service_type].get(channel.pk, [])
+                for service_type, model in SERVICES}
+
+    def get_participant(self, asn):
+        """ Returns the organization name of the first ContactsMap of an ASN
+        """
+        contacts_map = self.contacts_maps.get(asn.pk)
+        if contacts_map is None or contacts_map.organization is None:
+            return ""
+        return contacts_map.organization.name
+
+    def get_master_port(self, channel):
+        """ Same as Channel.get_master_port(), from the loaded ports """
+        ports = self.get_channel_ports(channel)
+        if any(port.switch.model.vendor == 'EXTREME' for port in ports):
+            if not any(str(port.name) in channel.name for port in ports):
+                raise ValidationError(
+                    _("{} master port has nos association with him".format(
+                        channel.name)))
+            master_number = channel.name.split("-")[1]
+            return next(port for port in ports if port.name == master_number)
+        return ports[0] if ports else None
@@ -5,7 +5,8 @@
 from re import compile
 
 # Local source tree Imports
-from ....core.models import IX, PIX, ChannelPort, Port, Switch
+from ....core.models import IX, PIX
+from .loader import Loader
 
 # Third-party Imports
 
@@ -20,6 +21,19 @@ class Query(object):
     def __init__(self, ix):
         self.ix_obj = IX.objects.get(code=ix)
         self.ix = ix
+        self._loader = None
+
+    @property
+    def loader(self):
+        """
+        Every object of the IX used by the queries, loaded on first use
+
+        Returns: a Loader of the IX
+
+        """
+        if self._loader is None:
+            self._loader = Loader(self.ix)
+        return self._loader
 
     def get_all_pix(self):
         """
@@ -37,11 +51,19 @@ class Query(object):
         Returns: a list with all switches of a given location
 
         """
-        pix_list = self.get_all_pix()
-        sw_list = [Switch.objects.get(pk=sw_pk) for sw_pk in
-                   pix_list.values_list('switch', flat=True)]
+        return self.loader.switches
+
+    def get_ports_per_switch(self, switch):
+        """
+        Query all ports of a switch
+
+        Args:
+            switch: The Switch to query
 
-        return sw_list
+        Returns: a list with all ports of the switch
+
+        """
+        return self.loader.ports_by_switch.get(switch.pk, [])
 
     def get_last_ticket(self, port_uuid):
         """
@@ -84,31 +106,13 @@ class Query(object):
         Returns: A dict mapping all services allocated to a given service
 
         """
-        services_dict = dict()
-        cur_port = Port.objects.get(uuid=port_uuid)
+        cur_port = self.loader.ports[port_uuid]
 
         if cur_port.status != "CUSTOMER":
-            return services_dict
+            return dict()
         else:
-            customer_channel = cur_port.channel_port.customerchannel
-
-            if customer_channel.mlpav4_set is not None:
-                services_dict["mlpav4"] = list(
-                    customer_channel.mlpav4_set.all())
-
-            if customer_channel.mlpav6_set is not None:
-                services_dict["mlpav6"] = list(
-                    customer_channel.mlpav6_set.all())
-
-            if customer_channel.bilateralpeer_set is not None:
-                services_dict["bilateralpeer"] = list(
-                    customer_channel.bilateralpeer_set.all())
-
-            if customer_channel.monitorv4_set is not None:
-                services_dict["monitorv4"] = list(
-                    customer_channel.monitorv4_set.all())
-
-            return services_dict
+            return self.loader.get_services(
+                self.loader.get_customer_channel(cur_port))
 
     def get_tag_per_port(self, port_uuid):
         """
@@ -120,8 +124,7 @@ class Query(object):
 
         """
         tag_dict = dict()
-        port = Port.objects.get(uuid=port_uuid)
-        service_list = self.get_services_per_port(port.uuid)
+        service_list = self.get_services_per_port(port_uuid)
 
         for service_type, service_list in service_list.items():
             if len(service_list) > 0:
@@ -143,9 +146,9 @@ class Query(object):
         Returns: An ASN object
 
         """
-        cur_port = Port.objects.get(uuid=port_uuid)
+        cur_port = self.loader.ports[port_uuid]
         if cur_port.status == "CUSTOMER":
-            customer_channel = cur_port.channel_port.customerchannel
+            customer_channel = self.loader.get_customer_channel(cur_port)
         else:
             return None
 
@@ -168,10 +171,9 @@ class MonitoracaoInterfaces(Query):
 
         """
 
-        switch = Switch.objects.get(pk=switch_uuid)
         asn_port_mapping = dict()
 
-        for port in switch.port_set.all():
+        for port in self.loader.ports_by_switch.get(switch_uuid, []):
             if port.status == "CUSTOMER":
                 port_asn = self.get_asn_per_port(port_uuid=port.uuid)
                 asn_port_mapping[port.name] = port_asn.number
@@ -187,7 +189,7 @@ class MonitoracaoInterfaces(Query):
         Returns: Port type (U or P)
 
         """
-        port = Port.objects.get(uuid = port_uuid)
+        port = self.loader.ports[port_uuid]
         if port.status == "CUSTOMER":
             port_type = "P"
         elif port.status == "INFRASTRUCTURE":
@@ -209,21 +211,15 @@ class MonitoracaoInterfaces(Query):
 
         """
 
-        cur_port = Port.objects.get(uuid=port_uuid)
-        channel_port = ChannelPort.objects.get(uuid=cur_port.channel_port.uuid)
+        cur_port = self.loader.ports[port_uuid]
 
         if cur_port.status != "INFRASTRUCTURE":
             return None
         else:
-            # Verify channel type (Downlink or Uplink)
-            if getattr(channel_port, "downlinkchannel", None) is not None:
-                channel = channel_port.downlinkchannel
-            elif getattr(channel_port, "uplinkchannel", None) is not None:
-                channel = channel_port.uplinkchannel
-            else:
-                channel = channel_port.corechannel
+            # Downlink, Uplink or Core channel
+            channel = self.loader.get_channel(cur_port)
 
-        return channel.get_master_port()
+        return self.loader.get_master_port(channel)
 
     def get_port_connection(self, port_uuid):
         """
@@ -235,15 +231,11 @@ class MonitoracaoInterfaces(Query):
         Returns: List of ports connected
 
         """
-        cur_port = Port.objects.get(uuid=port_uuid)
-        channel_port = ChannelPort.objects.get(uuid=cur_port.channel_port.uuid)
+        cur_port = self.loader.ports[port_uuid]
+        channel = self.loader.get_connected_channel(
+            self.loader.get_channel(cur_port))
 
-        if getattr(channel_port, "downlinkchannel", None) is not None:
-            return list(channel_port.downlinkchannel.uplinkchannel.get_ports())
-        elif getattr(channel_port, "uplinkchannel", None) is not None:
-            return list(channel_port.uplinkchannel.downlink_channel.get_ports())
-        else:
-            return list(channel_port.corechannel.get_ports())
+        return list(self.loader.get_channel_ports(channel))
 
     def get_port_status(self, port_uuid):
         """
@@ -254,7 +246,7 @@ class MonitoracaoInterfaces(Query):
         Returns: Status information for a port
 
         """
-        port = Port.objects.get(pk=port_uuid)
+        port = self.loader.ports[port_uuid]
         tag_occur_v4 = list()
         tag_occur_v6 = list()
 
@@ -354,12 +346,14 @@ class AlocacaoDeIps(Query):
         ipv4_dict = dict()
         ipv6_dict = dict()
 
-        if getattr(channel_port, "customerchannel", None) is not None:
-            for srv in channel_port.customerchannel.mlpav4_set.all():
-                ipv4_dict[srv.get_address().address] = srv.asn
+        customer_channel = self.loader.customer_channels.get(channel_port.pk)
+        if customer_channel is not None:
+            services = self.loader.get_services(customer_channel)
+            for srv in services["mlpav4"]:
+                ipv4_dict[srv.mlpav4_address_id] = srv.asn
 
-            for srv in channel_port.customerchannel.mlpav6_set.all():
-                ipv6_dict[srv.get_address().address] = srv.asn
+            for srv in services["mlpav6"]:
+                ipv6_dict[srv.mlpav6_address_id] = srv.asn
 
         return {
             "ipv4": ipv4_dict,
@@ -436,7 +430,7 @@ class AlocacaoDeIps(Query):
         channel_port_list = set()
 
         for switch in switch_list:
-            for port in switch.port_set.all():
+            for port in self.get_ports_per_switch(switch):
                 if port.channel_port is not None:
                     channel_port_list.add(port.channel_port)
 
@@ -461,6 +455,7 @@ class AlocacaoDeVlans(Query):
         """
         tag_dict = dict()
         mi = MonitoracaoInterfaces(ix=self.ix)
+        mi._loader = self.loader
 
         v4_vlan_regex = compile("as\d+-tr(\s|\-\d+)")
         v6_vlan_regex = compile("as\d+-tr-v6(\s|\-\d+)")
@@ -468,7 +463,7 @@ class AlocacaoDeVlans(Query):
 
         sw_list = self.get_all_switches()
         for switch in sw_list:
-            for port in switch.port_set.all():
+            for port in self.get_ports_per_switch(switch):
                 port_status = mi.get_port_status(port.uuid)
                 for status in port_status:
                     tag_name_finder_v4 = v4_vlan_regex.search(status)
@@ -525,7 +520,7 @@ class AlocacaoDeVlans(Query):
         sw_list = self.get_all_switches()
 
         for switch in sw_list:
-            for p in switch.port_set.all():
+            for p in self.get_ports_per_switch(switch):
                 srv_p_list = self.get_services_per_port(p.uuid)
                 for service_type, service_list in srv_p_list.items():
                     if len(service_list) > 0:
@@ -0,0 +1,101 @@
+""" This script keeps the rendered Nikiti pages of each IX in the cache, so
+the NOC screens polling them do not hit the DB
+"""
+
+# System Imports
+import hashlib
+import time
+import uuid
+
+# Third-party Imports
+from django.core.cache import cache
+from django.db import transaction
+
+NIKITI_SNAPSHOT_CACHE_KEY = 'nikiti_snapshot:{}:{}'
+NIKITI_GENERATION_CACHE_KEY = 'nikiti_snapshot_generation'
+NIKITI_SNAPSHOT_CACHE_TIMEOUT = 60 * 60 * 24
+NIKITI_PAGES = ('monitoramento_de_interfaces', 'alocacao_de_ip', 'vlans')
+
+
+def refresh_snapshot(page, ix, build, generation=None, previous=None):
+    """
+    Builds and stores the snapshot of a Nikiti page of an IX
+
+    Args:
+        page: One of NIKITI_PAGES
+        ix: The IX code
+        build: Function receiving the IX code and returning the page content
+        generation: The snapshots generation read before the build
+        previous: The snapshot being replaced, if any
+
+    Returns: dict with the page 'content', its 'etag', the 'last_modified'
+    timestamp and the 'generation' it belongs to. last_modified only moves
+    when the content changes.
+
+    """
+    if generation is None:
+        generation = cache.get(NIKITI_GENERATION_CACHE_KEY)
+    content = build(ix)
+    etag = hashlib.md5(content.encode('utf-8')).hexdigest()
+
+    if previous is not None and previous['etag'] == etag:
+        last_modified = previous['last_modified']
+    else:
+        last_modified = int(time.time())
+
+    snapshot = {
+        'content': content,
+        'etag': etag,
+        'last_modified': last_modified,
+        'generation': generation,
+    }
+    cache.set(NIKITI_SNAPSHOT_CACHE_KEY.format(page, ix), snapshot,
+              NIKITI_SNAPSHOT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def get_cached_snapshot(page, ix):
+    """ Returns the stored snapshot of a Nikiti page of an IX, or None """
+    return cache.get(NIKITI_SNAPSHOT_CACHE_KEY.format(page, ix))
+
+
+def get_snapshot(page, ix, build):
+    """
+    Returns the last snapshot of a Nikiti page of an IX, with a single cache
+    read. The snapshot is built again when it is missing or older than the
+    last invalidate_all_nikiti_snapshots().
+
+    Args:
+        page: One of NIKITI_PAGES
+        ix: The IX code
+        build: Function receiving the IX code and returning the page content
+
+    Returns: the snapshot dict described in refresh_snapshot()
+
+    """
+    key = NIKITI_SNAPSHOT_CACHE_KEY.format(page, ix)
+    values = cache.get_many([key, NIKITI_GENERATION_CACHE_KEY])
+    generation = values.get(NIKITI_GENERATION_CACHE_KEY)
+    snapshot = values.get(key)
+
+    if snapshot is None or snapshot['generation'] != generation:
+        snapshot = refresh_snapshot(page, ix, build, generation, snapshot)
+    return snapshot
+
+
+def invalidate_nikiti_snapshots(ix):
+    """ Drops the snapshots of an IX. It is done again on commit, so a
+    snapshot rebuilt by a concurrent request before the commit does not
+    survive """
+    keys = [NIKITI_SNAPSHOT_CACHE_KEY.format(page, ix)
+            for page in NIKITI_PAGES]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_all_nikiti_snapshots():
+    """ Makes the snapshots of every IX stale, for changes whose IX is not
+    known without a query """
+    cache.set(NIKITI_GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(
+        NIKITI_GENERATION_CACHE_KEY, uuid.uuid4().hex, None))
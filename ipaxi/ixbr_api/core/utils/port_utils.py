@@ -1,5 +1,25 @@
 from collections import OrderedDict
-from re import sub
+import re
+
+# Digits of each number of a port name in its sort key
+PORT_NUMBER_WIDTH = 6
+PORT_SORT_KEY_LENGTH = 255
+
+_numbers = re.compile(r'\d+')
+
+
+def natural_sort_key(port_name):
+    '''
+    Computes the key stored in Port.sort_key and DIOPort.sort_key. Letters
+    and separators are ignored and each number is zero padded, so ports
+    named like TenGigEY/Y/Y/Y or XE-Y/Y/Y sort as strings by their numbers.
+
+    :param port_name: The name of a port or the position of a DIO port.
+    :return: A string with the numbers of port_name zero padded
+    '''
+    return ''.join(number.zfill(PORT_NUMBER_WIDTH)
+                   for number in _numbers.findall(port_name)
+                   )[:PORT_SORT_KEY_LENGTH]
 
 
 def port_sorting(port_dict, descendent=False):
@@ -9,21 +29,14 @@ def port_sorting(port_dict, descendent=False):
         CISCO Port Naming -   Eg. TenGigEY/Y/Y/Y
         Extreme Port Naming - Eg. XE-Y/Y/Y
 
+    Ports read from the database should be ordered by their sort_key
+    instead, see PortQuerySet.order_by_port_name().
+
     :param port_dict: A dictionary where the port name is the key.
     :param descendent: Inform a reverse sorting.
     :return: A OrderedDict object
     '''
-
-    clean_port_name_regex = r'([a-zA-Z]|(?:\s)|(?:-))'
-    pre_process_dict = {}
-    ordered = OrderedDict()
-
-    for port_name in port_dict.keys():
-        cleaned_port_name = sub(clean_port_name_regex, '', port_name)
-        pre_process_dict[int(cleaned_port_name.replace('/', '0'))] = port_name
-
-    for port_no in sorted(pre_process_dict.keys(), reverse=descendent):
-        ordered[pre_process_dict[port_no]] = \
-            port_dict[pre_process_dict[port_no]]
-
-    return ordered
+    return OrderedDict(
+        (port_name, port_dict[port_name]) for port_name in sorted(
+            port_dict, key=lambda name: (natural_sort_key(name), name),
+            reverse=descendent))
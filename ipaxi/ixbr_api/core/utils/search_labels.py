@@ -0,0 +1,45 @@
+""" Labels of the objects indexed by SearchIndex
+
+They are the str() of the models, and the migrations build the index with
+them too. As the models of migrations have no __str__, only fields and the
+primary keys of relations are read.
+"""
+
+
+def channel_port_label(channel_port):
+    return '[%s]' % (channel_port.uuid, )
+
+
+def pix_label(pix):
+    return '[IX %s: PIX %s]' % (pix.ix_id, pix.code, )
+
+
+def switch_label(switch):
+    return '[%s: %s]' % (pix_label(switch.pix), switch.management_ip, )
+
+
+def switch_module_label(switch_module):
+    return '[module-%s-%s ports]' % (switch_module.model,
+                                     switch_module.port_quantity)
+
+
+def port_label(port):
+    if port.switch_id:
+        return '[%s: %s]' % (port.switch.management_ip, port.name)
+    module = port.switch_module
+    return '[%s: %s]' % (switch_module_label(module) if module else None,
+                         port.name)
+
+
+def tag_label(tag):
+    if tag is None:
+        return str(None)
+    return '[[%s]-%s:%s]' % (
+        tag.ix_id, tag.tag,
+        '[%s]' % tag.tag_domain_id if tag.tag_domain_id else None)
+
+
+def service_label(service):
+    return '%s [%s AS%s %s:%s]' % (service.uuid, service.shortname,
+                                   service.asn_id, tag_label(service.tag),
+                                   service.inner)
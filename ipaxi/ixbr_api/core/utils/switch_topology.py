@@ -0,0 +1,25 @@
+from django.core.cache import cache
+from django.db import transaction
+
+SWITCH_TOPOLOGY_CACHE_KEY = 'switch_topology'
+SWITCH_TOPOLOGY_CACHE_TIMEOUT = 60 * 60
+# Fields of Port, by name and attname, that are edges of the topology
+PORT_TOPOLOGY_FIELDS = frozenset(
+    ('switch', 'switch_id', 'channel_port', 'channel_port_id'))
+
+
+def get_cached_switch_topology():
+    """ Returns the switch topology already built, or None """
+    return cache.get(SWITCH_TOPOLOGY_CACHE_KEY)
+
+
+def set_cached_switch_topology(topology):
+    cache.set(SWITCH_TOPOLOGY_CACHE_KEY, topology,
+              SWITCH_TOPOLOGY_CACHE_TIMEOUT)
+
+
+def invalidate_switch_topology():
+    """ Drops the switch topology. It is done again on commit, so a topology
+    rebuilt by a concurrent request before the commit does not survive """
+    cache.delete(SWITCH_TOPOLOGY_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(SWITCH_TOPOLOGY_CACHE_KEY))
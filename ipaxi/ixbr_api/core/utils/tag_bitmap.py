@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import MAX_TAG_NUMBER, MIN_TAG_NUMBER
+
+TAG_BITMAPS_CACHE_KEY = 'tag_bitmaps:{}'
+INNER_TAG_BITMAP_CACHE_KEY = 'inner_tag_bitmap:{}'
+TAG_BITMAPS_CACHE_TIMEOUT = 60 * 60
+
+_FULL_MASK = (1 << (MAX_TAG_NUMBER + 1)) - (1 << MIN_TAG_NUMBER)
+
+
+class TagBitmap(object):
+    """
+    Occupancy bitmap of the VLAN tags of a tag domain. Bit N set means that
+    the tag N is used. Every operation is done over a single 4096 bits
+    integer, so there is no scan over Tag rows or tag numbers.
+    """
+
+    def __init__(self, used_tags=(), bits=0):
+        self.bits = bits
+        for tag in used_tags:
+            self.bits |= 1 << tag
+
+    def __or__(self, other):
+        return TagBitmap(bits=self.bits | other.bits)
+
+    def __and__(self, other):
+        return TagBitmap(bits=self.bits & other.bits)
+
+    def __invert__(self):
+        return TagBitmap(bits=~self.bits & _FULL_MASK)
+
+    def __eq__(self, other):
+        return isinstance(other, TagBitmap) and self.bits == other.bits
+
+    def __repr__(self):
+        return "TagBitmap({} used)".format(bin(self.bits).count('1'))
+
+    def occupy(self, tag):
+        self.bits |= 1 << tag
+
+    def release(self, tag):
+        self.bits &= ~(1 << tag)
+
+    def is_free(self, tag):
+        if tag < MIN_TAG_NUMBER or tag > MAX_TAG_NUMBER:
+            return False
+        return not (self.bits >> tag) & 1
+
+    def next_free(self, start=MIN_TAG_NUMBER):
+        """ Returns the lowest free tag greater than or equal to start, or
+        None if every tag from start is used """
+        start = max(start, MIN_TAG_NUMBER)
+        free = ~self.bits & _FULL_MASK & ~((1 << start) - 1)
+        if not free:
+            return None
+        return (free & -free).bit_length() - 1
+
+    def free_in_range(self, begin=MIN_TAG_NUMBER, end=MAX_TAG_NUMBER,
+                      limit=None):
+        """ Returns the free tags between begin and end (both included), in
+        ascending order, up to limit tags """
+        free_tags = []
+        tag = self.next_free(begin)
+        while tag is not None and tag <= end:
+            if limit is not None and len(free_tags) >= limit:
+                break
+            free_tags.append(tag)
+            tag = self.next_free(tag + 1)
+        return free_tags
+
+    def used_tags(self):
+        return (~self).free_in_range()
+
+
+def get_cached_tag_bitmaps(ix_code):
+    """ Returns the dict of bitmaps int already built for the IX """
+    return cache.get(TAG_BITMAPS_CACHE_KEY.format(ix_code), {})
+
+
+def set_cached_tag_bitmaps(ix_code, bitmaps):
+    cache.set(TAG_BITMAPS_CACHE_KEY.format(ix_code), bitmaps,
+              TAG_BITMAPS_CACHE_TIMEOUT)
+
+
+def invalidate_tag_bitmaps(ix_code):
+    """ Drops every bitmap of the IX. It is done again on commit, so a
+    bitmap rebuilt by a concurrent request before the commit does not
+    survive """
+    key = TAG_BITMAPS_CACHE_KEY.format(ix_code)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_cached_inner_tag_bitmap(tag_pk):
+    """ Returns the bitmap int of the inner tags used in an outer Tag, or
+    None if it is not cached """
+    return cache.get(INNER_TAG_BITMAP_CACHE_KEY.format(tag_pk))
+
+
+def set_cached_inner_tag_bitmap(tag_pk, bits):
+    cache.set(INNER_TAG_BITMAP_CACHE_KEY.format(tag_pk), bits,
+              TAG_BITMAPS_CACHE_TIMEOUT)
+
+
+def invalidate_inner_tag_bitmap(tag_pk):
+    key = INNER_TAG_BITMAP_CACHE_KEY.format(tag_pk)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
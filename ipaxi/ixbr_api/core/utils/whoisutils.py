@@ -1,6 +1,10 @@
 import re
-from subprocess import PIPE, CalledProcessError, run
+import threading
+import time
+from subprocess import PIPE, CalledProcessError, TimeoutExpired, run
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
@@ -8,14 +12,26 @@ from ..validators import validate_as_number
 
 INEXISTENT_ASN = _('ASN Does not exist.')
 
+WHOIS_CACHE_KEY = 'whois:{}'
+WHOIS_REFRESH_LOCK_KEY = 'whois_refresh:{}'
+# Default seconds a whois answer is kept, and an unknown ASN is remembered
+WHOIS_CACHE_TTL = 60 * 60 * 24
+WHOIS_NEGATIVE_CACHE_TTL = 60 * 10
+# Default seconds whois may run
+WHOIS_TIMEOUT = 30
+# Fraction of the TTL left when an entry starts being refreshed in background
+WHOIS_REFRESH_AHEAD = 0.2
+
 
 def get_whois(asn):
     try:
         validate_as_number(asn)
-        data = run(['whois', 'AS' + str(asn)], stdout=PIPE)
+        data = run(['whois', 'AS' + str(asn)], stdout=PIPE,
+                   timeout=getattr(settings, 'WHOIS_TIMEOUT', WHOIS_TIMEOUT))
         data.check_returncode()
         return data.stdout
-    except (TypeError, ValidationError, CalledProcessError) as e:
+    except (TypeError, ValidationError, CalledProcessError,
+            TimeoutExpired) as e:
         raise ValidationError(INEXISTENT_ASN)
 
 
@@ -55,5 +71,77 @@ def parse_whois(whois_content):
     return final_list
 
 
+def fetch_whois(asn, refresh=False):
+    """ Runs whois for an ASN and stores the answer in the cache, shared by
+    every process.
+
+    Args:
+        refresh: True when the cached answer is refreshed. If whois fails
+            (timeout, error or empty output) the cached answer is kept, as
+            an unknown ASN is only stored when nothing is cached.
+
+    Returns: dict with the raw whois 'content', its 'parsed' list of
+    tuples (both None for an unknown ASN) and the 'refresh_at' timestamp
+    after which it is refreshed in background (None for an unknown ASN)
+    """
+    try:
+        content = get_whois(asn)
+        parsed = parse_whois(content)
+    except ValidationError:
+        content = parsed = None
+
+    if parsed is None and refresh:
+        entry = cache.get(WHOIS_CACHE_KEY.format(asn))
+        if entry is not None and entry['parsed'] is not None:
+            return entry
+
+    if parsed is None:
+        ttl = getattr(settings, 'WHOIS_NEGATIVE_CACHE_TTL',
+                      WHOIS_NEGATIVE_CACHE_TTL)
+        refresh_at = None
+    else:
+        ttl = getattr(settings, 'WHOIS_CACHE_TTL', WHOIS_CACHE_TTL)
+        refresh_at = time.time() + ttl * (1 - WHOIS_REFRESH_AHEAD)
+
+    entry = {'content': content, 'parsed': parsed, 'refresh_at': refresh_at}
+    cache.set(WHOIS_CACHE_KEY.format(asn), entry, ttl)
+    return entry
+
+
+def refresh_whois_in_background(asn):
+    """ Fetches whois for an ASN again in a thread, unless some process is
+    already doing it """
+    if not cache.add(WHOIS_REFRESH_LOCK_KEY.format(asn), True, 60):
+        return
+
+    def refresh():
+        try:
+            fetch_whois(asn, refresh=True)
+        finally:
+            cache.delete(WHOIS_REFRESH_LOCK_KEY.format(asn))
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_whois_entry(asn):
+    """ Returns the cached whois entry of an ASN described in fetch_whois(),
+    running whois only when it is not cached. Entries close to expire are
+    answered from the cache while they are refreshed in background. """
+    try:
+        validate_as_number(asn)
+    except (TypeError, ValidationError):
+        raise ValidationError(INEXISTENT_ASN)
+
+    entry = cache.get(WHOIS_CACHE_KEY.format(asn))
+    if entry is None:
+        return fetch_whois(asn)
+    if entry['refresh_at'] is not None and time.time() >= entry['refresh_at']:
+        refresh_whois_in_background(asn)
+    return entry
+
+
 def get_parsed_whois(asn):
-    return parse_whois(get_whois(asn))
+    parsed = get_whois_entry(asn)['parsed']
+    if parsed is None:
+        raise ValidationError(INEXISTENT_ASN)
+    return parsed
@@ -45,6 +45,7 @@ INVALID_CUSTOMER_NAME = _(
 UNRECOGNIZED_CHANNEL_TYPE_VENDOR = _('Unrecognized channel_type/vendor values')
 INVALID_CHANNEL_TYPE_OR_VENDOR = _('Invalid value of channel_type or vendor')
 RESERVED_IP = _('The IP {} is reserved')
+ADDRESS_HELD = _('The IP {} is held to another user')
 # ------- Regex -------
 CNPJ = re.compile(r'^{0}$'.format(regex.cnpj))
 IX_CODE = re.compile(r'^{0}$'.format(regex.ix_code))
@@ -164,6 +165,26 @@ def validate_ipv6_network(value):
         raise ValidationError(INVALID_IPV6_NETWORK, code='invalid')
 
 
+def validate_ipv4_prefix(value):
+    """IPv4 network validator, without host bits set."""
+    try:
+        ipaddress.IPv4Network(value)
+    except (ipaddress.AddressValueError,
+            ipaddress.NetmaskValueError,
+            ValueError):
+        raise ValidationError(INVALID_IPV4_NETWORK, code='invalid')
+
+
+def validate_ipv6_prefix(value):
+    """IPv6 network validator, without host bits set."""
+    try:
+        ipaddress.IPv6Network(value)
+    except (ipaddress.AddressValueError,
+            ipaddress.NetmaskValueError,
+            ValueError):
+        raise ValidationError(INVALID_IPV6_NETWORK, code='invalid')
+
+
 def validate_ix_code(value):
     validator = RegexValidator(IX_CODE, USUAL_IX_CODE)
     validator(value)
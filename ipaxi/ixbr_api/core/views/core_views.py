@@ -4,9 +4,8 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.views.generic import ListView, View
 from django.db.models import Q
 from ..models import (IX, CustomerChannel,
-                      DownlinkChannel, Port, Organization, ASN, MLPAv4,
-                      MLPAv6, Bilateral, Tag, MACAddress, ChannelPort,
-                      Switch)
+                      DownlinkChannel, Port, Organization, ASN,
+                      search_by_identifier)
 
 
 class BundleEtherListView(LoginRequiredMixin, ListView):
@@ -102,57 +101,15 @@ class SearchASNByNameView(LoginRequiredMixin, View):
 
 
 class SearchUUIDView(LoginRequiredMixin, View):
+    """Search MLPAv4, MLPAv6, Tag, ChannelPort, Port and Switch objects by
+    the beginning of any group of their UUID, with a single query on the
+    SearchIndex.
+    """
+
     def get(self, request):
         uuid = request.GET.get('uuid')
         prev_path = request.GET.get('prev_path')
-        search_data = list()
-
-        where_to_look_list = ['MLPAv4', 'MLPAv6', 'Tag',
-                              'MacAddress', 'ChannelPort', 'Port', 'Switch']
-
-        for service in where_to_look_list:
-            if service == 'MLPAv4':
-                service_uuid = MLPAv4.objects.filter(uuid__icontains=uuid)
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-                continue
-
-            elif service == 'MLPAv6':
-                service_uuid = MLPAv6.objects.filter(uuid__icontains=uuid)
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-                continue
-
-            elif service == 'Bilateral':
-                service_uuid = Bilateral.objects.filter(uuid__icontains=uuid)
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-
-            elif service == 'Tag':
-                service_uuid = Tag.objects.filter(Q(Q(status='PRODUCTION') |
-                                                  Q(status='ALLOCATED')) &
-                                                  Q(uuid__icontains=uuid))
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-                continue
-
-            elif service == 'ChannelPort':
-                service_uuid = ChannelPort.objects.filter(uuid__icontains=uuid)
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-                continue
-
-            elif service == 'Port':
-                service_uuid = Port.objects.filter(uuid__icontains=uuid)
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-                continue
-
-            elif service == 'Switch':
-                service_uuid = Switch.objects.filter(uuid__icontains=uuid)
-                if len(service_uuid) > 0:
-                    search_data.extend(self.__build_dict(service_uuid, service))
-                continue
+        search_data = search_by_identifier(uuid or '')
 
         if len(search_data) == 0:
             messages.error(self.request, (uuid + " not found"),
@@ -164,14 +121,3 @@ class SearchUUIDView(LoginRequiredMixin, View):
             'search_res': search_data,
         }
         return render(request, 'core/uuid_list.html', context)
-
-    def __build_dict(self, query_set, item_type):
-        info =list()
-
-        for item in query_set:
-            item_dict = dict()
-            item_dict["type"] = item_type
-            item_dict["desc"] = str(item)
-            info.append(item_dict)
-
-        return info
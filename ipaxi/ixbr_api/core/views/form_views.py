@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from django import forms
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -47,12 +49,12 @@ from ..use_cases.mac_address_converter_to_system_pattern import (
 from ..use_cases.migrate_switch import migrate_switch
 from ..use_cases.switch_module_use_cases import (
     create_switch_module_with_ports_use_case,)
-from ..use_cases.tags_use_cases import (get_free_tags,
-                                        get_tag_without_all_service,
-                                        get_tag_without_bilateral,
-                                        instantiate_tag,)
-from ..utils import port_utils
-from ..utils.constants import CAPACITIES_CONF, SWITCH_MODEL_CHANNEL_PREFIX
+from ..use_cases.tags_use_cases import (
+    get_free_tags, get_or_create_specific_tag_without_all_service,
+    get_or_create_specific_tag_without_bilateral, get_tag_without_all_service,
+    get_uninstantiated_tag_numbers, instantiate_tag,)
+from ..utils.constants import (CAPACITIES_CONF, SWITCH_MODEL_CHANNEL_PREFIX,
+                               TAGS_BORN_ALLOCATED,)
 from ..utils.consulta import MAC
 from ..utils.last_ticket_update import updatelastticket
 from ..utils.logger import ixapilog
@@ -842,7 +844,8 @@ class AddCustomerChannelFormView(AjaxableResponseMixin,
                     p_object.save()
 
                 if tags_type == 'Direct-Bundle-Ether' and switch_object.is_pe:
-                    create_tag_by_channel_port(channel_port, True, 3)
+                    create_tag_by_channel_port(
+                        channel_port, True, len(TAGS_BORN_ALLOCATED))
 
                 customer_channel = CustomerChannel.objects.create(
                     cix_type=cix_type, asn=asn, name=channel_name,
@@ -1431,7 +1434,7 @@ class EditServiceTagFormView(LoginRequiredMixin, LogsMixin, FormView):
             with transaction.atomic():
                 tag = form.cleaned_data['tag']
 
-                tag_new = Tag.objects.get(tag=tag, ix=self.kwargs['code'])
+                ix = IX.objects.get(pk=self.kwargs['code'])
                 service_list = []
                 service_list.extend(MLPAv4.objects.filter(
                     pk=self.kwargs['service']))
@@ -1443,24 +1446,27 @@ class EditServiceTagFormView(LoginRequiredMixin, LogsMixin, FormView):
 
                 tag_old = service_list.tag
 
+                # The Tag is only instantiated when it is allocated
                 bilateral = BilateralPeer.objects.filter(pk=service_list.pk)
                 if bilateral:
-                    free_tags = get_tag_without_all_service(
-                        ix=self.kwargs['code'],
-                        channel=service_list.customer_channel)
+                    tag_new = get_or_create_specific_tag_without_all_service(
+                        ix=ix,
+                        channel=service_list.customer_channel,
+                        tag_number=tag)
 
                 else:
-                    free_tags = get_tag_without_bilateral(
-                        ix=self.kwargs['code'],
-                        channel=service_list.customer_channel)
+                    tag_new = get_or_create_specific_tag_without_bilateral(
+                        ix=ix,
+                        channel=service_list.customer_channel,
+                        tag_number=tag)
 
-                if tag_new in free_tags:
+                if tag_new:
                     service_list.tag = tag_new
 
                     service_list.save()
 
                     tag_new.update_status('PRODUCTION')
-                    if tag_old not in free_tags:
+                    if tag_old.status != 'AVAILABLE':
                         tag_old.update_status('AVAILABLE')
 
                 else:
@@ -2360,7 +2366,6 @@ class EditDioPortFormView(LoginRequiredMixin, FormView):
         pix_object = get_object_or_404(PIX, pk=pix)
         switch_set = pix_object.switch_set.all()
 
-        port_dict = dict()
         switch_dict = list()
 
         for switch in switch_set:
@@ -2380,13 +2385,11 @@ class EditDioPortFormView(LoginRequiredMixin, FormView):
         form.fields['switch'].choices = switch_dict
 
         port_set = Port.objects.filter(
-            switch=switch_initial)
-
-        for port in port_set:
-            if len(port.getDioPorts()) == 0:
-                port_dict[str(port.name)] = str(port.uuid)
+            switch=switch_initial).order_by_port_name()
 
-        ordered_ports = port_utils.port_sorting(port_dict)
+        ordered_ports = OrderedDict(
+            (str(port.name), str(port.uuid)) for port in port_set
+            if len(port.getDioPorts()) == 0)
 
         port_choices = ()
         for key in ordered_ports:
@@ -2865,14 +2868,54 @@ class ReleasePortResourceFormView(LoginRequiredMixin, LogsMixin, FormView):
             return redirect(self.request.META.get('PATH_INFO'))
 
 
-class AllocateTagStatusFormView(LoginRequiredMixin, LogsMixin, FormView):
+class UninstantiatedTagsMixin(object):
+    """
+    Mixin to offer, in the tag_number_field of a form, the tags without
+    instance of the tag domain of the bundle_pk, or of the IX when it is
+    ix_managed, and to instantiate the chosen ones.
+    """
+    tag_number_field = None
+
+    def get_tag_domain(self):
+        bundle_pk = self.request.GET.get('bundle_pk')
+        if bundle_pk:
+            return DownlinkChannel.objects.get(pk=bundle_pk).channel_port
+        return None
+
+    def get_form(self, form_class=None):
+        form = super(UninstantiatedTagsMixin, self).get_form(form_class)
+        form.fields[self.tag_number_field].choices = [
+            (tag_number, tag_number) for tag_number in
+            get_uninstantiated_tag_numbers(
+                ix=self.kwargs['ix'], tag_domain=self.get_tag_domain())]
+        return form
+
+    def instantiate_tags(self, form):
+        ix = IX.objects.get(pk=self.kwargs['ix'])
+        tag_domain = self.get_tag_domain()
+        tags = []
+        for tag_number in form.cleaned_data[self.tag_number_field]:
+            tag = instantiate_tag(ix=ix, tag_domain=tag_domain,
+                                  tag_number=tag_number,
+                                  last_ticket=(tag_domain or ix).last_ticket,
+                                  modified_by=self.request.user)
+            if tag is None:
+                raise ValidationError(
+                    "Tag {} already exists".format(tag_number))
+            tags.append(tag)
+        return tags
+
+
+class AllocateTagStatusFormView(LoginRequiredMixin, LogsMixin,
+                                UninstantiatedTagsMixin, FormView):
     template_name = 'forms/allocate_tag_status.html'
     form_class = AllocateTagStatusForm
     initial = {}
     http_method_names = ['get', 'post']
+    tag_number_field = 'tag_number_to_allocate'
 
     def get(self, request, **kwargs):
-        form = self.form_class()
+        form = self.get_form()
 
         self.context = {
             'ix': kwargs['ix'],
@@ -2898,10 +2941,9 @@ class AllocateTagStatusFormView(LoginRequiredMixin, LogsMixin, FormView):
         try:
             with transaction.atomic():
                 tags = form.cleaned_data['tag_to_allocate']
-                if tags:
-                    for tag in tags:
-                        tag.status = 'ALLOCATED'
-                        tag.save()
+                for tag in list(tags) + self.instantiate_tags(form):
+                    tag.status = 'ALLOCATED'
+                    tag.save()
 
                 ix = self.kwargs['ix']
                 if self.request.META['QUERY_STRING']:
@@ -2981,14 +3023,16 @@ class DeallocateTagStatusFormView(LoginRequiredMixin, LogsMixin, FormView):
             return redirect(self.request.META.get('PATH_INFO'))
 
 
-class ReserveTagResourceFormView(LoginRequiredMixin, LogsMixin, FormView):
+class ReserveTagResourceFormView(LoginRequiredMixin, LogsMixin,
+                                 UninstantiatedTagsMixin, FormView):
     template_name = 'forms/reserve_tag_resource.html'
     form_class = ReserveTagResourceForm
     initial = {}
     http_method_names = ['get', 'post']
+    tag_number_field = 'tag_number_to_reserve'
 
     def get(self, request, **kwargs):
-        form = self.form_class()
+        form = self.get_form()
 
         self.context = {
             'ix': kwargs['ix'],
@@ -3016,9 +3060,8 @@ class ReserveTagResourceFormView(LoginRequiredMixin, LogsMixin, FormView):
             with transaction.atomic():
                 tags = form.cleaned_data['tag_to_reserve']
 
-                if tags:
-                    for tag in tags:
-                        tag.reserve_this()
+                for tag in list(tags) + self.instantiate_tags(form):
+                    tag.reserve_this()
 
                 ix = self.kwargs['ix']
                 try:
@@ -1,6 +1,7 @@
 """Collections of Function Based Views (FBV)"""
 
 import json
+from collections import OrderedDict
 
 from django.core.exceptions import ValidationError
 from django.db.models import Q
@@ -9,20 +10,20 @@ from requests import get
 
 from ..models import (ASN, IX, PIX, BilateralPeer, ContactsMap,
                       CustomerChannel, IPv4Address, IPv6Address, MLPAv4,
-                      MLPAv6, Monitorv4, Port, Switch, Tag)
+                      MLPAv6, Monitorv4, Port, ServiceIndex, Switch, Tag)
 from ..use_cases.bilateral_use_case import define_bilateral_case
 from ..use_cases.get_free_ips_by_ix import get_free_ips_by_ix
 from ..use_cases.service_use_case import delete_service_use_case
 from ..use_cases.switch_module_use_cases import delete_switch_module_use_case
-from ..use_cases.tags_use_cases import (check_inner_tag_availability,
-                                        get_available_inner_tag,
-                                        get_tag_without_all_service,
+from ..use_cases.tags_use_cases import (get_common_available_inner_tag,
+                                        get_free_tag_numbers,
+                                        get_next_free_tag,
                                         get_tag_without_bilateral)
 from ..use_cases.mac_address_converter_to_system_pattern import (
     MACAddressConverterToSystemPattern,)
 from ..use_cases.search_use_cases import(
     search_customer_channel_by_mac_address)
-from ..utils import external_api_urls, port_utils
+from ..utils import external_api_urls
 from ..utils.constants import SWITCH_MODEL_CHANNEL_PREFIX
 
 
@@ -604,13 +605,11 @@ def get_ports_by_switch_search__as_detail(request):
 
     switch = Switch.objects.get(pk=switch_uuid)
 
-    port_set = switch.port_set.filter(status='AVAILABLE')
+    port_set = switch.port_set.filter(
+        status='AVAILABLE').order_by_port_name()
 
-    port_list = {}
-    for port in port_set:
-        port_list[str(port.name)] = str(port.uuid)
-
-    ordered_ports = port_utils.port_sorting(port_list)
+    ordered_ports = OrderedDict(
+        (str(port.name), str(port.uuid)) for port in port_set)
 
     channel_name_prefix = SWITCH_MODEL_CHANNEL_PREFIX[switch.model.vendor]
 
@@ -672,16 +671,18 @@ def get_ips_and_tags_by_ix(request):
     channel = request.GET['channel']
     channel_object = CustomerChannel.objects.get(pk=channel)
 
-    tag_list = []
     data = {}
 
-    ips = get_free_ips_by_ix(option, ix)
+    # Suggested addresses are held to the operator, so two forms filled at
+    # the same time do not get the same ones
+    holder = request.user.pk if request.user.is_authenticated else None
+    ips = get_free_ips_by_ix(option, ix, holder=holder)
     ipv4 = ips['ipv4']
     ipv6 = ips['ipv6']
 
-    tags_free = get_tag_without_bilateral(ix=ix, channel=channel_object)[:2]
-    for tag in tags_free:
-        tag_list.append(int(tag.tag))
+    tag_list = get_free_tag_numbers(ix=ix, channel=channel_object,
+                                    without='bilateral', create=True,
+                                    limit=2)
 
     if option == 'only_v4':
         data = {
@@ -707,7 +708,8 @@ def get_ips_and_tags_by_ix(request):
 
 def __ip_list(ip):
     ip_list = []
-    ip_list.append(str(ip.address))
+    if ip is not None:
+        ip_list.append(str(ip.address))
     return ip_list
 
 
@@ -720,80 +722,23 @@ def get_tags_by_port(request):
 
     tag = dict()
 
+    # Tags of each service type of each ASN in the customer channel
     cur_port = port.channel_port.customerchannel
-    try:
-        asn = ASN.objects.filter(
-            Q(pk__in=cur_port.mlpav4_set.all().values_list(
-                'asn', flat=True)))
-        for as_number in asn:
-            if as_number.number not in tag:
-                tag[as_number.number] = []
-            tags = Tag.objects.filter(
-                Q(pk__in=as_number.mlpav4_set.filter(
-                    customer_channel=cur_port.pk).values_list(
-                    'tag', flat=True))).filter(ix=ix.pk)
-            if tags:
-                tag[as_number.number].append(
-                    list(value.tag for value in tags))
-                tag[as_number.number] = sorted(
-                    tag[as_number.number], reverse=False)
-
-    except MLPAv4.DoesNotExist:
-        pass
-    try:
-        asn = ASN.objects.filter(
-            Q(pk__in=cur_port.mlpav6_set.all().values_list(
-                'asn', flat=True)))
-        for as_number in asn:
-            if as_number.number not in tag:
-                tag[as_number.number] = []
-            tags = Tag.objects.filter(
-                Q(pk__in=as_number.mlpav6_set.filter(
-                    customer_channel=cur_port.pk).values_list(
-                    'tag', flat=True))).filter(ix=ix.pk)
-            if tags:
-                tag[as_number.number].append(
-                    list(value.tag for value in tags))
-                tag[as_number.number] = sorted(
-                    tag[as_number.number], reverse=False)
-    except MLPAv6.DoesNotExist:
-        pass
-    try:
-        asn = ASN.objects.filter(
-            Q(pk__in=cur_port.bilateralpeer_set.all().values_list(
-                'asn', flat=True)))
-        for as_number in asn:
-            if as_number.number not in tag:
-                tag[as_number.number] = []
-            tags = Tag.objects.filter(
-                Q(pk__in=as_number.bilateralpeer_set.filter(
-                    customer_channel=cur_port.pk).values_list(
-                    'tag', flat=True))).filter(ix=ix.pk)
-            if tags:
-                tag[as_number.number].append(
-                    list(value.tag for value in tags))
-                tag[as_number.number] = sorted(
-                    tag[as_number.number], reverse=False)
-    except BilateralPeer.DoesNotExist:
-        pass
-    try:
-        asn = ASN.objects.filter(
-            Q(pk__in=cur_port.monitorv4_set.all().values_list(
-                'asn', flat=True)))
-        for as_number in asn:
-            if as_number.number not in tag:
-                tag[as_number.number] = []
-            tags = Tag.objects.filter(
-                Q(pk__in=as_number.monitorv4_set.filter(
-                    customer_channel=cur_port.pk).values_list(
-                    'tag', flat=True))).filter(ix=ix.pk)
-            if tags:
-                tag[as_number.number].append(
-                    list(value.tag for value in tags))
-                tag[as_number.number] = sorted(
-                    tag[as_number.number], reverse=False)
-    except Monitorv4.DoesNotExist:
-        pass
+    tags_by_service = dict()
+    for service_type, asn, tag_pk, tag_ix, tag_number in \
+            ServiceIndex.objects.filter(
+                customer_channel=cur_port.pk).values_list(
+                    'service_type', 'asn', 'tag', 'tag__ix', 'tag__tag'):
+        tag.setdefault(asn, [])
+        tags = tags_by_service.setdefault((asn, service_type), dict())
+        if tag_ix == ix.pk:
+            tags[tag_pk] = tag_number
+
+    for (asn, service_type), tags in tags_by_service.items():
+        if tags:
+            tag[asn].append(sorted(tags.values()))
+    for asn in tag:
+        tag[asn] = sorted(tag[asn], reverse=False)
     return JsonResponse(tag)
 
 
@@ -810,11 +755,8 @@ def get_new_customer_channels_by_switch(request):
     switch = request.GET['switch']
     asn = request.GET['asn']
 
-    used_channels = CustomerChannel.objects.filter(
-        Q(mlpav4__asn__pk=asn) |
-        Q(mlpav6__asn__pk=asn) |
-        Q(monitorv4__asn__pk=asn) |
-        Q(bilateralpeer__asn__pk=asn))
+    used_channels = ServiceIndex.objects.filter(asn=asn).values(
+        'customer_channel')
 
     cix_rules_free_channels = CustomerChannel.objects.filter(
         Q(asn__pk=asn) |
@@ -908,34 +850,29 @@ def get_bilateral_type(request):
         tag_a_number = tag_a.tag
         tag_b = get_tag_without_bilateral(ix=ix, channel=channel_b)[0]
         tag_b_number = tag_b.tag
-        inner_a = get_available_inner_tag(tag=tag_a)
-        inner_b = 0
-        for i in range(inner_a, 4097):
-            if not check_inner_tag_availability(tag=tag_b, inner=i):
-                continue
-            else:
-                if not check_inner_tag_availability(tag=tag_a, inner=i):
-                    continue
-                else:
-                    inner_a = i
-                    inner_b = i
-                    break
+        inner_a = get_common_available_inner_tag(tag_a=tag_a, tag_b=tag_b)
+        inner_b = inner_a
 
         data = {'bilateral_type': bilateral_type,
                 'tag_a': tag_a_number, 'tag_b': tag_b_number,
                 'inner_a': inner_a, 'inner_b': inner_b}
     elif bilateral_type == 1:
-        tag_a = get_tag_without_all_service(ix=ix, channel=channel_a)[0].tag
-        tag_b = get_tag_without_bilateral(ix=ix, channel=channel_b)[0].tag
+        tag_a = get_next_free_tag(ix=ix, channel=channel_a,
+                                  without='all_service', create=True)
+        tag_b = get_next_free_tag(ix=ix, channel=channel_b,
+                                  without='bilateral', create=True)
         data = {
             'bilateral_type': bilateral_type, 'tag_b': tag_b, 'tag_a': tag_a}
     elif bilateral_type == 2:
-        tag_a = get_tag_without_bilateral(ix=ix, channel=channel_a)[0].tag
-        tag_b = get_tag_without_all_service(ix=ix, channel=channel_a)[0].tag
+        tag_a = get_next_free_tag(ix=ix, channel=channel_a,
+                                  without='bilateral', create=True)
+        tag_b = get_next_free_tag(ix=ix, channel=channel_a,
+                                  without='all_service', create=True)
         data = {
             'bilateral_type': bilateral_type, 'tag_a': tag_a, 'tag_b': tag_b}
     elif bilateral_type == 0:
-        tag_a = get_tag_without_all_service(ix=ix, channel=channel_a)[0].tag
+        tag_a = get_next_free_tag(ix=ix, channel=channel_a,
+                                  without='all_service', create=True)
         tag_b = tag_a
         data = {
             'bilateral_type': bilateral_type, 'tag_a': tag_a, 'tag_b': tag_b}
@@ -985,11 +922,8 @@ def get_used_customer_channels_by_switch(request):
     asn = request.GET['asn']
     channels_list = {}
 
-    used_channels = CustomerChannel.objects.filter(
-        Q(mlpav4__asn__pk=asn) |
-        Q(mlpav6__asn__pk=asn) |
-        Q(monitorv4__asn__pk=asn) |
-        Q(bilateralpeer__asn__pk=asn))
+    used_channels = ServiceIndex.objects.filter(asn=asn).values(
+        'customer_channel')
 
     channels_query = used_channels.filter(
         channel_port__port__switch=Switch.objects.get(pk=switch))
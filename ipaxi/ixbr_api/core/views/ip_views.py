@@ -1,28 +1,32 @@
+import ipaddress
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.core.urlresolvers import reverse
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.views.generic import View
 
-from ..models import IX, IPv4Address, IPv6Address, MLPAv4, MLPAv6, Monitorv4
+from ..models import IX
+from ..use_cases.ip_allocation_use_cases import (IP_ALLOCATION_FAMILIES,
+                                                 IP_ALLOCATION_PAGE_SIZE,
+                                                 IP_ALLOCATION_STATUSES,
+                                                 get_ip_allocation)
+
+IP_ALLOCATION_MAX_PAGE_SIZE = 1024
 
 
 class IPListView(LoginRequiredMixin, View):
     """List IPs of a specific location.
 
-    List ips into a table marked by ALLOCATED or FREE status.
-    And show stats of IPs.
+    List the first page of ips into a table marked by ALLOCATED or FREE
+    status. The next pages are loaded from IPAllocationView.
 
     Attributes:
         context (dict): Dictionary that return a set of informations
             to be printed.
         dict_ips (dict): Dictionary with IP address and its status
             (ALLOCATED or FREE).
-        allocated_ipv4 (QuerySet): cached information of allocated ip v4
-        allocated_ipv6 (QuerySet): cached information of allocated ip v6
-        ipv4s (<class 'django.db.models.query.QuerySet'>): Get queryset with
-            filtered IPv4s from a specified IX.
-        ipv6s (<class 'django.db.models.query.QuerySet'>): Get queryset with
-            filtered IPv6s from a specified IX.
+        page (dict): First page returned by get_ip_allocation().
         ix (<class 'ixbr_api.core.models.IX'>): Get the ix from IX models or
             return a 404.
         template_name (str): core/ip_list.html'
@@ -51,39 +55,96 @@ class IPListView(LoginRequiredMixin, View):
               'v6': <IPv6Address: [2001:12f8:0:16::3]>
               'v6_status': "FREE"
             }
-          }
+          },
+          'next': '187.16.193.3'
         }
     """
 
     def get(self, request, code):
         template_name = 'core/ip_list.html'
         ix = get_object_or_404(IX, code=code)
-        ipv4s = IPv4Address.objects.filter(ix=code)
-        ipv6s = IPv6Address.objects.filter(ix=code)
-
-        allocated_ipv4 = IPv4Address.objects.filter(
-            Q(address__in=MLPAv4.objects.filter(
-                mlpav4_address__ix=code).values_list(
-                'mlpav4_address', flat=True))
-            | Q(address__in=Monitorv4.objects.filter(
-                monitor_address__ix=code).values_list(
-                'monitor_address', flat=True)))
-
-        allocated_ipv6 = IPv6Address.objects.filter(
-            Q(address__in=MLPAv6.objects.filter(
-                mlpav6_address__ix=code).values_list(
-                'mlpav6_address', flat=True)))
 
+        page = get_ip_allocation(ix=ix)
         dict_ips = dict()
-        for index, ipv4 in enumerate(ipv4s):
+        for index, row in enumerate(page['rows']):
             # index+1 because IPs start at 1
-            dict_ips[index+1] = {
-                "v4": ipv4,
-                "v4_status": "ALLOCATED" if ipv4 in allocated_ipv4 else "FREE",
-                "v6": ipv6s[index],
-                "v6_status": "ALLOCATED" if ipv6s[index] in allocated_ipv6
-                             else "FREE"
-            }
+            dict_ips[index+1] = row
 
-        context = {'ips': dict_ips, 'ix': ix}
+        context = {'ips': dict_ips, 'ix': ix, 'next': page['next']}
         return render(request, template_name, context)
+
+
+class IPAllocationView(LoginRequiredMixin, View):
+    """List a page of the IPs of a specific location as JSON.
+
+    Query parameters:
+        after: address where the previous page ended
+        family: 'ipv4' (default) or 'ipv6', the family the pages are
+            ordered and filtered by
+        status: 'ALLOCATED' or 'FREE' to filter the addresses of family
+        limit: amount of pairs, up to IP_ALLOCATION_MAX_PAGE_SIZE
+
+    Returns:
+        {
+          'results': [
+            {
+              'v4': {'address': '187.16.193.1', 'status': 'ALLOCATED',
+                     'reserved': False, 'description': ''},
+              'v6': {'address': '2001:12f8:0:16::1', 'status': 'FREE',
+                     'reserved': False, 'description': ''},
+              'edit_description_url': '/core/form/edit-ip-description/...'
+            },
+            ...
+          ],
+          'next': '187.16.193.1' or null on the last page
+        }
+    """
+
+    def get(self, request, code):
+        ix = get_object_or_404(IX, code=code)
+
+        family = request.GET.get('family')
+        if family not in IP_ALLOCATION_FAMILIES:
+            family = None
+        status = request.GET.get('status')
+        if status not in IP_ALLOCATION_STATUSES:
+            status = None
+        try:
+            limit = min(int(request.GET.get('limit', IP_ALLOCATION_PAGE_SIZE)),
+                        IP_ALLOCATION_MAX_PAGE_SIZE)
+        except ValueError:
+            return HttpResponseBadRequest('limit must be a number')
+        after = request.GET.get('after') or None
+        if after is not None:
+            try:
+                ipaddress.ip_address(after)
+            except ValueError:
+                return HttpResponseBadRequest('after must be an address')
+
+        page = get_ip_allocation(ix=ix, family=family, status=status,
+                                 after=after, limit=max(limit, 1))
+
+        results = []
+        for row in page['rows']:
+            result = {
+                'v4': self.serialize(row['v4'], row['v4_status']),
+                'v6': self.serialize(row['v6'], row['v6_status']),
+                'edit_description_url': None,
+            }
+            if row['v4'] and row['v6']:
+                result['edit_description_url'] = reverse(
+                    'core:edit_ip_description_form',
+                    kwargs={'ipv4': row['v4'].pk, 'ipv6': row['v6'].pk})
+            results.append(result)
+
+        return JsonResponse({'results': results, 'next': page['next']})
+
+    def serialize(self, address, status):
+        if address is None:
+            return None
+        return {
+            'address': address.address,
+            'status': status,
+            'reserved': address.is_reserved,
+            'description': address.description,
+        }
@@ -8,6 +8,8 @@ from django.views.generic import ListView, View
 from ..models import (ASN, DIO, IX, PIX, BilateralPeer, CustomerChannel,
                       IPv4Address, IPv6Address, MACAddress, MLPAv4,
                       MLPAv6, Monitorv4, Port, Tag,)
+from ..use_cases.ix_stats_use_cases import get_ix_stats
+from ..use_cases.tags_use_cases import get_uninstantiated_tag_domains
 from ..utils.consulta import MAC
 from ..use_cases.mac_address_converter_to_system_pattern import (
     MACAddressConverterToSystemPattern
@@ -30,6 +32,7 @@ class IXDetailView(LoginRequiredMixin, ListView):
         self.mlpav4_total (int): Total of MLPAv4 from a specified IX.
         self.mlpav6_total (int): Total of MLPAv6 from a specified IX.
         self.bilateral_total (int): Total of bilateral from a specified IX.
+        self.stats (dict): Every figure of the IX, see get_ix_stats().
         cixs (int): Total of bilateral from a specified IX.
         template_name (str): core/ix_detail.html
     returns:
@@ -50,26 +53,15 @@ class IXDetailView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         self.ix = get_object_or_404(IX, code=self.kwargs['code'])
-        self.total_production_tags = Tag.objects.filter(
-            ix=self.kwargs['code'],
-            status='PRODUCTION').count()
-        self.total_available_tags = Tag.objects.filter(
-            ix=self.kwargs['code'],
-            status='AVAILABLE').count()
-        self.total_reserved_tags = Tag.objects.filter(
-            ix=self.kwargs['code'],
-            status='ALLOCATED').count()
-        self.pixs = PIX.objects.filter(ix=self.kwargs['code'])
-        self.asn_total = 0
-        self.mlpav4_total = 0
-        self.mlpav6_total = 0
-        self.bilateral_total = 0
-        for value in self.pixs:
-            self.asn_total += value.get_stats_amount()['asn_amount']
-            self.mlpav4_total += value.get_stats_amount()['mlpav4_amount']
-            self.mlpav6_total += value.get_stats_amount()['mlpav6_amount']
-            self.bilateral_total += value.\
-                get_stats_amount()['bilateral_amount']
+        self.stats = get_ix_stats(ix=self.ix)
+        self.total_production_tags = self.stats['tags'].get('PRODUCTION', 0)
+        self.total_available_tags = self.stats['tags'].get('AVAILABLE', 0)
+        self.total_reserved_tags = self.stats['tags'].get('ALLOCATED', 0)
+        self.pixs = self.stats['pixs']
+        self.asn_total = self.stats['asn_total']
+        self.mlpav4_total = self.stats['mlpav4_total']
+        self.mlpav6_total = self.stats['mlpav6_total']
+        self.bilateral_total = self.stats['bilateral_total']
         if self.ix.tags_policy == 'ix_managed':
             self.is_managed = True
         else:
@@ -86,12 +78,14 @@ class IXDetailView(LoginRequiredMixin, ListView):
         context['total_available_tags'] = self.total_available_tags
         context['total_reserved_tags'] = self.total_reserved_tags
         context['pixs'] = self.pixs
-        context['cixs'] = self.ix.get_cix_info()
+        context['pix_stats'] = self.stats['pix_stats']
+        context['cixs'] = self.stats['cixs']
         context['asn_total'] = self.asn_total
         context['mlpav4_total'] = self.mlpav4_total
         context['mlpav6_total'] = self.mlpav6_total
         context['bilateral_total'] = self.bilateral_total
-        context['total_available_ports'] = self.ix.get_total_available_ports()
+        context['total_available_ports'] = \
+            self.stats['total_available_ports']
         context['is_managed'] = self.is_managed
 
         return context
@@ -214,10 +208,19 @@ class TagSearchView(LoginRequiredMixin, View):
         context = {}
         ix = get_object_or_404(IX, code=code)
 
-        if tag_queryset.count():
+        # Tags are only instantiated when allocated, so a tag without
+        # instance is AVAILABLE in its tag domains
+        try:
+            free_tag_domains = get_uninstantiated_tag_domains(
+                ix=ix, tag_number=int(tag_number))
+        except (TypeError, ValueError):
+            free_tag_domains = []
+
+        if tag_queryset.count() or free_tag_domains:
             context = {'ix': ix,
                        'tag_number': tag_number,
-                       'tag_queryset': tag_queryset}
+                       'tag_queryset': tag_queryset,
+                       'free_tag_domains': free_tag_domains}
 
             return render(request, 'core/tag_search_result.html', context)
 
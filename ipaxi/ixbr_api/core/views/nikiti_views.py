@@ -2,22 +2,83 @@
 """
 
 # System Imports
+from abc import ABCMeta, abstractmethod
 from re import findall, sub
 
 # Third-party Imports
-from django.shortcuts import render
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
 from django.views.generic import View
 
 # Local source tree Imports
 from ..utils.nikiti.queries import (AlocacaoDeIps, AlocacaoDeVlans,
                                     MonitoracaoInterfaces,)
+from ..utils.nikiti.snapshots import get_snapshot
 
 
-class MonitoramentoInterfaces(View):
+class NikitiSnapshotView(View, metaclass=ABCMeta):
+    """
+    Parent class of the Nikiti pages. The page of each IX is served from its
+    last snapshot, answering conditional GETs with 304. The pages only read,
+    so they are not wrapped in the request transaction.
+    """
+    page = None
+    template_name = None
+    # Set by as_view(), None when the page is built outside a request
+    request = None
+
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    @abstractmethod
+    def build_dict(self, ix):
+        """
+        Args:
+            ix: The ix code
+
+        Returns: The context of the page template
+
+        """
+
+    def build(self, ix):
+        """
+        Renders the page of an IX from the DB
+
+        Args:
+            ix: The ix code
+
+        Returns: The page content
+
+        """
+        return render_to_string(self.template_name,
+                                {'context': self.build_dict(ix=ix)},
+                                request=self.request)
+
+    def get(self, request, ix):
+        snapshot = get_snapshot(self.page, ix, self.build)
+        etag = quote_etag(snapshot['etag'])
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=snapshot['last_modified'])
+        if response is None:
+            response = HttpResponse(snapshot['content'])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(snapshot['last_modified'])
+        return response
+
+
+class MonitoramentoInterfaces(NikitiSnapshotView):
     """
     This class implements the View to render nikiti's Monitoramento de
     Interfaces page.
     """
+    page = 'monitoramento_de_interfaces'
+    template_name = 'nikiti/monitoramento_de_interfaces_template.html'
 
     def build_dict(self, ix):
         """
@@ -50,7 +111,7 @@ class MonitoramentoInterfaces(View):
             nikiti_dict_built[s_ip]["pix"] = switch.pix.code
             nikiti_dict_built[s_ip]["ports"] = dict()
 
-            for port in switch.port_set.all():
+            for port in query.get_ports_per_switch(switch):
 
                 if port.status == "CUSTOMER":
                     nikiti_dict_built[s_ip]["ports"][port.name] = dict()
@@ -61,7 +122,7 @@ class MonitoramentoInterfaces(View):
                     nikiti_dict_built[s_ip]["ports"][port.name]["asn"] = \
                         port_asn.number
                     nikiti_dict_built[s_ip]["ports"][port.name]["participante"] =\
-                        port_asn.contactsmap_set.first().organization.name
+                        query.loader.get_participant(port_asn)
                     port_type = query.get_port_type(port_uuid=port.uuid)
                     nikiti_dict_built[s_ip]["ports"][port.name]["type"] = port_type
                     port_status = query.get_port_status(port_uuid=port.uuid)
@@ -95,17 +156,14 @@ class MonitoramentoInterfaces(View):
 
         return nikiti_dict_built
 
-    def get(self, request, ix):
-        context = self.build_dict(ix=ix)
-        return render(request,
-                      'nikiti/monitoramento_de_interfaces_template.html',
-                      {'context': context})
-
 
-class AlocacaoDeIP(View):
+class AlocacaoDeIP(NikitiSnapshotView):
     """
     This class implements the View to render nikiti's Alocacao de IPs page.
     """
+    page = 'alocacao_de_ip'
+    template_name = 'nikiti/alocacao_ips_template.html'
+
     def build_dict(self, ix):
         """
 
@@ -146,9 +204,9 @@ class AlocacaoDeIP(View):
             line = ""
             ip_dict = query.ip_used_dict(channel_port)
             last_ticket = str(channel_port.last_ticket)
-            pix_id = channel_port.port_set.first().switch.pix.code
+            pix_id = query.loader.get_first_port(channel_port).switch.pix.code
             for ip4, asn in ip_dict["ipv4"].items():
-                as_name = asn.contactsmap_set.first().organization.name
+                as_name = query.loader.get_participant(asn)
                 line = str(asn.number) + 9*space + as_name + 7*space + ip4
                 ip6 = query.find_asn_per_last_ip_value(ip4, ip_dict["ipv6"])
                 if ip6 is not None:
@@ -159,8 +217,8 @@ class AlocacaoDeIP(View):
                 line = line + 5*space + pix_id + 5*space + "Em ativação [" + \
                        last_ticket + "]"
                 ip_alloc_dict["lines"].append(line)
-            for ip6, asn in ip_dict["ipv6"]:
-                as_name = asn.contactsmap_set.first().organization.name
+            for ip6, asn in ip_dict["ipv6"].items():
+                as_name = query.loader.get_participant(asn)
                 line = str(asn.number) + 5*space + as_name + 15*space + ip6
 
                 line = line + 5*space + pix_id + 5*space + "Em ativação [" + \
@@ -168,18 +226,13 @@ class AlocacaoDeIP(View):
                 ip_alloc_dict["lines"].append(line)
         return ip_alloc_dict
 
-    def get(self, request, ix):
-        context = self.build_dict(ix=ix)
-        print(context)
-        return render(request,
-                      'nikiti/alocacao_ips_template.html',
-                      {'context': context})
 
-
-class Vlans(View):
+class Vlans(NikitiSnapshotView):
     """
     This class implements the View to render nikiti's VLAN's page.
     """
+    page = 'vlans'
+    template_name = 'nikiti/vlans_template.html'
 
     def build_dict(self, ix):
         """
@@ -238,9 +291,3 @@ class Vlans(View):
 
         tags_dict.update(special_tag_names)
         return tags_dict
-
-    def get(self, request, ix):
-        context = self.build_dict(ix=ix)
-        return render(request,
-                      'nikiti/vlans_template.html',
-                      {'context': context})
@@ -3,6 +3,7 @@ from django.shortcuts import get_object_or_404
 from django.views.generic import ListView
 
 from ..models import IX, DownlinkChannel, Port, Tag
+from ..use_cases.tags_use_cases import get_tag_amounts
 
 
 class TAGsListView(LoginRequiredMixin, ListView):
@@ -55,16 +56,17 @@ class TAGsListView(LoginRequiredMixin, ListView):
             self.switch_model = Port.objects.filter(
                 channel_port=self.bundle_name.channel_port).\
                 first().switch.model
-            self.tags = DownlinkChannel.objects.get(
-                pk=bundle_pk).channel_port.tag_set.all()
-            self.available_amount = len(self.tags.filter(status='AVAILABLE'))
-            self.production_amount = len(self.tags.filter(status='PRODUCTION'))
+            tag_domain = self.bundle_name.channel_port
+            self.tags = tag_domain.tag_set.all()
         except Exception:
             self.bundle_name = ''
             self.switch_model = ''
+            tag_domain = None
             self.tags = IX.objects.get(pk=ix_code).tag_set.all()
-            self.available_amount = len(self.tags.filter(status='AVAILABLE'))
-            self.production_amount = len(self.tags.filter(status='PRODUCTION'))
+        # Tags without instance are counted as AVAILABLE
+        amounts = get_tag_amounts(ix=self.ix, tag_domain=tag_domain)
+        self.available_amount = amounts.get('AVAILABLE', 0)
+        self.production_amount = amounts.get('PRODUCTION', 0)
 
         return self.tags
 
@@ -1,8 +1,11 @@
 $('tr:visible').filter(':odd').css({'background-color': '#f2f2f2'});
 $('tr:visible').filter(':even').css({'background-color': '#FFF'});
 
+// Filter of the rows loaded from the server, see load_ips
+var ips_filter = {};
 
-$(".basic-ip-info-detail").click(function(e){
+
+$("#ip-list-table").on("click", ".basic-ip-info-detail", function(e){
       	var open = $(this).data("open");
       	var ipv4 = $(this).data("ip");
       	var ipv6 = $(this).data("ipv");
@@ -157,20 +160,87 @@ $("#asn").keyup(function(e){
     }
 });
 
-//Filter IPs
+//Filter IPs, done by the server over all the IPs of the IX
 $("#filter_ips").change(function(){
-	$(".more-ip-info-detail").css({"display" : "none"});
-	$(".basic-ip-info-detail").css({"border" : "none"});
 	var status = $(this).val();
 	var type_ip = $('option:selected').data("typeip");
 	if(status === "ALL" || status === ""){
-		$(".basic-ip-info-detail").css({"display" : "table-row"});
+		ips_filter = {};
 	}else{
-		filter_ips(type_ip, status);
+		ips_filter = {'family': type_ip, 'status': status};
 	}
-	$('tr:visible').filter(':odd').css({'background-color': '#f2f2f2'});
-	$('tr:visible').filter(':even').css({'background-color': '#FFF'});
+	$("#ip-list-table tbody").empty();
+	$("#ip-list-table").data("next", "");
+	load_ips();
+});
+
+$("#load-more-ips").click(function(){
+	load_ips();
 });
+
+//Function load_ips appends the next page of IPs to the table
+function load_ips(){
+	var table = $("#ip-list-table");
+	var data = $.extend({}, ips_filter);
+	if(table.data("next")){
+		data['after'] = table.data("next");
+	}
+	$("#load-more-ips").prop("disabled", true);
+	$.ajax({
+		url: table.data("url"),
+		data: data,
+		dataType: 'json',
+		success: function(data){
+			var key = $(".basic-ip-info-detail").length;
+			var html = "";
+			for(var i = 0; i < data.results.length; i++){
+				key++;
+				html += ip_row(key, data.results[i]);
+			}
+			table.find("tbody").append(html);
+			table.data("next", data.next || "");
+			$("#load-more-ips-container").toggleClass("hidden", !data.next);
+			$('tr:visible').filter(':odd').css({'background-color': '#f2f2f2'});
+			$('tr:visible').filter(':even').css({'background-color': '#FFF'});
+		},
+		complete: function(){
+			$("#load-more-ips").prop("disabled", false);
+		}
+	});
+}
+
+//Function ip_row returns the rows of a pair of IPs, as rendered by ip_list.html
+function ip_row(key, row){
+	var table = $("#ip-list-table");
+	var v4 = row.v4 || {'address': '', 'status': '', 'reserved': false, 'description': ''};
+	var v6 = row.v6 || {'address': '', 'status': '', 'reserved': false, 'description': ''};
+	var html = "<tr class='basic-ip-info-detail' id='border-" + key + "' data-open='" + key + "' data-ip='" + v4.address + "' data-ipv='" + v6.address + "'>";
+	$.each([[v4, 'ipv4'], [v6, 'ipv6']], function(index, ip){
+		var status_class = ip[0].status === 'FREE' ? 'text-success' : 'text-danger';
+		html += "<td class='text-center'>" + ip[0].address + "</td>";
+		html += "<td class='text-center " + status_class + " status-" + ip[1] + "' data-open='" + key + "'>" + ip[0].status + "</td>";
+		html += "<td class='text-center text-danger status-" + ip[1] + "' data-open='" + key + "'>" + (ip[0].reserved ? "True" : "") + "</td>";
+	});
+	html += "<td class='align-middle text-center status-ipv4' data-open='" + key + "'><div class=''>" + escape_html(v4.description) + "</div><div class=''>";
+	if(row.edit_description_url){
+		var icon = v4.description === "" ? ["fa-plus-circle", "Add description"] : ["fa-pencil-square-o", "Edit description"];
+		html += "<i class='fa " + icon[0] + " no_display' aria-hidden='true' href='" + row.edit_description_url + "' data-toggle='modal' data-target='#modal' title='" + icon[1] + "'></i>";
+	}
+	html += "</div></td></tr>";
+	html += "<tr class='more-ip-info-detail' id='detail-open-" + key + "'>";
+	$.each([['ipv4', 3], ['ipv6', 4]], function(index, ip){
+		html += "<td colspan='" + ip[1] + "'><div class='col-md-12 more-ip-detail text-center' id='" + ip[0] + "-detail-" + key + "'>";
+		html += "<p id='" + ip[0] + "-detail-paragraph-asn-" + key + "' class='ip-detail-paragraph'>ASN: <a href='" + table.data("as-detail-url") + "'><span id='" + ip[0] + "-asn-" + key + "'></span></a></p>";
+		html += "<p id='" + ip[0] + "-detail-paragraph-name-" + key + "' class='ip-detail-paragraph'>NAME: <a href='" + table.data("ix-as-detail-url") + "'><span id='" + ip[0] + "-name-" + key + "'></span></a></p>";
+		html += "</div></td>";
+	});
+	html += "</tr>";
+	return html;
+}
+
+function escape_html(text){
+	return $("<div>").text(text).html();
+}
 //Function search_asn_ip list of ips by asn
 function search_asn_ip(data){
 	var i = 0;
@@ -191,20 +261,3 @@ function search_asn_ip(data){
 		});
 	}
 }
-
-//Function filter IPs
-function filter_ips(type_ip, status){
-	$(".basic-ip-info-detail").css({"display" : "none"});
-		$(".status-"+type_ip).each(function(){
-			var open = $(this).data("open");
-			var stat = $(this).text();
-				
-			if(stat === status){
-				if($("#border-"+open).css("display") === "none"){
-					$("#border-"+open).css({"display" : "table-row"});
-				}
-			}else{
-				$("#border-"+open).css({"display" : "none"});
-			}
-	});
-}